@@ -31,11 +31,12 @@
 import os
 from abc import abstractmethod
 
-from tvb.adapters.analyzers.matlab_worker import MatlabWorker
 from tvb.adapters.datatypes.db.connectivity import ConnectivityIndex
 from tvb.adapters.datatypes.db.graph import ConnectivityMeasureIndex
 from tvb.adapters.datatypes.db.mapped_value import ValueWrapperIndex
 from tvb.adapters.datatypes.h5.mapped_value_h5 import ValueWrapper
+from tvb.analyzers.graph import modularity_dir, modularity_und, distance_bin, distance_wei, breadthdist, \
+    reachdist, findwalks
 from tvb.basic.profile import TvbProfile
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
 from tvb.core.entities.filters.chain import FilterChain
@@ -103,17 +104,10 @@ class BaseUnidirectedBCTForm(BaseBCTForm):
 class BaseBCT(ABCAdapter):
     """
     Interface between Brain Connectivity Toolbox of Olaf Sporns and TVB Framework.
-    This adapter requires BCT deployed locally, and Matlab or Octave installed separately of TVB.
+    The BCT functions are computed with their NumPy implementation from `tvb.analyzers.graph`,
+    the BCT sources being only read for the adapter descriptions.
     """
 
-    def __init__(self):
-        ABCAdapter.__init__(self)
-        self.matlab_worker = MatlabWorker()
-
-    @staticmethod
-    def can_be_active():
-        return not not TvbProfile.current.MATLAB_EXECUTABLE
-
     def get_form_class(self):
         return BaseBCTForm
 
@@ -130,34 +124,25 @@ class BaseBCT(ABCAdapter):
     def get_connectivity(self, view_model):
         return self.load_traited_by_gid(view_model.connectivity)
 
-    def execute_matlab(self, matlab_code, data):
-        self.matlab_worker.add_to_path(BCT_PATH)
-        self.log.info("Starting execution of MATLAB code:" + matlab_code)
-        runcode, matlablog, result = self.matlab_worker.matlab(matlab_code, data=data, work_dir=self.get_storage_path())
-        self.log.debug("Code run in MATLAB: " + str(runcode))
-        self.log.debug("MATLAB log: " + str(matlablog))
-        self.log.debug("Finished MATLAB execution:" + str(result))
-        return result
-
-    def build_connectivity_measure(self, result, key, connectivity, title="", label_x="", label_y=""):
+    def build_connectivity_measure(self, array_data, connectivity, title="", label_x="", label_y=""):
         measure = ConnectivityMeasure()
-        measure.array_data = result[key]
+        measure.array_data = array_data
         measure.connectivity = connectivity
         measure.title = title
         measure.label_x = label_x
         measure.label_y = label_y
         return self.store_complete(measure)
 
-    def build_float_value_wrapper(self, result, key, title=""):
+    def build_float_value_wrapper(self, data_value, title=""):
         value = ValueWrapper()
-        value.data_value = str(float(result[key]))
+        value.data_value = str(float(data_value))
         value.data_type = 'float'
         value.data_name = title
         return self.store_complete(value)
 
-    def build_int_value_wrapper(self, result, key, title=""):
+    def build_int_value_wrapper(self, data_value, title=""):
         value = ValueWrapper()
-        value.data_value = str(int(result[key]))
+        value.data_value = str(int(data_value))
         value.data_type = 'int'
         value.data_name = title
         return self.store_complete(value)
@@ -186,18 +171,17 @@ class ModularityOCSM(BaseBCT):
 
     _ui_name = "Compute optimal Community Structure and Modularity from a Directed (weighted or binary) connection matrix:"
     _ui_description = bct_description("modularity_dir.m")
-    _matlab_code = "[Ci,Q] = modularity_dir(CW);"
+    _bct_function = staticmethod(modularity_dir)
 
     def launch(self, view_model):
         # Prepare parameters
         connectivity = self.get_connectivity(view_model)
-        data = {'CW': connectivity.weights}
 
-        # Execute the matlab code
-        result = self.execute_matlab(self._matlab_code, data=data)
+        # Compute the BCT function
+        Ci, Q = self._bct_function(connectivity.weights)
         # Gather results
-        measure = self.build_connectivity_measure(result, 'Ci', connectivity, "Optimal Community Structure")
-        value = self.build_float_value_wrapper(result, 'Q', title="Maximized Modularity")
+        measure = self.build_connectivity_measure(Ci, connectivity, "Optimal Community Structure")
+        value = self.build_float_value_wrapper(Q, title="Maximized Modularity")
         return [measure, value]
 
 
@@ -206,7 +190,7 @@ class ModularityOpCSMU(ModularityOCSM):
     """
     _ui_name = "Optimal Community Structure and Modularity (Undirected):"
     _ui_description = bct_description("modularity_und.m")
-    _matlab_code = "[Ci,Q] = modularity_und(CW);"
+    _bct_function = staticmethod(modularity_und)
 
 
 class DistanceDBIN(BaseBCT):
@@ -216,14 +200,12 @@ class DistanceDBIN(BaseBCT):
 
     _ui_name = "Distance binary matrix"
     _ui_description = bct_description("distance_bin.m")
-    _matlab_code = "D = distance_bin(A);"
+    _bct_function = staticmethod(distance_bin)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure = self.build_connectivity_measure(result, 'D', connectivity, "Distance matrix")
+        D = self._bct_function(connectivity.weights)
+        measure = self.build_connectivity_measure(D, connectivity, "Distance matrix")
         return [measure]
 
 
@@ -232,7 +214,13 @@ class DistanceDWEI(DistanceDBIN):
     """
     _ui_name = "Distance weighted matrix over a Weighted (directed/undirected) connection matrix"
     _ui_description = bct_description("distance_wei.m")
-    _matlab_code = "D = distance_wei(A);"
+    _bct_function = staticmethod(distance_wei)
+
+    def launch(self, view_model):
+        connectivity = self.get_connectivity(view_model)
+        D, _ = self._bct_function(connectivity.weights)
+        measure = self.build_connectivity_measure(D, connectivity, "Distance matrix")
+        return [measure]
 
 
 class DistanceRDM(DistanceDBIN):
@@ -240,16 +228,14 @@ class DistanceRDM(DistanceDBIN):
     """
     _ui_name = "Reachability and distance matrices (Breadth-first search)"
     _ui_description = bct_description("breadthdist.m")
-    _matlab_code = "[R,D] = breadthdist(A);"
+    _bct_function = staticmethod(breadthdist)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
+        R, D = self._bct_function(connectivity.weights)
 
-        measure1 = self.build_connectivity_measure(result, 'R', connectivity, "Reachability matrix")
-        measure2 = self.build_connectivity_measure(result, 'D', connectivity, "Distance matrix")
+        measure1 = self.build_connectivity_measure(R, connectivity, "Reachability matrix")
+        measure2 = self.build_connectivity_measure(D, connectivity, "Distance matrix")
         return [measure1, measure2]
 
 
@@ -258,7 +244,7 @@ class DistanceRDA(DistanceRDM):
     """
     _ui_name = "Reachability and distance matrices (Algebraic path count)"
     _ui_description = bct_description("reachdist.m")
-    _matlab_code = "[R,D] = reachdist(A);"
+    _bct_function = staticmethod(reachdist)
 
 
 class DistanceNETW(DistanceDBIN):
@@ -266,15 +252,13 @@ class DistanceNETW(DistanceDBIN):
     """
     _ui_name = "Network walks"
     _ui_description = bct_description("findwalks.m")
-    _matlab_code = "[Wq,twalk,wlq]  = findwalks(A);"
+    _bct_function = staticmethod(findwalks)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
+        Wq, twalk, wlq = self._bct_function(connectivity.weights)
 
-        measure1 = self.build_connectivity_measure(result, 'Wq', connectivity, "3D matrix")
-        measure2 = self.build_connectivity_measure(result, 'wlq', connectivity, "Walk length distribution")
-        value = self.build_float_value_wrapper(result, 'twalk', title="Total number of walks found")
+        measure1 = self.build_connectivity_measure(Wq, connectivity, "3D matrix")
+        measure2 = self.build_connectivity_measure(wlq, connectivity, "Walk length distribution")
+        value = self.build_float_value_wrapper(twalk, title="Total number of walks found")
         return [measure1, value, measure2]
@@ -29,6 +29,9 @@
 #
 
 from tvb.adapters.analyzers.bct_adapters import BaseBCT, BaseUndirected, bct_description, LABEL_CONNECTIVITY_BINARY
+from tvb.analyzers.graph import betweenness_bin, betweenness_wei, edge_betweenness_bin, edge_betweenness_wei, \
+    eigenvector_centrality_und, kcoreness_centrality_bu, kcoreness_centrality_bd, erange, flow_coef_bd, \
+    participation_coef, participation_coef_sign, subgraph_centrality
 from tvb.core.entities.model.model_operation import AlgorithmTransientGroup
 
 BCT_GROUP_CENTRALITY = AlgorithmTransientGroup("Centrality Algorithms", "Brain Connectivity Toolbox", "bctcentrality")
@@ -40,14 +43,12 @@ class CentralityNodeBinary(BaseBCT):
 
     _ui_name = "Node Betweenness Centrality Binary: " + LABEL_CONNECTIVITY_BINARY
     _ui_description = bct_description("betweenness_bin.m")
-    _matlab_code = "C = betweenness_bin(A);"
+    _bct_function = staticmethod(betweenness_bin)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'C', connectivity,
+        C = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(C, connectivity,
                                                   "Node Betweenness Centrality Binary", "Nodes")
         return [measure_index]
 
@@ -58,14 +59,12 @@ class CentralityNodeWeighted(BaseBCT):
 
     _ui_name = "Node Betweenness Centrality Weighted: Weighted (directed/undirected)  connection matrix"
     _ui_description = bct_description("betweenness_wei.m")
-    _matlab_code = "C = betweenness_wei(A);"
+    _bct_function = staticmethod(betweenness_wei)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'C', connectivity,
+        C = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(C, connectivity,
                                                   "Node Betweenness Centrality Weighted", "Nodes")
         return [measure_index]
 
@@ -75,16 +74,14 @@ class CentralityEdgeBinary(CentralityNodeBinary):
     """
     _ui_name = "Edge Betweenness Centrality Weighted"
     _ui_description = bct_description("edge_betweenness_bin.m")
-    _matlab_code = "[EBC,BC] = edge_betweenness_bin(A);"
+    _bct_function = staticmethod(edge_betweenness_bin)
 
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'EBC', connectivity, "Edge Betweenness Centrality Matrix")
-        measure_index2 = self.build_connectivity_measure(result, 'BC', connectivity, "Node Betweenness Centrality Vector")
+        EBC, BC = self._bct_function(connectivity.weights)
+        measure_index1 = self.build_connectivity_measure(EBC, connectivity, "Edge Betweenness Centrality Matrix")
+        measure_index2 = self.build_connectivity_measure(BC, connectivity, "Node Betweenness Centrality Vector")
         return [measure_index1, measure_index2]
 
 
@@ -93,16 +90,14 @@ class CentralityEdgeWeighted(CentralityNodeWeighted):
     """
     _ui_name = "Edge Betweenness Centrality Weighted"
     _ui_description = bct_description("edge_betweenness_wei.m")
-    _matlab_code = "[EBC,BC] = edge_betweenness_wei(A);"
+    _bct_function = staticmethod(edge_betweenness_wei)
 
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'EBC', connectivity, "Edge Betweenness Centrality Matrix")
-        measure_index2 = self.build_connectivity_measure(result, 'BC', connectivity, "Node Betweenness Centrality Vector")
+        EBC, BC = self._bct_function(connectivity.weights)
+        measure_index1 = self.build_connectivity_measure(EBC, connectivity, "Edge Betweenness Centrality Matrix")
+        measure_index2 = self.build_connectivity_measure(BC, connectivity, "Node Betweenness Centrality Vector")
         return [measure_index1, measure_index2]
 
 
@@ -113,15 +108,13 @@ class CentralityEigenVector(BaseUndirected):
 
     _ui_name = "EigenVector Centrality"
     _ui_description = bct_description("eigenvector_centrality_und.m")
-    _matlab_code = "v = eigenvector_centrality_und(CIJ)"
+    _bct_function = staticmethod(eigenvector_centrality_und)
 
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'v', connectivity, "Eigen vector centrality")
+        v = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(v, connectivity, "Eigen vector centrality")
         return [measure_index]
 
 class CentralityKCoreness(BaseUndirected):
@@ -131,15 +124,13 @@ class CentralityKCoreness(BaseUndirected):
 
     _ui_name = "K-coreness centrality BU: " + LABEL_CONNECTIVITY_BINARY
     _ui_description = bct_description("kcoreness_centrality_bu.m")
-    _matlab_code = "[coreness, kn] = kcoreness_centrality_bu(CIJ);"
+    _bct_function = staticmethod(kcoreness_centrality_bu)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.binarized_weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'coreness', connectivity, "Node coreness BU")
-        measure_index2 = self.build_connectivity_measure(result, 'kn', connectivity, "Size of k-core")
+        coreness, kn = self._bct_function(connectivity.binarized_weights)
+        measure_index1 = self.build_connectivity_measure(coreness, connectivity, "Node coreness BU")
+        measure_index2 = self.build_connectivity_measure(kn, connectivity, "Size of k-core")
         return [measure_index1, measure_index2]
 
 
@@ -148,16 +139,14 @@ class CentralityKCorenessBD(CentralityNodeBinary):
     """
     _ui_name = "K-coreness centrality BD"
     _ui_description = bct_description("kcoreness_centrality_bd.m")
-    _matlab_code = "[coreness, kn] = kcoreness_centrality_bd(CIJ);"
+    _bct_function = staticmethod(kcoreness_centrality_bd)
 
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.binarized_weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'coreness', connectivity, "Node coreness BD")
-        measure_index2 = self.build_connectivity_measure(result, 'kn', connectivity, "Size of k-core")
+        coreness, kn = self._bct_function(connectivity.binarized_weights)
+        measure_index1 = self.build_connectivity_measure(coreness, connectivity, "Node coreness BD")
+        measure_index2 = self.build_connectivity_measure(kn, connectivity, "Size of k-core")
         return [measure_index1, measure_index2]
 
 class CentralityShortcuts(CentralityNodeBinary):
@@ -166,18 +155,16 @@ class CentralityShortcuts(CentralityNodeBinary):
 
     _ui_name = "Centrality Shortcuts: Binary directed connection matrix"
     _ui_description = bct_description("erange.m")
-    _matlab_code = "[Erange,eta,Eshort,fs]  = erange(A);"
+    _bct_function = staticmethod(erange)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.binarized_weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
+        Erange, eta, Eshort, fs = self._bct_function(connectivity.binarized_weights)
 
-        measure_index1 = self.build_connectivity_measure(result, 'Erange', connectivity, "Range for each edge")
-        value1 = self.build_int_value_wrapper(result, 'eta', "Average range for entire graph")
-        measure_index2 = self.build_connectivity_measure(result, 'Eshort', connectivity, "Shortcut edges")
-        value2 = self.build_float_value_wrapper(result, 'fs', "Fraction of shortcuts in the graph")
+        measure_index1 = self.build_connectivity_measure(Erange, connectivity, "Range for each edge")
+        value1 = self.build_int_value_wrapper(eta, "Average range for entire graph")
+        measure_index2 = self.build_connectivity_measure(Eshort, connectivity, "Shortcut edges")
+        value2 = self.build_float_value_wrapper(fs, "Fraction of shortcuts in the graph")
         return [measure_index1, value1, measure_index2, value2]
 
 
@@ -186,17 +173,15 @@ class FlowCoefficients(CentralityNodeBinary):
     """
     _ui_name = "Node-wise flow coefficients"
     _ui_description = bct_description("flow_coef_bd.m")
-    _matlab_code = "[fc,FC,total_flo] = flow_coef_bd(CIJ);"
+    _bct_function = staticmethod(flow_coef_bd)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.binarized_weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
+        fc, FC, total_flo = self._bct_function(connectivity.binarized_weights)
 
-        measure_index1 = self.build_connectivity_measure(result, 'fc', connectivity, "Flow coefficient for each node")
-        value1 = self.build_float_value_wrapper(result, 'FC', "Average flow coefficient over the network")
-        measure_index2 = self.build_connectivity_measure(result, 'total_flo', connectivity,
+        measure_index1 = self.build_connectivity_measure(fc, connectivity, "Flow coefficient for each node")
+        value1 = self.build_float_value_wrapper(FC, "Average flow coefficient over the network")
+        measure_index2 = self.build_connectivity_measure(total_flo, connectivity,
                                                    "Number of paths that flow across the central node")
         return [measure_index1, value1, measure_index2]
 
@@ -207,15 +192,13 @@ class ParticipationCoefficient(BaseBCT):
 
     _ui_name = "Participation Coefficient: Binary/weighted, directed/undirected connection matrix"
     _ui_description = bct_description("participation_coef.m")
-    _matlab_code = "[Ci, Q]=modularity_dir(W); P = participation_coef(W, Ci);"
+    _bct_function = staticmethod(participation_coef)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'W': connectivity.weights}
+        P = self._bct_function(connectivity.weights)
 
-        result = self.execute_matlab(self._matlab_code, data=data)
-
-        measure_index = self.build_connectivity_measure(result, 'P', connectivity, "Participation Coefficient")
+        measure_index = self.build_connectivity_measure(P, connectivity, "Participation Coefficient")
         return [measure_index]
 
 
@@ -224,18 +207,16 @@ class ParticipationCoefficientSign(ParticipationCoefficient):
     """
     _ui_name = "Participation Coefficient Sign"
     _ui_description = bct_description("participation_coef_sign.m")
-    _matlab_code = "[Ci, Q]=modularity_dir(W); [Ppos, Pneg] = participation_coef_sign(W, Ci);"
+    _bct_function = staticmethod(participation_coef_sign)
 
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'W': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
+        Ppos, Pneg = self._bct_function(connectivity.weights)
 
-        measure_index1 = self.build_connectivity_measure(result, 'Ppos', connectivity,
+        measure_index1 = self.build_connectivity_measure(Ppos, connectivity,
                                                    "Participation Coefficient from positive weights")
-        measure_index2 = self.build_connectivity_measure(result, 'Pneg', connectivity,
+        measure_index2 = self.build_connectivity_measure(Pneg, connectivity,
                                                    "Participation Coefficient from negative weights")
         return [measure_index1, measure_index2]
 
@@ -245,13 +226,11 @@ class SubgraphCentrality(CentralityNodeBinary):
 
     _ui_name = "Subgraph centrality of a network: Adjacency matrix (binary)"
     _ui_description = bct_description("subgraph_centrality.m")
-    _matlab_code = "Cs = subgraph_centrality(CIJ);"
+    _bct_function = staticmethod(subgraph_centrality)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.binarized_weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
+        Cs = self._bct_function(connectivity.binarized_weights)
 
-        measure_index = self.build_connectivity_measure(result, 'Cs', connectivity, "Subgraph Centrality")
+        measure_index = self.build_connectivity_measure(Cs, connectivity, "Subgraph Centrality")
         return [measure_index]
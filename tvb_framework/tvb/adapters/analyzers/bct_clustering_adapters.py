@@ -30,6 +30,8 @@
 from tvb.core.entities.model.model_operation import AlgorithmTransientGroup
 from tvb.adapters.analyzers.bct_adapters import BaseBCT, BaseUndirected, bct_description, \
     LABEL_CONN_WEIGHTED_UNDIRECTED, LABEL_CONN_WEIGHTED_DIRECTED
+from tvb.analyzers.graph import clustering_coef_bd, clustering_coef_bu, clustering_coef_wu, clustering_coef_wd, \
+    transitivity_bd, transitivity_wd, transitivity_bu, transitivity_wu
 
 BCT_GROUP_CLUSTERING = AlgorithmTransientGroup("Clustering Algorithms", "Brain Connectivity Toolbox", "bctclustering")
 
@@ -41,14 +43,12 @@ class ClusteringCoefficient(BaseBCT):
 
     _ui_name = "Clustering Coefficient BD: Binary directed connection matrix"
     _ui_description = bct_description("clustering_coef_bd.m")
-    _matlab_code = "C = clustering_coef_bd(A);"
+    _bct_function = staticmethod(clustering_coef_bd)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'C', connectivity, "Clustering Coefficient BD")
+        C = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(C, connectivity, "Clustering Coefficient BD")
         return [measure_index]
 
 
@@ -59,14 +59,12 @@ class ClusteringCoefficientBU(BaseUndirected):
 
     _ui_name = "Clustering Coefficient BU"
     _ui_description = bct_description("clustering_coef_bu.m")
-    _matlab_code = "C = clustering_coef_bu(A);"
+    _bct_function = staticmethod(clustering_coef_bu)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'C', connectivity, "Clustering Coefficient BU")
+        C = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(C, connectivity, "Clustering Coefficient BU")
         return [measure_index]
 
 class ClusteringCoefficientWU(BaseUndirected):
@@ -76,14 +74,12 @@ class ClusteringCoefficientWU(BaseUndirected):
 
     _ui_name = "Clustering Coeficient WU: " + LABEL_CONN_WEIGHTED_UNDIRECTED
     _ui_description = bct_description("clustering_coef_wu.m")
-    _matlab_code = "C = clustering_coef_wu(A);"
+    _bct_function = staticmethod(clustering_coef_wu)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.scaled_weights()}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'C', connectivity, "Clustering Coefficient WU")
+        C = self._bct_function(connectivity.scaled_weights())
+        measure_index = self.build_connectivity_measure(C, connectivity, "Clustering Coefficient WU")
         return [measure_index]
 
 class ClusteringCoefficientWD(ClusteringCoefficient):
@@ -91,14 +87,12 @@ class ClusteringCoefficientWD(ClusteringCoefficient):
     """
     _ui_name = "Clustering Coeficient WD: " + LABEL_CONN_WEIGHTED_DIRECTED
     _ui_description = bct_description("clustering_coef_wd.m")
-    _matlab_code = "C = clustering_coef_wd(A);"
+    _bct_function = staticmethod(clustering_coef_wd)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.scaled_weights()}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'C', connectivity, "Clustering Coefficient WD")
+        C = self._bct_function(connectivity.scaled_weights())
+        measure_index = self.build_connectivity_measure(C, connectivity, "Clustering Coefficient WD")
         return [measure_index]
 
 class TransitivityBinaryDirected(BaseBCT):
@@ -108,14 +102,12 @@ class TransitivityBinaryDirected(BaseBCT):
 
     _ui_name = "Transitivity Binary Directed: Binary directed connection matrix"
     _ui_description = bct_description("transitivity_bd.m")
-    _matlab_code = "T = transitivity_bd(A);"
+    _bct_function = staticmethod(transitivity_bd)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        value = self.build_float_value_wrapper(result, 'T', "Transitivity Binary Directed")
+        T = self._bct_function(connectivity.weights)
+        value = self.build_float_value_wrapper(T, "Transitivity Binary Directed")
         return [value]
 
 class TransitivityWeightedDirected(TransitivityBinaryDirected):
@@ -123,14 +115,12 @@ class TransitivityWeightedDirected(TransitivityBinaryDirected):
     """
     _ui_name = "Transitivity Weighted Directed: " + LABEL_CONN_WEIGHTED_DIRECTED
     _ui_description = bct_description("transitivity_wd.m")
-    _matlab_code = "T = transitivity_wd(A);"
+    _bct_function = staticmethod(transitivity_wd)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.scaled_weights()}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        value = self.build_float_value_wrapper(result, 'T', "Transitivity Weighted Directed")
+        T = self._bct_function(connectivity.scaled_weights())
+        value = self.build_float_value_wrapper(T, "Transitivity Weighted Directed")
         return [value]
 
 
@@ -141,14 +131,12 @@ class TransitivityBinaryUnDirected(BaseUndirected):
 
     _ui_name = "Transitivity Binary Undirected"
     _ui_description = bct_description("transitivity_bu.m")
-    _matlab_code = "T = transitivity_bu(A);"
+    _bct_function = staticmethod(transitivity_bu)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        value = self.build_float_value_wrapper(result, 'T', "Transitivity Binary Undirected")
+        T = self._bct_function(connectivity.weights)
+        value = self.build_float_value_wrapper(T, "Transitivity Binary Undirected")
         return [value]
 
 class TransitivityWeightedUnDirected(TransitivityBinaryUnDirected):
@@ -156,12 +144,10 @@ class TransitivityWeightedUnDirected(TransitivityBinaryUnDirected):
     """
     _ui_name = "Transitivity Weighted undirected: " + LABEL_CONN_WEIGHTED_UNDIRECTED
     _ui_description = bct_description("transitivity_wu.m")
-    _matlab_code = "T = transitivity_wu(A);"
+    _bct_function = staticmethod(transitivity_wu)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.scaled_weights()}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        value = self.build_float_value_wrapper(result, 'T', "Transitivity Weighted Undirected")
+        T = self._bct_function(connectivity.scaled_weights())
+        value = self.build_float_value_wrapper(T, "Transitivity Weighted Undirected")
         return [value]
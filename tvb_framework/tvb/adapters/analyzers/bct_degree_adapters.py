@@ -29,6 +29,8 @@
 #
 from tvb.core.entities.model.model_operation import AlgorithmTransientGroup
 from tvb.adapters.analyzers.bct_adapters import BaseBCT, bct_description, BaseBCTForm
+from tvb.analyzers.graph import degrees_und, degrees_dir, jdegree, matching_ind, strengths_und, strengths_dir, \
+    strengths_und_sign, density_dir, density_und
 
 BCT_GROUP_DEGREE = AlgorithmTransientGroup("Degree and Similarity Algorithms",
                                            "Brain Connectivity Toolbox", "bctdegree")
@@ -42,14 +44,12 @@ class Degree(BaseBCT):
 
     _ui_name = "Degree: Undirected (binary/weighted) connection matrix"
     _ui_description = bct_description("degrees_und.m")
-    _matlab_code = "deg = degrees_und(CIJ);"
+    _bct_function = staticmethod(degrees_und)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'deg', connectivity, "Node degree")
+        deg = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(deg, connectivity, "Node degree")
         return [measure_index]
 
 
@@ -59,16 +59,14 @@ class DegreeIOD(Degree):
 
     _ui_name = "Indegree and outdegree: Directed (binary/weighted) connection matrix"
     _ui_description = bct_description("degrees_dir.m")
-    _matlab_code = "[id,od,deg] = degrees_dir(CIJ);"
+    _bct_function = staticmethod(degrees_dir)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'id', connectivity, "Node indegree")
-        measure_index2 = self.build_connectivity_measure(result, 'od', connectivity, "Node outdegree")
-        measure_index3 = self.build_connectivity_measure(result, 'deg', connectivity,
+        in_degree, out_degree, deg = self._bct_function(connectivity.weights)
+        measure_index1 = self.build_connectivity_measure(in_degree, connectivity, "Node indegree")
+        measure_index2 = self.build_connectivity_measure(out_degree, connectivity, "Node outdegree")
+        measure_index3 = self.build_connectivity_measure(deg, connectivity,
                                                          "Node degree (indegree + outdegree)")
         return [measure_index1, measure_index2, measure_index3]
 
@@ -78,21 +76,19 @@ class JointDegree(Degree):
     """
     _ui_name = "Joint Degree"
     _ui_description = bct_description("jdegree.m")
-    _matlab_code = "[J,J_od,J_id,J_bl] = jdegree(CIJ);"
+    _bct_function = staticmethod(jdegree)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'J', connectivity,
-                                                        "Joint Degree JOD=" + str(result['J_od']) +
-                                                        ", JID=" + str(result['J_id']) +
-                                                        ", JBL=" + str(result['J_bl']),
+        J, J_od, J_id, J_bl = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(J, connectivity,
+                                                        "Joint Degree JOD=" + str(J_od) +
+                                                        ", JID=" + str(J_id) +
+                                                        ", JBL=" + str(J_bl),
                                                         "Connectivity Nodes", "Connectivity Nodes")
-        value1 = self.build_int_value_wrapper(result, 'J_od', "Number of vertices with od > id")
-        value2 = self.build_int_value_wrapper(result, 'J_id', "Number of vertices with id > od")
-        value3 = self.build_int_value_wrapper(result, 'J_bl', "Number of vertices with id = od")
+        value1 = self.build_int_value_wrapper(J_od, "Number of vertices with od > id")
+        value2 = self.build_int_value_wrapper(J_id, "Number of vertices with id > od")
+        value3 = self.build_int_value_wrapper(J_bl, "Number of vertices with id = od")
         return [measure_index, value1, value2, value3]
 
 
@@ -101,18 +97,16 @@ class MatchingIndex(Degree):
     """
     _ui_name = "Matching Index: Connection/adjacency matrix"
     _ui_description = bct_description("matching_ind.m")
-    _matlab_code = "[Min,Mout,Mall] = matching_ind(CIJ);"
+    _bct_function = staticmethod(matching_ind)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'Min', connectivity,
+        Min, Mout, Mall = self._bct_function(connectivity.weights)
+        measure_index1 = self.build_connectivity_measure(Min, connectivity,
                                                          "Matching index for incoming connections")
-        measure_index2 = self.build_connectivity_measure(result, 'Mout', connectivity,
+        measure_index2 = self.build_connectivity_measure(Mout, connectivity,
                                                          "Matching index for outgoing connections")
-        measure_index3 = self.build_connectivity_measure(result, 'Mall', connectivity,
+        measure_index3 = self.build_connectivity_measure(Mall, connectivity,
                                                          "Matching index for all connections")
         return [measure_index1, measure_index2, measure_index3]
 
@@ -122,14 +116,12 @@ class Strength(Degree):
     """
     _ui_name = "Strength: Directed weighted connection matrix"
     _ui_description = bct_description("strengths_und.m")
-    _matlab_code = "strength = strengths_und(CIJ);"
+    _bct_function = staticmethod(strengths_und)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index = self.build_connectivity_measure(result, 'strength', connectivity, "Node strength")
+        strength = self._bct_function(connectivity.weights)
+        measure_index = self.build_connectivity_measure(strength, connectivity, "Node strength")
         return [measure_index]
 
 
@@ -138,16 +130,14 @@ class StrengthISOS(Strength):
     """
     _ui_name = "Instrength and Outstrength"
     _ui_description = bct_description("strengths_dir.m")
-    _matlab_code = "[is,os,strength] = strengths_dir(CIJ);"
+    _bct_function = staticmethod(strengths_dir)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'is', connectivity, "Node instrength")
-        measure_index2 = self.build_connectivity_measure(result, 'os', connectivity, "Node outstrength")
-        measure_index3 = self.build_connectivity_measure(result, 'strength', connectivity,
+        in_strength, out_strength, strength = self._bct_function(connectivity.weights)
+        measure_index1 = self.build_connectivity_measure(in_strength, connectivity, "Node instrength")
+        measure_index2 = self.build_connectivity_measure(out_strength, connectivity, "Node outstrength")
+        measure_index3 = self.build_connectivity_measure(strength, connectivity,
                                                          "Node strength (instrength + outstrength)")
         return [measure_index1, measure_index2, measure_index3]
 
@@ -157,19 +147,17 @@ class StrengthWeights(Strength):
     """
     _ui_name = "Strength and Weight"
     _ui_description = bct_description("strengths_und_sign.m")
-    _matlab_code = "[Spos,Sneg,vpos,vneg] = strengths_und_sign(CIJ);"
+    _bct_function = staticmethod(strengths_und_sign)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'CIJ': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        measure_index1 = self.build_connectivity_measure(result, 'Spos', connectivity,
+        Spos, Sneg, vpos, vneg = self._bct_function(connectivity.weights)
+        measure_index1 = self.build_connectivity_measure(Spos, connectivity,
                                                          "Nodal strength of positive weights")
-        measure_index2 = self.build_connectivity_measure(result, 'Sneg', connectivity,
+        measure_index2 = self.build_connectivity_measure(Sneg, connectivity,
                                                          "Nodal strength of negative weights")
-        value1 = self.build_float_value_wrapper(result, 'vpos', "Total positive weight")
-        value2 = self.build_float_value_wrapper(result, 'vneg', "Total negative weight")
+        value1 = self.build_float_value_wrapper(vpos, "Total positive weight")
+        value2 = self.build_float_value_wrapper(vneg, "Total negative weight")
         return [measure_index1, measure_index2, value1, value2]
 
 
@@ -180,16 +168,14 @@ class DensityDirected(BaseBCT):
 
     _ui_name = "Density Directed: Directed (weighted/binary) connection matrix"
     _ui_description = bct_description("density_dir.m")
-    _matlab_code = "[kden,N,K]  = density_dir(A);"
+    _bct_function = staticmethod(density_dir)
 
     def launch(self, view_model):
         connectivity = self.get_connectivity(view_model)
-        data = {'A': connectivity.weights}
-
-        result = self.execute_matlab(self._matlab_code, data=data)
-        value1 = self.build_float_value_wrapper(result, 'kden', title="Density")
-        value2 = self.build_int_value_wrapper(result, 'N', title="Number of vertices")
-        value3 = self.build_int_value_wrapper(result, 'K', title="Number of edges")
+        kden, N, K = self._bct_function(connectivity.weights)
+        value1 = self.build_float_value_wrapper(kden, title="Density")
+        value2 = self.build_int_value_wrapper(N, title="Number of vertices")
+        value3 = self.build_int_value_wrapper(K, title="Number of edges")
         return [value1, value2, value3]
 
 
@@ -198,4 +184,4 @@ class DensityUndirected(DensityDirected):
     """
     _ui_name = "Density Unirected: Undirected (weighted/binary) connection matrix"
     _ui_description = bct_description("density_und.m")
-    _matlab_code = "[kden,N,K]  = density_und(A);"
+    _bct_function = staticmethod(density_und)
@@ -40,12 +40,13 @@ Adapter that uses the traits module to generate interfaces for ... Analyzer.
 import uuid
 
 import numpy
-from scipy.signal.signaltools import correlate
 from tvb.adapters.datatypes.db.graph import CorrelationCoefficientsIndex
 from tvb.adapters.datatypes.db.temporal_correlations import CrossCorrelationIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex, TimeSeriesEEGIndex, TimeSeriesMEGIndex, \
     TimeSeriesSEEGIndex
 from tvb.adapters.datatypes.h5.temporal_correlations_h5 import CrossCorrelationH5
+from tvb.analyzers.cross_correlation import cross_correlation_node_blocks, cross_correlation_lags, \
+    cross_correlation_memory_size
 from tvb.basic.neotraits.api import Float
 from tvb.basic.neotraits.info import narray_describe
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
@@ -67,6 +68,13 @@ class CrossCorrelateAdapterModel(ViewModel):
         doc="""The time-series for which the cross correlation sequences are calculated."""
     )
 
+    max_lag = Float(
+        label="Maximum offset (ms)",
+        default=0.0,
+        required=False,
+        doc="""Only the cross correlation at temporal offsets within [-max_lag, max_lag] is kept.
+        By default (0) the offsets over the whole length of the time-series are kept.""")
+
 
 class CrossCorrelateAdapterForm(ABCAdapterForm):
 
@@ -74,6 +82,7 @@ class CrossCorrelateAdapterForm(ABCAdapterForm):
         super(CrossCorrelateAdapterForm, self).__init__()
         self.time_series = TraitDataTypeSelectField(CrossCorrelateAdapterModel.time_series, name=self.get_input_name(),
                                                     conditions=self.get_filters(), has_all_option=True)
+        self.max_lag = FloatField(CrossCorrelateAdapterModel.max_lag)
 
     @staticmethod
     def get_view_model():
@@ -120,19 +129,15 @@ class CrossCorrelateAdapter(ABCAdapter):
         """
         Returns the required memory to be able to run the adapter.
         """
-        # Not all the data is loaded into memory at one time here.
-        used_shape = (self.input_shape[0], 1, self.input_shape[2], self.input_shape[3])
-        input_size = numpy.prod(used_shape) * 8.0
-        output_size = self._result_size(used_shape)
-        return input_size + output_size
+        # The input is read, and the result computed and stored, one block of nodes at a time.
+        return cross_correlation_memory_size(*self.input_shape, max_lag=self._max_lag_points(view_model))
 
     def get_required_disk_size(self, view_model):
         # type: (CrossCorrelateAdapterModel) -> int
         """
         Returns the required disk size to be able to run the adapter (in kB).
         """
-        used_shape = (self.input_shape[0], 1, self.input_shape[2], self.input_shape[3])
-        return self.array_size2kb(self._result_size(used_shape))
+        return self.array_size2kb(self._result_size(self.input_shape, self._max_lag_points(view_model)))
 
     def launch(self, view_model):
         # type: (CrossCorrelateAdapterModel) -> [CrossCorrelationIndex]
@@ -153,75 +158,53 @@ class CrossCorrelateAdapter(ABCAdapter):
         cross_corr_index = CrossCorrelationIndex()
         cross_corr_h5_path = self.path_for(CrossCorrelationH5, cross_corr_index.gid)
         cross_corr_h5 = CrossCorrelationH5(cross_corr_h5_path)
+        max_lag = self._max_lag_points(view_model)
+        self.log.info("result shape will be: %s" % str(self._result_shape(self.input_shape, max_lag)))
 
-        node_slice = [slice(self.input_shape[0]), None, slice(self.input_shape[2]), slice(self.input_shape[3])]
-        # ---------- Iterate over slices and compose final result ------------##
-        small_ts = TimeSeries()
-
+        # ---------- Iterate over node blocks and compose final result ------------##
         with h5.h5_file_for_index(self.input_time_series_index) as ts_h5:
-            small_ts.sample_period = ts_h5.sample_period.load()
-            small_ts.sample_period_unit = ts_h5.sample_period_unit.load()
-            partial_cross_corr = None
-            for var in range(self.input_shape[1]):
-                node_slice[1] = slice(var, var + 1)
-                small_ts.data = ts_h5.read_data_slice(tuple(node_slice))
-                partial_cross_corr = self._compute_cross_correlation(small_ts, ts_h5)
-                cross_corr_h5.write_data_slice(partial_cross_corr)
-
-        partial_cross_corr.source.gid = view_model.time_series
-        partial_cross_corr.gid = uuid.UUID(cross_corr_index.gid)
-
-        cross_corr_index.fill_from_has_traits(partial_cross_corr)
+            sample_period = ts_h5.sample_period.load()
+
+            def read_nodes(start, stop):
+                return ts_h5.read_data_slice((slice(None), slice(None), slice(start, stop), slice(None)))
+
+            block = None
+            for block in cross_correlation_node_blocks(read_nodes, self.input_shape, max_lag):
+                cross_corr_h5.write_node_block(block)
+
+        offset = sample_period * cross_correlation_lags(self.input_shape[0], max_lag)
+        cross_corr = CrossCorrelation(source=TimeSeries(gid=view_model.time_series), array_data=block, time=offset)
+        cross_corr.gid = uuid.UUID(cross_corr_index.gid)
+
+        cross_corr_index.fill_from_has_traits(cross_corr)
         self.fill_index_from_h5(cross_corr_index, cross_corr_h5)
 
-        cross_corr_h5.store(partial_cross_corr, scalars_only=True)
+        cross_corr_h5.store(cross_corr, scalars_only=True)
+        cross_corr_h5.time.store(offset)
         cross_corr_h5.close()
 
         return cross_corr_index
 
-    def _compute_cross_correlation(self, small_ts, input_ts_h5):
+    def _max_lag_points(self, view_model):
         """
-        Cross-correlate two one-dimensional arrays. Return a CrossCorrelation datatype with result.
+        The maximum offset of the view model in time points, or None when all the offsets are kept.
         """
-        # (tpts, nodes, nodes, state-variables, modes)
-        result_shape = self._result_shape(small_ts.data.shape)
-        self.log.info("result shape will be: %s" % str(result_shape))
-
-        result = numpy.zeros(result_shape)
-
-        # TODO: For region level, 4s, 2000Hz, this takes ~3hours...(which makes node_coherence seem positively speedy
-        # Probably best to add a keyword for offsets, so we just compute +- some "small" range...
-        # One inter-node correlation, across offsets, for each state-var & mode.
-        for mode in range(result_shape[4]):
-            for var in range(result_shape[3]):
-                data = input_ts_h5.data[:, var, :, mode]
-                data = data - data.mean(axis=0)[numpy.newaxis, :]
-                # TODO: Work out a way around the 4 level loop:
-                for n1 in range(result_shape[1]):
-                    for n2 in range(result_shape[2]):
-                        result[:, n1, n2, var, mode] = correlate(data[:, n1], data[:, n2], mode="same")
-
-        self.log.debug("result")
-        self.log.debug(narray_describe(result))
-
-        offset = (small_ts.sample_period *
-                  numpy.arange(-numpy.floor(result_shape[0] / 2.0), numpy.ceil(result_shape[0] / 2.0)))
-
-        cross_corr = CrossCorrelation(source=small_ts, array_data=result, time=offset)
-
-        return cross_corr
+        if not view_model.max_lag or view_model.max_lag <= 0:
+            return None
+        return int(view_model.max_lag / self.input_time_series_index.sample_period)
 
     @staticmethod
-    def _result_shape(input_shape):
+    def _result_shape(input_shape, max_lag=None):
         """Returns the shape of the main result of ...."""
-        result_shape = (input_shape[0], input_shape[2], input_shape[2], input_shape[1], input_shape[3])
+        n_lags = len(cross_correlation_lags(input_shape[0], max_lag))
+        result_shape = (n_lags, input_shape[2], input_shape[2], input_shape[1], input_shape[3])
         return result_shape
 
-    def _result_size(self, input_shape):
+    def _result_size(self, input_shape, max_lag=None):
         """
         Returns the storage size in Bytes of the main result of .
         """
-        result_size = numpy.sum(list(map(numpy.prod, self._result_shape(input_shape)))) * 8.0  # Bytes
+        result_size = numpy.prod(self._result_shape(input_shape, max_lag)) * 8.0  # Bytes
         return result_size
 
 
@@ -47,6 +47,7 @@ from tvb.adapters.datatypes.db.fcd import FcdIndex
 from tvb.adapters.datatypes.db.graph import ConnectivityMeasureIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesRegionIndex
 from tvb.adapters.datatypes.h5.fcd_h5 import FcdH5
+from tvb.analyzers.fcd_matrix import compute_fcd, fcd_memory_size
 from tvb.basic.neotraits.api import Float
 from tvb.basic.neotraits.info import narray_describe
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
@@ -179,8 +180,12 @@ class FunctionalConnectivityDynamicsAdapter(ABCAdapter):
 
     def get_required_memory_size(self, view_model):
         # type: (FCDAdapterModel) -> int
-        # We do not know how much memory is needed.
-        return -1
+        """
+        The FC of all windows, for one state variable and mode at a time, and the FCD & segmented FCD results.
+        """
+        n_time, n_var, n_node, n_mode = self.input_shape
+        fcd_size = fcd_memory_size(n_time, n_node, self.actual_sw, self.actual_sp)
+        return int(fcd_size + 2 * np.prod(self._result_shape(self.input_shape)) * 8)
 
     def get_required_disk_size(self, view_model):
         # type: (FCDAdapterModel) -> int
@@ -250,34 +255,19 @@ class FunctionalConnectivityDynamicsAdapter(ABCAdapter):
         return result
 
     def _compute_fcd_matrix(self, ts_h5):
-        self.log.debug("timeseries_h5.data")
-        self.log.debug(narray_describe(ts_h5.data[:]))
-
         input_shape = ts_h5.data.shape
+        self.log.debug("timeseries_h5.data shape %s" % (input_shape,))
         result_shape = self._result_shape(input_shape)
 
         fcd = np.zeros(result_shape)
-        fc_stream = {}  # dict where the fc calculated over the sliding window will be stored
         for mode in range(result_shape[3]):
             for var in range(result_shape[2]):
-                start = -self.actual_sp  # in order to well initialize the first starting point of the FC stream
-                for nfcd in range(result_shape[0]):
-                    start += self.actual_sp
-                    current_slice = tuple([slice(int(start), int(start + self.actual_sw) + 1), slice(var, var + 1),
-                                           slice(input_shape[2]), slice(mode, mode + 1)])
-                    data = ts_h5.read_data_slice(current_slice).squeeze()
-                    fc = np.corrcoef(data.T)
-                    # the triangular part of the fc is organized as a vector, excluding the diagonal (always ones)
-                    triangular = np.triu_indices(len(fc), 1)
-                    fc_stream[nfcd] = fc[triangular]
-                for i in range(result_shape[0]):
-                    j = i
-                    while j < result_shape[0]:
-                        fci = fc_stream[i]
-                        fcj = fc_stream[j]
-                        fcd[i, j, var, mode] = np.corrcoef(fci, fcj)[0, 1]
-                        fcd[j, i, var, mode] = fcd[i, j, var, mode]
-                        j += 1
+                # the time series is streamed from the file, the FC of each window being computed from running sums
+                def read_data(start, stop):
+                    data_slice = (slice(start, stop), slice(var, var + 1), slice(input_shape[2]), slice(mode, mode + 1))
+                    return ts_h5.read_data_slice(data_slice)[:, 0, :, 0]
+
+                fcd[:, :, var, mode] = compute_fcd(read_data, input_shape[0], self.actual_sw, self.actual_sp)
 
         self.log.debug("FCD")
         self.log.debug(narray_describe(fcd))
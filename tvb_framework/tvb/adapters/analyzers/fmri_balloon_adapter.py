@@ -36,17 +36,17 @@ Adapter that uses the traits module to generate interfaces for BalloonModel Anal
 """
 
 import uuid
-import numpy
 
 from tvb.adapters.datatypes.db.time_series import TimeSeriesRegionIndex
 from tvb.adapters.datatypes.h5.time_series_h5 import TimeSeriesRegionH5
-from tvb.analyzers.fmri_balloon import BalloonModel, BoldModels, NeuralInputTransformations
-from tvb.basic.neotraits.api import Float, Attr, EnumAttr
+from tvb.analyzers.fmri_balloon import CHUNK_MEMORY, BalloonModel, BoldModels, NeuralInputTransformations
+from tvb.basic.neotraits.api import Float, Int, Attr, EnumAttr
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
+from tvb.core.adapters.exceptions import LaunchException
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.neocom import h5
 from tvb.core.neotraits.db import prepare_array_shape_meta
-from tvb.core.neotraits.forms import TraitDataTypeSelectField, FloatField, StrField, BoolField, SelectField
+from tvb.core.neotraits.forms import TraitDataTypeSelectField, FloatField, StrField, BoolField, SelectField, IntField
 from tvb.core.neotraits.view_model import ViewModel, DataTypeGidAttr
 from tvb.datatypes.time_series import TimeSeries, TimeSeriesRegion
 
@@ -86,8 +86,10 @@ class BalloonModelAdapterModel(ViewModel):
 
     bold_model = EnumAttr(
         label="Select BOLD model equations",
-        default=BoldModels.NONLINEAR,
-        doc="""Select the set of equations for the BOLD model."""
+        default=BoldModels.LINEAR,
+        doc="""Select the set of equations for the BOLD model: ``linear`` computes the BOLD signal as
+            V0 * ((k1 + k2) * (1 - q) + (k3 - k2) * (1 - v)), linear in the deoxyhemoglobin content q and
+            the blood volume v, ``nonlinear`` as V0 * (k1 * (1 - q) + k2 * (1 - q / v) + k3 * (1 - v))."""
     )
 
     RBM = Attr(
@@ -107,6 +109,13 @@ class BalloonModelAdapterModel(ViewModel):
         doc="""Set if the mean should be subtracted from the neural input."""
     )
 
+    downsampling = Int(
+        label="Downsampling factor",
+        default=1,
+        required=False,
+        doc="""Keep one BOLD sample every this many time points of the neural input, e.g. the
+            repetition time divided by the sample period of the input. Must be at least 1.""")
+
 
 class BalloonModelAdapterForm(ABCAdapterForm):
 
@@ -120,6 +129,7 @@ class BalloonModelAdapterForm(ABCAdapterForm):
         self.bold_model = SelectField(BalloonModelAdapterModel.bold_model)
         self.RBM = BoolField(BalloonModelAdapterModel.RBM)
         self.normalize_neural_input = BoolField(BalloonModelAdapterModel.normalize_neural_input)
+        self.downsampling = IntField(BalloonModelAdapterModel.downsampling)
 
     @staticmethod
     def get_view_model():
@@ -166,6 +176,8 @@ class BalloonModelAdapter(ABCAdapter):
                             self.input_time_series_index.data_length_4d)
 
         self.log.debug("time_series shape is %s" % str(self.input_shape))
+        if view_model.downsampling is not None and view_model.downsampling < 1:
+            raise LaunchException("The downsampling factor must be at least 1, not %d." % view_model.downsampling)
         # -------------------- Fill Algorithm for Analysis -------------------##
         algorithm = BalloonModel()
         if view_model.tau_s is not None:
@@ -186,19 +198,25 @@ class BalloonModelAdapter(ABCAdapter):
         """
         Return the required memory to run this algorithm.
         """
-        used_shape = self.input_shape
-        input_size = numpy.prod(used_shape) * 8.0
-        output_size = self.algorithm.result_size(used_shape)
-        return input_size + output_size
+        return CHUNK_MEMORY + 4 * self.input_shape[2] * self.input_shape[3] * 8.0
 
     def get_required_disk_size(self, view_model):
         # type: (BalloonModelAdapterModel) -> int
         """
         Returns the required disk size to be able to run the adapter.(in kB)
         """
-        used_shape = (self.input_shape[0], self.input_shape[1], self.input_shape[2], self.input_shape[3])
+        used_shape = (self._downsampled_length(view_model), 1, self.input_shape[2], self.input_shape[3])
         return self.array_size2kb(self.algorithm.result_size(used_shape))
 
+    def _downsampled_length(self, view_model):
+        """
+        The number of time points of the BOLD signal.
+        """
+        n_steps = self.input_shape[0]
+        if self.algorithm.neural_input_transformation == NeuralInputTransformations.ABS_DIFF:
+            n_steps -= 1
+        return len(range(0, n_steps, view_model.downsampling or 1))
+
     def launch(self, view_model):
         # type: (BalloonModelAdapterModel) -> [TimeSeriesRegionIndex]
         """
@@ -208,39 +226,37 @@ class BalloonModelAdapter(ABCAdapter):
         """
         input_time_series_h5 = h5.h5_file_for_index(self.input_time_series_index)
         time_line = input_time_series_h5.read_time_page(0, self.input_shape[0])
+        stride = view_model.downsampling or 1
 
         bold_signal_index = TimeSeriesRegionIndex()
         bold_signal_h5_path = self.path_for(TimeSeriesRegionH5, bold_signal_index.gid)
         bold_signal_h5 = TimeSeriesRegionH5(bold_signal_h5_path)
         bold_signal_h5.gid.store(uuid.UUID(bold_signal_index.gid))
-        self._fill_result_h5(bold_signal_h5, input_time_series_h5)
-
-        # ---------- Iterate over slices and compose final result ------------##
+        self._fill_result_h5(bold_signal_h5, input_time_series_h5, stride)
 
-        node_slice = [slice(self.input_shape[0]), slice(self.input_shape[1]), None, slice(self.input_shape[3])]
+        # ---------- Integrate all nodes over chunks of time points ------------##
         small_ts = TimeSeries()
         small_ts.sample_period = self.input_time_series_index.sample_period
         small_ts.sample_period_unit = self.input_time_series_index.sample_period_unit
-        small_ts.time = time_line
 
-        for node in range(self.input_shape[2]):
-            node_slice[2] = slice(node, node + 1)
-            small_ts.data = input_time_series_h5.read_data_slice(tuple(node_slice))
-            self.algorithm.time_series = small_ts
-            partial_bold = self.algorithm.evaluate()
-            bold_signal_h5.write_data_slice_on_grow_dimension(partial_bold.data, grow_dimension=2)
+        def read_data(start, stop):
+            return input_time_series_h5.read_data_slice((slice(start, stop),))
+
+        for partial_bold in self.algorithm.bold_signal_chunks(read_data, self.input_shape[0],
+                                                              1. / small_ts.sample_rate, stride):
+            bold_signal_h5.write_data_slice(partial_bold)
 
         input_time_series_h5.close()
 
-        bold_signal_h5.write_time_slice(time_line)
+        bold_signal_h5.write_time_slice(time_line[:self._downsampled_length(view_model) * stride:stride])
         bold_signal_shape = bold_signal_h5.data.shape
         bold_signal_h5.nr_dimensions.store(len(bold_signal_shape))
         bold_signal_h5.close()
 
-        self._fill_result_index(bold_signal_index, bold_signal_shape)
+        self._fill_result_index(bold_signal_index, bold_signal_shape, stride)
         return bold_signal_index
 
-    def _fill_result_index(self, result_index, result_signal_shape):
+    def _fill_result_index(self, result_index, result_signal_shape, stride=1):
         result_index.time_series_type = TimeSeriesRegion.__name__
         result_index.data_ndim = len(result_signal_shape)
         result_index.data_length_1d, result_index.data_length_2d, \
@@ -250,19 +266,19 @@ class BalloonModelAdapter(ABCAdapter):
         result_index.fk_region_mapping_gid = self.input_time_series_index.fk_region_mapping_gid
         result_index.fk_region_mapping_volume_gid = self.input_time_series_index.fk_region_mapping_volume_gid
 
-        result_index.sample_period = self.input_time_series_index.sample_period
+        result_index.sample_period = self.input_time_series_index.sample_period * stride
         result_index.sample_period_unit = self.input_time_series_index.sample_period_unit
-        result_index.sample_rate = self.input_time_series_index.sample_rate
+        result_index.sample_rate = self.input_time_series_index.sample_rate / stride
         result_index.labels_ordering = self.input_time_series_index.labels_ordering
         result_index.labels_dimensions = self.input_time_series_index.labels_dimensions
         result_index.has_volume_mapping = self.input_time_series_index.has_volume_mapping
         result_index.has_surface_mapping = self.input_time_series_index.has_surface_mapping
         result_index.title = self.input_time_series_index.title
 
-    def _fill_result_h5(self, result_h5, input_h5):
-        result_h5.sample_period.store(self.input_time_series_index.sample_period)
+    def _fill_result_h5(self, result_h5, input_h5, stride=1):
+        result_h5.sample_period.store(self.input_time_series_index.sample_period * stride)
         result_h5.sample_period_unit.store(self.input_time_series_index.sample_period_unit)
-        result_h5.sample_rate.store(input_h5.sample_rate.load())
+        result_h5.sample_rate.store(input_h5.sample_rate.load() / stride)
         result_h5.start_time.store(input_h5.start_time.load())
         result_h5.labels_ordering.store(input_h5.labels_ordering.load())
         result_h5.labels_dimensions.store(input_h5.labels_dimensions.load())
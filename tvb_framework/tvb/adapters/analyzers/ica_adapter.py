@@ -41,13 +41,16 @@ import numpy
 from tvb.adapters.datatypes.db.mode_decompositions import IndependentComponentsIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
 from tvb.adapters.datatypes.h5.mode_decompositions_h5 import IndependentComponentsH5
-from tvb.analyzers.ica import compute_ica_decomposition
-from tvb.basic.neotraits.api import Int
+from tvb.analyzers.ica import compute_ica_decomposition, streamed_fastica
+from tvb.analyzers.pca import CHUNK_MEMORY, PCAMethods, chunk_size, project_components, streamed_moments
+from tvb.analyzers.pca import streamed_pca_memory_size
+from tvb.basic.neotraits.api import Int, EnumAttr
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.neocom import h5
-from tvb.core.neotraits.forms import TraitDataTypeSelectField, IntField
+from tvb.core.neotraits.forms import TraitDataTypeSelectField, IntField, SelectField
 from tvb.core.neotraits.view_model import ViewModel, DataTypeGidAttr
+from tvb.datatypes.mode_decompositions import IndependentComponents
 from tvb.datatypes.time_series import TimeSeries
 
 
@@ -65,6 +68,15 @@ class ICAAdapterModel(ViewModel):
         default=None,
         doc="Number of principal components to unmix.")
 
+    method = EnumAttr(
+        label="Whitening method",
+        default=PCAMethods.SVD,
+        required=False,
+        doc="""``svd`` whitens the whole time series of a state variable in memory.
+            ``covariance`` and ``randomized`` whiten it with the principal components computed
+            over chunks of the time series (see the PCA analyzer), and only keep the whitened
+            data, one value per component and time point, in memory.""")
+
 
 class ICAAdapterForm(ABCAdapterForm):
 
@@ -73,6 +85,7 @@ class ICAAdapterForm(ABCAdapterForm):
         self.time_series = TraitDataTypeSelectField(ICAAdapterModel.time_series, name='time_series',
                                                     conditions=self.get_filters(), has_all_option=True)
         self.n_components = IntField(ICAAdapterModel.n_components)
+        self.method = SelectField(ICAAdapterModel.method)
 
     @staticmethod
     def get_view_model():
@@ -127,9 +140,13 @@ class ICAAdapter(ABCAdapter):
         Return the required memory to run this algorithm.
         """
         used_shape = (self.input_shape[0], 1, self.input_shape[2], self.input_shape[3])
-        input_size = numpy.prod(used_shape) * 8.0
         output_size = self.result_size(self.input_shape, view_model.n_components)
-        return input_size + output_size
+        if view_model.method == PCAMethods.SVD:
+            input_size = numpy.prod(used_shape) * 8.0
+            return input_size + output_size
+        whitening_size = streamed_pca_memory_size(self.input_shape[2], view_model.n_components, view_model.method)
+        whitened_size = 2 * self.input_shape[0] * view_model.n_components * 8.0
+        return whitening_size + whitened_size + output_size + CHUNK_MEMORY
 
     def get_required_disk_size(self, view_model):
         # type: (ICAAdapterModel) -> int
@@ -153,16 +170,11 @@ class ICAAdapter(ABCAdapter):
 
         # ------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
         time_series_h5 = h5.h5_file_for_index(self.input_time_series_index)
-        input_shape = time_series_h5.data.shape
-        node_slice = [slice(input_shape[0]), None, slice(input_shape[2]), slice(input_shape[3])]
 
-        # ---------- Iterate over slices and compose final result ------------##
-        small_ts = TimeSeries()
-        for var in range(input_shape[1]):
-            node_slice[1] = slice(var, var + 1)
-            small_ts.data = time_series_h5.read_data_slice(tuple(node_slice))
-            partial_ica = compute_ica_decomposition(small_ts, view_model.n_components)
-            ica_h5.write_data_slice(partial_ica)
+        if view_model.method == PCAMethods.SVD:
+            partial_ica = self._compute_in_memory(view_model, time_series_h5, ica_h5)
+        else:
+            partial_ica = self._compute_streamed(view_model, time_series_h5, ica_h5)
 
         time_series_h5.close()
 
@@ -176,6 +188,63 @@ class ICAAdapter(ABCAdapter):
 
         return ica_index
 
+    @staticmethod
+    def _compute_in_memory(view_model, time_series_h5, ica_h5):
+        """
+        Unmix the time series of one state variable at a time, read whole in memory.
+        """
+        input_shape = time_series_h5.data.shape
+        node_slice = [slice(input_shape[0]), None, slice(input_shape[2]), slice(input_shape[3])]
+
+        # ---------- Iterate over slices and compose final result ------------##
+        small_ts = TimeSeries()
+        for var in range(input_shape[1]):
+            node_slice[1] = slice(var, var + 1)
+            small_ts.data = time_series_h5.read_data_slice(tuple(node_slice))
+            partial_ica = compute_ica_decomposition(small_ts, view_model.n_components)
+            ica_h5.write_data_slice(partial_ica)
+        return partial_ica
+
+    @staticmethod
+    def _compute_streamed(view_model, time_series_h5, ica_h5):
+        """
+        Unmix the time series of each state variable and mode from chunks of time points read from its
+        file, then write the normalised and component time series one chunk at a time.
+        """
+        n_time, n_svar, n_node, n_mode = time_series_h5.data.shape
+        n_comp = view_model.n_components
+        unmixing = numpy.zeros((n_comp, n_comp, n_svar, n_mode))
+        prewhitening = numpy.zeros((n_comp, n_node, n_svar, n_mode))
+        mean = numpy.zeros((n_svar, n_node, n_mode))
+        std = numpy.zeros((n_svar, n_node, n_mode))
+
+        for var in range(n_svar):
+            for mode in range(n_mode):
+                def read_data(start, stop):
+                    return time_series_h5.read_data_slice((slice(start, stop), var, slice(None), mode))
+
+                mean[var, :, mode], variance = streamed_moments(read_data, n_time, n_node, covariance=False)
+                std[var, :, mode] = numpy.sqrt(variance)
+                prewhitening[:, :, var, mode], unmixing[:, :, var, mode], _ = streamed_fastica(
+                    read_data, n_time, n_node, n_comp, view_model.method)
+
+        ica = IndependentComponents(source=TimeSeries(), unmixing_matrix=unmixing,
+                                    prewhitening_matrix=prewhitening, n_components=n_comp)
+        ica.compute_mixing_matrix()
+        ica_h5.unmixing_matrix.store(unmixing)
+        ica_h5.prewhitening_matrix.store(prewhitening)
+        ica_h5.mixing_matrix.store(ica.mixing_matrix)
+
+        weights = numpy.einsum('ijvm,jnvm->invm', unmixing, prewhitening)
+        step = chunk_size(n_svar * (n_node + n_comp) * n_mode)
+        for start in range(0, n_time, step):
+            data = time_series_h5.read_data_slice((slice(start, min(start + step, n_time)),))
+            norm_data = (data - mean) / std
+            ica_h5.write_time_slice(norm_data, project_components(weights, data),
+                                    project_components(weights, norm_data))
+
+        return ica
+
     @staticmethod
     def result_shape(input_shape, n_components):
         """Returns the shape of the mixing matrix."""
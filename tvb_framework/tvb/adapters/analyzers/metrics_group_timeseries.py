@@ -38,9 +38,11 @@ Analyzer used to calculate a single measure for TimeSeries.
 .. moduleauthor:: Lia Domide <lia.domide@codemart.ro>
 
 """
+import uuid
 import numpy
 from tvb.adapters.datatypes.db.mapped_value import DatatypeMeasureIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
+from tvb.analyzers.metric_accumulators import METRICS, compute_metrics, metrics_memory_size
 from tvb.basic.neotraits.api import Int, Float
 from tvb.basic.neotraits.api import List
 from tvb.config import ALGORITHMS
@@ -148,6 +150,9 @@ class TimeseriesMetricsAdapter(ABCAdapter):
         """
         Return the required memory to run this algorithm.
         """
+        algorithms = view_model.algorithms or list(ALGORITHMS)
+        if all(algorithm_name in METRICS for algorithm_name in algorithms):
+            return metrics_memory_size(self.input_shape)
         input_size = numpy.prod(self.input_shape) * 8.0
         return input_size
 
@@ -169,13 +174,9 @@ class TimeseriesMetricsAdapter(ABCAdapter):
             algorithms = list(ALGORITHMS)
 
         self.log.debug("time_series shape is %s" % str(self.input_shape))
-        dt_timeseries = self.load_traited_by_gid(self.input_time_series_index.gid)
 
-        metrics_results = {}
+        selected_algorithms = []
         for algorithm_name in algorithms:
-
-            algorithm_func = ALGORITHMS[algorithm_name]
-
             # Validate that current algorithm's filter is valid.
             algorithm_filter = TimeseriesMetricsAdapterForm.get_extra_algorithm_filters().get(algorithm_name)
             if algorithm_filter is not None \
@@ -185,16 +186,37 @@ class TimeseriesMetricsAdapter(ABCAdapter):
                 continue
             else:
                 self.log.debug("Applying measure: " + str(algorithm_name))
+            selected_algorithms.append(algorithm_name)
 
-            unstored_result = algorithm_func({'time_series': dt_timeseries, 'start_point': view_model.start_point,
-                                              'segment': view_model.segment})
+        # The known metrics are computed together, in one pass over chunks of the time series file
+        streamed_algorithms = [name for name in selected_algorithms if name in METRICS]
+        metrics_results = {}
+        if streamed_algorithms:
+            time_series_h5 = h5.h5_file_for_index(self.input_time_series_index)
+
+            def read_data(start, stop):
+                return time_series_h5.read_data_slice((slice(start, stop),))
+
+            metrics_results = compute_metrics(read_data, self.input_shape,
+                                              self.input_time_series_index.sample_period, streamed_algorithms,
+                                              view_model.start_point, view_model.segment)
+            time_series_h5.close()
+
+        other_algorithms = [name for name in selected_algorithms if name not in METRICS]
+        if other_algorithms:
+            dt_timeseries = self.load_traited_by_gid(self.input_time_series_index.gid)
+        for algorithm_name in other_algorithms:
+            unstored_result = ALGORITHMS[algorithm_name]({'time_series': dt_timeseries,
+                                                          'start_point': view_model.start_point,
+                                                          'segment': view_model.segment})
             # ----------------- Prepare a Float object(s) for result ----------------##
             if isinstance(unstored_result, dict):
                 metrics_results.update(unstored_result)
             else:
                 metrics_results[algorithm_name] = unstored_result
 
-        dt_metric = DatatypeMeasure(analyzed_datatype=dt_timeseries, metrics=metrics_results)
+        analyzed_datatype = TimeSeries(gid=uuid.UUID(self.input_time_series_index.gid))
+        dt_metric = DatatypeMeasure(analyzed_datatype=analyzed_datatype, metrics=metrics_results)
 
         result = self.store_complete(dt_metric)
 
@@ -42,13 +42,15 @@ import numpy
 from tvb.adapters.datatypes.db.spectral import CoherenceSpectrumIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
 from tvb.adapters.datatypes.h5.spectral_h5 import CoherenceSpectrumH5
-from tvb.analyzers.node_coherence import calculate_cross_coherence
+from tvb.analyzers.cross_spectrum import cross_spectrum_memory_size
+from tvb.analyzers.node_coherence import windowed_coherence, coherence_frequencies
 from tvb.basic.neotraits.api import Int
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.neocom import h5
 from tvb.core.neotraits.forms import TraitDataTypeSelectField, IntField
 from tvb.core.neotraits.view_model import ViewModel, DataTypeGidAttr
+from tvb.datatypes.spectral import CoherenceSpectrum
 from tvb.datatypes.time_series import TimeSeries
 
 
@@ -125,9 +127,10 @@ class NodeCoherenceAdapter(ABCAdapter):
                       1,
                       self.input_shape[2],
                       self.input_shape[3])
-        input_size = numpy.prod(used_shape) * 8.0
+        # the time series is streamed, one state variable and mode at a time
+        cross_spectrum_size = cross_spectrum_memory_size(self.input_shape[2], view_model.nfft // 2, view_model.nfft)
         output_size = self.result_size(used_shape, view_model.nfft)
-        return input_size + output_size
+        return cross_spectrum_size + output_size
 
     def get_required_disk_size(self, view_model):
         # type: (NodeCoherenceModel) -> int
@@ -155,17 +158,23 @@ class NodeCoherenceAdapter(ABCAdapter):
         # ------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
         time_series_h5 = h5.h5_file_for_index(self.input_time_series_index)
         input_shape = time_series_h5.data.shape
-        node_slice = [slice(input_shape[0]), None, slice(input_shape[2]), slice(input_shape[3])]
 
         # ---------- Iterate over slices and compose final result ------------##
         small_ts = TimeSeries()
         small_ts.sample_period = time_series_h5.sample_period.load()
         small_ts.sample_period_unit = time_series_h5.sample_period_unit.load()
-        partial_coh = None
+        partial_coh = CoherenceSpectrum(source=small_ts, nfft=view_model.nfft,
+                                        frequency=coherence_frequencies(view_model.nfft, small_ts.sample_rate))
         for var in range(input_shape[1]):
-            node_slice[1] = slice(var, var + 1)
-            small_ts.data = time_series_h5.read_data_slice(tuple(node_slice))
-            partial_coh = calculate_cross_coherence(small_ts, view_model.nfft)
+            coh = numpy.empty((len(partial_coh.frequency), input_shape[2], input_shape[2], 1, input_shape[3]))
+            for mode in range(input_shape[3]):
+                # the time series is streamed from the file, a block of FFT windows at a time
+                def read_data(start, stop):
+                    data_slice = (slice(start, stop), slice(var, var + 1), slice(input_shape[2]), slice(mode, mode + 1))
+                    return time_series_h5.read_data_slice(data_slice)[:, 0, :, 0]
+
+                coh[..., 0, mode] = windowed_coherence(read_data, input_shape[0], view_model.nfft)
+            partial_coh.array_data = coh
             coherence_h5.write_data_slice(partial_coh)
 
         time_series_h5.close()
@@ -40,13 +40,16 @@ import numpy
 from tvb.adapters.datatypes.db.spectral import ComplexCoherenceSpectrumIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
 from tvb.adapters.datatypes.h5.spectral_h5 import ComplexCoherenceSpectrumH5
-from tvb.analyzers.node_complex_coherence import calculate_complex_cross_coherence, complex_coherence_result_shape
+from tvb.analyzers.cross_spectrum import cross_spectrum_memory_size
+from tvb.analyzers.node_complex_coherence import complex_cross_coherence, complex_coherence_result_shape, \
+    average_state_variables_and_modes
 from tvb.basic.neotraits.api import Attr, Int, Float
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.neocom import h5
 from tvb.core.neotraits.forms import TraitDataTypeSelectField
 from tvb.core.neotraits.view_model import ViewModel, DataTypeGidAttr
+from tvb.datatypes.spectral import ComplexCoherenceSpectrum
 from tvb.datatypes.time_series import TimeSeries
 
 
@@ -109,8 +112,9 @@ class NodeComplexCoherenceModel(ViewModel):
         label="Zeropadding",
         default=0,
         required=False,
-        doc="""Adds `n` zeros at the end of each segment and at the end of window_function.
-        It is not yet functional.""")
+        doc="""Adds `n` zeros at the end of each windowed segment before the FFT. The spectra are then
+        sampled on a finer frequency grid, of (segment length + n) points, without improving the actual
+        frequency resolution.""")
 
     detrend_ts = Attr(
         field_type=bool,
@@ -126,12 +130,6 @@ class NodeComplexCoherenceModel(ViewModel):
         doc="""Maximum frequency points (e.g. 32., 64., 128.) represented in the output.
         Default is segment_length / 2 + 1.""")
 
-    npat = Float(
-        label="dummy variable",
-        default=1.0,
-        required=False,
-        doc="""This attribute appears to be related to an input projection matrix... Which is not yet implemented""")
-
 
 class NodeComplexCoherenceForm(ABCAdapterForm):
 
@@ -175,13 +173,21 @@ class NodeComplexCoherenceAdapter(ABCAdapter):
         """
         Return the required memory to run this algorithm.
         """
-        input_size = numpy.prod(self.input_shape) * 8.0
+        sample_period = self.input_time_series_index.sample_period
+        result_shape = complex_coherence_result_shape(self.input_shape, view_model.max_freq, view_model.epoch_length,
+                                                      view_model.segment_length, view_model.segment_shift,
+                                                      sample_period, view_model.zeropad,
+                                                      view_model.average_segments)[0]
+        # the time series is streamed, so only the cross spectrum is held, besides the results
+        n_seg = 1 if view_model.average_segments else result_shape[3]
+        cross_spectrum_size = cross_spectrum_memory_size(result_shape[0], result_shape[2],
+                                                         int(view_model.segment_length / sample_period), n_seg)
         output_size = self.result_size(self.input_shape,
                                        view_model.max_freq, view_model.epoch_length, view_model.segment_length,
-                                       view_model.segment_shift, self.input_time_series_index.sample_period,
+                                       view_model.segment_shift, sample_period,
                                        view_model.zeropad, view_model.average_segments)
 
-        return input_size + output_size
+        return cross_spectrum_size + 2 * output_size
 
     def get_required_disk_size(self, view_model):
         # type: (NodeComplexCoherenceModel) -> int
@@ -213,16 +219,27 @@ class NodeComplexCoherenceAdapter(ABCAdapter):
         :param view_model: the ViewModel keeping the algorithm inputs
         :return: the complex coherence for the specified time series
         """
-        # TODO ---------- Iterate over slices and compose final result ------------##
-        time_series = h5.load_from_index(self.input_time_series_index)
-        ht_result = calculate_complex_cross_coherence(time_series, view_model.epoch_length,
-                                                      view_model.segment_length,
-                                                      view_model.segment_shift,
-                                                      view_model.window_function,
-                                                      view_model.average_segments,
-                                                      view_model.subtract_epoch_average,
-                                                      view_model.zeropad, view_model.detrend_ts,
-                                                      view_model.max_freq, view_model.npat)
+        with h5.h5_file_for_index(self.input_time_series_index) as time_series_h5:
+            source = TimeSeries(sample_period=time_series_h5.sample_period.load(),
+                                sample_period_unit=time_series_h5.sample_period_unit.load())
+            source.gid = view_model.time_series
+
+            # the time series is streamed from the file, a block of segments at a time
+            def read_data(start, stop):
+                return average_state_variables_and_modes(time_series_h5.read_data_slice((slice(start, stop),)))
+
+            cs, coh, epoch_length, segment_length = complex_cross_coherence(
+                read_data, time_series_h5.data.shape[0], source.sample_period, view_model.epoch_length,
+                view_model.segment_length, view_model.segment_shift, view_model.window_function,
+                view_model.average_segments, view_model.subtract_epoch_average, view_model.zeropad,
+                view_model.detrend_ts, view_model.max_freq)
+
+        ht_result = ComplexCoherenceSpectrum(source=source,
+                                             array_data=coh,
+                                             cross_spectrum=cs,
+                                             epoch_length=epoch_length,
+                                             segment_length=segment_length,
+                                             windowing_function=view_model.window_function)
         self.log.debug("got ComplexCoherenceSpectrum result")
         self.log.debug("ComplexCoherenceSpectrum segment_length is %s" % (str(ht_result.segment_length)))
         self.log.debug("ComplexCoherenceSpectrum epoch_length is %s" % (str(ht_result.epoch_length)))
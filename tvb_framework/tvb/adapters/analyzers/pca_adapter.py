@@ -41,12 +41,15 @@ import numpy
 from tvb.adapters.datatypes.db.mode_decompositions import PrincipalComponentsIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
 from tvb.adapters.datatypes.h5.mode_decompositions_h5 import PrincipalComponentsH5
-from tvb.analyzers.pca import compute_pca
+from tvb.analyzers.pca import CHUNK_MEMORY, PCAMethods, chunk_size, compute_pca, principal_axes
+from tvb.analyzers.pca import project_components, streamed_pca_memory_size
+from tvb.basic.neotraits.api import Int, EnumAttr
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.neocom import h5
-from tvb.core.neotraits.forms import TraitDataTypeSelectField
+from tvb.core.neotraits.forms import TraitDataTypeSelectField, IntField, SelectField
 from tvb.core.neotraits.view_model import ViewModel, DataTypeGidAttr
+from tvb.datatypes.mode_decompositions import PrincipalComponents
 from tvb.datatypes.time_series import TimeSeries
 
 
@@ -61,6 +64,22 @@ class PCAAdapterModel(ViewModel):
                 1024Hz, would need to be greater than 16 seconds long."""
     )
 
+    n_components = Int(
+        label="Number of principal components",
+        required=False,
+        default=None,
+        doc="Number of principal components to keep, all of them by default.")
+
+    method = EnumAttr(
+        label="Method",
+        default=PCAMethods.SVD,
+        required=False,
+        doc="""``svd`` decomposes the whole time series of a state variable in memory.
+            ``covariance`` accumulates the covariance matrix of the nodes over chunks of
+            the time series, and gives the same components. ``randomized`` approximates the
+            first components over a few passes on the chunks, with a memory proportional to
+            the number of components, for long surface time series.""")
+
 
 class PCAAdapterForm(ABCAdapterForm):
 
@@ -68,6 +87,9 @@ class PCAAdapterForm(ABCAdapterForm):
         super(PCAAdapterForm, self).__init__()
         self.time_series = TraitDataTypeSelectField(PCAAdapterModel.time_series, name=self.get_input_name(),
                                                     conditions=self.get_filters(), has_all_option=True)
+        self.n_components = IntField(PCAAdapterModel.n_components)
+        self.method = SelectField(PCAAdapterModel.method)
+
     @staticmethod
     def get_view_model():
         return PCAAdapterModel
@@ -116,9 +138,13 @@ class PCAAdapter(ABCAdapter):
         Return the required memory to run this algorithm.
         """
         used_shape = (self.input_shape[0], 1, self.input_shape[2], self.input_shape[3])
-        input_size = numpy.prod(used_shape) * 8.0
-        output_size = self.result_size(used_shape)
-        return input_size + output_size
+        if view_model.method == PCAMethods.SVD:
+            input_size = numpy.prod(used_shape) * 8.0
+            output_size = self.result_size(used_shape, view_model.n_components)
+            return input_size + output_size
+        decomposition_size = streamed_pca_memory_size(self.input_shape[2], view_model.n_components,
+                                                      view_model.method)
+        return decomposition_size + self.result_size(self.input_shape, view_model.n_components) + CHUNK_MEMORY
 
     def get_required_disk_size(self, view_model):
         # type: (PCAAdapterModel) -> int
@@ -126,7 +152,7 @@ class PCAAdapter(ABCAdapter):
         Returns the required disk size to be able to run the adapter (in kB).
         """
         used_shape = (self.input_shape[0], 1, self.input_shape[2], self.input_shape[3])
-        return self.array_size2kb(self.result_size(used_shape))
+        return self.array_size2kb(self.result_size(used_shape, view_model.n_components))
 
     def launch(self, view_model):
         # type: (PCAAdapterModel) -> [PrincipalComponentsIndex]
@@ -142,6 +168,27 @@ class PCAAdapter(ABCAdapter):
 
         # ------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
         time_series_h5 = h5.h5_file_for_index(self.input_time_series_index)
+
+        if view_model.method == PCAMethods.SVD:
+            partial_pca = self._compute_in_memory(view_model, time_series_h5, pca_h5)
+        else:
+            partial_pca = self._compute_streamed(view_model, time_series_h5, pca_h5)
+
+        time_series_h5.close()
+
+        partial_pca.source.gid = view_model.time_series
+        partial_pca.gid = uuid.UUID(principal_components_index.gid)
+        principal_components_index.fill_from_has_traits(partial_pca)
+
+        pca_h5.store(partial_pca, scalars_only=True)
+        pca_h5.close()
+
+        return principal_components_index
+
+    def _compute_in_memory(self, view_model, time_series_h5, pca_h5):
+        """
+        Decompose the time series of one state variable at a time, read whole in memory.
+        """
         input_shape = time_series_h5.data.shape
         node_slice = [slice(input_shape[0]), None, slice(input_shape[2]), slice(input_shape[3])]
 
@@ -151,36 +198,61 @@ class PCAAdapter(ABCAdapter):
             node_slice[1] = slice(var, var + 1)
             small_ts.data = time_series_h5.read_data_slice(tuple(node_slice))
             self.time_series = small_ts.gid
-            partial_pca = compute_pca(small_ts)
+            partial_pca = compute_pca(small_ts, view_model.n_components)
             pca_h5.write_data_slice(partial_pca)
+        return partial_pca
 
-        time_series_h5.close()
+    @staticmethod
+    def _compute_streamed(view_model, time_series_h5, pca_h5):
+        """
+        Decompose the time series of each state variable and mode from chunks of time points read from
+        its file, then write the normalised and component time series one chunk at a time.
+        """
+        n_time, n_svar, n_node, n_mode = time_series_h5.data.shape
+        n_comp = view_model.n_components or n_node
+        weights = numpy.zeros((n_comp, n_node, n_svar, n_mode))
+        fractions = numpy.zeros((n_comp, n_svar, n_mode))
+        mean = numpy.zeros((n_svar, n_node, n_mode))
+        std = numpy.zeros((n_svar, n_node, n_mode))
 
-        partial_pca.source.gid = view_model.time_series
-        partial_pca.gid = uuid.UUID(principal_components_index.gid)
-        principal_components_index.fill_from_has_traits(partial_pca)
+        for var in range(n_svar):
+            for mode in range(n_mode):
+                def read_data(start, stop):
+                    return time_series_h5.read_data_slice((slice(start, stop), var, slice(None), mode))
 
-        pca_h5.store(partial_pca, scalars_only=True)
-        pca_h5.close()
+                mean[var, :, mode], std[var, :, mode], variances, weights[:, :, var, mode] = principal_axes(
+                    read_data, n_time, n_node, n_comp, view_model.method)
+                fractions[:, var, mode] = variances / n_node
 
-        return principal_components_index
+        pca_h5.weights.store(weights)
+        pca_h5.fractions.store(fractions)
+
+        step = chunk_size(n_svar * (n_node + n_comp) * n_mode)
+        for start in range(0, n_time, step):
+            data = time_series_h5.read_data_slice((slice(start, min(start + step, n_time)),))
+            norm_data = (data - mean) / std
+            pca_h5.write_time_slice(norm_data, project_components(weights, data),
+                                    project_components(weights, norm_data))
+
+        return PrincipalComponents(source=TimeSeries(), weights=weights, fractions=fractions)
 
-    def result_size(self, input_shape):
+    def result_size(self, input_shape, n_components=None):
         """
         Returns the storage size in Bytes of the results of the PCA analysis.
         """
         result_size = numpy.sum(list(map(numpy.prod,
-                                         self.result_shape(input_shape)))) * 8.0  # Bytes
+                                         self.result_shape(input_shape, n_components)))) * 8.0  # Bytes
         return result_size
 
     @staticmethod
-    def result_shape(input_shape):
+    def result_shape(input_shape, n_components=None):
         """
         Returns the shape of the main result of the PCA analysis -- compnnent
         weights matrix and a vector of fractions.
         """
-        weights_shape = (input_shape[2], input_shape[2], input_shape[1],
+        n_components = n_components or input_shape[2]
+        weights_shape = (n_components, input_shape[2], input_shape[1],
                          input_shape[3])
-        fractions_shape = (input_shape[2], input_shape[1], input_shape[3])
+        fractions_shape = (n_components, input_shape[1], input_shape[3])
 
         return [weights_shape, fractions_shape]
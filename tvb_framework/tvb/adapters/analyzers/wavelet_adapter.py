@@ -44,13 +44,16 @@ from tvb.adapters.datatypes.db.spectral import WaveletCoefficientsIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
 from tvb.adapters.datatypes.h5.spectral_h5 import WaveletCoefficientsH5
 from tvb.adapters.datatypes.h5.time_series_h5 import TimeSeriesH5
-from tvb.analyzers.wavelet import compute_continuous_wavelet_transform
+from tvb.analyzers.wavelet import wavelet_frequencies, morlet_kernels, morlet_kernels_shape, temporal_step, \
+    wavelet_transform_chunks, wavelet_memory_size
 from tvb.basic.neotraits.api import Attr, Range, Float
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
+from tvb.core.adapters.exceptions import LaunchException
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.neocom import h5
-from tvb.core.neotraits.forms import FormField, Form, TraitDataTypeSelectField, StrField, FloatField
+from tvb.core.neotraits.forms import FormField, Form, TraitDataTypeSelectField, StrField, FloatField, BoolField
 from tvb.core.neotraits.view_model import ViewModel, DataTypeGidAttr
+from tvb.datatypes.spectral import WaveletCoefficients
 from tvb.datatypes.time_series import TimeSeries
 
 
@@ -95,6 +98,14 @@ class WaveletAdapterModel(ViewModel):
         default=5.0,
         doc="""NFC. Must be greater than 5. Ratios of the center frequencies to bandwidths.""")
 
+    single_precision = Attr(
+        field_type=bool,
+        label="Single precision",
+        default=False,
+        required=False,
+        doc="""Compute and store the coefficients as complex64 instead of complex128, halving the
+            memory and disk space used.""")
+
 
 class RangeForm(Form):
     def __init__(self):
@@ -120,6 +131,7 @@ class ContinuousWaveletTransformAdapterForm(ABCAdapterForm):
         self.sample_period = FloatField(WaveletAdapterModel.sample_period)
         self.normalisation = StrField(WaveletAdapterModel.normalisation)
         self.q_ratio = FloatField(WaveletAdapterModel.q_ratio)
+        self.single_precision = BoolField(WaveletAdapterModel.single_precision)
         self.frequencies = FormField(RangeForm, name='frequencies', label=WaveletAdapterModel.frequencies.label,
                                      doc=WaveletAdapterModel.frequencies.doc)
 
@@ -177,30 +189,35 @@ class ContinuousWaveletTransformAdapter(ABCAdapter):
 
         self.input_shape = tuple(input_shape)
         self.log.debug("Time series shape is %s" % str(self.input_shape))
+        if not self.input_shape or 0 in self.input_shape:
+            raise LaunchException("Can not compute the wavelet transform of an empty time series, "
+                                  "its shape is %s." % str(self.input_shape))
 
     def get_required_memory_size(self, view_model):
         """
         Return the required memory to run this algorithm.
         """
-        used_shape = (self.input_shape[0],
-                      self.input_shape[1],
-                      1,
-                      self.input_shape[3])
-        input_size = numpy.prod(used_shape) * 8.0
-        output_size = self.result_size(view_model.frequencies, view_model.sample_period,
-                                       used_shape, self.input_time_series_index.sample_period)
-        return input_size + output_size
+        # the time series is streamed, and the coefficients are written, a chunk of time points at a time
+        sample_period = self.input_time_series_index.sample_period
+        sample_rate = TimeSeries(sample_period=sample_period,
+                                 sample_period_unit=self.input_time_series_index.sample_period_unit).sample_rate
+        _, freqs = wavelet_frequencies(view_model.frequencies)
+        kernels_shape = morlet_kernels_shape(freqs, sample_rate, view_model.q_ratio)
+        n_channel = int(numpy.prod(self.input_shape[1:]))
+        return wavelet_memory_size(self.input_shape[0], n_channel, kernels_shape,
+                                   temporal_step(view_model.sample_period, sample_period), self._dtype(view_model))
 
     def get_required_disk_size(self, view_model):
         """
         Returns the required disk size to be able to run the adapter.(in kB)
         """
-        used_shape = (self.input_shape[0],
-                      self.input_shape[1],
-                      1,
-                      self.input_shape[3])
         return self.array_size2kb(self.result_size(view_model.frequencies, view_model.sample_period,
-                                                   used_shape, self.input_time_series_index.sample_period))
+                                                   self.input_shape, self.input_time_series_index.sample_period,
+                                                   self._dtype(view_model)))
+
+    @staticmethod
+    def _dtype(view_model):
+        return numpy.complex64 if view_model.single_precision else numpy.complex128
 
     def launch(self, view_model):
         # type: (WaveletAdapterModel) -> (WaveletCoefficientsIndex)
@@ -209,10 +226,6 @@ class ContinuousWaveletTransformAdapter(ABCAdapter):
         :param view_model: the ViewModel keeping the algorithm inputs
         :return: the wavelet coefficients for the specified time series
         """
-        frequencies_array = numpy.array([])
-        if view_model.frequencies is not None:
-            frequencies_array = view_model.frequencies.to_array()
-
         time_series_h5 = h5.h5_file_for_index(self.input_time_series_index)
         assert isinstance(time_series_h5, TimeSeriesH5)
 
@@ -221,24 +234,30 @@ class ContinuousWaveletTransformAdapter(ABCAdapter):
         dest_path = self.path_for(WaveletCoefficientsH5, wavelet_index.gid)
         wavelet_h5 = WaveletCoefficientsH5(path=dest_path)
 
-        # ------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
-        node_slice = [slice(self.input_shape[0]), slice(self.input_shape[1]), None, slice(self.input_shape[3])]
-
-        # ---------- Iterate over slices and compose final result ------------##
         small_ts = TimeSeries()
         small_ts.sample_period = time_series_h5.sample_period.load()
         small_ts.sample_period_unit = time_series_h5.sample_period_unit.load()
-        for node in range(self.input_shape[2]):
-            node_slice[2] = slice(node, node + 1)
-            small_ts.data = time_series_h5.read_data_slice(tuple(node_slice))
-            partial_wavelet = compute_continuous_wavelet_transform(small_ts, view_model.frequencies,
-                                                                   view_model.sample_period,
-                                                                   view_model.q_ratio, view_model.normalisation,
-                                                                   view_model.mother)
-            wavelet_h5.write_data_slice(partial_wavelet)
+        frequencies, freqs = wavelet_frequencies(view_model.frequencies)
+        kernels = morlet_kernels(freqs, small_ts.sample_rate, view_model.q_ratio, view_model.normalisation)
+        step = temporal_step(view_model.sample_period, small_ts.sample_period)
 
-        time_series_h5.close()
+        # ---------- Stream the time series and write the coefficients, a chunk of time points at a time ----------##
+        coefficients = None
+        for coefficients in wavelet_transform_chunks(
+                lambda start, stop: time_series_h5.read_data_slice((slice(start, stop),)),
+                time_series_h5.data.shape[0], kernels, step, self._dtype(view_model)):
+            wavelet_h5.write_time_slice(coefficients)
 
+        time_series_h5.close()
+        if coefficients is None:
+            wavelet_h5.close()
+            raise LaunchException("The time series %s has no data to transform." % view_model.time_series)
+
+        partial_wavelet = WaveletCoefficients(source=small_ts, mother=view_model.mother,
+                                              sample_period=view_model.sample_period,
+                                              frequencies=frequencies.to_array(),
+                                              normalisation=view_model.normalisation, q_ratio=view_model.q_ratio,
+                                              array_data=coefficients)
         partial_wavelet.source.gid = view_model.time_series
         partial_wavelet.gid = uuid.UUID(wavelet_index.gid)
 
@@ -246,7 +265,7 @@ class ContinuousWaveletTransformAdapter(ABCAdapter):
         self.fill_index_from_h5(wavelet_index, wavelet_h5)
 
         wavelet_h5.store(partial_wavelet, scalars_only=True)
-        wavelet_h5.frequencies.store(frequencies_array)
+        wavelet_h5.frequencies.store(partial_wavelet.frequencies)
         wavelet_h5.close()
 
         return wavelet_index
@@ -263,12 +282,12 @@ class ContinuousWaveletTransformAdapter(ABCAdapter):
         result_shape = (freq_len, nt,) + input_shape[1:]
         return result_shape
 
-    def result_size(self, frequencies, sample_period, input_shape, input_sample_period):
+    def result_size(self, frequencies, sample_period, input_shape, input_sample_period, dtype=numpy.complex128):
         """
         Returns the storage size in Bytes of the main result (complex array) of
         the continuous wavelet transform.
         """
         result_size = numpy.prod(
             self.result_shape(frequencies, sample_period, input_shape,
-                              input_sample_period)) * 2.0 * 8.0  # complex*Bytes
+                              input_sample_period)) * numpy.dtype(dtype).itemsize
         return result_size
@@ -62,6 +62,15 @@ class PrincipalComponentsH5(H5File):
         partial_result.compute_normalised_component_time_series()
         self.normalised_component_time_series.append(partial_result.normalised_component_time_series, close_file=False)
 
+    def write_time_slice(self, norm_source, component_time_series, normalised_component_time_series):
+        """
+        Append a chunk of time points of the normalised source and component time series.
+        """
+        self.norm_source.append(norm_source, close_file=False, grow_dimension=0)
+        self.component_time_series.append(component_time_series, close_file=False, grow_dimension=0)
+        self.normalised_component_time_series.append(normalised_component_time_series, close_file=False,
+                                                     grow_dimension=0)
+
     def read_fractions_data(self, from_comp, to_comp):
         """
         Return a list with fractions for components in interval from_comp, to_comp and in
@@ -123,3 +132,12 @@ class IndependentComponentsH5(H5File):
 
         partial_result.compute_mixing_matrix()
         self.mixing_matrix.append(partial_result.mixing_matrix, close_file=False)
+
+    def write_time_slice(self, norm_source, component_time_series, normalised_component_time_series):
+        """
+        Append a chunk of time points of the normalised source and component time series.
+        """
+        self.norm_source.append(norm_source, close_file=False, grow_dimension=0)
+        self.component_time_series.append(component_time_series, close_file=False, grow_dimension=0)
+        self.normalised_component_time_series.append(normalised_component_time_series, close_file=False,
+                                                     grow_dimension=0)
@@ -139,6 +139,15 @@ class WaveletCoefficientsH5(DataTypeMatrixH5):
         partial_result.compute_power()
         self.power.append(partial_result.power, close_file=False)
 
+    def write_time_slice(self, coefficients):
+        """
+        Append the coefficients of the next time points, with their amplitude, phase and power.
+        """
+        self.array_data.append(coefficients, close_file=False, grow_dimension=1)
+        self.amplitude.append(numpy.abs(coefficients), close_file=False, grow_dimension=1)
+        self.phase.append(numpy.angle(coefficients), close_file=False, grow_dimension=1)
+        self.power.append(numpy.abs(coefficients) ** 2, close_file=False, grow_dimension=1)
+
 
 class CoherenceSpectrumH5(DataTypeMatrixH5):
 
@@ -58,3 +58,9 @@ class CrossCorrelationH5(DataTypeMatrixH5):
         Append chunk.
         """
         self.array_data.append(partial_result.array_data, close_file=False)
+
+    def write_node_block(self, block):
+        """
+        Append the cross-correlation sequences of a block of nodes, along the first node dimension.
+        """
+        self.array_data.append(block, close_file=False, grow_dimension=1)
@@ -35,27 +35,105 @@
 
 import json
 
+import numpy
 from tvb.basic.neotraits.api import Int
 from tvb.core.adapters.arguments_serialisation import *
 from tvb.core.neotraits.h5 import H5File, Scalar, DataSet, Reference, Json
 from tvb.core.utils import prepare_time_slice
 from tvb.datatypes.time_series import *
+from tvb.storage.h5.file.exceptions import MissingDataSetException
+from tvb.storage.h5.file.storage_policy import StoragePolicy
 
 NO_OF_DEFAULT_SELECTED_CHANNELS = 20
+# Bytes of data and time samples buffered in memory before being appended to file
+APPEND_BUFFER_SIZE = 1024 * 1024
+
+# Each level of the level-of-detail pyramid aggregates LOD_FACTOR entries of the level below, level 0 being the data
+LOD_FACTOR = 16
+LOD_LEVELS = 5
+# Time series with more samples get their pyramid built while the simulator writes them, others are reduced on read
+LOD_MIN_LENGTH = LOD_FACTOR ** 3
+# Bytes of data read at once when building the pyramid of an existing time series, or reducing data without it
+LOD_BUILD_CHUNK_SIZE = 64 * 1024 * 1024
+LOD_STATISTICS = ('min', 'max', 'mean')
+
+
+class LodPyramidBuilder(object):
+    """
+    Aggregates time series data, as it comes, into the levels of a minimum / maximum / mean pyramid.
+    Level l has one entry for each LOD_FACTOR ** l samples, the last one covering the remaining samples.
+    """
+
+    def __init__(self, nr_levels=LOD_LEVELS, factor=LOD_FACTOR):
+        self.factor = factor
+        # for each level, the (min, max, sum, count) of the entries below it not yet making a full block
+        self._pending = [None] * nr_levels
+
+    def add(self, data):
+        """
+        :returns: for each level, the (min, max, mean) of the blocks completed by this data, or None
+        """
+        data = numpy.asarray(data)
+        return self._aggregate((data, data, data, numpy.ones(len(data), dtype=numpy.int64)), finish=False)
+
+    def finish(self):
+        """
+        :returns: for each level, the (min, max, mean) of the last, partial blocks, or None
+        """
+        return self._aggregate(None, finish=True)
+
+    def _aggregate(self, entries, finish):
+        result = []
+        for level in range(len(self._pending)):
+            entries = self._reduce(level, entries, finish)
+            if entries is None:
+                result.append(None)
+                continue
+            minimums, maximums, sums, counts = entries
+            result.append((minimums, maximums, sums / counts.reshape((-1,) + (1,) * (sums.ndim - 1))))
+        return result
+
+    def _reduce(self, level, entries, finish):
+        pending = self._pending[level]
+        if entries is None:
+            if not finish or pending is None:
+                return None
+            entries = pending
+        elif pending is not None:
+            entries = tuple(numpy.concatenate((old, new)) for old, new in zip(pending, entries))
+
+        length = len(entries[3])
+        used = length if finish else length - length % self.factor
+        self._pending[level] = tuple(entry[used:] for entry in entries) if used < length else None
+        if used == 0:
+            return None
+
+        minimums, maximums, sums, counts = (entry[:used] for entry in entries)
+        starts = numpy.arange(0, used, self.factor)
+        return (numpy.minimum.reduceat(minimums, starts, axis=0), numpy.maximum.reduceat(maximums, starts, axis=0),
+                numpy.add.reduceat(sums, starts, axis=0, dtype=numpy.float64), numpy.add.reduceat(counts, starts))
 
 
 class TimeSeriesH5(H5File):
+    # chunked for pages of time for all channels, as read by the viewers through read_data_page
+    DATA_STORAGE_POLICY = StoragePolicy(StoragePolicy.TIME_PAGED)
+
     def __init__(self, path):
         super(TimeSeriesH5, self).__init__(path)
         self.title = Scalar(TimeSeries.title, self)
-        self.data = DataSet(TimeSeries.data, self, expand_dimension=0)
+        self.data = DataSet(TimeSeries.data, self, expand_dimension=0, buffer_size=APPEND_BUFFER_SIZE,
+                            storage_policy=self.DATA_STORAGE_POLICY)
         self.nr_dimensions = Scalar(Int(), self, name="nr_dimensions")
+        # number of data samples aggregated in the level-of-detail pyramid, missing when there is none
+        self.lod_data_length = Scalar(Int(), self, name="lod_data_length")
+        self._lod_builder = None
+        self._lod_samples = 0
 
         # omitted length_nd , these are indexing props, to be removed from datatype too
         self.labels_ordering = Json(TimeSeries.labels_ordering, self)
         self.labels_dimensions = Json(TimeSeries.labels_dimensions, self)
 
-        self.time = DataSet(TimeSeries.time, self, expand_dimension=0)
+        self.time = DataSet(TimeSeries.time, self, expand_dimension=0, buffer_size=APPEND_BUFFER_SIZE)
         self.start_time = Scalar(TimeSeries.start_time, self)
         self.sample_period = Scalar(TimeSeries.sample_period, self)
         self.sample_period_unit = Scalar(TimeSeries.sample_period_unit, self)
@@ -138,17 +216,25 @@ class TimeSeriesH5(H5File):
         """
         Retrieve one page of data (paging done based on time).
         """
-        from_idx, to_idx = int(from_idx), int(to_idx)
+        if step is None:
+            step = 1
+        slices = self._page_slices(self.data.shape, int(from_idx), int(to_idx), int(step), specific_slices)
+        data = self.data[slices]
+        data = data.squeeze()
 
+        if len(data.shape) == 1:
+            # Do not allow time dimension to get squeezed, a 2D result need to
+            # come out of this method.
+            data = data.reshape((1, len(data)))
+
+        return data
+
+    @staticmethod
+    def _page_slices(overall_shape, from_idx, to_idx, step, specific_slices):
         if isinstance(specific_slices, str):
             specific_slices = json.loads(specific_slices)
-        if step is None:
-            step = 1
-        else:
-            step = int(step)
 
         slices = []
-        overall_shape = self.data.shape
         for i in range(len(overall_shape)):
             if i == 0:
                 # Time slice
@@ -163,16 +249,148 @@ class TimeSeriesH5(H5File):
                 slices.append(slice(0, 1))
             else:
                 slices.append(slice(specific_slices[i], min(specific_slices[i] + 1, overall_shape[i]), 1))
+        return tuple(slices)
 
-        data = self.data[tuple(slices)]
-        data = data.squeeze()
+    def get_lod_level(self, from_idx, to_idx, pixel_width):
+        """
+        :returns: the level of the level-of-detail pyramid from which to read the data between the given time
+            indices, to display it on `pixel_width` pixels: the coarsest level with at least one entry per pixel.
+            Level 0 is the data itself.
+        """
+        samples_per_pixel = (int(to_idx) - int(from_idx)) / max(int(pixel_width), 1)
+        level = 0
+        while level < LOD_LEVELS and LOD_FACTOR ** (level + 1) <= samples_per_pixel:
+            level += 1
+        return level
 
-        if len(data.shape) == 1:
-            # Do not allow time dimension to get squeezed, a 2D result need to
-            # come out of this method.
-            data = data.reshape((1, len(data)))
+    def read_data_page_lod(self, from_idx, to_idx, pixel_width, specific_slices=None):
+        """
+        Retrieve one page of data reduced to at most `pixel_width` points per channel, whatever the page length.
+        Each point has the minimum, maximum and mean of the samples it covers. These are read from the
+        level-of-detail pyramid when the simulator has built it, and computed from the data otherwise.
+        Points cover `step` samples, the first one starting `offset` (zero or negative) samples from `from_idx`,
+        as points are aligned to the pyramid blocks. Sample indices are not sent, as the viewers receive
+        float32 values, which can not represent the indices of long time series.
+
+        :returns: [[offset, step], minimums, maximums, means]
+        """
+        data_length = self.data.shape[0]
+        from_idx, to_idx = int(from_idx), min(int(to_idx), data_length)
+        pixel_width = max(int(pixel_width), 1)
+        level = self.get_lod_level(from_idx, to_idx, pixel_width)
+        if level > 0 and self._read_lod_data_length() != data_length:
+            return self._reduce_data_page(from_idx, to_idx, pixel_width, specific_slices)
+
+        block = LOD_FACTOR ** level
+        first, last = from_idx // block, -(-to_idx // block)
+        if level == 0:
+            minimums = maximums = means = self._read_lod_page(self.data.field_name, first, last, specific_slices)
+        else:
+            minimums, maximums, means = [self._read_lod_page(self._lod_dataset_name(level, statistic),
+                                                             first, last, specific_slices)
+                                         for statistic in LOD_STATISTICS]
+
+        group = -(-(last - first) // pixel_width)
+        if group > 1:
+            # join groups of entries, weighting means with the number of samples each entry covers
+            starts = numpy.arange(first, last) * block
+            indices = numpy.arange(0, last - first, group)
+            weights = (numpy.minimum(starts + block, data_length) - starts)[:, numpy.newaxis]
+            minimums = numpy.minimum.reduceat(minimums, indices, axis=0)
+            maximums = numpy.maximum.reduceat(maximums, indices, axis=0)
+            means = numpy.add.reduceat(means * weights, indices, axis=0) / numpy.add.reduceat(weights, indices)
+        return [numpy.array([first * block - from_idx, block * group]), minimums, maximums, means]
+
+    def _reduce_data_page(self, from_idx, to_idx, pixel_width, specific_slices):
+        """
+        Same result as `read_data_page_lod`, computed from the data, without writing a pyramid on a read.
+        The data is read in chunks of whole points, to bound the memory used.
+        """
+        step = -(-(to_idx - from_idx) // pixel_width)
+        sample_size = self.data.shape[2] * numpy.dtype(numpy.float64).itemsize
+        chunk_length = max(LOD_BUILD_CHUNK_SIZE // (sample_size * step), 1) * step
+        chunks = []
+        for start in range(from_idx, to_idx, chunk_length):
+            page = self._read_lod_page(self.data.field_name, start, min(start + chunk_length, to_idx), specific_slices)
+            indices = numpy.arange(0, len(page), step)
+            counts = numpy.diff(numpy.append(indices, len(page)))[:, numpy.newaxis]
+            chunks.append((numpy.minimum.reduceat(page, indices, axis=0), numpy.maximum.reduceat(page, indices, axis=0),
+                           numpy.add.reduceat(page, indices, axis=0, dtype=numpy.float64) / counts))
+        minimums, maximums, means = [numpy.concatenate(statistic) for statistic in zip(*chunks)]
+        return [numpy.array([0, step]), minimums, maximums, means]
+
+    def read_channels_page_lod(self, from_idx, to_idx, pixel_width, specific_slices=None, channels_list=None):
+        """
+        Same as `read_data_page_lod`, only for the specified channels list (see `read_channels_page`).
+        """
+        page = self.read_data_page_lod(from_idx, to_idx, pixel_width, specific_slices)
+        if channels_list:
+            channels = [int(channel) for channel in json.loads(channels_list)]
+            page[1:] = [statistic[:, channels] for statistic in page[1:]]
+        return page
 
-        return data
+    def _read_lod_page(self, dataset_name, first, last, specific_slices):
+        shape = self.storage_manager.get_data_shape(dataset_name)
+        page = self.storage_manager.get_data(dataset_name, self._page_slices(shape, first, last, 1, specific_slices))
+        return page.reshape((page.shape[0], -1))
+
+    @staticmethod
+    def _lod_dataset_name(level, statistic):
+        return 'lod_%d_%s' % (level, statistic)
+
+    def _read_lod_data_length(self):
+        try:
+            return self.lod_data_length.load()
+        except MissingDataSetException:
+            return 0
+
+    def start_lod_pyramid(self):
+        """
+        Build the level-of-detail pyramid from the data written from now on by `write_data_slice`,
+        writing it on `close`. It is up to date only if no data was written before.
+        """
+        self._lod_builder = LodPyramidBuilder()
+        self._lod_samples = 0
+
+    def build_lod_pyramid(self):
+        """
+        Build the level-of-detail pyramid from all the data stored, replacing the one which might exist.
+        It writes the file, thus is meant for the operations producing time series, not for the viewers.
+        """
+        data_shape = self.data.shape
+        sample_size = max(int(numpy.prod(data_shape[1:])), 1) * numpy.dtype(numpy.float64).itemsize
+        chunk_length = max(LOD_BUILD_CHUNK_SIZE // sample_size, LOD_FACTOR)
+
+        with self.storage_manager.kept_open():
+            self._remove_lod_pyramid()
+            builder = LodPyramidBuilder()
+            for start in range(0, data_shape[0], chunk_length):
+                self._append_lod_entries(builder.add(self.data[start:start + chunk_length]))
+            self._append_lod_entries(builder.finish())
+            self._store_lod_data_length(data_shape[0])
+
+    def _remove_lod_pyramid(self):
+        for level in range(1, LOD_LEVELS + 1):
+            for statistic in LOD_STATISTICS:
+                name = self._lod_dataset_name(level, statistic)
+                try:
+                    self.storage_manager.get_data_shape(name)
+                except MissingDataSetException:
+                    continue
+                self.storage_manager.remove_data(name)
+
+    def _append_lod_entries(self, levels):
+        for level, entries in enumerate(levels, 1):
+            if entries is None:
+                continue
+            for statistic, values in zip(LOD_STATISTICS, entries):
+                self.storage_manager.append_data(values, self._lod_dataset_name(level, statistic),
+                                                 grow_dimension=0, close_file=False)
+
+    def _store_lod_data_length(self, data_length):
+        self.lod_data_length.store(data_length)
+        if self.metadata_cache is not None:
+            self.metadata_cache[self.lod_data_length.field_name] = data_length
 
     def write_time_slice(self, partial_result):
         """
@@ -185,6 +403,9 @@ class TimeSeriesH5(H5File):
         Append a chunk of time-series data to the ``data`` attribute.
         """
         self.data.append(partial_result, False)
+        if self._lod_builder is not None:
+            self._append_lod_entries(self._lod_builder.add(partial_result))
+            self._lod_samples += len(partial_result)
 
     def write_data_slice_on_grow_dimension(self, partial_result, grow_dimension=0):
         self.data.append(partial_result, grow_dimension=grow_dimension, close_file=False)
@@ -232,6 +453,13 @@ class TimeSeriesH5(H5File):
     def store_references(self, ts):
         pass
 
+    def close(self):
+        if self._lod_builder is not None:
+            self._append_lod_entries(self._lod_builder.finish())
+            self._store_lod_data_length(self._lod_samples)
+            self._lod_builder = None
+        super(TimeSeriesH5, self).close()
+
 
 class TimeSeriesRegionH5(TimeSeriesH5):
     def __init__(self, path):
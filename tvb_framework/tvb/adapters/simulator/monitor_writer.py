@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Background writing of simulation monitor output.
+"""
+
+import os
+import queue
+import threading
+import numpy
+
+from tvb.basic.logger.builder import get_logger
+
+# Number of samples which may be pending before the simulation waits for the writer
+QUEUE_SIZE = 1024
+# Maximum number of samples written by one append
+BATCH_SIZE = 256
+
+_STOP = object()
+
+
+class AsyncTimeSeriesWriter(threading.Thread):
+    """
+    Appends the samples of one monitor to its TimeSeriesH5 from a background thread, so that HDF5 I/O,
+    file locking and encryption sync overlap with the integration of the next samples.
+
+    Samples are queued by `write`, which blocks while the queue is full, and pending samples are written
+    in batches. An error raised while writing is raised again by the next `write` or by `close`.
+    """
+
+    def __init__(self, ts_h5, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+        super(AsyncTimeSeriesWriter, self).__init__(name="TimeSeriesWriter-%s" % os.path.basename(ts_h5.path),
+                                                    daemon=True)
+        self.log = get_logger(self.__class__.__module__)
+        self.ts_h5 = ts_h5
+        self.batch_size = batch_size
+        self.samples_written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._stopped = False
+        self.start()
+
+    def write(self, time, data):
+        """
+        Queue one monitor sample for writing.
+        """
+        self._raise_error()
+        # copied, since the monitor could reuse its array for the next sample
+        self._queue.put((time, numpy.array(data)))
+
+    def run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                batch.pop()
+                stop = True
+            # after an error, samples are still consumed so that the simulation doesn't block
+            if batch and self._error is None:
+                try:
+                    self._write_batch(batch)
+                except Exception as excep:
+                    self.log.exception("Could not write monitor output to %s" % self.ts_h5.path)
+                    self._error = excep
+
+    def _write_batch(self, batch):
+        times, data = zip(*batch)
+        self.ts_h5.write_time_slice(list(times))
+        self.ts_h5.write_data_slice(numpy.array(data))
+        self.samples_written += len(batch)
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        """
+        Wait for pending samples to be written and stop the thread, without raising write errors.
+        """
+        if not self._stopped:
+            self._stopped = True
+            self._queue.put(_STOP)
+            self.join()
+
+    def close(self):
+        """
+        Wait for pending samples to be written and stop the thread, raising any write error.
+        """
+        self.stop()
+        self._raise_error()
@@ -47,10 +47,12 @@ from tvb.adapters.datatypes.db.connectivity import ConnectivityIndex
 from tvb.adapters.datatypes.db.region_mapping import RegionMappingIndex, RegionVolumeMappingIndex
 from tvb.adapters.datatypes.db.simulation_history import SimulationHistoryIndex
 from tvb.adapters.datatypes.db.time_series import TimeSeriesIndex
+from tvb.adapters.datatypes.h5.time_series_h5 import LOD_MIN_LENGTH
 from tvb.adapters.forms.coupling_forms import CouplingFunctionsEnum
 from tvb.adapters.forms.model_forms import get_model_to_form_dict
 from tvb.adapters.forms.monitor_forms import get_monitor_to_form_dict
 from tvb.adapters.forms.simulator_fragments import *
+from tvb.adapters.simulator.monitor_writer import AsyncTimeSeriesWriter
 from tvb.basic.neotraits.api import EnumAttr
 from tvb.core.adapters.abcadapter import ABCAdapterForm, ABCAdapter
 from tvb.core.adapters.exceptions import LaunchException, InvalidParameterException
@@ -299,19 +301,26 @@ class SimulatorAdapter(ABCAdapter):
             # Storing GA also here redundant, except for HPC
             ts_h5.store_generic_attributes(self.generic_attributes)
             ts_h5.store_references(ts)
+            if view_model.simulation_length / monitor.period > LOD_MIN_LENGTH:
+                # long results get their level-of-detail pyramid while written, instead of on first view
+                ts_h5.start_lod_pyramid()
 
             result_indexes[m_name] = ts_index
             result_h5[m_name] = ts_h5
 
-        # Run simulation
+        # Run simulation, with monitor output written from background threads
         self.log.debug("Starting simulation...")
-        for result in self.algorithm(simulation_length=self.algorithm.simulation_length):
-            for j, monitor in enumerate(self.algorithm.monitors):
-                if result[j] is not None:
-                    m_name = type(monitor).__name__
-                    ts_h5 = result_h5[m_name]
-                    ts_h5.write_time_slice([result[j][0]])
-                    ts_h5.write_data_slice([result[j][1]])
+        writers = [AsyncTimeSeriesWriter(result_h5[type(monitor).__name__]) for monitor in self.algorithm.monitors]
+        try:
+            for result in self.algorithm(simulation_length=self.algorithm.simulation_length):
+                for j, writer in enumerate(writers):
+                    if result[j] is not None:
+                        writer.write(result[j][0], result[j][1])
+        finally:
+            for writer in writers:
+                writer.stop()
+        for writer in writers:
+            writer.close()
 
         self.log.debug("Completed simulation, starting to store simulation state ")
         # Now store simulator history, at the simulation end
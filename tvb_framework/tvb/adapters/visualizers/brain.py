@@ -176,7 +176,7 @@ class BrainViewer(ABCSurfaceDisplayer):
                     'noOfMeasurePoints': 0}
 
         connectivity_gid = self.connectivity_index.gid
-        measure_points = SurfaceURLGenerator.build_h5_url(connectivity_gid, 'get_centres')
+        measure_points = SurfaceURLGenerator.build_float32_h5_url(connectivity_gid, 'get_centres')
         measure_points_labels = SurfaceURLGenerator.build_h5_url(connectivity_gid, 'get_region_labels')
         self.measure_points_no = self.connectivity_index.number_of_regions
 
@@ -299,19 +299,24 @@ class BrainViewer(ABCSurfaceDisplayer):
                  Currently timeline_urls has just one value, as on client is loaded entirely anyway.
         """
         time_series_gid = time_series_index.gid
-        activity_base_url = URLGenerator.build_url(self.stored_adapter.id, 'read_data_page_split', time_series_gid, "")
+        activity_base_url = URLGenerator.build_float32_url(self.stored_adapter.id, 'read_data_page_split',
+                                                           time_series_gid, "")
         time_urls = [SurfaceURLGenerator.build_h5_url(time_series_gid, 'read_time_page',
                                                       parameter="current_page=0;page_size=" +
                                                                 str(time_series_index.data_length_1d))]
         return activity_base_url, time_urls
 
     def read_data_page_split(self, time_series_gid, from_idx, to_idx, step=None, specific_slices=None):
+        """
+        Read one page of activity, every `step` time points. For surface time series, the page is split in
+        one array per surface slice, as the surface is split for rendering.
+        """
         with h5.h5_file_for_gid(time_series_gid) as time_series_h5:
             assert isinstance(time_series_h5, TimeSeriesH5)
             basic_result = time_series_h5.read_data_page(from_idx, to_idx, step, specific_slices)
 
             if not isinstance(time_series_h5, TimeSeriesSurfaceH5):
-                return basic_result.tolist()
+                return basic_result
             surface_gid = time_series_h5.surface.load()
 
         result = []
@@ -319,11 +324,11 @@ class BrainViewer(ABCSurfaceDisplayer):
             assert isinstance(surface_h5, SurfaceH5)
             number_of_split_slices = surface_h5.number_of_split_slices.load()
             if number_of_split_slices <= 1:
-                result.append(basic_result.tolist())
+                result.append(basic_result)
             else:
                 for slice_number in range(surface_h5.number_of_split_slices):
                     start_idx, end_idx = surface_h5.get_slice_vertex_boundaries(slice_number)
-                    result.append(basic_result[:, start_idx:end_idx].tolist())
+                    result.append(basic_result[:, start_idx:end_idx])
 
         return result
 
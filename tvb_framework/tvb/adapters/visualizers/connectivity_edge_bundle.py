@@ -92,8 +92,9 @@ class ConnectivityEdgeBundle(ABCDisplayer):
         connectivity = self.load_traited_by_gid(view_model.connectivity)
 
         pars = {"labels": json.dumps(connectivity.region_labels.tolist()),
-                "url_base": URLGenerator.paths2url(view_model.connectivity,
-                                                   attribute_name="weights", flatten="True")
+                "url_base": URLGenerator.build_float32_datatype_attribute_url(view_model.connectivity,
+                                                                              attribute_name="weights",
+                                                                              flatten="True")
                 }
 
         return self.build_display_result("connectivity_edge_bundle/view", pars)
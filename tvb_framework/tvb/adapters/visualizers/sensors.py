@@ -54,7 +54,7 @@ def prepare_sensors_as_measure_points_params(sensors):
     """
     Returns urls from where to fetch the measure points and their labels
     """
-    sensor_locations = URLGenerator.build_h5_url(sensors.gid, 'get_locations')
+    sensor_locations = URLGenerator.build_float32_h5_url(sensors.gid, 'get_locations')
     sensor_no = sensors.number_of_sensors
     sensor_labels = URLGenerator.build_h5_url(sensors.gid, 'get_labels')
 
@@ -77,8 +77,8 @@ def prepare_mapped_sensors_as_measure_points_params(sensors, eeg_cap=None, adapt
     """
 
     if eeg_cap:
-        sensor_locations = URLGenerator.build_url(adapter_id, 'sensors_to_surface', sensors.gid,
-                                                  parameter='surface_to_map_gid=' + eeg_cap.gid)
+        sensor_locations = URLGenerator.build_float32_url(adapter_id, 'sensors_to_surface', sensors.gid,
+                                                          parameter='surface_to_map_gid=' + eeg_cap.gid)
         sensor_no = sensors.number_of_sensors
         sensor_labels = URLGenerator.build_h5_url(sensors.gid, 'get_labels')
 
@@ -107,7 +107,7 @@ def function_sensors_to_surface(sensors_gid, surface_to_map_gid):
     sensors_dt = h5.load_from_gid(sensors_gid)
     surface_dt = h5.load_from_gid(surface_to_map_gid)
 
-    return sensors_dt.sensors_to_surface(surface_dt).tolist()
+    return sensors_dt.sensors_to_surface(surface_dt)
 
 
 class SensorsViewerModel(ViewModel):
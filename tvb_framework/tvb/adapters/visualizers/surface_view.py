@@ -367,7 +367,7 @@ class SurfaceViewer(ABCSurfaceDisplayer):
             connectivity_index = self.load_entity_by_gid(connectivity_gid)
             measure_points_no = connectivity_index.number_of_regions
 
-            url_measure_points = SurfaceURLGenerator.build_h5_url(connectivity_gid, 'get_centres')
+            url_measure_points = SurfaceURLGenerator.build_float32_h5_url(connectivity_gid, 'get_centres')
             url_measure_points_labels = SurfaceURLGenerator.build_h5_url(connectivity_gid, 'get_region_labels')
 
             boundary_url = SurfaceURLGenerator.get_url_for_region_boundaries(surface_gid, region_map_gid,
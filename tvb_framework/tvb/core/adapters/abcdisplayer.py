@@ -51,6 +51,10 @@ class URLGenerator(object):
     H5_FILE = 'read_from_h5_file'
     DATATYPE_ATTRIBUTE = 'read_datatype_attribute'
     BINARY_DATATYPE_ATTRIBUTE = 'read_binary_datatype_attribute'
+    # endpoints sending ndarrays as little-endian float32, parsed in JS by HLPR_parseFloat32Arrays
+    FLOAT32_INVOKE_ADAPTER = 'invoke_adapter_float32'
+    FLOAT32_H5_FILE = 'read_float32_from_h5_file'
+    FLOAT32_DATATYPE_ATTRIBUTE = 'read_float32_datatype_attribute'
 
     @staticmethod
     def build_base_h5_url(entity_gid):
@@ -58,17 +62,22 @@ class URLGenerator(object):
         return url_regex.format(URLGenerator.FLOW, URLGenerator.H5_FILE, entity_gid)
 
     @staticmethod
-    def build_url(adapter_id, method_name, entity_gid, parameter=None):
+    def build_url(adapter_id, method_name, entity_gid, parameter=None, endpoint=INVOKE_ADAPTER):
         if isinstance(entity_gid, UUID):
             entity_gid = entity_gid.hex
         url_regex = '/{}/{}/{}/{}/{}'
-        url = url_regex.format(URLGenerator.FLOW, URLGenerator.INVOKE_ADAPTER, adapter_id, method_name, entity_gid)
+        url = url_regex.format(URLGenerator.FLOW, endpoint, adapter_id, method_name, entity_gid)
 
         if parameter is not None:
             url += "?" + str(parameter)
 
         return url
 
+    @staticmethod
+    def build_float32_url(adapter_id, method_name, entity_gid, parameter=None):
+        return URLGenerator.build_url(adapter_id, method_name, entity_gid, parameter,
+                                      endpoint=URLGenerator.FLOAT32_INVOKE_ADAPTER)
+
     @staticmethod
     def build_h5_url(entity_gid, method_name, flatten=False, datatype_kwargs=None, parameter=None):
         json_kwargs = json.dumps(datatype_kwargs)
@@ -83,6 +92,20 @@ class URLGenerator(object):
 
         return url
 
+    @staticmethod
+    def build_float32_h5_url(entity_gid, method_name, datatype_kwargs=None, parameter=None):
+        json_kwargs = json.dumps(datatype_kwargs)
+        if isinstance(entity_gid, UUID):
+            entity_gid = entity_gid.hex
+
+        url_regex = '/{}/{}/{}/{}/{}'
+        url = url_regex.format(URLGenerator.FLOW, URLGenerator.FLOAT32_H5_FILE, entity_gid, method_name, json_kwargs)
+
+        if parameter is not None:
+            url += "?" + str(parameter)
+
+        return url
+
     @staticmethod
     def paths2url(datatype_gid, attribute_name, flatten=False, parameter=None):
         """
@@ -108,6 +131,17 @@ class URLGenerator(object):
             url += "?" + str(parameter)
         return url
 
+    @staticmethod
+    def build_float32_datatype_attribute_url(datatype_gid, attribute_name, flatten=False, parameter=None):
+        if isinstance(datatype_gid, UUID):
+            datatype_gid = datatype_gid.hex
+        url_regex = '/{}/{}/{}/{}/{}'
+        url = url_regex.format(URLGenerator.FLOW, URLGenerator.FLOAT32_DATATYPE_ATTRIBUTE,
+                               datatype_gid, attribute_name, flatten)
+        if parameter is not None:
+            url += "?" + str(parameter)
+        return url
+
 
 @add_metaclass(ABCMeta)
 class ABCDisplayer(ABCAdapter, metaclass=ABCMeta):
@@ -44,6 +44,8 @@ from tvb.config import SIMULATION_DATATYPE_CLASS
 
 
 DEFAULT_PAGE_SIZE = 200
+# Maximum number of ids in one IN clause, below the limit of bound parameters in SQLite
+QUERY_CHUNK_SIZE = 500
 
 
 class RootDAO(object, metaclass=SESSION_META_CLASS):
@@ -82,10 +84,17 @@ class RootDAO(object, metaclass=SESSION_META_CLASS):
         self.session.add_all(entities_list)
         self.session.commit()
 
-        stored_entities = []
+        # reload with one query for each entity class and chunk of ids, instead of one for each entity
+        ids_by_class = {}
         for entity in entities_list:
-            stored_entities.append(self.session.query(entity.__class__).filter_by(id=entity.id).one())
-        return stored_entities
+            ids_by_class.setdefault(entity.__class__, []).append(entity.id)
+        stored_by_key = {}
+        for entity_class, entity_ids in ids_by_class.items():
+            for start in range(0, len(entity_ids), QUERY_CHUNK_SIZE):
+                chunk = entity_ids[start:start + QUERY_CHUNK_SIZE]
+                for stored in self.session.query(entity_class).filter(entity_class.id.in_(chunk)).all():
+                    stored_by_key[(entity_class, stored.id)] = stored
+        return [stored_by_key[(entity.__class__, entity.id)] for entity in entities_list]
 
 
     def get_generic_entity(self, entity_type, filter_value, select_field="id"):
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+A cache for the values the viewers read again and again from the H5 files of datatypes
+(e.g. surface vertices, connectivity weights, pages of time series), such that repeated requests
+do not open and decode the files each time.
+"""
+
+import numbers
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy
+
+# Bytes of values kept in memory by the cache
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+# Values taking more than this part of the cache are not kept, as they would evict most of the others
+MAX_VALUE_FRACTION = 4
+
+
+class H5ResultCache(object):
+    """
+    A least recently used cache of values read from H5 files, bounded by the memory the values take.
+    Keys start with the gid of the datatype the value belongs to, and each value is kept along with the
+    modification time and size of the file, such that a changed file is read again.
+    The arrays of cached values are made read-only, as they are handed to all the callers asking for them.
+    Only values made of arrays, numbers, strings and lists, tuples or dicts of those are kept, as the size of
+    other objects (e.g. datatypes holding arrays) is not known.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (file stamp, value, value size), the least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, file_path, load_function):
+        """
+        :param key: hashable, starting with the datatype gid, e.g. (gid, method name, method kwargs)
+        :param file_path: the H5 file the value is read from
+        :param load_function: called without arguments to read the value, when it is not in the cache
+        """
+        stamp = self._file_stamp(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = load_function()
+        if stamp is not None:
+            self._put(key, stamp, value)
+        return value
+
+    def invalidate(self, gid):
+        """
+        Drop the values of a datatype, e.g. when it is removed.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == gid]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def get_statistics(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                    'size': self.size, 'max_size': self.max_size}
+
+    def _put(self, key, stamp, value):
+        value_size = self._size_of(value)
+        if value_size is None or value_size > self.max_size // MAX_VALUE_FRACTION:
+            return
+        self._freeze(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stamp, value, value_size)
+            self.size += value_size
+            while self.size > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        self.size -= self._entries.pop(key)[2]
+
+    @staticmethod
+    def _file_stamp(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def _freeze(cls, value):
+        if isinstance(value, numpy.ndarray):
+            value.setflags(write=False)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                cls._freeze(item)
+        elif isinstance(value, dict):
+            for item in value.values():
+                cls._freeze(item)
+
+    @classmethod
+    def _size_of(cls, value):
+        """
+        :returns: the bytes taken by the value, or None when they can not be measured
+        """
+        if isinstance(value, numpy.ndarray):
+            return None if value.dtype.hasobject else value.nbytes
+        if isinstance(value, (list, tuple, dict)):
+            sizes = [cls._size_of(item) for item in (value.values() if isinstance(value, dict) else value)]
+            if None in sizes:
+                return None
+            return sys.getsizeof(value) + sum(sizes)
+        if value is None or isinstance(value, (numbers.Number, str, bytes)):
+            return sys.getsizeof(value)
+        return None
@@ -284,7 +284,7 @@ class ViewModelLoader(DirLoader):
             h5_path = self.path_for_has_traits(type(view_model), view_model.gid)
         else:
             h5_path = os.path.join(self.base_dir, fname)
-        with ViewModelH5(h5_path, view_model) as h5_file:
+        with ViewModelH5(h5_path, view_model) as h5_file, h5_file.storage_manager.kept_open():
             h5_file.store(view_model)
             h5_file.type.store(self.get_class_path(view_model))
             h5_file.create_date.store(date2string(datetime.now()))
@@ -295,15 +295,28 @@ class ViewModelLoader(DirLoader):
                 h5_file.store_generic_attributes(GenericAttributes())
 
             references = h5_file.gather_references()
-            for trait_attr, gid in references:
-                if not gid:
-                    continue
-                model_attr = getattr(view_model, trait_attr.field_name)
-                if isinstance(gid, list):
-                    for idx, sub_gid in enumerate(gid):
-                        self.store(model_attr[idx])
-                else:
-                    self.store(model_attr)
+
+        for trait_attr, gid in references:
+            if not gid:
+                continue
+            model_attr = getattr(view_model, trait_attr.field_name)
+            if isinstance(gid, list):
+                for idx, sub_gid in enumerate(gid):
+                    self.store(model_attr[idx])
+            else:
+                self.store(model_attr)
+        return h5_path
+
+    def store_fields(self, view_model, field_names):
+        # type: (ViewModel, typing.Iterable[str]) -> str
+        """
+        Overwrite only the given fields in the already stored file of a ViewModel.
+        The files of the view models it references are left as they are.
+        """
+        h5_path = self.path_for_has_traits(type(view_model), view_model.gid)
+        with ViewModelH5(h5_path, view_model) as h5_file, h5_file.storage_manager.kept_open():
+            for field_name in field_names:
+                getattr(h5_file, field_name).store(getattr(view_model, field_name))
         return h5_path
 
     def load(self, gid=None, fname=None):
@@ -36,12 +36,15 @@ from tvb.basic.neotraits.api import HasTraits
 from tvb.core.entities.generic_attributes import GenericAttributes
 from tvb.core.entities.load import load_entity_by_gid
 from tvb.core.entities.model.model_datatype import DataType
+from tvb.core.neocom._h5cache import H5ResultCache
 from tvb.core.neocom._h5loader import Loader, DirLoader, TVBLoader, ViewModelLoader
 from tvb.core.neocom._registry import Registry
 from tvb.core.neotraits.h5 import H5File
 from tvb.core.neotraits.view_model import ViewModel
 
 REGISTRY = Registry()
+# values read from datatype H5 files by the viewers, see FlowController
+RESULT_CACHE = H5ResultCache()
 
 
 def path_for_stored_index(dt_index_instance):
@@ -235,6 +238,15 @@ def store_view_model(view_model, base_dir):
     return vm_loader.store(view_model)
 
 
+def store_view_model_fields(view_model, base_dir, field_names):
+    # type: (ViewModel, str, typing.Iterable[str]) -> str
+    """
+    Overwrite only the given fields of a ViewModel already stored in the directory specified by base_dir.
+    """
+    vm_loader = ViewModelLoader(base_dir)
+    return vm_loader.store_fields(view_model, field_names)
+
+
 def load_view_model(gid, base_dir):
     # type: (typing.Union[uuid.UUID, str], str) -> ViewModel
     """
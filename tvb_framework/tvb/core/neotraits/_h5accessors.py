@@ -180,8 +180,9 @@ class DataSet(Accessor):
     A dataset in a h5 file that corresponds to a traited NArray.
     """
 
-    def __init__(self, trait_attribute, h5file, name=None, expand_dimension=-1):
-        # type: (NArray, H5File, str, int) -> None
+    def __init__(self, trait_attribute, h5file, name=None, expand_dimension=-1, buffer_size=None,
+                 storage_policy=None):
+        # type: (NArray, H5File, str, int, int, StoragePolicy) -> None
         """
         :param trait_attribute: A traited attribute
         :param h5file: The parent H5file that contains this Accessor
@@ -190,9 +191,13 @@ class DataSet(Accessor):
                      If the traited attribute is not a member of a HasTraits then
                      it has no name and you have to provide this parameter
         :param expand_dimension: An int designating a dimension of the array that may grow.
+        :param buffer_size: Size in bytes of the data buffered in memory by appends before being written to file.
+        :param storage_policy: A StoragePolicy choosing chunking and compression of the dataset when created.
         """
         super(DataSet, self).__init__(trait_attribute, h5file, name)
         self.expand_dimension = expand_dimension
+        self.buffer_size = buffer_size
+        self.storage_policy = storage_policy
         # Cache metadata for expandable DataSets to avoid multiple reads/writes at append time
         self.meta = None
 
@@ -202,13 +207,15 @@ class DataSet(Accessor):
         Method to be called when it is necessary to write slices of data for a large dataset, eg. TimeSeries.
         Metdata for such datasets is written only at file close time, see H5File.close method.
         """
-        if not grow_dimension:
+        if grow_dimension is None:
             grow_dimension = self.expand_dimension
         self.owner.storage_manager.append_data(
             data,
             self.field_name,
             grow_dimension=grow_dimension,
-            close_file=close_file
+            close_file=close_file,
+            buffer_size=self.buffer_size,
+            storage_policy=self.storage_policy
         )
         # update the cached array min max metadata values
         new_meta = DataSetMetaData.from_array(numpy.array(data))
@@ -226,7 +233,7 @@ class DataSet(Accessor):
         if data is None:
             return
 
-        self.owner.storage_manager.store_data(data, self.field_name)
+        self.owner.storage_manager.store_data(data, self.field_name, storage_policy=self.storage_policy)
         # cache some array information
         self.owner.storage_manager.set_metadata(
             DataSetMetaData.from_array(data).to_dict(),
@@ -126,17 +126,34 @@ class H5File(object):
 
     def store(self, datatype, scalars_only=False, store_references=True):
         # type: (HasTraits, bool, bool) -> None
-        for accessor in self.iter_accessors():
-            f_name = accessor.trait_attribute.field_name
-            if f_name is None:
-                # skipp attribute that does not seem to belong to a traited type
-                # accessor is an independent Accessor
-                continue
-            if scalars_only and not isinstance(accessor, Scalar):
-                continue
-            if not store_references and isinstance(accessor, Reference):
+        with self.storage_manager.kept_open():
+            for accessor in self.iter_accessors():
+                f_name = accessor.trait_attribute.field_name
+                if f_name is None:
+                    # skipp attribute that does not seem to belong to a traited type
+                    # accessor is an independent Accessor
+                    continue
+                if scalars_only and not isinstance(accessor, Scalar):
+                    continue
+                if not store_references and isinstance(accessor, Reference):
+                    continue
+                accessor.store(getattr(datatype, f_name))
+
+    def load_field(self, field_name):
+        """
+        Read only the dataset holding the given datatype field, as `load_into` would.
+        :raises KeyError: when the field is not stored as a dataset in this file
+        """
+        for dataset in self.iter_datasets():
+            if dataset.trait_attribute.field_name != field_name:
                 continue
-            accessor.store(getattr(datatype, f_name))
+            try:
+                return dataset.load()
+            except MissingDataSetException:
+                if dataset.trait_attribute.required:
+                    raise
+                return None
+        raise KeyError(field_name)
 
     def load_into(self, datatype):
         # type: (HasTraits) -> None
@@ -176,23 +193,24 @@ class H5File(object):
     def store_generic_attributes(self, generic_attributes, create=True):
         # type: (GenericAttributes, bool) -> None
         # write_metadata  creation time, serializer class name, etc
-        if create:
-            self.create_date.store(date2string(datetime.now()))
-
-        self.generic_attributes.fill_from(generic_attributes)
-        self.invalid.store(self.generic_attributes.invalid)
-        self.is_nan.store(self.generic_attributes.is_nan)
-        self.subject.store(self.generic_attributes.subject)
-        self.state.store(self.generic_attributes.state)
-        self.user_tag_1.store(self.generic_attributes.user_tag_1)
-        self.user_tag_2.store(self.generic_attributes.user_tag_2)
-        self.user_tag_3.store(self.generic_attributes.user_tag_3)
-        self.user_tag_4.store(self.generic_attributes.user_tag_4)
-        self.user_tag_5.store(self.generic_attributes.user_tag_5)
-        self.operation_tag.store(self.generic_attributes.operation_tag)
-        self.visible.store(self.generic_attributes.visible)
-        if self.generic_attributes.parent_burst is not None:
-            self.parent_burst.store(uuid.UUID(self.generic_attributes.parent_burst))
+        with self.storage_manager.kept_open():
+            if create:
+                self.create_date.store(date2string(datetime.now()))
+
+            self.generic_attributes.fill_from(generic_attributes)
+            self.invalid.store(self.generic_attributes.invalid)
+            self.is_nan.store(self.generic_attributes.is_nan)
+            self.subject.store(self.generic_attributes.subject)
+            self.state.store(self.generic_attributes.state)
+            self.user_tag_1.store(self.generic_attributes.user_tag_1)
+            self.user_tag_2.store(self.generic_attributes.user_tag_2)
+            self.user_tag_3.store(self.generic_attributes.user_tag_3)
+            self.user_tag_4.store(self.generic_attributes.user_tag_4)
+            self.user_tag_5.store(self.generic_attributes.user_tag_5)
+            self.operation_tag.store(self.generic_attributes.operation_tag)
+            self.visible.store(self.generic_attributes.visible)
+            if self.generic_attributes.parent_burst is not None:
+                self.parent_burst.store(uuid.UUID(self.generic_attributes.parent_burst))
 
     def load_generic_attributes(self):
         # type: () -> GenericAttributes
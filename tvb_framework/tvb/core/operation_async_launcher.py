@@ -106,14 +106,21 @@ def do_operation_launch(operation_id):
             burst_service.mark_burst_finished(parent_burst, error_message=str(excep))
 
 
-if __name__ == '__main__':
-    OPERATION_ID = sys.argv[1]
+def launch_operation(operation_id):
+    """
+    Execute an operation, syncing the encrypted project folders meanwhile when needed.
+    """
     storage_interface = StorageInterface()
     if storage_interface.app_encryption_handler():
         storage_interface.start()
 
-    do_operation_launch(OPERATION_ID)
+    do_operation_launch(operation_id)
 
     if storage_interface.app_encryption_handler():
         storage_interface.mark_stop()
         storage_interface.join()
+
+
+if __name__ == '__main__':
+    OPERATION_ID = sys.argv[1]
+    launch_operation(OPERATION_ID)
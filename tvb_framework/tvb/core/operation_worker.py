@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+This module is started in a new process by the stand-alone backend, and kept alive to execute
+operations one after the other, so that the interpreter startup, imports and profile initialization
+are paid once for many operations (e.g. the points of a PSE).
+Example: python -m tvb.core.operation_worker user_name_label 20 2048
+
+The ids of the operations to execute are read from stdin, one per line. After each operation, a
+line is written back: WORKER_DONE, or WORKER_RECYCLED when the worker has executed the given maximum
+number of operations (20), or uses more than the given memory (2048 MB), and exits to be replaced.
+"""
+
+import os
+import sys
+
+if __name__ == '__main__':
+    # Keep stdout for the replies, and send whatever is printed from here on (imports included) to stderr
+    REPLIES = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+import psutil
+from tvb.basic.profile import TvbProfile
+from tvb.basic.logger.builder import get_logger
+from tvb.core.operation_async_launcher import launch_operation
+from tvb.core.services.backend_clients.standalone_client import WORKER_DONE, WORKER_RECYCLED
+
+if __name__ == '__main__':
+    TvbProfile.set_profile(sys.argv[1], True)
+
+
+def serve(commands, replies, max_operations, max_memory):
+    """
+    Execute the operations read from `commands`, until it is closed or the worker should be recycled.
+
+    :param max_memory: resident memory, in bytes, above which the worker is recycled
+    """
+    log = get_logger('tvb.core.operation_worker')
+    process = psutil.Process()
+    nr_operations = 0
+    for line in iter(commands.readline, ""):
+        operation_id = line.strip()
+        if not operation_id:
+            break
+        launch_operation(operation_id)
+        nr_operations += 1
+
+        memory = process.memory_info().rss
+        recycle = nr_operations >= max_operations or memory >= max_memory
+        if recycle:
+            log.info("Recycling operation worker %s after %d operations, using %d MB"
+                     % (process.pid, nr_operations, memory // 2 ** 20))
+        replies.write((WORKER_RECYCLED if recycle else WORKER_DONE) + "\n")
+        replies.flush()
+        if recycle:
+            break
+
+
+if __name__ == '__main__':
+    serve(sys.stdin, REPLIES, int(sys.argv[2]), int(sys.argv[3]) * 2 ** 20)
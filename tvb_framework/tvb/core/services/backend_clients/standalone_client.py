@@ -38,8 +38,9 @@ import os
 import queue
 import signal
 import sys
+import tempfile
 from subprocess import Popen, PIPE
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 
 from tvb.basic.exceptions import TVBException
 from tvb.basic.logger.builder import get_logger
@@ -55,11 +56,133 @@ from tvb.storage.storage_interface import StorageInterface
 LOGGER = get_logger(__name__)
 
 CURRENT_ACTIVE_THREADS = []
+# Held while a thread looks up and kills the process of an operation, and while an OperationExecutor
+# gives its worker back, such that a stop can not kill a worker already running another operation
+PROCESS_LOCK = Lock()
 
 LOCKS_QUEUE = queue.Queue(0)
 for i in range(TvbProfile.current.MAX_THREADS_NUMBER):
     LOCKS_QUEUE.put(1)
 
+# Replies of an operation worker, after each operation
+WORKER_DONE = "done"
+WORKER_RECYCLED = "recycled"
+
+
+def _operation_process_env():
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    # anything that was already in $PYTHONPATH should have been reproduced in sys.path
+    return env
+
+
+class OperationWorker(object):
+    """
+    Long-lived process, executing the operations sent to it one after the other.
+    """
+
+    def __init__(self):
+        run_params = [TvbProfile.current.PYTHON_INTERPRETER_PATH, '-m', 'tvb.core.operation_worker',
+                      TvbProfile.CURRENT_PROFILE_NAME, str(TvbProfile.current.MAX_OPERATIONS_PER_WORKER),
+                      str(TvbProfile.current.MAX_WORKER_MEMORY)]
+        # the output of the current operation, kept for the log when it fails
+        self._errors = tempfile.TemporaryFile()
+        self.process = Popen(run_params, stdin=PIPE, stdout=PIPE, stderr=self._errors,
+                             env=_operation_process_env(), universal_newlines=True)
+        self.pid = self.process.pid
+        self.reusable = True
+        LOGGER.debug("Started operation worker pid=%s" % self.pid)
+
+    def launch(self, operation_id):
+        """
+        Execute one operation and wait for it to finish.
+        :returns: the exit code of the worker, when it did not survive the operation, 0 otherwise
+        """
+        # The worker shares the file offset, thus writes from the start from now on
+        self._errors.seek(0)
+        self._errors.truncate()
+        try:
+            self.process.stdin.write("%s\n" % operation_id)
+            self.process.stdin.flush()
+            reply = self.process.stdout.readline().strip()
+        except (OSError, ValueError):
+            reply = None
+        if reply == WORKER_DONE:
+            return 0
+        # Recycled, or killed when the operation was stopped, or crashed
+        self.reusable = False
+        return self.process.wait()
+
+    def read_errors(self):
+        """
+        :returns: what the worker has written on stderr (and stdout) during the last operation
+        """
+        self._errors.seek(0)
+        return self._errors.read().decode(errors='replace')
+
+    def is_alive(self):
+        return self.reusable and self.process.poll() is None
+
+    def close(self):
+        """
+        Ask the worker to exit, once it is idle.
+        """
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+        self._errors.close()
+
+    def kill(self):
+        """
+        Make sure the worker is gone, e.g. after the operation it ran was stopped.
+        """
+        self.reusable = False
+        self.process.kill()
+        self.process.wait()
+        self._errors.close()
+
+
+class OperationWorkerPool(object):
+    """
+    Idle operation workers, reused by the `OperationExecutor` threads. As these are limited by
+    LOCKS_QUEUE, at most MAX_THREADS_NUMBER workers are in use at once.
+    """
+
+    def __init__(self):
+        self._idle = queue.Queue(0)
+
+    def start(self, nr_workers=None):
+        """
+        Start the workers ahead of the first operations.
+        """
+        for _ in range(nr_workers or TvbProfile.current.MAX_THREADS_NUMBER):
+            self._idle.put(OperationWorker())
+
+    def acquire(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return OperationWorker()
+            if worker.is_alive():
+                return worker
+
+    def release(self, worker):
+        if worker.is_alive():
+            self._idle.put(worker)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+WORKER_POOL = OperationWorkerPool()
+
 
 class OperationExecutor(Thread):
     """
@@ -76,8 +199,7 @@ class OperationExecutor(Thread):
         Get the required data from the operation queue and launch the operation.
         """
         operation_id = self.operation_id
-        run_params = [TvbProfile.current.PYTHON_INTERPRETER_PATH, '-m', 'tvb.core.operation_async_launcher',
-                      str(operation_id), TvbProfile.CURRENT_PROFILE_NAME]
+        worker = None
 
         current_operation = dao.get_operation_by_id(operation_id)
         storage_interface = StorageInterface()
@@ -90,25 +212,20 @@ class OperationExecutor(Thread):
         # We should no longer launch the operation.
         if self.stopped() is False:
 
-            env = os.environ.copy()
-            env['PYTHONPATH'] = os.pathsep.join(sys.path)
-            # anything that was already in $PYTHONPATH should have been reproduced in sys.path
-
-            launched_process = Popen(run_params, stdout=PIPE, stderr=PIPE, env=env)
-
-            LOGGER.debug("Storing pid=%s for operation id=%s launched on local machine." % (operation_id,
-                                                                                            launched_process.pid))
-            op_ident = OperationProcessIdentifier(operation_id, pid=launched_process.pid)
-            dao.store_entity(op_ident)
-
-            if self.stopped():
-                # In the exceptional case where the user pressed stop while the Thread startup is done.
-                # and stop_operation is concurrently asking about OperationProcessIdentity.
-                self.stop_pid(launched_process.pid)
-
-            subprocess_result = launched_process.communicate()
+            if TvbProfile.current.OPERATION_WORKERS:
+                worker = WORKER_POOL.acquire()
+                self._store_pid(worker.pid)
+                returned = worker.launch(operation_id)
+                subprocess_result = worker.read_errors() if returned != 0 else None
+            else:
+                run_params = [TvbProfile.current.PYTHON_INTERPRETER_PATH, '-m', 'tvb.core.operation_async_launcher',
+                              str(operation_id), TvbProfile.CURRENT_PROFILE_NAME]
+                launched_process = Popen(run_params, stdout=PIPE, stderr=PIPE, env=_operation_process_env())
+                self._store_pid(launched_process.pid)
+                subprocess_result = launched_process.communicate()
+                returned = launched_process.wait()
+                del launched_process
             LOGGER.info("Finished with launch of operation %s" % operation_id)
-            returned = launched_process.wait()
 
             LOGGER.info("Return code: {}. Stopped: {}".format(returned, self.stopped()))
             LOGGER.info("Thread: {}".format(self))
@@ -121,14 +238,30 @@ class OperationExecutor(Thread):
                 burst_service.persist_operation_state(operation, STATUS_ERROR,
                                                       "Operation failed unexpectedly! Please check the log files.")
 
-            del launched_process
-
         storage_interface.check_and_delete(project_folder)
 
-        # Give back empty spot now that you finished your operation
-        CURRENT_ACTIVE_THREADS.remove(self)
+        with PROCESS_LOCK:
+            # Give back empty spot now that you finished your operation
+            CURRENT_ACTIVE_THREADS.remove(self)
+            # Only now the worker may run another operation, as stop_operation_process no longer finds this thread.
+            # A worker of a stopped operation is not reused, even when the stop came after the operation finished
+            if worker is not None:
+                if self.stopped():
+                    worker.kill()
+                else:
+                    WORKER_POOL.release(worker)
         LOCKS_QUEUE.put(1)
 
+    def _store_pid(self, pid):
+        LOGGER.debug("Storing pid=%s for operation id=%s launched on local machine." % (pid, self.operation_id))
+        op_ident = OperationProcessIdentifier(self.operation_id, pid=pid)
+        dao.store_entity(op_ident)
+
+        if self.stopped():
+            # In the exceptional case where the user pressed stop while the Thread startup is done.
+            # and stop_operation is concurrently asking about OperationProcessIdentity.
+            self.stop_pid(pid)
+
     def _stop(self):
         """ Mark current thread for stop"""
         self._stop_ev.set()
@@ -249,29 +382,37 @@ class StandAloneClient(BackendClient):
                 LOGGER.error("Stop operation notify error", e)
                 return False
         else:
-            # Set the thread stop flag to true
-            operation_threads = []
-            for thread in CURRENT_ACTIVE_THREADS:
-                if int(thread.operation_id) == operation_id:
-                    operation_threads.append(thread)
-
-            if len(operation_threads) > 0:
-                for thread in operation_threads:
-                    thread._stop()
-                    LOGGER.info("Found running thread for operation: %d" % operation_id)
-                    LOGGER.info("Thread marked to stop: {}".format(thread.stopped()))
-                    LOGGER.info("Thread: {}".format(thread))
-                # Kill Thread
-                stopped = True
-                operation_process = dao.get_operation_process_for_operation(operation_id)
-                if operation_process is not None:
-                    # Now try to kill the operation if it exists
-                    stopped = OperationExecutor.stop_pid(operation_process.pid)
-                    if not stopped:
-                        LOGGER.debug("Operation %d was probably killed from it's specific thread." % operation_id)
-                    else:
-                        LOGGER.debug("Stopped OperationExecutor process for %d" % operation_id)
-                return stopped
-
-            LOGGER.info("Running thread was not found for operation {}".format(operation_id))
-            return False
+            with PROCESS_LOCK:
+                return StandAloneClient._stop_operation_thread(operation_id)
+
+    @staticmethod
+    def _stop_operation_thread(operation_id):
+        """
+        Mark the threads of the operation to stop and kill its process. Call it holding PROCESS_LOCK.
+        """
+        # Set the thread stop flag to true
+        operation_threads = []
+        for thread in CURRENT_ACTIVE_THREADS:
+            if int(thread.operation_id) == operation_id:
+                operation_threads.append(thread)
+
+        if len(operation_threads) > 0:
+            for thread in operation_threads:
+                thread._stop()
+                LOGGER.info("Found running thread for operation: %d" % operation_id)
+                LOGGER.info("Thread marked to stop: {}".format(thread.stopped()))
+                LOGGER.info("Thread: {}".format(thread))
+            # Kill Thread
+            stopped = True
+            operation_process = dao.get_operation_process_for_operation(operation_id)
+            if operation_process is not None:
+                # Now try to kill the operation if it exists
+                stopped = OperationExecutor.stop_pid(operation_process.pid)
+                if not stopped:
+                    LOGGER.debug("Operation %d was probably killed from it's specific thread." % operation_id)
+                else:
+                    LOGGER.debug("Stopped OperationExecutor process for %d" % operation_id)
+            return stopped
+
+        LOGGER.info("Running thread was not found for operation {}".format(operation_id))
+        return False
@@ -592,6 +592,8 @@ class ProjectService:
                     if burst is not None:
                         dao.remove_entity(BurstConfiguration, burst.id)
 
+            h5.RESULT_CACHE.invalidate(gid)
+
         except RemoveDataTypeException:
             self.logger.exception("Could not execute operation Node Remove!")
             raise
@@ -34,6 +34,7 @@
 
 import copy
 import json
+import os
 import uuid
 import numpy
 
@@ -42,8 +43,10 @@ from tvb.core.entities import load
 from tvb.core.entities.filters.chain import FilterChain
 from tvb.core.entities.model.model_burst import BurstConfiguration
 from tvb.core.entities.model.model_datatype import DataTypeGroup
+from tvb.core.entities.model.model_operation import Operation
 from tvb.core.entities.storage import dao
 from tvb.core.neocom import h5
+from tvb.core.neotraits.h5 import ViewModelH5
 from tvb.core.services.algorithm_service import AlgorithmService
 from tvb.core.services.burst_service import BurstService
 from tvb.core.services.exceptions import BurstServiceException
@@ -51,6 +54,9 @@ from tvb.core.services.operation_service import OperationService, GROUP_BURST_PE
 from tvb.simulator.integrators import IntegratorStochastic
 from tvb.storage.storage_interface import StorageInterface
 
+# Number of PSE operations prepared and launched together
+PSE_BATCH_SIZE = 100
+
 
 class SimulatorService(object):
     def __init__(self):
@@ -178,75 +184,144 @@ class SimulatorService(object):
             self.logger.error(excep)
             self.burst_service.mark_burst_finished(burst_config, error_message=str(excep))
 
+    def _is_burst_stopped(self, burst_config):
+        if burst_config is None:
+            self.logger.debug("Burst config was deleted")
+            return True
+        if burst_config.status in [BurstConfiguration.BURST_CANCELED, BurstConfiguration.BURST_ERROR]:
+            self.logger.debug("Current burst status is {}. Operations cannot continue.".format(burst_config.status))
+            return True
+        return False
+
     def _launch_operations(self, operations, burst_config):
+        """
+        Launch the PSE operations in batches, checking the burst status once before each batch.
+        """
         wf_errs = 0
-        for operation in operations:
-            try:
-                burst_config = dao.get_burst_by_id(burst_config.id)
-                if burst_config is None or burst_config.status in [BurstConfiguration.BURST_CANCELED,
-                                                                   BurstConfiguration.BURST_ERROR]:
-                    self.logger.debug("Preparing operations cannot continue. Burst config {}".format(
-                        burst_config))
-                    return
-                OperationService().launch_operation(operation.id, True)
-            except Exception as excep:
-                self.logger.error(excep)
-                wf_errs += 1
-                self.burst_service.mark_burst_finished(burst_config, error_message=str(excep))
+        for start in range(0, len(operations), PSE_BATCH_SIZE):
+            burst_config = dao.get_burst_by_id(burst_config.id)
+            if self._is_burst_stopped(burst_config):
+                return wf_errs
+            for operation in operations[start:start + PSE_BATCH_SIZE]:
+                try:
+                    OperationService().launch_operation(operation.id, True)
+                except Exception as excep:
+                    self.logger.error(excep)
+                    wf_errs += 1
+                    self.burst_service.mark_burst_finished(burst_config, error_message=str(excep))
         return wf_errs
 
+    @staticmethod
+    def _range_parameter_holders(simulator, range_parameter_name, copy_holders=False):
+        """
+        The objects along the path of a ranged parameter, from the simulator to the one holding the parameter.
+        With copy_holders, they are first replaced by shallow copies, which can then take the values of a PSE point.
+        """
+        holders = [simulator]
+        for param_name in range_parameter_name.split('.')[:-1]:
+            holder = getattr(holders[-1], param_name)
+            if copy_holders:
+                holder = copy.copy(holder)
+                setattr(holders[-1], param_name, holder)
+            holders.append(holder)
+        return holders
+
+    def _simulator_for_point(self, template_simulator, range_params, point):
+        """
+        Shallow copy the simulator for one PSE point, with a new GUID. Only the objects holding the ranged
+        parameters are copied, the rest of the view model graph is shared with the template.
+        """
+        simulator = copy.copy(template_simulator)
+        simulator.gid = uuid.uuid4()
+        ranges = {}
+        for range_param, param_value in zip(range_params, point):
+            self._range_parameter_holders(simulator, range_param.name, copy_holders=True)
+            self._set_simulator_range_parameter(simulator, range_param.name, param_value)
+            ranges[range_param.name] = self._set_range_param_in_dict(param_value)
+        simulator.range_values = json.dumps(ranges)
+        return simulator
+
+    def _store_point_view_models(self, simulator, range_params, storage_path, template_files):
+        """
+        Store the view models of a PSE point as copies of the files of the first point (the simulator file
+        being the first of template_files), in which only the GUID and range values of the simulator,
+        and the ranged parameters, are overwritten.
+        """
+        simulator_path = h5.path_by_dir(storage_path, ViewModelH5, simulator.gid, type(simulator).__name__)
+        self.storage_interface.copy_file(template_files[0], simulator_path)
+        for template_file in template_files[1:]:
+            self.storage_interface.copy_file(template_file, storage_path, os.path.basename(template_file))
+
+        changed_fields = {simulator.gid: (simulator, ['gid', 'range_values'])}
+        for range_param in range_params:
+            holder = self._range_parameter_holders(simulator, range_param.name)[-1]
+            changed_fields.setdefault(holder.gid, (holder, []))[1].append(range_param.name.split('.')[-1])
+        for holder, field_names in changed_fields.values():
+            h5.store_view_model_fields(holder, storage_path, field_names)
+
     def _prepare_operations(self, algo_category, burst_config, metric_operation_group,
                             operation_group, project, range_param1, range_param2,
                             range_param2_values, session_stored_simulator, simulator_algo, user):
-        first_simulator = None
-        pse_canceled = False
+        """
+        Prepare one operation for each point of the PSE, in batches of operations stored together,
+        checking the burst status once before each batch.
+
+        The view models are stored completely only for the first point. The files of the other points are
+        copies of these, in which only the values that differ between points are written.
+        """
+        range_params = [range_param1]
+        points = [(param1_value,) for param1_value in range_param1.get_range_values()]
+        if range_param2:
+            range_params.append(range_param2)
+            points = [point + (param2_value,) for point in points for param2_value in range_param2_values]
+
+        template_simulator = copy.copy(session_stored_simulator)
+        ga = self.operation_service.prepare_metadata(algo_category, current_ga=template_simulator.generic_attributes,
+                                                     burst=burst_config.gid)
+        ga.visible = True
+        template_simulator.generic_attributes = ga
+
         operations = []
-        for param1_value in range_param1.get_range_values():
-            for param2_value in range_param2_values:
-                burst_config = dao.get_burst_by_id(burst_config.id)
-                if burst_config is None:
-                    self.logger.debug("Burst config was deleted")
-                    pse_canceled = True
-                    break
-
-                if burst_config.status in [BurstConfiguration.BURST_CANCELED, BurstConfiguration.BURST_ERROR]:
-                    self.logger.debug("Current burst status is {}. Preparing operations cannot continue.".format(
-                        burst_config.status))
-                    pse_canceled = True
-                    break
-                # Copy, but generate a new GUID for every Simulator in PSE
-                simulator = copy.deepcopy(session_stored_simulator)
-                simulator.gid = uuid.uuid4()
-                self._set_simulator_range_parameter(simulator, range_param1.name, param1_value)
-
-                ranges = {range_param1.name: self._set_range_param_in_dict(param1_value)}
-
-                if param2_value is not None:
-                    self._set_simulator_range_parameter(simulator, range_param2.name, param2_value)
-                    ranges[range_param2.name] = self._set_range_param_in_dict(param2_value)
-
-                ranges = json.dumps(ranges)
-
-                simulator.range_values = ranges
-                operation = self.operation_service.prepare_operation(user.id, project, simulator_algo,
-                                                                     view_model=simulator, ranges=ranges,
-                                                                     burst_gid=burst_config.gid,
-                                                                     op_group_id=burst_config.fk_operation_group)
-                operations.append(operation)
-                if first_simulator is None:
-                    first_simulator = simulator
-                    burst_config = self.burst_service.update_simulation_fields(burst_config, operation.id,
-                                                                               first_simulator.gid)
-                    self.burst_service.store_burst_configuration(burst_config)
-                    datatype_group = DataTypeGroup(operation_group, operation_id=operation.id,
-                                                   fk_parent_burst=burst_config.gid,
-                                                   state=algo_category.defaultdatastate)
-                    dao.store_entity(datatype_group)
-
-                    metrics_datatype_group = DataTypeGroup(metric_operation_group, fk_parent_burst=burst_config.gid,
-                                                           state=algo_category.defaultdatastate)
-                    dao.store_entity(metrics_datatype_group)
-        return operations, pse_canceled
+        template_files = None
+        for start in range(0, len(points), PSE_BATCH_SIZE):
+            burst_config = dao.get_burst_by_id(burst_config.id)
+            if self._is_burst_stopped(burst_config):
+                return operations, True
+
+            simulators = [self._simulator_for_point(template_simulator, range_params, point)
+                          for point in points[start:start + PSE_BATCH_SIZE]]
+            batch = [Operation(simulator.gid.hex, user.id, project.id, simulator_algo.id, user_group=ga.operation_tag,
+                               op_group_id=burst_config.fk_operation_group, range_values=simulator.range_values)
+                     for simulator in simulators]
+            batch = dao.store_entities(batch)
+
+            for operation, simulator in zip(batch, simulators):
+                storage_path = self.storage_interface.get_project_folder(project.name, str(operation.id))
+                if template_files is None:
+                    simulator_file = h5.store_view_model(simulator, storage_path)
+                    template_files = [simulator_file] + [os.path.join(storage_path, file_name)
+                                                         for file_name in os.listdir(storage_path)
+                                                         if file_name != os.path.basename(simulator_file)]
+                else:
+                    self._store_point_view_models(simulator, range_params, storage_path, template_files)
+                operation.view_model_disk_size = StorageInterface.compute_recursive_h5_disk_usage(storage_path)
+            batch = dao.store_entities(batch)
+
+            if not operations:
+                first_operation = batch[0]
+                burst_config = self.burst_service.update_simulation_fields(burst_config, first_operation.id,
+                                                                           simulators[0].gid)
+                self.burst_service.store_burst_configuration(burst_config)
+                datatype_group = DataTypeGroup(operation_group, operation_id=first_operation.id,
+                                               fk_parent_burst=burst_config.gid,
+                                               state=algo_category.defaultdatastate)
+                dao.store_entity(datatype_group)
+
+                metrics_datatype_group = DataTypeGroup(metric_operation_group, fk_parent_burst=burst_config.gid,
+                                                       state=algo_category.defaultdatastate)
+                dao.store_entity(metrics_datatype_group)
+            operations.extend(batch)
+        return operations, False
 
     @staticmethod
     def compute_conn_branch_conditions(is_branch, simulator):
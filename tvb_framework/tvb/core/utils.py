@@ -185,6 +185,8 @@ class TVBJSONEncoder(json.JSONEncoder):
             return obj.to_json()
         if isinstance(obj, bytes):
             return obj.decode('utf-8')
+        if isinstance(obj, numpy.ndarray):
+            return obj.tolist()
         try:
             # TVB-2565 numpy int serialization
             if numpy.issubdtype(obj, numpy.integer):
@@ -194,6 +196,25 @@ class TVBJSONEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, obj)
 
 
+def float32_arrays2bytes(arrays):
+    """
+    Serialize one ndarray, or a list of ndarrays, for the binary transport of viewer data.
+
+    The result starts with the length of a JSON header, as a little-endian uint32. The header holds the
+    shapes of the arrays and whether a list was given, and is padded with spaces such that the arrays,
+    which follow it as little-endian float32, start at an offset multiple of 4 (as JS typed arrays need).
+    """
+    nested = isinstance(arrays, (list, tuple))
+    if not nested:
+        arrays = [arrays]
+    arrays = [numpy.asarray(array, dtype='<f4') for array in arrays]
+
+    header = json.dumps({'shapes': [array.shape for array in arrays], 'nested': nested}).encode('ascii')
+    header += b' ' * (-len(header) % 4)
+    return b''.join([numpy.uint32(len(header)).astype('<u4').tobytes(), header] +
+                    [array.tobytes() for array in arrays])
+
+
 ################## CONVERT related methods end here ###############
 
 
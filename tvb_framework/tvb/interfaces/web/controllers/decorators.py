@@ -48,7 +48,7 @@ from tvb.basic.logger.builder import get_logger
 from tvb.basic.profile import TvbProfile
 from tvb.core.services.authorization import AuthorizationManager
 from tvb.storage.kube.kube_notifier import KubeNotifier
-from tvb.core.utils import TVBJSONEncoder
+from tvb.core.utils import TVBJSONEncoder, float32_arrays2bytes
 from tvb.interfaces.web.controllers import common
 
 env = Environment(loader=FileSystemLoader(TvbProfile.current.web.TEMPLATE_ROOT),
@@ -133,6 +133,30 @@ def ndarray_to_http_binary(func):
     return deco
 
 
+def ndarrays_to_http_float32(func):
+    """
+    Decorator to wrap calls that return a numpy array, or a list of them, as a binary float32 http response.
+    """
+
+    @wraps(func)
+    def deco(*a, **b):
+        result = func(*a, **b)
+        if isinstance(result, (list, tuple)):
+            is_valid = all(isinstance(x, numpy.ndarray) for x in result)
+        else:
+            is_valid = isinstance(result, numpy.ndarray)
+        if not is_valid:
+            raise ValueError('Result must be an ndarray or a list of ndarrays for float32 transport, '
+                             'not %s' % type(result))
+
+        body = float32_arrays2bytes(result)
+        cherrypy.response.headers["Content-Type"] = "application/x.float32-arrays"
+        cherrypy.response.headers["Content-Length"] = len(body)
+        return body
+
+    return deco
+
+
 def handle_error(redirect):
     """
     If `redirect` is true(default) all errors will generate redirects.
@@ -360,6 +384,14 @@ def expose_numpy_array(func):
     return func
 
 
+def expose_float32_arrays(func):
+    func = check_user(func)
+    func = ndarrays_to_http_float32(func)
+    func = handle_error(redirect=False)(func)
+    func = cherrypy.expose(func)
+    return func
+
+
 def profile_func(func):
     def wrapper(*args, **kwargs):
         log = get_logger(_LOGGER_NAME)
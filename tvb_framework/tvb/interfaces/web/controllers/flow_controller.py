@@ -68,6 +68,7 @@ from tvb.interfaces.web.controllers.common import InvalidFormValues
 from tvb.interfaces.web.controllers.decorators import expose_fragment, handle_error, check_user, expose_json, \
     using_template
 from tvb.interfaces.web.controllers.decorators import expose_page, settings, context_selected, expose_numpy_array
+from tvb.interfaces.web.controllers.decorators import expose_float32_arrays, check_admin
 from tvb.interfaces.web.controllers.simulator.simulator_controller import SimulatorController
 from tvb.interfaces.web.entities.context_selected_adapter import SelectedAdapterContext
 from tvb.adapters.creators.local_connectivity_creator import LocalConnectivityCreatorModel, KEY_LCONN
@@ -384,7 +385,21 @@ class FlowController(BaseController):
     def _read_datatype_attribute(self, entity_gid, dataset_name, datatype_kwargs='null', **kwargs):
 
         self.logger.debug("Starting to read HDF5: " + entity_gid + "/" + dataset_name + "/" + str(kwargs))
-        entity_dt = h5.load_from_gid(entity_gid)
+        entity_index = load_entity_by_gid(entity_gid)
+        cache_key = (entity_gid, 'datatype', dataset_name, datatype_kwargs, json.dumps(kwargs, sort_keys=True))
+        return h5.RESULT_CACHE.get_or_load(
+            cache_key, h5.path_for_stored_index(entity_index),
+            lambda: self._load_datatype_attribute(entity_index, dataset_name, datatype_kwargs, kwargs))
+
+    @staticmethod
+    def _load_datatype_attribute(entity_index, dataset_name, datatype_kwargs, kwargs):
+        with h5.h5_file_for_index(entity_index) as entity_h5:
+            try:
+                # when the attribute is stored as a dataset, avoid loading the whole datatype for it
+                return entity_h5.load_field(dataset_name)
+            except KeyError:
+                pass
+        entity_dt = h5.load_from_index(entity_index)
 
         datatype_kwargs = json.loads(datatype_kwargs)
         if datatype_kwargs:
@@ -401,6 +416,16 @@ class FlowController(BaseController):
 
     @expose_json
     def invoke_adapter(self, algo_id, method_name, entity_gid, **kwargs):
+        return self._invoke_adapter(algo_id, method_name, entity_gid, **kwargs)
+
+    @expose_float32_arrays
+    def invoke_adapter_float32(self, algo_id, method_name, entity_gid, **kwargs):
+        """
+        Same as `invoke_adapter`, for adapter methods returning ndarrays, which are sent as binary float32.
+        """
+        return self._invoke_adapter(algo_id, method_name, entity_gid, **kwargs)
+
+    def _invoke_adapter(self, algo_id, method_name, entity_gid, **kwargs):
         algorithm = self.algorithm_service.get_algorithm_by_identifier(algo_id)
         adapter_instance = ABCAdapter.build_adapter(algorithm)
         entity = load_entity_by_gid(entity_gid)
@@ -414,13 +439,20 @@ class FlowController(BaseController):
 
     def _read_from_h5(self, entity_gid, method_name, datatype_kwargs='null', **kwargs):
         self.logger.debug("Starting to read HDF5: " + entity_gid + "/" + method_name + "/" + str(kwargs))
+        entity_index = load_entity_by_gid(entity_gid)
+        cache_key = (entity_gid, 'h5', method_name, datatype_kwargs, json.dumps(kwargs, sort_keys=True))
+        return h5.RESULT_CACHE.get_or_load(
+            cache_key, h5.path_for_stored_index(entity_index),
+            lambda: self._call_h5_method(entity_index, method_name, datatype_kwargs, kwargs))
 
+    @staticmethod
+    def _call_h5_method(entity_index, method_name, datatype_kwargs, kwargs):
         datatype_kwargs = json.loads(datatype_kwargs)
         if datatype_kwargs:
             for key, value in six.iteritems(datatype_kwargs):
                 kwargs[key] = load_entity_by_gid(value)
 
-        with h5.h5_file_for_gid(entity_gid) as entity_h5:
+        with h5.h5_file_for_index(entity_index) as entity_h5:
             result = getattr(entity_h5, method_name)
             if kwargs:
                 result = result(**kwargs)
@@ -452,6 +484,25 @@ class FlowController(BaseController):
         result = self._read_datatype_attribute(entity_gid, dataset_name, datatype_kwargs, **kwargs)
         return self._prepare_result(result, flatten)
 
+    @expose_float32_arrays
+    def read_float32_from_h5_file(self, entity_gid, method_name, datatype_kwargs='null', **kwargs):
+        """
+        Retrieve the result of a H5 file method, as binary float32 arrays (e.g. pages of time series data).
+        """
+        return self._read_from_h5(entity_gid, method_name, datatype_kwargs, **kwargs)
+
+    @expose_float32_arrays
+    def read_float32_datatype_attribute(self, entity_gid, dataset_name, flatten=False, datatype_kwargs='null',
+                                        **kwargs):
+        """
+        Retrieve from a given DataType a property or a method result, as binary float32 arrays.
+        Parameters are the same as for `read_datatype_attribute`.
+        """
+        result = self._read_datatype_attribute(entity_gid, dataset_name, datatype_kwargs, **kwargs)
+        if isinstance(result, numpy.ndarray) and (flatten is True or flatten == "True"):
+            result = result.flatten()
+        return result
+
     def _prepare_result(self, result, flatten):
         if isinstance(result, numpy.ndarray):
             # for ndarrays honor the flatten kwarg and convert to lists as ndarrs are not json-able
@@ -465,6 +516,14 @@ class FlowController(BaseController):
     def read_binary_datatype_attribute(self, entity_gid, method_name, datatype_kwargs='null', **kwargs):
         return self._read_from_h5(entity_gid, method_name, datatype_kwargs, **kwargs)
 
+    @expose_json
+    @check_admin
+    def read_cache_statistics(self):
+        """
+        :returns: hits, misses and size of the cache of values read by the viewers, for tuning its size
+        """
+        return h5.RESULT_CACHE.get_statistics()
+
     @expose_fragment("flow/genericAdapterFormFields")
     def get_simple_adapter_interface(self, algorithm_id, parent_div='', is_uploader=False):
         """
@@ -1115,6 +1115,91 @@ function HLPR_fetchNdArray(binary_url, onload, kwargs) {
     oReq.send(null);
 }
 
+/**
+ * From an NdArr to a list of typed array views, one for each index along the first axis.
+ * 1D arrays are returned as they are.
+ */
+NdArr.prototype.rows = function () {
+    if (this.shape.length < 2) {
+        return this.buffer;
+    }
+    const rowSize = this.buffer.length / this.shape[0];
+    const rows = [];
+    for (let i = 0; i < this.shape[0]; ++i) {
+        rows.push(this.buffer.subarray(i * rowSize, (i + 1) * rowSize));
+    }
+    return rows;
+};
+
+/**
+ * Parse a response of the float32 endpoints (see float32_arrays2bytes on the server):
+ * an uint32 header length, a JSON header with the array shapes and the arrays as float32, all little-endian.
+ * Each array is returned as a list of Float32Array rows, viewing the received buffer without copies
+ * (typed arrays use the host byte order, which is little-endian on all the platforms we support).
+ * When the server has sent a list of arrays, a list of such results is returned.
+ */
+function HLPR_parseFloat32Arrays(arrayBuffer) {
+    const headerLength = new DataView(arrayBuffer).getUint32(0, true);
+    const header = JSON.parse(String.fromCharCode.apply(null, new Uint8Array(arrayBuffer, 4, headerLength)));
+    let offset = 4 + headerLength;
+    const arrays = [];
+
+    for (let i = 0; i < header.shapes.length; ++i) {
+        const shape = header.shapes[i];
+        let size = 1;
+        for (let j = 0; j < shape.length; ++j) {
+            size *= shape[j];
+        }
+        arrays.push(new NdArr(new Float32Array(arrayBuffer, offset, size), shape).rows());
+        offset += 4 * size;
+    }
+    return header.nested ? arrays : arrays[0];
+}
+
+/**
+ * Retrieves synchronously from server float32 arrays, as parsed by HLPR_parseFloat32Arrays.
+ * Synchronous requests can not have an arraybuffer response, thus the bytes are received as
+ * a user-defined charset and copied to a buffer.
+ * @return {null} when nothing comes from the server
+ */
+function HLPR_readFloat32Arrays(binary_url) {
+    const oReq = new XMLHttpRequest();
+    oReq.open("GET", deploy_context + binary_url, false);
+    oReq.overrideMimeType("text/plain; charset=x-user-defined");
+    oReq.send(null);
+
+    if (oReq.status !== 200) {
+        displayMessage("Could not retrieve data from the server!", "warningMessage");
+        return null;
+    }
+    const text = oReq.responseText;
+    const bytes = new Uint8Array(text.length);
+    for (let i = 0; i < text.length; ++i) {
+        bytes[i] = text.charCodeAt(i) & 0xff;
+    }
+    return HLPR_parseFloat32Arrays(bytes.buffer);
+}
+
+/**
+ * Retrieves asynchronously from server float32 arrays and calls onload with them,
+ * as parsed by HLPR_parseFloat32Arrays.
+ */
+function HLPR_fetchFloat32Arrays(binary_url, onload) {
+    const oReq = new XMLHttpRequest();
+    oReq.open("GET", deploy_context + binary_url, true);
+    oReq.responseType = "arraybuffer";
+
+    oReq.onload = function () {
+        if (oReq.status !== 200) {
+            displayMessage("Could not retrieve data from the server!", "warningMessage");
+            return;
+        }
+        onload(HLPR_parseFloat32Arrays(oReq.response));
+    };
+
+    oReq.send(null);
+}
+
 // -------------End Binary transport parsing ----------------------------------
 
 function checkArg(arg, def) {
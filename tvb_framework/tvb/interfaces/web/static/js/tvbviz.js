@@ -84,12 +84,12 @@ tv.util = {
         $.getJSON(baseURL + "/read_data_shape/False?kwd=0", callback);
     },
 
-    get_array_slice: function (baseURL, slices, callback, channels, currentMode, currentStateVar) {
-        var readDataURL = readDataChannelURL(baseURL, slices[0].lo, slices[0].hi,
-            currentStateVar, currentMode, slices[0].di, JSON.stringify(channels));
+    get_array_slice: function (baseURL, slices, callback, channels, currentMode, currentStateVar, pixelWidth) {
+        var readDataURL = readFloat32LodChannelURL(baseURL, slices[0].lo, slices[0].hi,
+            currentStateVar, currentMode, pixelWidth, JSON.stringify(channels));
         //NOTE: If we need to add slices for the other dimensions pass them as the 'specific_slices' parameter.
-        //      Method called is from time_series.py.
-        $.getJSON(readDataURL, callback);
+        //      Method called is from time_series_h5.py.
+        HLPR_fetchFloat32Arrays(readDataURL, callback);
     }
 };
 
@@ -565,7 +565,8 @@ tv.plot = {
         f.render = function () {
             f.status_line.text("waiting for data from server...");
             //console.log(f.baseURL(), f.current_slice())
-            tv.util.get_array_slice(f.baseURL(), f.current_slice(), f.render_callback, f.channels(), f.mode(), f.state_var());
+            tv.util.get_array_slice(f.baseURL(), f.current_slice(), f.render_callback, f.channels(), f.mode(),
+                f.state_var(), f.point_limit());
         };
 
         f.render_callback = function (data) {
@@ -576,21 +577,39 @@ tv.plot = {
 
             /* reformat data into normal ndar style */
             var flat = []
+                , ts = []
                 , sl = f.current_slice()[0]
-                , shape = [(sl.hi - sl.lo) / sl.di, f.shape()[2]]
-                , strides = [f.shape()[2], 1];
+                , t0 = f.t0()
+                , dt = f.dt()
+                , offset = data[0][0]
+                , step = data[0][1]
+                , nr_points = data[3].length
+                , nr_channels = nr_points > 0 ? data[3][0].length : 0
+                , hi = Math.min(sl.hi, f.shape()[0])
+                , push_point = function (values, time) {
+                    for (var j = 0; j < nr_channels; j++) {
+                        flat.push(values[j]);
+                    }
+                    ts.push(t0 + dt * time);
+                };
 
-            for (var i = 0; i < shape[0]; i++) {
-                for (var j = 0; j < shape[1]; j++) {
-                    flat.push(data[i][j]);
+            // data holds the [offset, step] layout, minimums, maximums and means of at most point_limit points,
+            // each covering step samples when zoomed out (see read_data_page_lod in time_series_h5.py).
+            // Sample indices are computed here, from sl.lo, as float32 values can not hold large ones.
+            for (var i = 0; i < nr_points; i++) {
+                var start = Math.max(sl.lo + offset + i * step, sl.lo);
+                if (step === 1) {
+                    push_point(data[3][i], start);
+                } else {
+                    // draw the range of the samples covered by the point, to keep the peaks visible
+                    var end = Math.min(sl.lo + offset + (i + 1) * step, hi);
+                    push_point(data[1][i], start);
+                    push_point(data[2][i], (start + end) / 2);
                 }
             }
 
-            var ts = [], t0 = f.t0(), dt = f.dt();
-
-            for (var ii = 0; ii < shape[0]; ii++) {
-                ts.push(t0 + dt * sl.lo + ii * dt * sl.di);
-            }
+            var shape = [ts.length, nr_channels]
+                , strides = [nr_channels, 1];
 
             f.ts(tv.ndar.ndfrom({data: ts, shape: [shape[0]], strides: [1]}));
             f.ys(tv.ndar.ndfrom({data: flat, shape: shape, strides: strides}));
@@ -831,7 +850,8 @@ tv.plot = {
             }
 
             f.da_lines = da_lines;
-            f.da_x_dt = f.dt() * f.current_slice()[0].di;
+            var sl = f.current_slice()[0];
+            f.da_x_dt = f.dt() * (sl.hi - sl.lo) / Math.max(ys.shape[0], 1);
             f.da_x = da_x;
             f.da_xs = [0, da_xs[da_xs.length - 1]].concat(da_xs, [0]); // filled area needs start == end
             f.da_y = da_y;
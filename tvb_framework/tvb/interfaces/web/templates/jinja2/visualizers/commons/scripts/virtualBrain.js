@@ -24,6 +24,7 @@
  */
 
 /* globals gl, SHADING_Context, GL_shaderProgram, displayMessage, HLPR_readJSONfromFile, readDataPageURL,
+ HLPR_readFloat32Arrays, HLPR_fetchFloat32Arrays,
  GL_handleKeyDown, GL_handleKeyUp, GL_handleMouseMove, GL_handleMouseWeel,
  initGL, updateGLCanvasSize, LEG_updateLegendVerticesBuffers,
  basicInitShaders, basicInitSurfaceLighting, GL_initColorPickFrameBuffer,
@@ -440,7 +441,7 @@ function _bindEvents(canvas) {
 
 function _initMeasurePoints(noOfMeasurePoints, urlMeasurePoints, urlMeasurePointsLabels) {
     if (noOfMeasurePoints > 0) {
-        measurePoints = HLPR_readJSONfromFile(urlMeasurePoints);
+        measurePoints = HLPR_readFloat32Arrays(urlMeasurePoints);
         measurePointsLabels = HLPR_readJSONfromFile(urlMeasurePointsLabels);
         NO_OF_MEASURE_POINTS = measurePoints.length;
     } else {
@@ -1134,7 +1135,7 @@ function initActivityData() {
     currentTimeValue = 0;
     //read the first file
     const initUrl = getUrlForPageFromIndex(0);
-    activitiesData = HLPR_readJSONfromFile(initUrl);
+    activitiesData = HLPR_readFloat32Arrays(initUrl);
     if (activitiesData !== null && activitiesData !== undefined) {
         currentActivitiesFileLength = activitiesData.length * TIME_STEP;
         totalPassedActivitiesData = 0;
@@ -1250,14 +1251,13 @@ function readFileData(fileUrl, async, callIdentifier) {
     // async calls are started before the first one finishes.
     const self = this;
     self.callIdentifier = callIdentifier;
-    doAjaxCall({
-        url: fileUrl,
-        async: async,
-        success: function (data) {
-            if ((self.callIdentifier === currentAsyncCall) || !async) {
-                nextActivitiesFileData = eval(data);
-                data = null;
-            }
+    if (!async) {
+        nextActivitiesFileData = HLPR_readFloat32Arrays(fileUrl);
+        return;
+    }
+    HLPR_fetchFloat32Arrays(fileUrl, function (data) {
+        if (self.callIdentifier === currentAsyncCall) {
+            nextActivitiesFileData = data;
         }
     });
 }
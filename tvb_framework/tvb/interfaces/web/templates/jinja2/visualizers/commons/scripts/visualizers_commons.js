@@ -48,6 +48,28 @@ function readDataChannelURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable
     return baseURL.replace('read_data_page', 'read_channels_page') + ';channels_list=' + channels;
 }
 
+/**
+ * The same pages, but read as float32 arrays (see HLPR_readFloat32Arrays) instead of JSON.
+ */
+function readFloat32DataPageURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable, mode, step) {
+    const baseURL = readDataPageURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable, mode, step);
+    return baseURL.replace('/read_from_h5_file/', '/read_float32_from_h5_file/');
+}
+
+function readFloat32DataChannelURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable, mode, step, channels) {
+    const baseURL = readDataChannelURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable, mode, step, channels);
+    return baseURL.replace('/read_from_h5_file/', '/read_float32_from_h5_file/');
+}
+
+/**
+ * A page of channels reduced to at most pixelWidth points, each with the minimum, maximum and mean
+ * of the samples it covers (see read_channels_page_lod in time_series_h5.py), as float32 arrays.
+ */
+function readFloat32LodChannelURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable, mode, pixelWidth, channels) {
+    const baseURL = readFloat32DataChannelURL(baseDatatypeMethodURL, fromIdx, toIdx, stateVariable, mode, 1, channels);
+    return baseURL.replace('/read_channels_page?', '/read_channels_page_lod?').replace(';step=1;', ';pixel_width=' + pixelWidth + ';');
+}
+
 // ------ Datatype methods mappings end here
 
 
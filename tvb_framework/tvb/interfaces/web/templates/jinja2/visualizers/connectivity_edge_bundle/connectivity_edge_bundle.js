@@ -39,16 +39,11 @@ var ConnectivityEdgesData = {
 
 function _CE_Ajaxify() {
 
-    doAjaxCall({
-        url: ConnectivityEdgesData.data_url,
-        type: 'POST',
-        async: true,
-        success: function (data) {
-            ConnectivityEdgesData.matrix = $.parseJSON(data);
-            HEB_InitData(ConnectivityEdgesData, function (d) {
-                return d !== 0;
-            });
-        }
+    HLPR_fetchFloat32Arrays(ConnectivityEdgesData.data_url, function (data) {
+        ConnectivityEdgesData.matrix = data;
+        HEB_InitData(ConnectivityEdgesData, function (d) {
+            return d !== 0;
+        });
     });
 }
 
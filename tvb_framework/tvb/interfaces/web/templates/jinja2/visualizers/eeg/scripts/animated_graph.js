@@ -17,7 +17,7 @@
  *
  **/
 
-/* globals doAjaxCall, readDataPageURL, HLPR_readJSONfromFile */
+/* globals doAjaxCall, readFloat32DataPageURL, HLPR_readJSONfromFile, HLPR_readFloat32Arrays, HLPR_fetchFloat32Arrays */
 
 // //it contains all the points that have to be/have been displayed (it contains all the points from the read file);
 // //it is an array of arrays (each array contains the points for a certain line chart)
@@ -471,8 +471,8 @@ function submitSelectedChannels(isEndOfData) {
 
         let results = [];
         for (let i = 0; i < nrOfPagesSet.length; i++) {
-            const dataURL = readDataPageURL(baseDataURLS[i], 0, dataPageSize, tsStates[i], tsModes[i]);
-            const data = HLPR_readJSONfromFile(dataURL);
+            const dataURL = readFloat32DataPageURL(baseDataURLS[i], 0, dataPageSize, tsStates[i], tsModes[i]);
+            const data = HLPR_readFloat32Arrays(dataURL);
             results.push(parseData(data, i));
         }
         const r = _AG_getSelectedDataAndLongestChannelIndex(results);
@@ -771,8 +771,8 @@ function getTimeoutBasedOnSpeed() {
 function loadEEGChartFromTimeStep(step) {
     // Read all data for the page in which the selected step falls into
     const chunkForStep = Math.floor(step / dataPageSize);
-    const dataUrl = readDataPageURL(baseDataURLS[0], chunkForStep * dataPageSize, (chunkForStep + 1) * dataPageSize, tsStates[0], tsModes[0]);
-    const dataPage = [parseData(HLPR_readJSONfromFile(dataUrl), 0)];
+    const dataUrl = readFloat32DataPageURL(baseDataURLS[0], chunkForStep * dataPageSize, (chunkForStep + 1) * dataPageSize, tsStates[0], tsModes[0]);
+    const dataPage = [parseData(HLPR_readFloat32Arrays(dataUrl), 0)];
     AG_allPoints = getDisplayedChannels(dataPage[0], 0).slice(0);
     AG_time = HLPR_readJSONfromFile(timeSetUrls[0][chunkForStep]).slice(0);
 
@@ -833,8 +833,8 @@ function loadEEGChartFromTimeStep(step) {
  */
 function addFromPreviousPage(indexInPage, currentPage) {
 
-    const previousPageUrl = readDataPageURL(baseDataURLS[0], (currentPage - 1) * dataPageSize, currentPage * dataPageSize, tsStates[0], tsModes[0]);
-    let previousData = parseData(HLPR_readJSONfromFile(previousPageUrl), 0);
+    const previousPageUrl = readFloat32DataPageURL(baseDataURLS[0], (currentPage - 1) * dataPageSize, currentPage * dataPageSize, tsStates[0], tsModes[0]);
+    let previousData = parseData(HLPR_readFloat32Arrays(previousPageUrl), 0);
     previousData = getDisplayedChannels(previousData, 0).slice(0);
     const previousTimeData = HLPR_readJSONfromFile(timeSetUrls[0][currentPage - 1]);
     // Compute which slices we would need from the 'full' two-pages data.
@@ -866,8 +866,8 @@ function addFromPreviousPage(indexInPage, currentPage) {
  */
 function addFromNextPage(indexInPage, currentPage) {
 
-    const followingPageUrl = readDataPageURL(baseDataURLS[0], (currentPage + 1) * dataPageSize, (currentPage + 2) * dataPageSize, tsStates[0], tsModes[0]);
-    let followingData = parseData(HLPR_readJSONfromFile(followingPageUrl), 0);
+    const followingPageUrl = readFloat32DataPageURL(baseDataURLS[0], (currentPage + 1) * dataPageSize, (currentPage + 2) * dataPageSize, tsStates[0], tsModes[0]);
+    let followingData = parseData(HLPR_readFloat32Arrays(followingPageUrl), 0);
     followingData = getDisplayedChannels(followingData, 0).slice(0);
     const followingTimeData = HLPR_readJSONfromFile(timeSetUrls[0][currentPage + 1]);
     let fromIdx, toIdx;
@@ -1043,23 +1043,20 @@ function AG_readFileDataAsynchronous(nrOfPages, noOfChannelsPerSet, currentFileI
 
         AG_readFileDataAsynchronous(nrOfPages, noOfChannelsPerSet, currentFileIndex, maxChannelLength, dataSetIndex + 1);
     } else {
-        doAjaxCall({
-            url: readDataPageURL(baseDataURLS[dataSetIndex], currentFileIndex * dataPageSize, (currentFileIndex + 1) * dataPageSize, tsStates[dataSetIndex], tsModes[dataSetIndex]),
-            success: function (data) {
-                if (AG_isLoadStarted) {
-                    data = $.parseJSON(data);
-                    const result = parseData(data, dataSetIndex);
-                    nextData.push(result);
-
-                    AG_readFileDataAsynchronous(nrOfPages, noOfChannelsPerSet, currentFileIndex, maxChannelLength, dataSetIndex + 1);
-                }
+        const dataURL = readFloat32DataPageURL(baseDataURLS[dataSetIndex], currentFileIndex * dataPageSize, (currentFileIndex + 1) * dataPageSize, tsStates[dataSetIndex], tsModes[dataSetIndex]);
+        HLPR_fetchFloat32Arrays(dataURL, function (data) {
+            if (AG_isLoadStarted) {
+                const result = parseData(data, dataSetIndex);
+                nextData.push(result);
+
+                AG_readFileDataAsynchronous(nrOfPages, noOfChannelsPerSet, currentFileIndex, maxChannelLength, dataSetIndex + 1);
             }
         });
     }
 }
 
 /*
- * Data is received from the HLPR_parseJSON as a 500/74 array. We need to transform it
+ * Data is received from HLPR_readFloat32Arrays as a 500/74 array. We need to transform it
  * into an 74/500 one and in the transformation also replace all NaN values.
  */
 function parseData(dataArray, dataSetIndex) {
@@ -1071,7 +1068,7 @@ function parseData(dataArray, dataSetIndex) {
     for (let j = 0; j < dataArray.length; j++) {
         for (let k = 0; k < noOfChannelsPerSet[dataSetIndex]; k++) {
             let arrElem = dataArray[j][k];
-            if (arrElem === 'NaN') {
+            if (arrElem === 'NaN' || Number.isNaN(arrElem)) {
                 nanValueFound = true;
                 arrElem = 0;
             }
@@ -29,6 +29,8 @@
 #
 
 import os
+import numpy
+import pytest
 from tvb.adapters.analyzers.cross_correlation_adapter import CrossCorrelateAdapter, PearsonCorrelationCoefficientAdapter
 from tvb.adapters.analyzers.fcd_adapter import FunctionalConnectivityDynamicsAdapter
 from tvb.adapters.analyzers.fmri_balloon_adapter import BalloonModelAdapter
@@ -46,6 +48,8 @@ from tvb.adapters.datatypes.h5.spectral_h5 import WaveletCoefficientsH5, Coheren
     ComplexCoherenceSpectrumH5
 from tvb.adapters.datatypes.h5.temporal_correlations_h5 import CrossCorrelationH5
 from tvb.adapters.datatypes.h5.time_series_h5 import TimeSeriesRegionH5
+from tvb.analyzers.pca import PCAMethods
+from tvb.core.adapters.exceptions import LaunchException
 from tvb.core.entities.file.simulator.datatype_measure_h5 import DatatypeMeasureH5
 from tvb.tests.framework.core.base_testcase import TransactionalTestCase
 
@@ -69,6 +73,19 @@ class TestAdapters(TransactionalTestCase):
 
         result_h5 = wavelet_adapter.path_for(WaveletCoefficientsH5, wavelet_idx.gid)
         assert os.path.exists(result_h5)
+        with WaveletCoefficientsH5(result_h5) as wavelet_h5:
+            # (frequencies, time, state variables, nodes, modes)
+            assert wavelet_h5.array_data.shape[2:] == (1, 3, 1)
+            assert wavelet_h5.power.shape == wavelet_h5.array_data.shape
+
+    def test_wavelet_adapter_empty_input(self, time_series_index_factory):
+        ts_index = time_series_index_factory(data=numpy.zeros((0, 1, 3, 1)))
+
+        wavelet_adapter = ContinuousWaveletTransformAdapter()
+        view_model = wavelet_adapter.get_view_model_class()()
+        view_model.time_series = ts_index.gid
+        with pytest.raises(LaunchException):
+            wavelet_adapter.configure(view_model)
 
     def test_pca_adapter(self, time_series_index_factory, operation_from_existing_op_factory):
         ts_index = time_series_index_factory()
@@ -108,6 +125,55 @@ class TestAdapters(TransactionalTestCase):
         result_h5 = ica_adapter.path_for(IndependentComponentsH5, ica_idx.gid)
         assert os.path.exists(result_h5)
 
+    def test_pca_adapter_streamed(self, time_series_index_factory, operation_from_existing_op_factory):
+        ts_index = time_series_index_factory()
+
+        pca_op, project_id = operation_from_existing_op_factory(ts_index.fk_from_operation)
+
+        pca_adapter = PCAAdapter()
+        view_model = pca_adapter.get_view_model_class()()
+        view_model.time_series = ts_index.gid
+        view_model.n_components = 2
+        view_model.method = PCAMethods.COVARIANCE
+        pca_adapter.configure(view_model)
+
+        disk = pca_adapter.get_required_disk_size(view_model)
+        mem = pca_adapter.get_required_memory_size(view_model)
+
+        pca_adapter.extract_operation_data(pca_op)
+        pca_idx = pca_adapter.launch(view_model)
+
+        result_h5 = pca_adapter.path_for(PrincipalComponentsH5, pca_idx.gid)
+        with PrincipalComponentsH5(result_h5) as pca_h5:
+            assert pca_h5.weights.shape == (2, 3, 1, 1)
+            assert pca_h5.fractions.shape == (2, 1, 1)
+            assert pca_h5.norm_source.shape == (4000, 1, 3, 1)
+            assert pca_h5.component_time_series.shape == (4000, 1, 2, 1)
+
+    def test_ica_adapter_streamed(self, time_series_index_factory, operation_from_existing_op_factory):
+        ts_index = time_series_index_factory()
+
+        ica_op, project_id = operation_from_existing_op_factory(ts_index.fk_from_operation)
+
+        ica_adapter = ICAAdapter()
+        view_model = ica_adapter.get_view_model_class()()
+        view_model.time_series = ts_index.gid
+        view_model.n_components = 2
+        view_model.method = PCAMethods.RANDOMIZED
+        ica_adapter.configure(view_model)
+
+        disk = ica_adapter.get_required_disk_size(view_model)
+        mem = ica_adapter.get_required_memory_size(view_model)
+
+        ica_adapter.extract_operation_data(ica_op)
+        ica_idx = ica_adapter.launch(view_model)
+
+        result_h5 = ica_adapter.path_for(IndependentComponentsH5, ica_idx.gid)
+        with IndependentComponentsH5(result_h5) as ica_h5:
+            assert ica_h5.prewhitening_matrix.shape == (2, 3, 1, 1)
+            assert ica_h5.mixing_matrix.shape == (3, 2, 1, 1)
+            assert ica_h5.component_time_series.shape == (4000, 1, 2, 1)
+
     def test_metrics_adapter_launch(self, time_series_index_factory, operation_from_existing_op_factory):
         ts_index = time_series_index_factory()
 
@@ -261,6 +327,46 @@ class TestAdapters(TransactionalTestCase):
         result_h5 = fmri_balloon_adapter.path_for(TimeSeriesRegionH5, ts_index.gid)
         assert os.path.exists(result_h5)
 
+    def test_fmri_balloon_adapter_downsampling(self, time_series_region_index_factory,
+                                               connectivity_factory, region_mapping_factory, surface_factory,
+                                               operation_from_existing_op_factory):
+        connectivity = connectivity_factory()
+        surface = surface_factory()
+        region_mapping = region_mapping_factory(surface=surface, connectivity=connectivity)
+        ts_index = time_series_region_index_factory(connectivity=connectivity, region_mapping=region_mapping)
+
+        fmri_balloon_op, project_id = operation_from_existing_op_factory(ts_index.fk_from_operation)
+
+        fmri_balloon_adapter = BalloonModelAdapter()
+        view_model = fmri_balloon_adapter.get_view_model_class()()
+        view_model.time_series = ts_index.gid
+        view_model.downsampling = 16
+        fmri_balloon_adapter.configure(view_model)
+
+        fmri_balloon_adapter.extract_operation_data(fmri_balloon_op)
+        bold_index = fmri_balloon_adapter.launch(view_model)
+
+        assert bold_index.data_length_1d == 250
+        assert bold_index.sample_period == ts_index.sample_period * 16
+        with TimeSeriesRegionH5(fmri_balloon_adapter.path_for(TimeSeriesRegionH5, bold_index.gid)) as bold_h5:
+            assert bold_h5.data.shape == (250, 1, 3, 1)
+            assert bold_h5.time.shape == (250,)
+
+    @pytest.mark.parametrize("downsampling", [0, -2])
+    def test_fmri_balloon_adapter_invalid_downsampling(self, time_series_region_index_factory, connectivity_factory,
+                                                       region_mapping_factory, surface_factory, downsampling):
+        connectivity = connectivity_factory()
+        surface = surface_factory()
+        region_mapping = region_mapping_factory(surface=surface, connectivity=connectivity)
+        ts_index = time_series_region_index_factory(connectivity=connectivity, region_mapping=region_mapping)
+
+        fmri_balloon_adapter = BalloonModelAdapter()
+        view_model = fmri_balloon_adapter.get_view_model_class()()
+        view_model.time_series = ts_index.gid
+        view_model.downsampling = downsampling
+        with pytest.raises(LaunchException):
+            fmri_balloon_adapter.configure(view_model)
+
     def test_node_covariance_adapter(self, time_series_index_factory, operation_from_existing_op_factory):
         ts_index = time_series_index_factory()
 
@@ -39,6 +39,7 @@ import json
 from tvb.adapters.datatypes.db.mapped_value import DatatypeMeasureIndex
 from tvb.config import ALGORITHMS
 from tvb.tests.framework.core.base_testcase import TransactionalTestCase
+from tvb.adapters.analyzers import metrics_group_timeseries
 from tvb.adapters.analyzers.metrics_group_timeseries import TimeseriesMetricsAdapter, TimeseriesMetricsAdapterModel
 from tvb.tests.framework.core.factory import TestFactory
 
@@ -83,3 +84,31 @@ class TestTimeSeriesMetricsAdapter(TransactionalTestCase):
         assert len(metrics) >= len(ALGORITHMS) - 1, "At least one metric expected for every Algorithm, except Kuramoto."
         for metric_value in metrics.values():
             assert isinstance(metric_value, (float, int))
+
+    def test_adapter_launch_without_streamed_metrics(self, connectivity_factory, region_mapping_factory,
+                                                     time_series_region_index_factory,
+                                                     operation_from_existing_op_factory, monkeypatch):
+        """
+        Test that the time series is not read when no streamed metric is computed.
+        """
+        connectivity = connectivity_factory()
+        region_mapping = region_mapping_factory()
+        time_series_index = time_series_region_index_factory(connectivity=connectivity, region_mapping=region_mapping)
+        metric_op, _ = operation_from_existing_op_factory(time_series_index.fk_from_operation)
+
+        def fail_read(*args, **kwargs):
+            raise AssertionError("The time series should not be read")
+
+        monkeypatch.setattr(metrics_group_timeseries, 'compute_metrics', fail_read)
+
+        ts_metric_adapter = TimeseriesMetricsAdapter()
+        view_model = TimeseriesMetricsAdapterModel()
+        view_model.time_series = time_series_index.gid
+        # the input has a single state variable, so the Kuramoto index is filtered out
+        view_model.algorithms = ['KuramotoIndex']
+
+        ts_metric_adapter.configure(view_model)
+        ts_metric_adapter.extract_operation_data(metric_op)
+        resulted_metric = ts_metric_adapter.launch(view_model)
+
+        assert json.loads(resulted_metric.metrics) == {}
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+import threading
+import numpy
+import pytest
+
+from tvb.adapters.simulator.monitor_writer import AsyncTimeSeriesWriter
+
+
+class _RecordingH5(object):
+    """
+    Stands in for a TimeSeriesH5, recording the appended slices.
+    """
+
+    def __init__(self, fail=False):
+        self.path = "recording.h5"
+        self.fail = fail
+        self.times = []
+        self.data = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def write_time_slice(self, partial_result):
+        self.release.wait()
+        if self.fail:
+            raise IOError("disk full")
+        self.times.append(partial_result)
+
+    def write_data_slice(self, partial_result):
+        self.data.append(partial_result)
+
+
+class TestAsyncTimeSeriesWriter(object):
+
+    def test_writes_in_order_and_batches(self):
+        ts_h5 = _RecordingH5()
+        ts_h5.release.clear()
+        writer = AsyncTimeSeriesWriter(ts_h5, batch_size=8)
+        for step in range(20):
+            writer.write(step * 0.1, numpy.full((2, 3, 1), step))
+        ts_h5.release.set()
+        writer.close()
+
+        times = numpy.concatenate(ts_h5.times)
+        data = numpy.concatenate(ts_h5.data)
+        assert writer.samples_written == 20
+        assert numpy.allclose(times, numpy.arange(20) * 0.1)
+        assert data.shape == (20, 2, 3, 1)
+        assert numpy.all(data[:, 0, 0, 0] == numpy.arange(20))
+        assert max(len(t) for t in ts_h5.times) <= 8
+        assert len(ts_h5.times) < 20
+
+    def test_sample_is_copied(self):
+        ts_h5 = _RecordingH5()
+        ts_h5.release.clear()
+        writer = AsyncTimeSeriesWriter(ts_h5)
+        sample = numpy.zeros(3)
+        writer.write(0.0, sample)
+        sample[:] = 1.0
+        ts_h5.release.set()
+        writer.close()
+        assert numpy.all(ts_h5.data[0] == 0.0)
+
+    def test_backpressure(self):
+        ts_h5 = _RecordingH5()
+        ts_h5.release.clear()
+        writer = AsyncTimeSeriesWriter(ts_h5, queue_size=2, batch_size=1)
+        producer = threading.Thread(target=lambda: [writer.write(i, numpy.zeros(1)) for i in range(10)])
+        producer.start()
+        producer.join(0.5)
+        assert producer.is_alive()
+        ts_h5.release.set()
+        producer.join()
+        writer.close()
+        assert writer.samples_written == 10
+
+    def test_error_raised_at_close(self):
+        writer = AsyncTimeSeriesWriter(_RecordingH5(fail=True))
+        writer.write(0.0, numpy.zeros(1))
+        writer.write(0.1, numpy.zeros(1))
+        with pytest.raises(IOError):
+            writer.close()
+        # stopping again is harmless
+        writer.stop()
@@ -33,6 +33,7 @@
 """
 
 import os
+import numpy
 import tvb_data.surfaceData
 import tvb_data.regionMapping
 
@@ -97,6 +98,19 @@ class TestBrainViewer(TransactionalTestCase):
             assert key in result and result[key] is not None
         assert not result['extended_view']
 
+    def test_read_data_page_split(self, time_series_region_index_factory):
+        """
+        Check that pages of region activity are read as arrays, every `step` time points.
+        """
+        time_series_index = time_series_region_index_factory(self.connectivity, self.region_mapping,
+                                                             test_user=self.test_user, test_project=self.test_project)
+        with h5.h5_file_for_index(time_series_index) as time_series_h5:
+            full_page = time_series_h5.read_data_page(0, 10)
+
+        page = BrainViewer().read_data_page_split(time_series_index.gid, 0, 10, step=2)
+        assert isinstance(page, numpy.ndarray)
+        numpy.testing.assert_array_equal(page, full_page[::2])
+
     def test_get_required_memory(self, time_series_region_index_factory):
         """
         Brainviewer should know required memory so expect positive number and not -1.
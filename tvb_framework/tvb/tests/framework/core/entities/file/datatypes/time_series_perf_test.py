@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Benchmarks of the page reads of time series, for the chunk shapes chosen by h5py
+and by the storage policies, e.g.
+
+    pytest --benchmark-group-by=func time_series_perf_test.py
+"""
+
+import numpy
+import pytest
+from tvb.adapters.datatypes.h5.time_series_h5 import TimeSeriesH5
+from tvb.datatypes.time_series import TimeSeries
+from tvb.storage.h5.file.storage_policy import StoragePolicy
+
+ntime, nsv, nnode = 20000, 2, 76
+
+POLICIES = {
+    'h5py': None,
+    'time_paged': StoragePolicy(StoragePolicy.TIME_PAGED),
+    'channel_sliced': StoragePolicy(StoragePolicy.CHANNEL_SLICED),
+    'time_paged_lz4': StoragePolicy(StoragePolicy.TIME_PAGED, compression=StoragePolicy.LZ4, shuffle=True),
+}
+
+
+@pytest.fixture(params=sorted(POLICIES))
+def simulated_ts_path(request, tmph5factory, monkeypatch):
+    monkeypatch.setattr(TimeSeriesH5, 'DATA_STORAGE_POLICY', POLICIES[request.param])
+    path = tmph5factory('ts_%s.h5' % request.param)
+    ts = TimeSeries(title='bench', labels_ordering=('time', 'statevar', 'space', 'mode'), sample_period=1.0)
+    data = numpy.random.random((ntime, nsv, nnode, 1))
+    with TimeSeriesH5(path) as f:
+        f.store(ts, scalars_only=True)
+        # written sample by sample, as the simulator adapter does
+        for sample in data:
+            f.write_data_slice([sample])
+    return path
+
+
+def test_read_data_page(benchmark, simulated_ts_path):
+    with TimeSeriesH5(simulated_ts_path) as f:
+        page = benchmark(lambda: f.read_data_page(5000, 7000))
+    assert page.shape == (2000, nnode)
+
+
+def test_read_channels_page(benchmark, simulated_ts_path):
+    with TimeSeriesH5(simulated_ts_path) as f:
+        page = benchmark(lambda: f.read_channels_page(0, ntime, specific_slices='[null, 0, null, 0]',
+                                                      channels_list='[3, 42]'))
+    assert page.shape == (ntime, 2)
@@ -28,8 +28,10 @@
 #
 #
 
+import os
 import numpy
-from tvb.adapters.datatypes.h5.time_series_h5 import TimeSeriesH5
+import pytest
+from tvb.adapters.datatypes.h5.time_series_h5 import TimeSeriesH5, LOD_FACTOR, LOD_STATISTICS
 from tvb.datatypes.time_series import TimeSeries
 
 
@@ -92,3 +94,59 @@ def test_streaming_reads(tmph5factory):
         expected = numpy.zeros((33, nsv))
         expected[:, 1] = 1.0   # the cos(0) part
         numpy.testing.assert_array_equal(data, expected)
+
+
+def _write_random_ts(path, length, chunk_size, streamed_pyramid):
+    numpy.random.seed(42)
+    data = numpy.random.randn(length, nsv, nspace)
+    with TimeSeriesH5(path) as f:
+        f.store(make_harmonic_ts(), scalars_only=True)
+        if streamed_pyramid:
+            f.start_lod_pyramid()
+        for start in range(0, length, chunk_size):
+            f.write_data_slice(data[start:start + chunk_size])
+    return data
+
+
+def test_lod_pyramid_streamed_equals_built(tmph5factory):
+    length = LOD_FACTOR ** 2 * 3 + 7
+    path = tmph5factory()
+    data = _write_random_ts(path, length, 101, streamed_pyramid=True)
+
+    with TimeSeriesH5(path) as f:
+        streamed = [f.storage_manager.get_data('lod_%d_%s' % (level, statistic))
+                    for level in (1, 2) for statistic in LOD_STATISTICS]
+        f.build_lod_pyramid()
+        built = [f.storage_manager.get_data('lod_%d_%s' % (level, statistic))
+                 for level in (1, 2) for statistic in LOD_STATISTICS]
+
+    for streamed_level, built_level in zip(streamed, built):
+        numpy.testing.assert_allclose(streamed_level, built_level)
+    numpy.testing.assert_allclose(streamed[0][-1], data[-7:].min(axis=0))
+    numpy.testing.assert_allclose(streamed[5][0], data[:LOD_FACTOR ** 2].mean(axis=0))
+
+
+@pytest.mark.parametrize('streamed_pyramid', [True, False])
+def test_read_data_page_lod(tmph5factory, streamed_pyramid):
+    length, pixel_width, from_idx = 20000, 100, 170
+    path = tmph5factory()
+    data = _write_random_ts(path, length, 1000, streamed_pyramid)[:, 0, :]
+    modified = os.stat(path).st_mtime_ns
+
+    with TimeSeriesH5(path) as f:
+        assert f.get_lod_level(0, 1000, 1000) == 0
+        assert f.get_lod_level(0, length, pixel_width) == 1
+        (offset, step), minimums, maximums, means = f.read_data_page_lod(from_idx, length, pixel_width)
+
+    # without a pyramid, the page is reduced from the data, without writing the file
+    assert os.stat(path).st_mtime_ns == modified
+    assert len(minimums) <= pixel_width
+    assert minimums.shape == maximums.shape == means.shape == (len(minimums), nspace)
+    starts = [max(from_idx + int(offset) + i * int(step), from_idx) for i in range(len(minimums))]
+    for i, (start, end) in enumerate(zip(starts, starts[1:] + [length])):
+        if streamed_pyramid and i == 0:
+            # the first point of the pyramid also covers the samples of its block before from_idx
+            start = from_idx + int(offset)
+        numpy.testing.assert_allclose(minimums[i], data[start:end].min(axis=0))
+        numpy.testing.assert_allclose(maximums[i], data[start:end].max(axis=0))
+        numpy.testing.assert_allclose(means[i], data[start:end].mean(axis=0))
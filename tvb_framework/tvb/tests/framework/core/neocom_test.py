@@ -29,6 +29,8 @@
 #
 import os
 import numpy
+import pytest
+from tvb.adapters.datatypes.h5.connectivity_h5 import ConnectivityH5
 from tvb.adapters.datatypes.h5.projections_h5 import ProjectionMatrixH5
 from tvb.core.adapters.abcadapter import ABCAdapter
 
@@ -36,6 +38,7 @@ from tvb.core.entities.file.simulator.view_model import SimulatorAdapterModel, E
     TemporalAverageViewModel
 from tvb.core.entities.storage import dao
 from tvb.core.neocom import h5
+from tvb.core.neocom._h5cache import H5ResultCache
 from tvb.core.neocom.h5 import load, store, load_from_dir, store_to_dir
 from tvb.datatypes.projections import ProjectionSurfaceEEG
 from tvb.storage.storage_interface import StorageInterface
@@ -171,3 +174,87 @@ def test_gather_view_model_and_datatype_references_multiple_monitors(connectivit
 
     vm_references, dt_references = h5.gather_references_of_view_model(sim_view_model.gid, storage_path)
     assert len(vm_references + dt_references) == 12
+
+
+def test_load_field(tmpdir, connectivity_factory):
+    path = os.path.join(str(tmpdir), 'interface.conn.h5')
+    connectivity = connectivity_factory(2)
+    store(connectivity, path)
+
+    with ConnectivityH5(path) as conn_h5:
+        numpy.testing.assert_equal(conn_h5.load_field('weights'), connectivity.weights)
+        with pytest.raises(KeyError):
+            conn_h5.load_field('number_of_regions')
+
+
+def test_result_cache(tmpdir):
+    path = os.path.join(str(tmpdir), 'values.txt')
+    with open(path, 'w') as f:
+        f.write('first')
+    cache = H5ResultCache(max_size=4000)
+    loaded = []
+
+    def load(value):
+        loaded.append(value)
+        return value
+
+    array = numpy.zeros(100)
+    assert cache.get_or_load(('gid1', 'a'), path, lambda: load(array)) is array
+    assert cache.get_or_load(('gid1', 'a'), path, lambda: load(None)) is array
+    assert cache.get_or_load(('gid2', 'a'), path, lambda: load(array.copy())) is not array
+    assert len(loaded) == 2
+    assert cache.get_statistics() == {'hits': 1, 'misses': 2, 'entries': 2, 'size': 1600, 'max_size': 4000}
+
+    # the least recently used value is dropped when the cache grows over its size
+    cache.get_or_load(('gid1', 'a'), path, lambda: load(None))
+    cache.get_or_load(('gid3', 'a'), path, lambda: load(numpy.zeros(300)))
+    assert cache.get_statistics()['entries'] == 2
+    cache.get_or_load(('gid1', 'a'), path, lambda: load(None))
+    assert len(loaded) == 3
+
+    cache.invalidate('gid1')
+    cache.get_or_load(('gid1', 'a'), path, lambda: load('reloaded'))
+    assert loaded[-1] == 'reloaded'
+
+    with open(path, 'w') as f:
+        f.write('changed')
+    assert cache.get_or_load(('gid1', 'a'), path, lambda: load('changed')) == 'changed'
+    assert len(loaded) == 5
+
+
+def test_result_cache_skips_values_of_unknown_size(tmpdir, connectivity_factory):
+    path = os.path.join(str(tmpdir), 'values.txt')
+    with open(path, 'w') as f:
+        f.write('values')
+    cache = H5ResultCache()
+    connectivity = connectivity_factory(2)
+
+    assert cache.get_or_load(('gid', 'conn'), path, lambda: connectivity) is connectivity
+    assert cache.get_or_load(('gid', 'conns'), path, lambda: [connectivity]) == [connectivity]
+    assert cache.get_statistics()['entries'] == 0
+    # the arrays of values which are not kept stay writable
+    assert connectivity.weights.flags.writeable
+
+
+def test_result_cache_values_read_only(tmpdir):
+    path = os.path.join(str(tmpdir), 'values.txt')
+    with open(path, 'w') as f:
+        f.write('values')
+    cache = H5ResultCache()
+
+    def load():
+        return [numpy.arange(5), {'weights': numpy.ones(3)}]
+
+    page = cache.get_or_load(('gid', 'page'), path, load)
+    with pytest.raises(ValueError):
+        page[0][0] = 10
+    with pytest.raises(ValueError):
+        page[1]['weights'] *= 2
+    # a copy can be changed without changing the cached value
+    changed = page[0].copy()
+    changed[0] = 10
+    assert page[0][0] == 0
+
+    page = cache.get_or_load(('gid', 'page'), path, load)
+    numpy.testing.assert_equal(page[0], numpy.arange(5))
+    numpy.testing.assert_equal(page[1]['weights'], numpy.ones(3))
@@ -51,7 +51,6 @@ from tvb.core.services.exceptions import ImportException
 from tvb.core.services.figure_service import FigureService
 from tvb.core.services.import_service import ImportService
 from tvb.core.services.project_service import ProjectService
-from tvb.core.utils import no_matlab
 from tvb.storage.storage_interface import StorageInterface
 from tvb.tests.framework.core.base_testcase import BaseTestCase
 from tvb.tests.framework.core.factory import TestFactory
@@ -84,7 +83,6 @@ class TestImportService(BaseTestCase):
 
         self.delete_project_folders()
 
-    @pytest.mark.skipif(no_matlab(), reason="Matlab or Octave not installed!")
     def test_import_export(self, user_factory, project_factory, value_wrapper_factory):
         """
         Test the import/export mechanism for a project structure.
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+import json
+import uuid
+import numpy
+from datetime import datetime
+from tvb.basic.neotraits.api import Range
+from tvb.config import SIMULATOR_MODULE, SIMULATOR_CLASS
+from tvb.core.adapters.abcadapter import ABCAdapter
+from tvb.core.entities.file.simulator.view_model import SimulatorAdapterModel
+from tvb.core.entities.model.model_burst import BurstConfiguration
+from tvb.core.entities.storage import dao
+from tvb.core.entities.transient.range_parameter import RangeParameter
+from tvb.core.services.burst_service import BurstService
+from tvb.core.services.simulator_service import SimulatorService
+from tvb.tests.framework.core.base_testcase import TransactionalTestCase
+from tvb.tests.framework.core.factory import TestFactory
+
+
+class TestSimulatorService(TransactionalTestCase):
+
+    def transactional_setup_method(self):
+        self.test_user = TestFactory.create_user()
+        self.test_project = TestFactory.create_project(self.test_user)
+        self.simulator_service = SimulatorService()
+
+    def test_prepare_pse_operations(self, connectivity_index_factory):
+        simulator = SimulatorAdapterModel()
+        simulator.connectivity = connectivity_index_factory().gid
+        range_param1 = RangeParameter("conduction_speed", float, Range(lo=1.0, hi=4.0, step=1.0))
+        range_param2 = RangeParameter("model.a", float, Range(lo=0.0, hi=1.0, step=0.5), is_array=True)
+
+        burst = BurstConfiguration(self.test_project.id, name="PSE")
+        burst.start_time = datetime.now()
+        burst.range1 = range_param1.to_json()
+        burst.range2 = range_param2.to_json()
+        burst = BurstService().prepare_burst_for_pse(burst)
+        simulator.operation_group_gid = uuid.UUID(burst.operation_group.gid)
+        simulator.ranges = json.dumps(burst.ranges)
+        algorithm = dao.get_algorithm_by_module(SIMULATOR_MODULE, SIMULATOR_CLASS)
+
+        operations, pse_canceled = self.simulator_service._prepare_operations(
+            algorithm.algorithm_category, burst, burst.metric_operation_group, burst.operation_group,
+            self.test_project, range_param1, range_param2, range_param2.get_range_values(), simulator, algorithm,
+            self.test_user)
+
+        assert not pse_canceled
+        assert len(operations) == 6
+        assert simulator.conduction_speed == SimulatorAdapterModel.conduction_speed.default
+        assert simulator.range_values is None
+
+        adapter = ABCAdapter.build_adapter(algorithm)
+        expected_points = [(speed, a) for speed in (1.0, 2.0, 3.0) for a in (0.0, 0.5)]
+        simulator_gids = set()
+        for operation, (speed, a) in zip(operations, expected_points):
+            operation = dao.get_operation_by_id(operation.id)
+            view_model = adapter.load_view_model(operation)
+            assert view_model.gid.hex == operation.view_model_gid
+            assert view_model.conduction_speed == speed
+            assert numpy.array_equal(view_model.model.a, [a])
+            assert json.loads(view_model.range_values) == {"conduction_speed": speed, "model.a": a}
+            assert operation.range_values == view_model.range_values
+            assert view_model.connectivity == simulator.connectivity
+            assert view_model.operation_group_gid == simulator.operation_group_gid
+            assert view_model.generic_attributes.parent_burst == burst.gid
+            assert operation.view_model_disk_size > 0
+            simulator_gids.add(view_model.gid)
+        assert len(simulator_gids) == len(operations)
+
+        burst = dao.get_burst_by_id(burst.id)
+        assert burst.fk_simulation == operations[0].id
+        assert burst.simulator_gid == operations[0].view_model_gid
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the execution of operations by the pool of long-lived worker processes.
+"""
+
+import time
+from tvb.basic.profile import TvbProfile
+from tvb.core.entities.model import model_operation
+from tvb.core.entities.storage import dao
+from tvb.core.services.backend_clients import standalone_client
+from tvb.core.services.backend_clients.standalone_client import CURRENT_ACTIVE_THREADS, WORKER_POOL
+from tvb.core.services.backend_clients.standalone_client import OperationWorker, StandAloneClient
+from tvb.core.services.operation_service import OperationService
+from tvb.core.services.project_service import initialize_storage
+from tvb.tests.framework.adapters.dummy_adapter2 import DummyAdapter2
+from tvb.tests.framework.core.base_testcase import BaseTestCase
+from tvb.tests.framework.core.factory import TestFactory
+
+# set by the OperationExecutor when the process running the operation died
+CRASH_MESSAGE = "Operation failed unexpectedly! Please check the log files."
+
+
+class TestOperationWorkers(BaseTestCase):
+    """
+    Operations are launched asynchronously here, so Transactional tests won't work.
+    """
+
+    def setup_method(self):
+        self.clean_database()
+        initialize_storage()
+        self.test_user = TestFactory.create_user()
+        self.test_project = TestFactory.create_project(self.test_user)
+        self.operation_service = OperationService()
+        self.backup_operations_per_worker = TvbProfile.current.MAX_OPERATIONS_PER_WORKER
+        # workers left by operations of previous tests would have run an unknown number of operations
+        WORKER_POOL.close()
+
+    def teardown_method(self):
+        TvbProfile.current.MAX_OPERATIONS_PER_WORKER = self.backup_operations_per_worker
+        WORKER_POOL.close()
+        self.clean_database()
+
+    def _launch_operation(self, module, class_name, **params):
+        adapter = TestFactory.create_adapter(module, class_name)
+        view_model = adapter.get_view_model()()
+        for name, value in params.items():
+            setattr(view_model, name, value)
+        operation = self.operation_service.prepare_operation(self.test_user.id, self.test_project,
+                                                             adapter.stored_adapter, view_model=view_model)
+        self.operation_service._send_to_cluster(operation, adapter)
+        return operation
+
+    @staticmethod
+    def _wait_for_threads(timeout=120):
+        end = time.time() + timeout
+        while CURRENT_ACTIVE_THREADS and time.time() < end:
+            time.sleep(0.2)
+        assert not CURRENT_ACTIVE_THREADS, "Operations did not finish in time"
+
+    @staticmethod
+    def _assert_not_crashed(operation):
+        operation = dao.get_operation_by_id(operation.id)
+        assert operation.has_finished
+        assert operation.additional_info != CRASH_MESSAGE
+
+    def _worker_pid(self, operation):
+        return dao.get_operation_process_for_operation(operation.id).pid
+
+    def test_workers_reused_and_recycled(self, test_adapter_factory):
+        test_adapter_factory()
+        TvbProfile.current.MAX_OPERATIONS_PER_WORKER = 2
+        operations = []
+        for _ in range(3):
+            operations.append(self._launch_operation("tvb.tests.framework.adapters.dummy_adapter1", "DummyAdapter1",
+                                                     test1_val1=5, test1_val2=6))
+            self._wait_for_threads()
+
+        for operation in operations:
+            assert dao.get_operation_by_id(operation.id).has_finished
+        pids = [self._worker_pid(operation) for operation in operations]
+        assert pids[0] == pids[1], "The second operation should have reused the worker"
+        assert pids[2] != pids[1], "The worker should have been recycled after two operations"
+
+    def test_stop_operation_kills_worker(self, test_adapter_factory):
+        test_adapter_factory(adapter_class=DummyAdapter2)
+        test_adapter_factory()
+        operation = self._launch_operation("tvb.tests.framework.adapters.dummy_adapter2", "DummyAdapter2", test=5)
+        end = time.time() + 60
+        while dao.get_operation_by_id(operation.id).status != model_operation.STATUS_STARTED and time.time() < end:
+            time.sleep(0.2)
+        self.operation_service.stop_operation(operation.id)
+        self._wait_for_threads()
+        assert dao.get_operation_by_id(operation.id).status == model_operation.STATUS_CANCELED
+
+        next_operation = self._launch_operation("tvb.tests.framework.adapters.dummy_adapter1", "DummyAdapter1",
+                                                test1_val1=5, test1_val2=6)
+        self._wait_for_threads()
+        assert dao.get_operation_by_id(next_operation.id).has_finished
+        assert self._worker_pid(next_operation) != self._worker_pid(operation)
+
+    def test_stop_after_operation_end_does_not_kill_next_operation(self, test_adapter_factory, monkeypatch):
+        test_adapter_factory()
+        launch = OperationWorker.launch
+
+        def launch_then_stop(worker, operation_id):
+            # the stop arrives once the worker has finished the operation, before the thread ends
+            returned = launch(worker, operation_id)
+            StandAloneClient.stop_operation_process(int(operation_id))
+            return returned
+
+        monkeypatch.setattr(OperationWorker, 'launch', launch_then_stop)
+        operation = self._launch_operation("tvb.tests.framework.adapters.dummy_adapter1", "DummyAdapter1",
+                                           test1_val1=5, test1_val2=6)
+        self._wait_for_threads()
+        monkeypatch.setattr(OperationWorker, 'launch', launch)
+
+        next_operation = self._launch_operation("tvb.tests.framework.adapters.dummy_adapter1", "DummyAdapter1",
+                                                test1_val1=5, test1_val2=6)
+        self._wait_for_threads()
+        self._assert_not_crashed(next_operation)
+        assert self._worker_pid(next_operation) != self._worker_pid(operation)
+
+    def test_crashed_worker_fails_operation(self, test_adapter_factory, monkeypatch):
+        test_adapter_factory()
+        launch = OperationWorker.launch
+        logged_errors = []
+
+        def crash_then_launch(worker, operation_id):
+            worker.process.kill()
+            worker.process.wait()
+            return launch(worker, operation_id)
+
+        monkeypatch.setattr(OperationWorker, 'launch', crash_then_launch)
+        monkeypatch.setattr(standalone_client.LOGGER, 'error', logged_errors.append)
+        operation = self._launch_operation("tvb.tests.framework.adapters.dummy_adapter1", "DummyAdapter1",
+                                           test1_val1=5, test1_val2=6)
+        self._wait_for_threads()
+        monkeypatch.setattr(OperationWorker, 'launch', launch)
+
+        assert dao.get_operation_by_id(operation.id).additional_info == CRASH_MESSAGE
+        assert any("Exit message: None" not in message for message in logged_errors
+                   if message.startswith("Operation suffered fatal failure!"))
+
+        next_operation = self._launch_operation("tvb.tests.framework.adapters.dummy_adapter1", "DummyAdapter1",
+                                                test1_val1=5, test1_val2=6)
+        self._wait_for_threads()
+        self._assert_not_crashed(next_operation)
@@ -35,10 +35,13 @@
 """
 
 import os
+import json
+import numpy
 import pytest
 from datetime import datetime
 from tvb.tests.framework.core.base_testcase import TransactionalTestCase
 from tvb.core.utils import path2url_part, get_unique_file_name, string2date, date2string, string2bool
+from tvb.core.utils import float32_arrays2bytes
 
 
 class TestUtils(TransactionalTestCase):
@@ -128,3 +131,21 @@ class TestUtils(TransactionalTestCase):
         assert not string2bool("False"), "Expect True boolean for input u'False'"
         assert not string2bool("somethingelse"), "Expect True boolean for input 'somethingelse'"
         assert not string2bool("somethingelse"), "Expect True boolean for input u'somethingelse'"
+
+    def test_float32_arrays2bytes(self):
+        """
+        Check the layout of the binary float32 transport: header length, JSON header and aligned data.
+        """
+        arrays = [numpy.arange(6).reshape((2, 3)), numpy.array([0.5, numpy.nan, -1.0])]
+        body = float32_arrays2bytes(arrays)
+
+        header_length = int(numpy.frombuffer(body[:4], dtype='<u4')[0])
+        assert header_length % 4 == 0, "Data should start at an offset multiple of 4"
+        assert json.loads(body[4:4 + header_length].decode('ascii')) == {'shapes': [[2, 3], [3]], 'nested': True}
+        data = numpy.frombuffer(body[4 + header_length:], dtype='<f4')
+        numpy.testing.assert_array_equal(data, numpy.concatenate([array.ravel() for array in arrays]))
+
+        body = float32_arrays2bytes(arrays[0])
+        header_length = int(numpy.frombuffer(body[:4], dtype='<u4')[0])
+        assert json.loads(body[4:4 + header_length].decode('ascii')) == {'shapes': [[2, 3]], 'nested': False}
+        assert len(body) == 4 + header_length + 4 * 6
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+All-pairs cross-correlation of the nodes of a time series.
+
+Each node is Fourier transformed once, the nodes being read a block at a time; the cross-correlation
+sequences of all the node pairs are then the inverse transforms of the products of these spectra, computed
+for a block of nodes at a time so that only a bounded part of the (offsets, nodes, nodes, state variables,
+modes) result is in memory.
+
+"""
+
+import numpy
+import scipy.fft
+from tvb.basic.logger.builder import get_logger
+
+log = get_logger(__name__)
+
+# Upper bound, in bytes, of the temporary arrays used to compute one block of nodes
+BLOCK_MEMORY = 256 * 2 ** 20
+
+
+def cross_correlation_lags(n_time, max_lag=None):
+    """
+    The offsets, in time points, of the cross-correlation sequences of two series of `n_time` points.
+
+    These are the offsets of `scipy.signal.correlate(a, v, mode="same")`, restricted to the
+    [-max_lag, max_lag] window when `max_lag` is given.
+    """
+    lags = numpy.arange(-(n_time // 2), n_time - n_time // 2)
+    if max_lag is not None:
+        lags = lags[numpy.abs(lags) <= max_lag]
+    return lags
+
+
+def block_size(n_time, n_var, n_node, n_mode, block_memory=BLOCK_MEMORY):
+    """
+    Number of nodes for which the cross-correlation sequences are computed at once.
+    """
+    fft_len = scipy.fft.next_fast_len(2 * n_time - 1, real=True)
+    # spectra products (complex) and their inverse transform, for one node against all the nodes
+    node_size = 2 * fft_len * n_var * n_node * n_mode * 8
+    return int(min(max(block_memory // node_size, 1), n_node))
+
+
+def read_block_size(n_time, n_var, n_node, n_mode, block_memory=BLOCK_MEMORY):
+    """
+    Number of nodes read, and Fourier transformed, at once.
+    """
+    fft_len = scipy.fft.next_fast_len(2 * n_time - 1, real=True)
+    # the padded node data and its spectra
+    node_size = 2 * fft_len * n_var * n_mode * 8
+    return int(min(max(block_memory // node_size, 1), n_node))
+
+
+def cross_correlation_memory_size(n_time, n_var, n_node, n_mode, max_lag=None, block_memory=BLOCK_MEMORY):
+    """
+    Upper bound of the memory in bytes required by `cross_correlation_blocks`, input blocks included.
+    """
+    fft_len = scipy.fft.next_fast_len(2 * n_time - 1, real=True)
+    n_lags = len(cross_correlation_lags(n_time, max_lag))
+    n_block = block_size(n_time, n_var, n_node, n_mode, block_memory)
+    n_read = read_block_size(n_time, n_var, n_node, n_mode, block_memory)
+    input_size = 2 * fft_len * n_var * n_read * n_mode * 8
+    spectra_size = (fft_len // 2 + 1) * n_var * n_node * n_mode * 16
+    temp_size = 2 * fft_len * n_var * n_block * n_node * n_mode * 8
+    result_size = n_lags * n_block * n_node * n_var * n_mode * 8
+    return input_size + spectra_size + temp_size + result_size
+
+
+def cross_correlation_blocks(data, max_lag=None, block_memory=BLOCK_MEMORY):
+    """
+    Cross-correlation sequences of all the node pairs of a time series, one block of nodes at a time.
+
+    :param data: time series data, shaped (time, state variables, nodes, modes)
+    :param max_lag: if given, only the offsets in [-max_lag, max_lag] time points are kept
+    :param block_memory: bound of the temporary memory used for one block of nodes, in bytes
+    :return: a generator of arrays shaped (offsets, block nodes, nodes, state variables, modes), for
+        consecutive blocks of the first node dimension. For nodes n1, n2 the sequence is the one of
+        `scipy.signal.correlate(x[:, n1], x[:, n2], mode="same")`, x being the demeaned data, and the
+        offsets are `cross_correlation_lags(n_time, max_lag)`.
+    """
+    return cross_correlation_node_blocks(lambda start, stop: data[:, :, start:stop], data.shape,
+                                         max_lag, block_memory)
+
+
+def cross_correlation_node_blocks(read_nodes, data_shape, max_lag=None, block_memory=BLOCK_MEMORY):
+    """
+    Same as `cross_correlation_blocks`, for data which is not in memory: it is read one block of
+    nodes at a time, such that only the spectra of all the nodes are kept.
+
+    :param read_nodes: called with (start, stop) node indices, returns the data of these nodes, shaped
+        (time, state variables, stop - start, modes)
+    :param data_shape: shape of the whole time series data
+    """
+    n_time, n_var, n_node, n_mode = data_shape
+    fft_len = scipy.fft.next_fast_len(2 * n_time - 1, real=True)
+    lags = cross_correlation_lags(n_time, max_lag)
+    # negative offsets wrap around to the end of the circular correlation
+    lag_indices = lags % fft_len
+    n_block = block_size(n_time, n_var, n_node, n_mode, block_memory)
+    n_read = read_block_size(n_time, n_var, n_node, n_mode, block_memory)
+    log.debug("Cross-correlating %d nodes in blocks of %d, with %d offsets" % (n_node, n_block, len(lags)))
+
+    # (frequencies, state variables, nodes, modes)
+    spectra = numpy.empty((fft_len // 2 + 1, n_var, n_node, n_mode), dtype=numpy.complex128)
+    for start in range(0, n_node, n_read):
+        stop = min(start + n_read, n_node)
+        data = numpy.asarray(read_nodes(start, stop), dtype=numpy.float64)
+        data = data - data.mean(axis=0)[numpy.newaxis]
+        spectra[:, :, start:stop] = scipy.fft.rfft(data, n=fft_len, axis=0)
+        del data
+    conj_spectra = spectra.conj()[:, :, numpy.newaxis]
+
+    for start in range(0, n_node, n_block):
+        stop = min(start + n_block, n_node)
+        # (frequencies, state variables, block nodes, nodes, modes)
+        products = spectra[:, :, start:stop, numpy.newaxis] * conj_spectra
+        block = scipy.fft.irfft(products, n=fft_len, axis=0)
+        del products
+        # to (offsets, block nodes, nodes, state variables, modes)
+        yield block[lag_indices].transpose(0, 2, 3, 1, 4)
+
+
+def cross_correlation(data, max_lag=None, block_memory=BLOCK_MEMORY):
+    """
+    Cross-correlation sequences of all the node pairs of a time series, as one
+    (offsets, nodes, nodes, state variables, modes) array. See `cross_correlation_blocks`.
+    """
+    return numpy.concatenate(list(cross_correlation_blocks(data, max_lag, block_memory)), axis=1)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Cross-spectral density of all the node pairs of a time series, estimated from windowed FFTs of
+(possibly overlapping) segments, which can be grouped in epochs.
+
+The segments are read in blocks through a `read_data` callable, so that the time series doesn't have to
+be in memory. Each segment is Fourier transformed once, and the cross spectra of a whole block of segments
+are accumulated by one batched matrix product over the frequencies.
+
+"""
+
+import numpy
+import scipy.fft
+from scipy import signal
+from tvb.basic.logger.builder import get_logger
+
+log = get_logger(__name__)
+
+# Upper bound, in bytes, of the data and spectra of the block of segments transformed at once
+BLOCK_MEMORY = 64 * 2 ** 20
+
+
+def segment_starts(n_time, seg_tpts, seg_shift_tpts, epoch_tpts=None):
+    """
+    Start time indices of the segments of a time series, divided into non overlapping epochs.
+
+    :param n_time: the number of time points of the time series
+    :param seg_tpts: the segment length, in time points
+    :param seg_shift_tpts: the shift between two consecutive segments of an epoch, in time points
+    :param epoch_tpts: the epoch length, in time points. By default the whole time series is one epoch
+    :returns: (n_epochs, n_segments) int array
+    """
+    epoch_tpts = epoch_tpts or n_time
+    n_epochs = n_time // epoch_tpts
+    n_seg = max((epoch_tpts - seg_tpts) // seg_shift_tpts + 1, 0)
+    return numpy.arange(n_epochs)[:, numpy.newaxis] * epoch_tpts + numpy.arange(n_seg) * seg_shift_tpts
+
+
+def _segment_size(seg_tpts, n_node, nfft=None):
+    # the data of one segment, and its complex spectrum
+    return (seg_tpts + 2 * (nfft or seg_tpts)) * n_node * 8
+
+
+def block_size(seg_tpts, n_node, nfft=None, block_memory=BLOCK_MEMORY):
+    """
+    Number of segments Fourier transformed at once.
+    """
+    return int(max(block_memory // _segment_size(seg_tpts, n_node, nfft), 1))
+
+
+def cross_spectrum_memory_size(n_node, n_freq, seg_tpts, n_seg=1, nfft=None, block_memory=BLOCK_MEMORY):
+    """
+    Upper bound of the memory in bytes required by `cross_spectrum`, for `n_seg` separately averaged segments.
+    """
+    result_size = n_seg * n_freq * (n_node + 1) * n_node * 16
+    block = block_size(seg_tpts, n_node, nfft, block_memory) * _segment_size(seg_tpts, n_node, nfft)
+    # plus the cross spectra of one block, before they are accumulated
+    return result_size + block + n_freq * n_node ** 2 * 16
+
+
+def segment_spectra(segments, window=None, nfft=None, n_freq=None, detrend=False):
+    """
+    Fourier transform a stack of segments.
+
+    :param segments: (n_segments, seg_tpts, n_node) array
+    :param window: `seg_tpts` weights, applied to each segment
+    :param nfft: the FFT length; segments are zero padded to it. Default `seg_tpts`
+    :param n_freq: the number of (lowest) FFT frequencies to keep. Default all of them
+    :param detrend: remove the linear trend of each segment
+    :returns: (n_segments, n_freq, n_node) complex array
+    """
+    nfft = nfft or segments.shape[1]
+    n_freq = nfft if n_freq is None else min(n_freq, nfft)
+    if detrend:
+        segments = signal.detrend(segments, axis=1)
+    if window is not None:
+        segments = segments * numpy.asarray(window)[:, numpy.newaxis]
+    # for real data, the lower half of the spectrum is enough
+    if n_freq <= nfft // 2 + 1 and not numpy.iscomplexobj(segments):
+        spectra = scipy.fft.rfft(segments, n=nfft, axis=1)
+    else:
+        spectra = scipy.fft.fft(segments, n=nfft, axis=1)
+    return spectra[:, :n_freq]
+
+
+def cross_spectrum(read_data, starts, seg_tpts, window=None, nfft=None, n_freq=None, detrend=False,
+                   per_segment=False, block_memory=BLOCK_MEMORY):
+    """
+    Average cross spectrum of the segments of a time series.
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    :param starts: (n_epochs, n_segments) start time indices of the segments, as given by `segment_starts`
+    :param seg_tpts: the segment length, in time points
+    :param window: `seg_tpts` weights, applied to each segment before its FFT
+    :param nfft: the FFT length; segments are zero padded to it. Default `seg_tpts`
+    :param n_freq: the number of (lowest) FFT frequencies to keep. Default all of them
+    :param detrend: remove the linear trend of each segment before its FFT
+    :param per_segment: average only across epochs, keeping apart the segments of an epoch
+    :param block_memory: upper bound of the memory, in bytes, of the block of segments transformed at once
+    :returns: the cross spectrum, a (n_freq, n_node, n_node) complex array, whose element [f, i, j] is the mean
+        of X_i(f) * conj(X_j(f)) across all the segments; and the mean spectrum X(f), a (n_freq, n_node)
+        array. With `per_segment`, both have a leading n_segments dimension.
+    """
+    starts = numpy.atleast_2d(starts)
+    n_epochs, n_seg = starts.shape
+    if starts.size == 0:
+        raise ValueError("No segment of %d time points fits in the time series." % seg_tpts)
+    nfft = nfft or seg_tpts
+    n_freq = nfft if n_freq is None else min(n_freq, nfft)
+    n_node = _read_segments(read_data, starts[0, :1], seg_tpts).shape[2]
+    n_block = block_size(seg_tpts, n_node, nfft, block_memory)
+    log.debug("Cross spectrum of %d x %d segments of %d nodes, %d segments at once"
+              % (n_epochs, n_seg, n_node, n_block))
+
+    out_shape = (n_seg,) if per_segment else ()
+    csd = numpy.zeros(out_shape + (n_freq, n_node, n_node), dtype=numpy.complex128)
+    mean = numpy.zeros(out_shape + (n_freq, n_node), dtype=numpy.complex128)
+    # blocks of consecutive segments, across epochs
+    flat_starts = starts.ravel()
+    for first in range(0, flat_starts.size, n_block):
+        block = flat_starts[first:first + n_block]
+        spectra = segment_spectra(_read_segments(read_data, block, seg_tpts), window, nfft, n_freq, detrend)
+        if per_segment:
+            for index, spectrum in enumerate(spectra, first):
+                seg = index % n_seg
+                csd[seg] += spectrum[:, :, numpy.newaxis] * spectrum.conj()[:, numpy.newaxis, :]
+                mean[seg] += spectrum
+        else:
+            # (freq, node, segment) x (freq, segment, node), summing over the segments
+            csd += numpy.matmul(spectra.transpose((1, 2, 0)), spectra.conj().transpose((1, 0, 2)))
+            mean += spectra.sum(axis=0)
+
+    n_summed = n_epochs if per_segment else n_epochs * n_seg
+    csd /= n_summed
+    mean /= n_summed
+    return csd, mean
+
+
+def _read_segments(read_data, block, seg_tpts):
+    """
+    Read the consecutive segments starting at `block` with one call of `read_data`.
+    """
+    span = numpy.asarray(read_data(block[0], block[-1] + seg_tpts), dtype=numpy.float64)
+    span = span.reshape((span.shape[0], -1))
+    return span[(block - block[0])[:, numpy.newaxis] + numpy.arange(seg_tpts)]
+
+
+def coherency(csd):
+    """
+    Complex coherency of a cross spectrum: csd[..., i, j] / sqrt(csd[..., i, i] * csd[..., j, j]).
+    """
+    power = numpy.sqrt(numpy.diagonal(csd, axis1=-2, axis2=-1).real)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        return csd / (power[..., :, numpy.newaxis] * power[..., numpy.newaxis, :])
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Functional connectivity dynamics (FCD): the Pearson correlation between the functional connectivity (FC)
+of sliding windows over a time series.
+
+The FC of all the windows is computed in one pass over the time series, from running sums of the data
+and of its outer products, read in chunks of time points, so that the time series doesn't have to be
+in memory. The FCD is then a single matrix product of the normalized FC upper triangles.
+
+"""
+
+import numpy
+from tvb.basic.logger.builder import get_logger
+
+log = get_logger(__name__)
+
+# Number of time points read at once
+CHUNK_SIZE = 4096
+
+
+def sliding_windows(n_time, sw, sp):
+    """
+    Start and (exclusive) stop time indices of the sliding windows over a time series.
+
+    :param n_time: the number of time points of the time series
+    :param sw: the sliding window length, in time points
+    :param sp: the spanning between two consecutive windows, in time points
+    """
+    n_windows = int((n_time - sw) / sp)
+    # accumulated like a running start, to get the same rounding for non integer spanning
+    starts = numpy.cumsum(numpy.r_[-sp, numpy.full(n_windows, float(sp))])[1:]
+    stops = (starts + sw).astype(int) + 1
+    return starts.astype(int), stops
+
+
+def fcd_memory_size(n_time, n_node, sw, sp, chunk_size=CHUNK_SIZE, dtype=numpy.float64):
+    """
+    Upper bound of the memory in bytes required by `compute_fcd` for one state variable and mode.
+    """
+    n_windows = max(int((n_time - sw) / sp), 0)
+    n_pairs = n_node * (n_node - 1) // 2
+    n_open = int(numpy.ceil((sw + 1) / sp)) + 1
+    itemsize = numpy.dtype(dtype).itemsize
+    fc_size = n_windows * n_pairs * itemsize
+    fcd_size = n_windows ** 2 * itemsize
+    sums_size = (n_open + 2) * (n_pairs + 2 * n_node) * 8
+    chunk_size = min(chunk_size, n_time) * n_node * 8
+    return fc_size + fcd_size + sums_size + chunk_size
+
+
+def windowed_fc(read_data, n_time, sw, sp, chunk_size=CHUNK_SIZE, dtype=numpy.float64):
+    """
+    Compute the FC of all the sliding windows over a time series.
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    :param n_time: the number of time points of the time series
+    :param sw: the sliding window length, in time points
+    :param sp: the spanning between two consecutive windows, in time points
+    :param chunk_size: the number of time points read at once
+    :param dtype: the data type of the result
+    :returns: (n_windows, n_node * (n_node - 1) / 2) array, with the upper triangle of the FC of each window
+        (diagonal excluded), as `numpy.corrcoef(data.T)[numpy.triu_indices(n_node, 1)]` would give
+    """
+    starts, stops = sliding_windows(n_time, sw, sp)
+    reader = _ChunkReader(read_data, n_time, chunk_size)
+    n_node = reader.n_node
+    triu = numpy.triu_indices(n_node, 1)
+    diag = numpy.diag_indices(n_node)
+    fc = numpy.empty((len(starts), len(triu[0])), dtype)
+
+    # running sums since the first time point: sum of data, and of the outer products
+    # (the upper triangle, and the diagonal separately)
+    running = numpy.zeros(n_node), numpy.zeros(len(triu[0])), numpy.zeros(n_node)
+    prod = numpy.zeros((n_node, n_node))
+    opened = {}
+    position = 0
+    for boundary in numpy.unique(numpy.r_[starts, stops]):
+        if boundary > position:
+            data = reader.read(position, boundary)
+            numpy.dot(data.T, data, out=prod)
+            running[0][:] += data.sum(axis=0)
+            running[1][:] += prod[triu]
+            running[2][:] += prod[diag]
+            position = boundary
+        for win in numpy.flatnonzero(stops == boundary):
+            _window_fc(starts, stops, win, opened.pop(win), running, triu, fc)
+        for win in numpy.flatnonzero(starts == boundary):
+            opened[win] = tuple(arr.copy() for arr in running)
+    return fc
+
+
+def _window_fc(starts, stops, win, opened_sums, running, triu, fc):
+    n_samples = stops[win] - starts[win]
+    sums, prods, squares = [(now - then) / n_samples for now, then in zip(running, opened_sums)]
+    variances = squares - sums ** 2
+    covariances = prods - sums[triu[0]] * sums[triu[1]]
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        fc[win] = covariances / numpy.sqrt(variances[triu[0]] * variances[triu[1]])
+
+
+class _ChunkReader(object):
+    """
+    Serves consecutive time slices of a time series from blocks of time points read at once.
+    The data is shifted by the mean of the first block, which doesn't change correlations but keeps
+    the running sums well conditioned.
+    """
+
+    def __init__(self, read_data, n_time, chunk_size):
+        self.read_data = read_data
+        self.n_time = n_time
+        self.chunk_size = chunk_size
+        self.block_start = 0
+        self.block = self._read_block(0)
+        self.shift = self.block.mean(axis=0)
+        self.block = self.block - self.shift
+        self.n_node = self.block.shape[1]
+
+    def _read_block(self, start):
+        stop = min(start + self.chunk_size, self.n_time)
+        return numpy.asarray(self.read_data(start, stop), dtype=numpy.float64).reshape((stop - start, -1))
+
+    def read(self, start, stop):
+        parts = []
+        while start < stop:
+            offset = start - self.block_start
+            if not 0 <= offset < self.block.shape[0]:
+                self.block_start, offset = start, 0
+                self.block = self._read_block(start) - self.shift
+            part = self.block[offset:offset + stop - start]
+            parts.append(part)
+            start += part.shape[0]
+        return parts[0] if len(parts) == 1 else numpy.concatenate(parts)
+
+
+def fcd_from_fc(fc, dtype=numpy.float64):
+    """
+    Compute the FCD matrix, i.e. the Pearson correlation between the FC of all pairs of windows.
+
+    :param fc: (n_windows, n_pairs) array, as returned by `windowed_fc`
+    """
+    normalized = numpy.array(fc, dtype=dtype)
+    normalized -= normalized.mean(axis=1)[:, numpy.newaxis]
+    normalized /= numpy.sqrt((normalized ** 2).sum(axis=1))[:, numpy.newaxis]
+    fcd = numpy.dot(normalized, normalized.T)
+    numpy.clip(fcd, -1, 1, out=fcd)
+    return fcd
+
+
+def compute_fcd(read_data, n_time, sw, sp, chunk_size=CHUNK_SIZE, dtype=numpy.float64):
+    """
+    Compute the FCD matrix of a time series.
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    :param n_time: the number of time points of the time series
+    :param sw: the sliding window length, in time points
+    :param sp: the spanning between two consecutive windows, in time points
+    :param chunk_size: the number of time points read at once
+    :param dtype: the data type of the FC & FCD, numpy.float32 halves the memory required
+    :returns: (n_windows, n_windows) FCD matrix
+    """
+    fc = windowed_fc(read_data, n_time, sw, sp, chunk_size, dtype)
+    log.debug("FC stream of shape %s" % (fc.shape,))
+    return fcd_from_fc(fc, dtype)
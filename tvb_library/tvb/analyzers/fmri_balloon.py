@@ -55,12 +55,16 @@ References:
 
 """
 
+import numba
 import numpy
 
 import tvb.datatypes.time_series as time_series
 from tvb.basic.neotraits.api import HasTraits, TVBEnum, Attr, NArray, Range, Float, EnumAttr
 import tvb.simulator.integrators as integrators_module
 
+# Upper bound, in bytes, of a chunk of the neural input integrated at once
+CHUNK_MEMORY = 64 * 2 ** 20
+
 
 class NeuralInputTransformations(TVBEnum):
     ABS_DIFF = "abs_diff"
@@ -73,6 +77,50 @@ class BoldModels(TVBEnum):
     NONLINEAR = "nonlinear"
 
 
+@numba.njit(inline='always')
+def _balloon_dfun(s, f, v, q, x, kappa, gamma, tau_o, alpha, E0):
+    """
+    The Balloon model equations of `BalloonModel.balloon_dfun`, for one signal.
+    """
+    v_alpha = v ** (1. / alpha)
+    ds = x - kappa * s - gamma * (f - 1)
+    dv = (f - v_alpha) / tau_o
+    dq = ((f * (1. - (1. - E0) ** (1. / f)) / E0) - v_alpha * (q / v)) / tau_o
+    return ds, s, dv, dq
+
+
+@numba.njit(parallel=True, cache=True)
+def _integrate_balloon(neural_input, state, first_step, stride, dt, kappa, gamma, tau_o, alpha, E0,
+                       c_q, c_qv, c_v, bold):
+    """
+    Integrate the Balloon model with the deterministic Heun scheme, for a chunk of (time, signals)
+    neural input starting at step `first_step`, in parallel over the signals. The (4, signals) state
+    is updated in place, and the BOLD signal of every `stride` step is written into `bold`.
+    """
+    n_time, n_signal = neural_input.shape
+    first_out = (first_step + stride - 1) // stride
+    for i in numba.prange(n_signal):
+        s, f, v, q = state[0, i], state[1, i], state[2, i], state[3, i]
+        for t in range(n_time):
+            step = first_step + t
+            # the first step is the initial condition
+            if step > 0:
+                x = neural_input[t, i]
+                ds, df, dv, dq = _balloon_dfun(s, f, v, q, x, kappa, gamma, tau_o, alpha, E0)
+                ds2, df2, dv2, dq2 = _balloon_dfun(s + dt * ds, f + dt * df, v + dt * dv, q + dt * dq,
+                                                   x, kappa, gamma, tau_o, alpha, E0)
+                s += (ds + ds2) * dt / 2.0
+                f += (df + df2) * dt / 2.0
+                v += (dv + dv2) * dt / 2.0
+                q += (dq + dq2) * dt / 2.0
+            if step % stride == 0:
+                y = c_q * (1. - q) + c_v * (1. - v)
+                if c_qv != 0.0:
+                    y += c_qv * (1. - q / v)
+                bold[step // stride - first_out, i] = y
+        state[0, i], state[1, i], state[2, i], state[3, i] = s, f, v, q
+
+
 class BalloonModel(HasTraits):
     """
 
@@ -103,9 +151,12 @@ class BalloonModel(HasTraits):
         time courses of the balloon model state variables.""")
 
     bold_model = EnumAttr(
-        default=BoldModels.NONLINEAR,
+        default=BoldModels.LINEAR,
         label="Select BOLD model equations",
-        doc="""Select the set of equations for the BOLD model.""")
+        doc="""Select the set of equations for the BOLD model: ``linear`` computes the BOLD signal as
+        V0 * ((k1 + k2) * (1 - q) + (k3 - k2) * (1 - v)), linear in the deoxyhemoglobin content q and the
+        blood volume v, ``nonlinear`` as V0 * (k1 * (1 - q) + k2 * (1 - q / v) + k3 * (1 - v)),
+        see Eq. (13) in [Stephan2007]_.""")
 
     RBM = Attr(
         field_type=bool,
@@ -210,83 +261,136 @@ class BalloonModel(HasTraits):
         #      input is the sum over the state-variables. Only time-series
         #      from basic monitors should be used as inputs.
 
-        neural_activity, t_int = self.input_transformation(self.time_series, self.neural_input_transformation)
-        input_shape = neural_activity.shape
-        result_shape = self.result_shape(input_shape)
-        self.log.debug("Result shape will be: %s" % str(result_shape))
-
-        balloon_nvar = 4
-
-        # NOTE: hard coded initial conditions
-        state = numpy.zeros((input_shape[0], balloon_nvar, input_shape[2], input_shape[3]))  # s
-        state[0, 1, :] = 1.  # f
-        state[0, 2, :] = 1.  # v
-        state[0, 3, :] = 1.  # q
-
-        # BOLD model coefficients
-        k = self.compute_derived_parameters()
-        k1, k2, k3 = k[0], k[1], k[2]
+        data = self.time_series.data
+        t_int = self.integration_time(self.time_series)
+        self.log.debug("Result shape will be: %s" % str((t_int.shape[0], 1) + data.shape[2:]))
 
         # prepare integrator
         self.integrator.dt = 1. / self.time_series.sample_rate # s
-        self.integrator.configure()
         self.log.debug("Integration time step size will be: %s seconds" % str(self.integrator.dt))
 
-        scheme = self.integrator.scheme
+        y_b = numpy.concatenate(list(self.bold_signal_chunks(lambda start, stop: data[start:stop],
+                                                             data.shape[0], self.integrator.dt)))
+        self.log.debug("Max value: %s" % str(y_b.max()))
 
-        # NOTE: the following variables are not used in this integration but
-        # required due to the way integrators scheme has been defined.
-
-        local_coupling = 0.0
-        stimulus = 0.0
+        bold_signal = time_series.TimeSeriesRegion(
+            data=y_b,
+            time=t_int,
+            sample_period=self.integrator.dt, # s
+            sample_period_unit='s')
 
-        # Do some checks:
-        if numpy.isnan(neural_activity).any():
-            self.log.warning("NaNs detected in the neural activity!!")
+        return bold_signal
 
-        # normalise the time-series.
-        if self.normalize_neural_input:
-            neural_activity = neural_activity - neural_activity.mean(axis=0)[numpy.newaxis, :]
+    def bold_signal_chunks(self, read_data, n_time, dt, stride=1, chunk_memory=CHUNK_MEMORY):
+        """
+        Integrate the balloon model over a neural time series read in chunks of time points, all the nodes
+        at once, and yield the BOLD signal of each chunk, keeping one sample every `stride` integration steps.
 
-        # solve equations
-        for step in range(1, t_int.shape[0]):
-            state[step, :] = scheme(state[step - 1, :], self.balloon_dfun,
-                                    neural_activity[step, :], local_coupling, stimulus)
-            if numpy.isnan(state[step, :]).any():
-                self.log.warning("NaNs detected...")
+        The deterministic Heun scheme is compiled, and other integrators step through `balloon_dfun`.
 
-        # NOTE: just for the sake of clarity, define the variables used in the BOLD model
-        s = state[:, 0, :]
-        f = state[:, 1, :]
-        v = state[:, 2, :]
-        q = state[:, 3, :]
+        :param read_data: callable returning the (time, state-variables, nodes, modes) neural activity
+                          between a start and a stop time index
+        :param n_time: number of time points of the neural activity
+        :param dt: the integration step, which is the sample period of the neural activity, in seconds
+        """
+        self.integrator.dt = dt
+        self.integrator.configure()
+        # abs_diff needs one more input point than the integration steps
+        extra = 1 if self.neural_input_transformation == NeuralInputTransformations.ABS_DIFF else 0
+        n_steps = n_time - extra
+        first_chunk = self.transform_neural_input(read_data(0, min(1 + extra, n_time)))
+        n_signal = int(numpy.prod(first_chunk.shape[2:]))
+        # the input of a chunk, as read and transformed, and its BOLD signal
+        chunk = max(int(chunk_memory // (4 * 8 * n_signal)), 1)
 
+        # NOTE: hard coded initial conditions
+        state = numpy.zeros((4, n_signal))  # s
+        state[1:] = 1.  # f, v, q
 
-        # BOLD models
-        if self.bold_model == "nonlinear":
-            """
-            Non-linear BOLD model equations.
-            Page 391. Eq. (13) top in [Stephan2007]_
-            """
-            y_bold = numpy.array(self.V0 * (k1 * (1. - q) + k2 * (1. - q / v) + k3 * (1. - v)))
-            y_b = y_bold[:, numpy.newaxis, :, :]
-            self.log.debug("Max value: %s" % str(y_b.max()))
+        mean = 0.0
+        if self.normalize_neural_input:
+            mean = sum(self.transform_neural_input(read_data(start, min(start + chunk, n_steps) + extra)).sum(axis=0)
+                       for start in range(0, n_steps, chunk)) / n_steps
+
+        for start in range(0, n_steps, chunk):
+            stop = min(start + chunk, n_steps)
+            neural_activity = self.transform_neural_input(read_data(start, stop + extra)) - mean
+            # Do some checks:
+            if numpy.isnan(neural_activity).any():
+                self.log.warning("NaNs detected in the neural activity!!")
+            neural_activity = numpy.ascontiguousarray(neural_activity.reshape((stop - start, n_signal)),
+                                                      dtype=numpy.float64)
+            bold = numpy.empty((len(range(-(-start // stride) * stride, stop, stride)), n_signal))
+            self._integrate(neural_activity, state, start, stride, bold)
+            if numpy.isnan(bold).any():
+                self.log.warning("NaNs detected...")
+            yield bold.reshape((bold.shape[0], 1) + first_chunk.shape[2:])
 
+    def _integrate(self, neural_activity, state, first_step, stride, bold):
+        """
+        Integrate a chunk of (time, signals) neural activity, from the (4, signals) state, updated in place.
+        """
+        k1, k2, k3 = (numpy.squeeze(k) for k in self.compute_derived_parameters())
+        if self.bold_model == BoldModels.NONLINEAR:
+            # Non-linear BOLD model equations, page 391, Eq. (13) top in [Stephan2007]_
+            c_q, c_qv, c_v = self.V0 * k1, self.V0 * k2, self.V0 * k3
         else:
-            """
-            Linear BOLD model equations.
-            Page 391. Eq. (13) bottom in [Stephan2007]_ 
-            """
-            y_bold = numpy.array(self.V0 * ((k1 + k2) * (1. - q) + (k3 - k2) * (1. - v)))
-            y_b = y_bold[:, numpy.newaxis, :, :]
+            # Linear BOLD model equations, page 391, Eq. (13) bottom in [Stephan2007]_
+            c_q, c_qv, c_v = self.V0 * (k1 + k2), 0.0, self.V0 * (k3 - k2)
 
-        bold_signal = time_series.TimeSeriesRegion(
-            data=y_b,
-            time=t_int,
-            sample_period=self.integrator.dt, # s
-            sample_period_unit='s')
+        if self._is_compiled_integration(c_qv, c_v):
+            _integrate_balloon(neural_activity, state, first_step, stride, self.integrator.dt,
+                               1. / self.tau_s, 1. / self.tau_f, self.tau_o, self.alpha, self.E0,
+                               float(c_q), float(c_qv), float(c_v), bold)
+            return
 
-        return bold_signal
+        # NOTE: the following variables are not used in this integration but
+        # required due to the way integrators scheme has been defined.
+        local_coupling = 0.0
+        stimulus = 0.0
+        scheme = self.integrator.scheme
+        for t in range(neural_activity.shape[0]):
+            step = first_step + t
+            if step > 0:
+                state[:] = scheme(state, self.balloon_dfun, neural_activity[t][numpy.newaxis],
+                                  local_coupling, stimulus)
+            if step % stride == 0:
+                q, v = state[3], state[2]
+                bold[step // stride - (first_step + stride - 1) // stride] = (
+                    c_q * (1. - q) + c_v * (1. - v) + (c_qv * (1. - q / v) if numpy.any(c_qv) else 0.0))
+
+    def _is_compiled_integration(self, *coefficients):
+        """
+        Whether the compiled Heun scheme applies: the default integrator without boundaries nor clamping,
+        and scalar BOLD coefficients.
+        """
+        integrator = self.integrator
+        return (type(integrator) is integrators_module.HeunDeterministic
+                and integrator._integration_state_variable_boundaries is None
+                and integrator._clamped_integration_state_variable_values is None
+                and all(numpy.size(c) == 1 for c in coefficients))
+
+    def transform_neural_input(self, data):
+        """
+        Perform the operation of `neural_input_transformation` on (time, state-variables, nodes, modes)
+        data, keeping a single state variable.
+        """
+        if self.neural_input_transformation == NeuralInputTransformations.NONE:
+            return data[:, 0:1]
+        if self.neural_input_transformation == NeuralInputTransformations.ABS_DIFF:
+            return abs(numpy.diff(data[:, 0:1], axis=0))
+        if self.neural_input_transformation == NeuralInputTransformations.SUM:
+            return numpy.sum(data, axis=1)[:, numpy.newaxis]
+        raise Exception("Bad transformation mode")
+
+    def integration_time(self, time_series):
+        """
+        The time (s) of the integration steps, as computed by `input_transformation`.
+        """
+        unit_factor = time_series.sample_rate * time_series.sample_period
+        if self.neural_input_transformation == NeuralInputTransformations.ABS_DIFF:
+            return (time_series.time[1:] - time_series.time[0:-1]) / unit_factor  # (s)
+        return time_series.time / unit_factor  # (s)
 
     def compute_derived_parameters(self):
         """
@@ -37,6 +37,8 @@ Useful graph analyses.
 
 import numpy
 import networkx
+import scipy.sparse
+from scipy.sparse import csgraph
 
 
 def betweenness_bin(A):
@@ -65,6 +67,7 @@ def betweenness_bin(A):
     
     """
     
+    A   = _graph(A).A
     n   = len(A)
     I   = numpy.eye(n)        # logical ID matrix                                        
     d   = 1                   # path length
@@ -399,3 +402,747 @@ def sequential_targeted_deletion(white_matter, nor):
             
     return node_strength, node_degree, node_betweenness_centrality, global_efficiency, largest_component
 
+
+
+
+class GraphMeasures(object):
+    """
+    A connection matrix together with the intermediate results which several of its measures have in common
+    (binarized matrix, degrees, shortest paths, path dependencies, community structure...).
+
+    Each intermediate result is computed the first time a measure needs it, so that computing many measures
+    of the same matrix with `bct_measures` is a single pass over it.
+    """
+
+    def __init__(self, A):
+        self.A = numpy.array(A, dtype=numpy.float64)
+        if self.A.ndim != 2 or self.A.shape[0] != self.A.shape[1]:
+            raise ValueError('The input matrix is not square')
+        self.n = self.A.shape[0]
+        self._cache = {}
+
+    def _cached(self, key, compute, *args):
+        if key not in self._cache:
+            self._cache[key] = compute(*args)
+        return self._cache[key]
+
+    @property
+    def binary(self):
+        """ The binarized matrix, as floats. """
+        return self._cached('binary', lambda: (self.A != 0).astype(numpy.float64))
+
+    @property
+    def in_degree(self):
+        return self._cached('in_degree', lambda: self.binary.sum(axis=0))
+
+    @property
+    def out_degree(self):
+        return self._cached('out_degree', lambda: self.binary.sum(axis=1))
+
+    @property
+    def sparse(self):
+        return self._cached('sparse', scipy.sparse.csr_matrix, self.A)
+
+    def shortest_paths(self, weighted):
+        """
+        Shortest path lengths between all the nodes, with the matrix values as edge lengths when `weighted`,
+        otherwise counting the edges. Unreachable nodes are at infinite distance.
+        """
+        return self._cached(('shortest_paths', weighted), csgraph.shortest_path, self.sparse, 'D', True,
+                            False, not weighted)
+
+    def path_dependencies(self, weighted):
+        """
+        Node and edge betweenness centrality, see `_path_dependencies`.
+        """
+        if weighted:
+            return self._cached(('path_dependencies', True), _path_dependencies, self.binary != 0, self.A,
+                                self.shortest_paths(True))
+        return self._cached(('path_dependencies', False), _path_dependencies_bin, self.binary,
+                            self.shortest_paths(False))
+
+    def cycles(self, weighted):
+        """
+        Number of directed triangles around each node, number of all the possible ones and total degree,
+        as in BCT clustering_coef_bd (or clustering_coef_wd when `weighted`).
+        """
+        if weighted:
+            return self._cached(('cycles', True), _directed_cycles, numpy.cbrt(self.A), self.binary)
+        return self._cached(('cycles', False), _directed_cycles, self.A, self.A)
+
+    def eigen(self):
+        """
+        Eigenvalues and eigenvectors of the matrix, real when the matrix is symmetric.
+        """
+        return self._cached('eigen', _eigen, self.A)
+
+    def modularity(self, directed):
+        return self._cached(('modularity', directed), _modularity, self.A, directed)
+
+
+def _eigen(A):
+    if numpy.allclose(A, A.T):
+        return numpy.linalg.eigh(A)
+    return numpy.linalg.eig(A)
+
+
+def _directed_cycles(W, A):
+    # W: matrix of the triangle weights; A: matrix of the degrees
+    S = W + W.T
+    K = (A + A.T).sum(axis=1)
+    cyc3 = numpy.einsum('ij,ji->i', S.dot(S), S) / 2.0
+    CYC3 = K * (K - 1) - 2 * numpy.einsum('ij,ji->i', A, A)
+    return cyc3, CYC3, K
+
+
+def _path_dependencies(edges, lengths, D):
+    """
+    Brandes' accumulation of the shortest path dependencies, for all the source nodes at once.
+
+    :param edges: boolean connection matrix
+    :param lengths: matrix of the edge lengths
+    :param D: shortest path lengths between all the nodes
+    :returns: the node betweenness centrality vector and the edge betweenness centrality matrix
+    """
+    n = len(edges)
+    sources = numpy.arange(n)
+    # nodes in order of non-decreasing distance from each source; the source comes first
+    order = numpy.argsort(D, axis=1, kind='stable')
+    # incoming edges of each node
+    incoming = scipy.sparse.csc_matrix(numpy.where(edges, lengths, 0))
+
+    def predecessors(k):
+        # the (source, v) pairs for which v precedes w, the k-th closest node of source, on a shortest path
+        w = order[:, k]
+        counts = incoming.indptr[w + 1] - incoming.indptr[w]
+        source = numpy.repeat(sources, counts)
+        edge = numpy.arange(counts.sum()) + numpy.repeat(incoming.indptr[w] - numpy.cumsum(counts) + counts, counts)
+        v = incoming.indices[edge]
+        dw = D[source, w[source]]
+        candidates = D[source, v] + incoming.data[edge]
+        with numpy.errstate(invalid='ignore'):
+            shortest = numpy.isfinite(dw) & (numpy.abs(candidates - dw) <= 1e-12 * dw)
+        return source[shortest], v[shortest], w[source[shortest]]
+
+    # number of shortest paths from each source
+    sigma = numpy.eye(n)
+    for k in range(1, n):
+        source, v, _ = predecessors(k)
+        sigma[sources, order[:, k]] = numpy.bincount(source, weights=sigma[source, v], minlength=n)
+
+    dependency = numpy.zeros((n, n))
+    EBC = numpy.zeros((n, n))
+    for k in range(n - 1, 0, -1):
+        source, v, w = predecessors(k)
+        partial = sigma[source, v] / sigma[source, w] * (1 + dependency[source, w])
+        dependency[source, v] += partial
+        numpy.add.at(EBC, (v, w), partial)
+
+    BC = dependency.sum(axis=0) - dependency.diagonal()
+    return BC, EBC
+
+
+def _path_dependencies_bin(A, D):
+    """
+    Same as `_path_dependencies`, for edges of length one: all the nodes at the same distance from
+    their sources are processed together, with matrix products.
+    """
+    levels = [D == d for d in range(int(D[numpy.isfinite(D)].max()) + 1)]
+    # number of shortest paths from each source
+    sigma = numpy.eye(len(A))
+    for d in range(1, len(levels)):
+        sigma += (sigma * levels[d - 1]).dot(A) * levels[d]
+
+    dependency = numpy.zeros(sigma.shape)
+    EBC = numpy.zeros(sigma.shape)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        ratio = numpy.where(sigma > 0, 1 / sigma, 0)
+    for d in range(len(levels) - 1, 0, -1):
+        successors = (1 + dependency) * ratio * levels[d]
+        dependency += successors.dot(A.T) * sigma * levels[d - 1]
+        EBC += (sigma * levels[d - 1]).T.dot(successors)
+
+    BC = dependency.sum(axis=0) - dependency.diagonal()
+    return BC, EBC * A
+
+
+def _modularity(A, directed, gamma=1.0):
+    """
+    Newman's spectral community detection with Kernighan-Lin like fine-tuning, as in BCT modularity_und/dir.
+    """
+    N = len(A)
+    if directed:
+        Ki = A.sum(axis=0)
+        Ko = A.sum(axis=1)
+        m = Ki.sum()
+        b = A - gamma * numpy.outer(Ki, Ko) / m
+        B = b + b.T
+    else:
+        K = A.sum(axis=0)
+        m = K.sum()
+        B = A - gamma * numpy.outer(K, K) / m
+
+    Ci = numpy.ones(N, dtype=int)
+    cn = 1
+    U = [1, 0]          # unexamined communities
+    ind = numpy.arange(N)
+    Bg = B.copy()
+    Ng = N
+    while U[0]:
+        D, V = numpy.linalg.eigh(Bg)
+        v1 = V[:, numpy.argmax(D)]
+        S = numpy.ones(Ng)
+        S[v1 < 0] = -1
+        q = S.dot(Bg).dot(S)
+        if q > 1e-10:
+            # contribution positive: U[0] is divisible; fine-tune the split
+            qmax = q
+            Bg[numpy.diag_indices(Ng)] = 0
+            indg = numpy.ones(Ng)
+            Sit = S.copy()
+            for _ in range(Ng):
+                Qit = (qmax - 4 * Sit * Bg.dot(Sit)) * indg
+                imax = numpy.nanargmax(Qit)
+                qmax = Qit[imax]
+                Sit[imax] = -Sit[imax]
+                indg[imax] = numpy.nan
+                if qmax > q:
+                    q = qmax
+                    S = Sit.copy()
+            if abs(S.sum()) == Ng:
+                U.pop(0)
+            else:
+                cn += 1
+                Ci[ind[S == 1]] = U[0]
+                Ci[ind[S == -1]] = cn
+                U.insert(0, cn)
+        else:
+            U.pop(0)
+        ind = numpy.nonzero(Ci == U[0])[0]
+        bg = B[numpy.ix_(ind, ind)]
+        Bg = bg - numpy.diag(bg.sum(axis=0))
+        Ng = len(ind)
+
+    Q = B[Ci[:, numpy.newaxis] == Ci[numpy.newaxis, :]].sum() / (2 * m if directed else m)
+    return Ci, Q
+
+
+def _graph(A):
+    return A if isinstance(A, GraphMeasures) else GraphMeasures(A)
+
+
+def _matching_index(blocks):
+    """
+    Matching index of the columns of the stacked `blocks`, leaving out the rows of the compared nodes.
+    """
+    n = len(blocks[0])
+    common = numpy.zeros((n, n))
+    connections = numpy.zeros((n, n))
+    for X in blocks:
+        B = (X != 0).astype(numpy.float64)
+        b = B.diagonal()
+        x = X.diagonal()
+        s = X.sum(axis=0)
+        common += B.T.dot(B) - b[:, numpy.newaxis] * B - B.T * b[numpy.newaxis, :]
+        connections += s[:, numpy.newaxis] + s[numpy.newaxis, :] - x[:, numpy.newaxis] - x[numpy.newaxis, :] - X - X.T
+    M = numpy.zeros((n, n))
+    numpy.divide(2 * common, connections, out=M, where=connections != 0)
+    return numpy.triu(M, 1)
+
+
+def _reachability(g):
+    """
+    Distances as in BCT breadthdist: the shortest path lengths, with the length of the shortest cycle
+    through each node on the diagonal, and infinity for unreachable nodes.
+    """
+    D = g.shortest_paths(False).copy()
+    # a cycle through i is a path from i to a node u linking back to i
+    cycles = numpy.where(g.binary.T != 0, D + 1, numpy.inf).min(axis=1)
+    D[numpy.diag_indices(g.n)] = cycles
+    return numpy.isfinite(D).astype(numpy.float64), D
+
+
+def _participation(W, Ci):
+    communities = (Ci[:, numpy.newaxis] == numpy.arange(1, Ci.max() + 1)[numpy.newaxis, :]).astype(numpy.float64)
+    S = W.sum(axis=1)
+    Sc2 = (W.dot(communities) ** 2).sum(axis=1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return numpy.ones(len(W)) - Sc2 / S ** 2
+
+
+def degrees_und(CIJ):
+    """
+    Node degree (number of links) of an undirected (binary/weighted) connection matrix.
+    """
+    return _graph(CIJ).in_degree
+
+
+def degrees_dir(CIJ):
+    """
+    Node indegree, outdegree and degree (their sum) of a directed (binary/weighted) connection matrix.
+    """
+    g = _graph(CIJ)
+    return g.in_degree, g.out_degree, g.in_degree + g.out_degree
+
+
+def jdegree(CIJ):
+    """
+    Joint degree distribution of a directed connection matrix.
+
+    :returns: J, where J[i, j] is the number of nodes with indegree i and outdegree j, and the number of
+        nodes with outdegree > indegree, indegree > outdegree and indegree = outdegree
+    """
+    g = _graph(CIJ)
+    id_ = g.in_degree.astype(int)
+    od = g.out_degree.astype(int)
+    J = numpy.zeros((max(id_.max(initial=0), od.max(initial=0)) + 1,) * 2)
+    numpy.add.at(J, (id_, od), 1)
+    return J, numpy.triu(J, 1).sum(), numpy.tril(J, -1).sum(), numpy.trace(J)
+
+
+def matching_ind(CIJ):
+    """
+    Matching index of all the node pairs of a connection matrix: the proportion of their connections
+    (incoming, outgoing, or both) which go to or come from the same nodes.
+
+    :returns: Min, Mout, Mall; upper triangular matrices
+    """
+    A = _graph(CIJ).A
+    return _matching_index([A]), _matching_index([A.T]), _matching_index([A, A.T])
+
+
+def strengths_und(CIJ):
+    """
+    Node strength (sum of the link weights) of an undirected weighted connection matrix.
+    """
+    return _graph(CIJ).A.sum(axis=0)
+
+
+def strengths_dir(CIJ):
+    """
+    Node instrength, outstrength and strength (their sum) of a directed weighted connection matrix.
+    """
+    A = _graph(CIJ).A
+    is_, os_ = A.sum(axis=0), A.sum(axis=1)
+    return is_, os_, is_ + os_
+
+
+def strengths_und_sign(W):
+    """
+    Nodal strength of the positive and of the negative weights, and the total positive and negative weight,
+    of an undirected connection matrix with positive and negative weights. Self connections are ignored.
+    """
+    W = _graph(W).A.copy()
+    W[numpy.diag_indices(len(W))] = 0
+    Spos = (W * (W > 0)).sum(axis=0)
+    Sneg = (-W * (W < 0)).sum(axis=0)
+    return Spos, Sneg, Spos.sum(), Sneg.sum()
+
+
+def density_dir(CIJ):
+    """
+    Density (fraction of present connections to possible connections), number of nodes and number of edges
+    of a directed connection matrix.
+    """
+    A = _graph(CIJ).A
+    N = len(A)
+    K = numpy.count_nonzero(A)
+    return K / (N ** 2 - N), N, K
+
+
+def density_und(CIJ):
+    """
+    Density, number of nodes and number of edges of an undirected connection matrix.
+    """
+    A = _graph(CIJ).A
+    N = len(A)
+    K = numpy.count_nonzero(numpy.triu(A))
+    return K / ((N ** 2 - N) / 2), N, K
+
+
+def clustering_coef_bd(A):
+    """
+    Clustering coefficient of a binary directed connection matrix: the fraction of the triangles around each
+    node (the fraction of the node's neighbours that are neighbours of each other) which are present.
+
+    **References:** Fagiolo (2007) Phys Rev E 76:026107.
+    """
+    cyc3, CYC3, _ = _graph(A).cycles(False)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        C = cyc3 / CYC3
+    C[cyc3 == 0] = 0
+    return C
+
+
+def clustering_coef_bu(G):
+    """
+    Clustering coefficient of a binary undirected connection matrix.
+
+    **References:** Watts and Strogatz (1998) Nature 393:440-442.
+    """
+    g = _graph(G)
+    B = g.binary
+    k = B.sum(axis=1)
+    links = numpy.einsum('ij,ji->i', B.dot(g.A), B.T)
+    C = numpy.zeros(g.n)
+    numpy.divide(links, k ** 2 - k, out=C, where=k >= 2)
+    return C
+
+
+def clustering_coef_wu(W):
+    """
+    Clustering coefficient of a weighted undirected connection matrix, from the geometric mean of the
+    triangle weights.
+
+    **References:** Onnela et al. (2005) Phys Rev E 71:065103
+    """
+    g = _graph(W)
+    K = g.binary.sum(axis=1)
+    W3 = numpy.cbrt(g.A)
+    cyc3 = numpy.einsum('ij,ji->i', W3.dot(W3), W3)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        C = cyc3 / (K * (K - 1))
+    C[cyc3 == 0] = 0
+    return C
+
+
+def clustering_coef_wd(W):
+    """
+    Clustering coefficient of a weighted directed connection matrix.
+
+    **References:** Fagiolo (2007) Phys Rev E 76:026107.
+    """
+    cyc3, CYC3, _ = _graph(W).cycles(True)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        C = cyc3 / CYC3
+    C[cyc3 == 0] = 0
+    return C
+
+
+def transitivity_bd(A):
+    """
+    Transitivity (ratio of triangles to triplets) of a binary directed connection matrix.
+    """
+    cyc3, CYC3, _ = _graph(A).cycles(False)
+    return cyc3.sum() / CYC3.sum()
+
+
+def transitivity_wd(W):
+    """
+    Transitivity of a weighted directed connection matrix.
+    """
+    cyc3, CYC3, _ = _graph(W).cycles(True)
+    return cyc3.sum() / CYC3.sum()
+
+
+def transitivity_bu(A):
+    """
+    Transitivity of a binary undirected connection matrix.
+    """
+    A = _graph(A).A
+    A2 = A.dot(A)
+    return numpy.einsum('ij,ji->', A2, A) / (A2.sum() - numpy.trace(A2))
+
+
+def transitivity_wu(W):
+    """
+    Transitivity of a weighted undirected connection matrix.
+    """
+    g = _graph(W)
+    K = g.binary.sum(axis=1)
+    W3 = numpy.cbrt(g.A)
+    cyc3 = numpy.einsum('ij,ji->i', W3.dot(W3), W3)
+    return cyc3.sum() / (K * (K - 1)).sum()
+
+
+def distance_bin(A):
+    """
+    Distance matrix (lengths of the shortest paths, in number of edges) of a binary connection matrix.
+    Unreachable nodes are at infinite distance.
+    """
+    return _graph(A).shortest_paths(False).copy()
+
+
+def distance_wei(L):
+    """
+    Distance matrix of a weighted connection-length matrix, with Dijkstra's algorithm.
+
+    :returns: D, the shortest path lengths, and B, the number of edges of the shortest paths
+    """
+    g = _graph(L)
+    D, predecessors = csgraph.shortest_path(g.sparse, 'D', directed=True, return_predecessors=True)
+    # number of edges, from the depth of each node in the shortest path trees
+    rows = numpy.arange(g.n)[:, numpy.newaxis]
+    B = numpy.zeros((g.n, g.n))
+    known = predecessors < 0
+    while not known.all():
+        parents = numpy.maximum(predecessors, 0)
+        ready = ~known & known[rows, parents]
+        B[ready] = B[rows, parents][ready] + 1
+        known |= ready
+    return D, B
+
+
+def breadthdist(CIJ):
+    """
+    Reachability and distance matrices of a binary connection matrix, from breadth-first searches.
+    The diagonal holds the length of the shortest cycle through each node.
+    """
+    return _reachability(_graph(CIJ))
+
+
+def reachdist(CIJ):
+    """
+    Reachability and distance matrices of a binary connection matrix. These are the matrices that BCT finds
+    by algebraic path counts, computed here with breadth-first searches, as in `breadthdist`.
+    """
+    return _reachability(_graph(CIJ))
+
+
+def findwalks(CIJ):
+    """
+    Walks of every length up to the number of nodes, in a (binarized) connection matrix.
+
+    :returns: Wq, where Wq[i, j, q-1] is the number of walks of length q from i to j; the total number
+        of walks; and the number of walks of each length
+    """
+    g = _graph(CIJ)
+    Wq = numpy.zeros((g.n, g.n, g.n))
+    power = g.binary
+    Wq[:, :, 0] = power
+    for q in range(1, g.n):
+        power = power.dot(g.binary)
+        Wq[:, :, q] = power
+    return Wq, Wq.sum(), Wq.sum(axis=(0, 1))
+
+
+def betweenness_wei(G):
+    """
+    Node betweenness centrality of a weighted connection-length matrix: the number of shortest paths
+    which contain each node.
+
+    **References:** Brandes (2001) J Math Sociol 25:163-177.
+    """
+    return _graph(G).path_dependencies(True)[0]
+
+
+def edge_betweenness_bin(G):
+    """
+    Edge and node betweenness centrality of a binary connection matrix.
+
+    **References:** Brandes (2001) J Math Sociol 25:163-177.
+    """
+    BC, EBC = _graph(G).path_dependencies(False)
+    return EBC, BC
+
+
+def edge_betweenness_wei(G):
+    """
+    Edge and node betweenness centrality of a weighted connection-length matrix.
+
+    **References:** Brandes (2001) J Math Sociol 25:163-177.
+    """
+    BC, EBC = _graph(G).path_dependencies(True)
+    return EBC, BC
+
+
+def eigenvector_centrality_und(CIJ):
+    """
+    Eigenvector centrality of an undirected connection matrix: the (absolute values of the) eigenvector
+    of its largest eigenvalue.
+    """
+    D, V = _graph(CIJ).eigen()
+    return numpy.abs(V[:, numpy.argmax(D.real)])
+
+
+def _kcoreness(A, undirected):
+    N = len(A)
+    if undirected and (A + A.T > 1).any():
+        A = (A + A.T > 0).astype(numpy.float64)
+    coreness = numpy.zeros(N)
+    kn = numpy.zeros(N)
+    # each k-core is peeled from the (k-1)-core
+    core = A.copy()
+    for k in range(1, N + 1):
+        while True:
+            links = core != 0
+            deg = links.sum(axis=0) if undirected else links.sum(axis=0) + links.sum(axis=1)
+            peel = (deg < k) & (deg > 0)
+            if not peel.any():
+                break
+            core[peel, :] = 0
+            core[:, peel] = 0
+        kn[k - 1] = (deg > 0).sum()
+        if not kn[k - 1]:
+            break
+        coreness[core.sum(axis=0) > 0] = k
+    return coreness, kn
+
+
+def kcoreness_centrality_bu(CIJ):
+    """
+    k-coreness of the nodes of a binary undirected connection matrix: the largest k for which the node
+    belongs to the k-core, the subgraph in which all nodes have degree at least k.
+
+    :returns: the coreness of each node and the size of the k-core for each k
+    """
+    return _kcoreness(_graph(CIJ).A, True)
+
+
+def kcoreness_centrality_bd(CIJ):
+    """
+    k-coreness of the nodes of a binary directed connection matrix, the k-cores being defined on the
+    total (in + out) degree.
+
+    :returns: the coreness of each node and the size of the k-core for each k
+    """
+    return _kcoreness(_graph(CIJ).A, False)
+
+
+def erange(CIJ):
+    """
+    Range of the edges of a binary directed connection matrix: the length of the shortest path from i to j
+    when the edge (i, j) is removed. Edges with range larger than two are shortcuts.
+
+    :returns: Erange, the range of each edge; eta, the average finite range; Eshort, the shortcuts; and
+        fs, the fraction of shortcuts among the edges
+    """
+    g = _graph(CIJ)
+    Erange = numpy.zeros((g.n, g.n))
+    for i in range(g.n):
+        targets = numpy.nonzero(g.A[i] == 1)[0]
+        if not len(targets):
+            continue
+        # without its edge to j, a shortest path from i to j goes through one of the other neighbours of i
+        # and never comes back to i
+        neighbours = numpy.nonzero(g.binary[i])[0]
+        neighbours = neighbours[neighbours != i]
+        if not len(neighbours):
+            Erange[i, targets] = numpy.inf
+            continue
+        columns = numpy.ones(g.n)
+        columns[i] = 0
+        without_i = g.sparse.dot(scipy.sparse.diags(columns)).tocsr()
+        without_i.eliminate_zeros()
+        D = csgraph.shortest_path(without_i, 'D', True, False, True, indices=neighbours)
+        # paths back to i itself, for a self connection
+        D[:, i] = g.shortest_paths(False)[neighbours, i]
+        for j in targets:
+            Erange[i, j] = 1 + D[neighbours != j, j].min(initial=numpy.inf)
+    finite = Erange[(Erange > 0) & (Erange < numpy.inf)]
+    eta = finite.mean() if len(finite) else numpy.nan
+    Eshort = Erange > 2
+    K = numpy.count_nonzero(g.A)
+    return Erange, eta, Eshort, numpy.count_nonzero(Eshort) / K if K else numpy.nan
+
+
+def flow_coef_bd(CIJ):
+    """
+    Flow coefficient of the nodes of a binary directed connection matrix: the fraction of the paths of
+    length two through each node, between its neighbours, which are not short-cut by a direct connection.
+
+    :returns: the flow coefficient of each node, its average and the number of paths through each node
+    """
+    A = _graph(CIJ).A
+    N = len(A)
+    fc = numpy.zeros(N)
+    total_flo = numpy.zeros(N)
+    for v in range(N):
+        nb = numpy.nonzero(A[v, :] + A[:, v])[0]
+        if not len(nb):
+            continue
+        flo = -A[numpy.ix_(nb, nb)] + numpy.outer(A[nb, v] == 1, A[v, nb] == 1)
+        total_flo[v] = ((flo == 1) & ~numpy.eye(len(nb), dtype=bool)).sum()
+        max_flo = len(nb) ** 2 - len(nb)
+        fc[v] = total_flo[v] / max_flo if max_flo else 0
+    return fc, fc.mean(), total_flo
+
+
+def participation_coef(W, Ci=None):
+    """
+    Participation coefficient of the nodes of a connection matrix: how evenly the connections of each node
+    are distributed among the communities.
+
+    :param Ci: community affiliation vector (1-based); by default the optimal community structure
+        of `modularity_dir`
+
+    **References:** Guimera and Amaral (2005) Nature 433:895-900.
+    """
+    g = _graph(W)
+    if Ci is None:
+        Ci = g.modularity(True)[0]
+    P = _participation(g.A, numpy.asarray(Ci, dtype=int).ravel())
+    P[g.A.sum(axis=1) == 0] = 0
+    return P
+
+
+def participation_coef_sign(W, Ci=None):
+    """
+    Participation coefficient of the nodes of a connection matrix, from its positive and from its negative
+    weights. See `participation_coef`.
+    """
+    g = _graph(W)
+    if Ci is None:
+        Ci = g.modularity(True)[0]
+    Ci = numpy.asarray(Ci, dtype=int).ravel()
+    Ppos = _participation(g.A * (g.A > 0), Ci)
+    Pneg = _participation(-g.A * (g.A < 0), Ci)
+    for P in (Ppos, Pneg):
+        P[numpy.isnan(P)] = 0
+    return Ppos, Pneg
+
+
+def subgraph_centrality(CIJ):
+    """
+    Subgraph centrality of the nodes of an undirected connection matrix: the weighted sum of the closed
+    walks of every length starting and ending at each node.
+
+    **References:** Estrada and Rodriguez-Velazquez (2005) Phys Rev E 71:056103.
+    """
+    D, V = _graph(CIJ).eigen()
+    return (V ** 2).dot(numpy.exp(D)).real
+
+
+def modularity_und(A):
+    """
+    Optimal community structure and maximized modularity of an undirected connection matrix.
+
+    :returns: Ci, the community (1-based) of each node, and Q, the modularity
+    **References:** Newman (2006) PNAS 103:8577-8582.
+    """
+    return _graph(A).modularity(False)
+
+
+def modularity_dir(A):
+    """
+    Optimal community structure and maximized modularity of a directed connection matrix.
+
+    :returns: Ci, the community (1-based) of each node, and Q, the modularity
+    **References:** Leicht and Newman (2008) Phys Rev Lett 100:118703.
+    """
+    return _graph(A).modularity(True)
+
+
+# Brain Connectivity Toolbox functions implemented here, by name
+BCT_MEASURES = dict((f.__name__, f) for f in [
+    degrees_und, degrees_dir, jdegree, matching_ind, strengths_und, strengths_dir, strengths_und_sign,
+    density_dir, density_und, clustering_coef_bd, clustering_coef_bu, clustering_coef_wu, clustering_coef_wd,
+    transitivity_bd, transitivity_wd, transitivity_bu, transitivity_wu, distance_bin, distance_wei, breadthdist,
+    reachdist, findwalks, betweenness_bin, betweenness_wei, edge_betweenness_bin, edge_betweenness_wei,
+    eigenvector_centrality_und, kcoreness_centrality_bu, kcoreness_centrality_bd, erange, flow_coef_bd,
+    participation_coef, participation_coef_sign, subgraph_centrality, modularity_und, modularity_dir])
+
+
+def bct_measures(A, names):
+    """
+    Compute several Brain Connectivity Toolbox measures of the same connection matrix in one pass,
+    sharing their intermediate results.
+
+    >>> degree, (Ci, Q), P = bct_measures(weights, ['degrees_und', 'modularity_dir', 'participation_coef'])
+
+    :param A: the connection matrix
+    :param names: names of the BCT functions, see `BCT_MEASURES`
+    :returns: the result of each function, in the order of `names`
+    """
+    g = GraphMeasures(A)
+    return [BCT_MEASURES[name](g) for name in names]
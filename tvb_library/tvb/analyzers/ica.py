@@ -39,6 +39,7 @@ IndependentComponents datatype.
 import numpy
 import tvb.datatypes.mode_decompositions as mode_decompositions
 from tvb.analyzers.ica_algorithm import fastica
+from tvb.analyzers.pca import CHUNK_MEMORY, PCAMethods, chunk_size, principal_axes
 
 
 """
@@ -57,9 +58,48 @@ See also: http://scikit-learn.org/stable/modules/generated/sklearn.decomposition
 """
 
 
-def compute_ica_decomposition(time_series, n_components):
+def _check_components(n_time, n_comp):
+    if n_time < n_comp:
+        msg = ("ICA requires more time points (received %d) than number of components (received %d)."
+               " Please run a longer simulation, use a higher sampling frequency or specify a lower"
+               " number of components to extract.")
+        msg %= n_time, n_comp
+        raise ValueError(msg)
+
+
+def streamed_fastica(read_data, n_time, n_node, n_components=None, method=PCAMethods.COVARIANCE,
+                     random_state=None, chunk_memory=CHUNK_MEMORY):
+    """
+    Run FastICA on a time series read in chunks of time points. The data is whitened with the leading
+    principal axes of the streamed PCA, and only the whitened data, `n_components` values per time point,
+    is kept in memory for the FastICA iterations.
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    :param method: `PCAMethods.COVARIANCE` or `PCAMethods.RANDOMIZED`, see `principal_axes`
+    :return: the pre-whitening matrix, the unmixing matrix and the (time, component) sources, as `fastica`
     """
-    # type: (TimeSeries, int) -> IndependentComponents
+    n_comp = n_components or n_node
+    _check_components(n_time, n_comp)
+
+    mean, _, variances, axes = principal_axes(read_data, n_time, n_node, n_comp, method, standardize=False,
+                                              random_state=random_state, chunk_memory=chunk_memory)
+    # same scaling as the whitening of fastica, from the singular values of the centered data
+    K = axes / numpy.sqrt(variances * n_time)[:, numpy.newaxis]
+
+    whitened = numpy.empty((n_comp, n_time))
+    step = chunk_size(n_node, chunk_memory)
+    for start in range(0, n_time, step):
+        stop = min(start + step, n_time)
+        whitened[:, start:stop] = numpy.dot(K, (numpy.asarray(read_data(start, stop)) - mean).T)
+    whitened *= numpy.sqrt(n_time)
+
+    _, W, _ = fastica(whitened.T, whiten=False, random_state=random_state, compute_sources=False)
+    return K, W, numpy.dot(W, whitened).T / numpy.sqrt(n_time)
+
+
+def compute_ica_decomposition(time_series, n_components, method=PCAMethods.SVD):
+    """
+    # type: (TimeSeries, int, PCAMethods) -> IndependentComponents
     Run FastICA on the given time series data.
 
     Parameters
@@ -70,6 +110,9 @@ def compute_ica_decomposition(time_series, n_components):
 
     n_components : int
     Number of principal components to unmix.
+
+    method : PCAMethods
+    How the data is whitened: SVD of the whole data, or one of the streamed methods of `principal_axes`.
     """
 
     # problem dimensions
@@ -77,12 +120,7 @@ def compute_ica_decomposition(time_series, n_components):
     n_time, n_svar, n_node, n_mode = data.shape
     n_components = n_comp = n_components or n_node
 
-    if n_time < n_comp:
-        msg = ("ICA requires more time points (received %d) than number of components (received %d)."
-               " Please run a longer simulation, use a higher sampling frequency or specify a lower"
-               " number of components to extract.")
-        msg %= n_time, n_comp
-        raise ValueError(msg)
+    _check_components(n_time, n_comp)
 
     # ICA operates on matrices, here we perform for all state variables and modes
     W = numpy.zeros((n_comp, n_comp, n_svar, n_mode))  # unmixing
@@ -92,7 +130,12 @@ def compute_ica_decomposition(time_series, n_components):
     for mode in range(n_mode):
         for var in range(n_svar):
             sl = Ellipsis, var, mode
-            K[sl], W[sl], src[sl] = fastica(data[:, var, :, mode], n_components)
+            if method == PCAMethods.SVD:
+                K[sl], W[sl], src[sl] = fastica(data[:, var, :, mode], n_components)
+            else:
+                node_data = data[:, var, :, mode]
+                K[sl], W[sl], src[sl] = streamed_fastica(lambda start, stop: node_data[start:stop], n_time, n_node,
+                                                         n_comp, method)
 
     return mode_decompositions.IndependentComponents(source=time_series, component_time_series=src,
                                                      prewhitening_matrix=K, unmixing_matrix=W, n_components=n_comp)
@@ -47,13 +47,20 @@
 
 """
 
+import math
 import warnings
+import numba
 import numpy
 from scipy import linalg
 from scipy._lib._util import check_random_state
 from six import moves
 from six import string_types
 
+# Codes of the non-linear functions of the compiled kernel
+_LOGCOSH, _EXP, _CUBE = 0, 1, 2
+# Number of samples of a row handled by one task of the compiled kernel
+_BLOCK_SIZE = 4096
+
 
 def _sym_decorrelation(W):
     """ Symmetric decorrelation
@@ -85,7 +92,7 @@ def _ica_def(X, tol, g, fun_args, max_iter, w_init):
         for i in moves.xrange(max_iter):
             gwtx, g_wtx = g(numpy.dot(w.T, X), fun_args)
 
-            w1 = (X * gwtx).mean(axis=1) - g_wtx.mean() * w
+            w1 = numpy.dot(X, gwtx) / X.shape[1] - g_wtx.mean() * w
 
             w1 -= numpy.dot(numpy.dot(w1, W[:j].T), W[:j])
 
@@ -131,28 +138,65 @@ def _ica_par(X, tol, g, fun_args, max_iter, w_init):
     return W, ii + 1
 
 
+@numba.njit(parallel=True, cache=True)
+def _nonlinearity_kernel(x, fun, alpha):
+    """
+    Replace, in place, each value of the (rows, samples) array x by the non-linear function g,
+    and return the mean of its derivative g' over each row.
+
+    Rows are split in blocks of samples, so that the work is spread over the threads for
+    a few rows, or a single one, as well as for many.
+    """
+    n_row, n_sample = x.shape
+    n_block = (n_sample + _BLOCK_SIZE - 1) // _BLOCK_SIZE
+    partial_sums = numpy.zeros((n_row, n_block))
+    for task in numba.prange(n_row * n_block):
+        row = task // n_block
+        block = task % n_block
+        derivative_sum = 0.0
+        if fun == _LOGCOSH:
+            for t in range(block * _BLOCK_SIZE, min((block + 1) * _BLOCK_SIZE, n_sample)):
+                # tanh from a single exp, which is cheaper than the libm tanh
+                exp = math.exp(-2.0 * abs(alpha * x[row, t]))
+                gx = math.copysign((1.0 - exp) / (1.0 + exp), x[row, t])
+                x[row, t] = gx
+                derivative_sum += alpha * (1.0 - gx * gx)
+        elif fun == _EXP:
+            for t in range(block * _BLOCK_SIZE, min((block + 1) * _BLOCK_SIZE, n_sample)):
+                value = x[row, t]
+                exp = math.exp(-value * value / 2.0)
+                x[row, t] = value * exp
+                derivative_sum += (1.0 - value * value) * exp
+        else:
+            for t in range(block * _BLOCK_SIZE, min((block + 1) * _BLOCK_SIZE, n_sample)):
+                value = x[row, t]
+                x[row, t] = value * value * value
+                derivative_sum += 3.0 * value * value
+        partial_sums[row, block] = derivative_sum
+    return partial_sums.sum(axis=1) / n_sample
+
+
+def _apply_nonlinearity(x, fun, alpha=1.0):
+    """
+    Evaluate g(x), in place when x is contiguous, and the row means of g'(x), for one or two dimensional x.
+    """
+    x = numpy.ascontiguousarray(x)
+    g_x = _nonlinearity_kernel(x.reshape((-1, x.shape[-1])), fun, alpha)
+    return x, g_x
+
+
 # Some standard non-linear functions.
 def _logcosh(x, fun_args=None):
     alpha = fun_args.get('alpha', 1.0)  # comment it out?
-
-    x *= alpha
-    gx = numpy.tanh(x, x)  # apply the tanh inplace
-    g_x = numpy.empty(x.shape[0])
-    # XXX compute in chunks to avoid extra allocation
-    for i, gx_i in enumerate(gx):  # please don't vectorize.
-        g_x[i] = (alpha * (1 - gx_i ** 2)).mean()
-    return gx, g_x
+    return _apply_nonlinearity(x, _LOGCOSH, alpha)
 
 
 def _exp(x, fun_args):
-    exp = numpy.exp(-(x ** 2) / 2)
-    gx = x * exp
-    g_x = (1 - x ** 2) * exp
-    return gx, g_x.mean(axis=-1)
+    return _apply_nonlinearity(x, _EXP)
 
 
 def _cube(x, fun_args):
-    return x ** 3, (3 * x ** 2).mean(axis=-1)
+    return _apply_nonlinearity(x, _CUBE)
 
 
 def fastica(X, n_components=None, algorithm="parallel", whiten=True,
@@ -33,17 +33,110 @@ This module implements information theoretic analyses.
 
 TODO: Fix docstring of sampen
 TODO: Convert sampen to a traited class
-TODO: Fix compatibility with  Python 3 and recent numpy
 
 .. moduleauthor:: Marmaduke Woodman <marmaduke.woodman@univ-amu.fr>
 
 """
+import numba
 import numpy
+from tvb.basic.logger.builder import get_logger
 
+log = get_logger(__name__)
 
-def sampen(y, m=2, r=None, qse=False, taus=1, info=False,
-           tile=numpy.tile, na=numpy.newaxis, abs=numpy.abs,
-           log=numpy.log, r_=numpy.r_):
+
+@numba.njit(cache=True)
+def _match_counts(y, m, r):
+    """
+    Count the pairs of templates of y, of length m and m + 1, matching within r (Chebyshev distance).
+
+    Templates are visited in the order of their first value, so that only the pairs whose first
+    values are closer than r are compared, instead of all of them.
+    """
+    n = y.size
+    n_templates = n - m + 1
+    c1 = 0
+    c2 = 0
+    if n_templates < 2:
+        return c1, c2
+    order = numpy.argsort(y[:n_templates])
+    for i in range(n_templates - 1):
+        a = order[i]
+        for j in range(i + 1, n_templates):
+            b = order[j]
+            if y[b] - y[a] >= r:
+                break
+            match = True
+            for k in range(1, m):
+                if abs(y[a + k] - y[b + k]) >= r:
+                    match = False
+                    break
+            if match:
+                c1 += 1
+                # the m + 1 long templates are one less
+                if a < n - m and b < n - m and abs(y[a + m] - y[b + m]) < r:
+                    c2 += 1
+    return c1, c2
+
+
+@numba.njit(parallel=True, cache=True)
+def _node_match_counts(data, m, r):
+    """
+    `_match_counts` of each row of data, in parallel.
+    """
+    counts = numpy.zeros((data.shape[0], 2), dtype=numpy.int64)
+    for node in numba.prange(data.shape[0]):
+        c1, c2 = _match_counts(data[node], m, r[node])
+        counts[node, 0] = c1
+        counts[node, 1] = c2
+    return counts
+
+
+def coarse_grain(data, tau):
+    """
+    Average consecutive, non overlapping, windows of tau time points of (time, ...) data.
+    """
+    n_time = data.shape[0] // tau * tau
+    return data[:n_time].reshape((-1, tau) + data.shape[1:]).mean(axis=1)
+
+
+def sample_entropy(data, m=2, r=None, qse=False, taus=1, info=False):
+    """
+    Computes the (quadratic) sample entropy of all the signals of `data`, shaped (time, nodes) or (time,),
+    at all the scale factors `taus`, with the same definitions as `sampen`. The match counts are computed
+    by a compiled kernel, in parallel across nodes.
+
+    If no value for r is given, it will be set to 0.15 times the standard deviation of each signal.
+
+    :return: the entropies, shaped (scales, nodes) when `taus` is a sequence, or (nodes,); without the
+             nodes axis for one dimensional data. With `info`, also the probabilities and the m + 1 and m
+             match counts, with the same shape.
+    """
+    data = numpy.asarray(data, dtype=numpy.float64)
+    signals = data.reshape((data.shape[0], -1))
+    scales = numpy.atleast_1d(numpy.asarray(taus)).astype(int)
+
+    r = 0.15 * signals.std(axis=0) if r is None else numpy.broadcast_to(numpy.asarray(r, dtype=float),
+                                                                           signals.shape[1:])
+    counts = numpy.array([_node_match_counts(numpy.ascontiguousarray(coarse_grain(signals, tau).T), m, r)
+                          for tau in scales])
+    c1, c2 = counts[..., 0], counts[..., 1]
+
+    # ref 2, last paragraph of methods, warn inaccurate estimate
+    if (c2 < 5).any():
+        log.warning("m+1 template match count is low (< 5) for %d signals and scales" % (c2 < 5).sum())
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        p = c2 * 1.0 / c1
+        e = -numpy.log(p / (2 * r) if qse else p)
+
+    shape = (() if numpy.ndim(taus) == 0 else scales.shape) + data.shape[1:]
+    if info:
+        return e.reshape(shape)[()], p.reshape(shape)[()], c2.reshape(shape)[()], c1.reshape(shape)[()]
+    else:
+        return e.reshape(shape)[()]
+
+
+def sampen(y, m=2, r=None, qse=False, taus=1, info=False):
     """
     Computes (quadratic) sample entropy of a given input signal y, with
     embedding dimension n, and a match tolerance of r (ref 2). If an array
@@ -58,6 +151,8 @@ def sampen(y, m=2, r=None, qse=False, taus=1, info=False,
     of r, giving the quadratic sample entropy, such that results from different
     values of r can be meaningfully compared (ref 2).
 
+    See `sample_entropy` for several signals at once.
+
     ref 1: Costa, M., Goldberger, A. L., and Peng C.-K. (2002) Multiscale Entropy
             Analysis of Complex Physiologic Time Series. Phys Rev Lett 89 (6).
 
@@ -70,43 +165,7 @@ def sampen(y, m=2, r=None, qse=False, taus=1, info=False,
     >>> sampen(numpy.random.randn(3*10000), r=.15, taus=numpy.r_[1:20], qse=False, m=2)
 
     """
-
-    # if multiple scales given, run on each
-    if type(taus) in (list, numpy.ndarray):
-        return numpy.array([sampen(y, m=m, r=r, qse=qse, taus=int(tau)) for tau in taus])
-
-    # helper function to reformat arrays for matching
-    subseq = lambda y, n: y[tile(r_[0:n], (y.size - n + 1, 1)) + r_[0:y.size - n + 1][:, na]]
-
-    # default value of r
-    if r is None:
-        r = 0.15 * y.std()
-
-    # if we have a scale factor, coarsen time series 
-    if taus > 1:
-        y = y[:y.shape[0] // taus * taus].reshape((-1, taus)).mean(axis=1)
-
-    # compute embedding of signal dims m, m+1, initialize match counts to 0
-    Y1 = subseq(y, m)
-    Y2 = subseq(y, m + 1)
-    c1 = 0
-    c2 = 0
-
-    # check for matches
-    for i in range(Y1.shape[0] - 1):
-        c1 += (abs(tile(Y1[i], (Y1.shape[0] - i - 1, 1)) - Y1[i + 1:]) < r).all(axis=1).sum()
-
-    for i in range(Y2.shape[0] - 1):
-        c2 += (abs(tile(Y2[i], (Y2.shape[0] - i - 1, 1)) - Y2[i + 1:]) < r).all(axis=1).sum()
-
-    # ref 2, last paragraph of methods, warn inaccurate estimate
-    if c2 < 5:
-        print("m+1 template match count is low, %d < 5" % c2)
-
-    p = c2 * 1.0 / c1
-    e = -log(p / (2 * r) if qse else p)
-
-    if info:
-        return e, p, c2, c1
-    else:
-        return e
+    y = numpy.asarray(y)
+    if y.ndim != 1:
+        raise ValueError("sampen expects a single signal, use sample_entropy for several of them.")
+    return sample_entropy(y, m=m, r=r, qse=qse, taus=taus, info=info)
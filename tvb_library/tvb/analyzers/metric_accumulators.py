@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Compute the global metrics of a TimeSeries (Kuramoto index, proxy metastability and synchrony,
+global variance and variance of node variance) together, in a single pass over chunks of time
+points, so that the memory used grows with the number of nodes but not with the length of the
+time series.
+
+"""
+
+import numpy
+from tvb.basic.logger.builder import get_logger
+
+# Upper bound, in bytes, of the chunk of time points read at once
+CHUNK_MEMORY = 64 * 2 ** 20
+
+KURAMOTO_INDEX = "KuramotoIndex"
+PROXY_METASTABILITY = "ProxyMetastabilitySynchrony"
+GLOBAL_VARIANCE = "GlobalVariance"
+VARIANCE_OF_NODE_VARIANCE = "VarianceNodeVariance"
+METRICS = (GLOBAL_VARIANCE, KURAMOTO_INDEX, PROXY_METASTABILITY, VARIANCE_OF_NODE_VARIANCE)
+
+log = get_logger(__name__)
+
+
+class Moments(object):
+    """
+    Running mean and sum of squared deviations over time of an array of signals. Each chunk is
+    merged with the pairwise update of Chan et al., the batched form of Welford's algorithm.
+    """
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = numpy.zeros(shape)
+        self.m2 = numpy.zeros(shape)
+
+    def update(self, chunk):
+        n_chunk = chunk.shape[0]
+        if n_chunk == 0:
+            return
+        chunk_mean = chunk.mean(axis=0)
+        delta = chunk_mean - self.mean
+        total = self.count + n_chunk
+        self.m2 += ((chunk - chunk_mean) ** 2).sum(axis=0) + delta ** 2 * (self.count * n_chunk / total)
+        self.mean += delta * (n_chunk / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        return self.m2 / self.count
+
+
+class KuramotoOrder(object):
+    """
+    Running time average of the modulus :math:`r` of the Kuramoto order parameter
+
+    .. math::
+        r(t) e^{i \\psi(t)} = \\frac{1}{N}\\,\\sum_{k=1}^N e^{i \\theta_k(t)}
+
+    the phase :math:`\\theta_k` of node k being that of its first two state variables (of the
+    first mode), taken as the real and imaginary parts of a complex signal.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, chunk):
+        phases = numpy.angle(chunk[:, 0, :, 0] + 1j * chunk[:, 1, :, 0])
+        self.total += numpy.abs(numpy.exp(1j * phases).mean(axis=1)).sum()
+        self.count += chunk.shape[0]
+
+    @property
+    def index(self):
+        return self.total / self.count
+
+
+def spatial_coherence(data):
+    """
+    The proxy of spatial coherence V(t) of Hellyer et al. (2014): the mean over nodes of the absolute
+    deviation from the mean over nodes, for each time point, state variable and mode.
+    """
+    return numpy.abs(data - data.mean(axis=2, keepdims=True)).mean(axis=2)
+
+
+def start_time_point(n_time, sample_period, start_point, segment):
+    """
+    The index of the first time point used by the metrics. The first `start_point` ms are discarded,
+    or, when the time series is shorter, all but the last of `segment` equally sized segments.
+    """
+    if start_point != 0.0:
+        start_tpt = start_point / sample_period
+        log.debug("Will discard: %s time points" % start_tpt)
+    else:
+        start_tpt = 0
+
+    if start_tpt > n_time:
+        log.warning("The time-series is shorter than the starting point")
+        log.debug("Will divide the time-series into %d segments." % segment)
+        # Lazy strategy
+        start_tpt = (segment - 1) * (n_time // segment)
+
+    return int(start_tpt)
+
+
+def chunk_size(shape, chunk_memory=CHUNK_MEMORY):
+    """
+    The number of time points read at once, for a time series of the given shape.
+    """
+    # the chunk, its deviations from the means and their squares, and the complex phases
+    return max(int(chunk_memory // (4 * 8 * numpy.prod(shape[1:]))), 1)
+
+
+def metrics_memory_size(shape, chunk_memory=CHUNK_MEMORY):
+    """
+    Upper bound, in bytes, of the memory used by `compute_metrics`.
+    """
+    point_size = 4 * 8 * numpy.prod(shape[1:])
+    chunk_memory = min(chunk_memory, shape[0] * point_size)
+    return int(max(chunk_memory, point_size) + 2 * 8 * numpy.prod(shape[1:]))
+
+
+def compute_metrics(read_data, shape, sample_period, metrics=METRICS, start_point=0.0, segment=4,
+                    chunk_memory=CHUNK_MEMORY):
+    """
+    Compute the selected metrics together, from chunks of time points.
+
+    The Kuramoto index uses all time points, the other metrics only those after `start_point`
+    (see `start_time_point`).
+
+    :param read_data: callable returning the (time, state variable, node, mode) data between a
+        start and a stop time index
+    :param shape: shape of the time series
+    :param sample_period: sample period of the time series, in ms
+    :param metrics: names of the metrics to compute, among `METRICS`
+    :return: dictionary of the metric values by name, where the proxy metastability is given by
+        two values, "Metastability" and "Synchrony"
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError("Unknown metrics: %s" % ", ".join(sorted(unknown)))
+
+    n_time, n_svar, n_node, n_mode = shape
+    order = None
+    if KURAMOTO_INDEX in metrics:
+        if n_svar < 2:
+            msg = " The number of state variables should be at least 2."
+            log.error(msg)
+            raise ValueError(msg)
+        order = KuramotoOrder()
+    node_moments = None
+    if GLOBAL_VARIANCE in metrics or VARIANCE_OF_NODE_VARIANCE in metrics:
+        node_moments = Moments((n_svar, n_node, n_mode))
+    coherence_moments = Moments() if PROXY_METASTABILITY in metrics else None
+
+    start_tpt = start_time_point(n_time, sample_period, start_point, segment)
+    step = chunk_size(shape, chunk_memory)
+    for start in range(0 if order is not None else start_tpt, n_time, step):
+        chunk = numpy.asarray(read_data(start, min(start + step, n_time)), dtype=numpy.float64)
+        if order is not None:
+            order.update(chunk)
+        chunk = chunk[max(start_tpt - start, 0):]
+        if node_moments is not None:
+            node_moments.update(chunk)
+        if coherence_moments is not None:
+            coherence_moments.update(spatial_coherence(chunk).reshape(-1))
+
+    results = {}
+    if GLOBAL_VARIANCE in metrics:
+        # the time series are zero-centred, so this is the mean of their variances
+        results[GLOBAL_VARIANCE] = float(node_moments.variance.mean())
+    if KURAMOTO_INDEX in metrics:
+        results[KURAMOTO_INDEX] = float(order.index)
+    if PROXY_METASTABILITY in metrics:
+        # std of V(t) across time points, state variables and modes, and the reciprocal of its mean
+        results["Metastability"] = float(numpy.sqrt(coherence_moments.variance))
+        results["Synchrony"] = float(1. / coherence_moments.mean)
+    if VARIANCE_OF_NODE_VARIANCE in metrics:
+        # variance over time points, state variables and modes of each node, then over nodes
+        results[VARIANCE_OF_NODE_VARIANCE] = float(node_moments.variance.mean(axis=(0, 2)).var())
+    return results
+
+
+def compute_time_series_metrics(time_series, metrics=METRICS, start_point=0.0, segment=4):
+    """
+    Compute the selected metrics of a TimeSeries held in memory, see `compute_metrics`.
+    """
+    data = time_series.data
+    return compute_metrics(lambda start, stop: data[start:stop], data.shape, time_series.sample_period,
+                           metrics, start_point, segment)
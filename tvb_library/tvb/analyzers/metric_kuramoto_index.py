@@ -35,8 +35,7 @@ Filler analyzer: Takes a TimeSeries object and returns a Float.
 
 """
 
-import cmath
-import numpy
+from tvb.analyzers.metric_accumulators import compute_time_series_metrics, KURAMOTO_INDEX
 from tvb.basic.logger.builder import get_logger
 
 
@@ -87,23 +86,5 @@ def compute_kuramoto_index_metric(params):
         Input time series for which the metric will be computed.
     """
 
-    time_series = params['time_series']
-    if time_series.data.shape[1] < 2:
-        msg = " The number of state variables should be at least 2."
-        log.error(msg)
-        raise Exception(msg)
-                
-    # TODO: Should be computed for each possible combination of var, mode
-    #      for var, mode in itertools.product(range(self.time_series.data.shape[1]),
-    #                                         range(self.time_series.data.shape[3])):
-        
-    # TODO: Generalise. The Kuramoto order parameter is computed over sliding
-    #      time windows and then normalised
-
-    theta_sum = numpy.sum(numpy.exp(0.0 + 1j * (numpy.vectorize(cmath.polar)
-                (numpy.vectorize(complex)(time_series.data[:, 0, :, 0],
-                    time_series.data[:, 1, :, 0]))[1])), axis=1)
-                     
-    result = numpy.vectorize(cmath.polar)(theta_sum / time_series.data.shape[2])
-
-    return result[0].mean()
+    metrics = compute_time_series_metrics(params['time_series'], [KURAMOTO_INDEX])
+    return metrics[KURAMOTO_INDEX]
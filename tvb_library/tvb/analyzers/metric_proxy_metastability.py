@@ -50,6 +50,7 @@ Proxy synchrony (S) : the reciprocal of mean spatial variance across time.
 """
 
 import numpy
+from tvb.analyzers.metric_accumulators import compute_time_series_metrics, PROXY_METASTABILITY
 from tvb.basic.logger.builder import get_logger
 
 
@@ -64,7 +65,7 @@ def remove_mean(x, axis):
     # Calculate the slicing dynamically
     idx = [slice(None)] * x.ndim
     idx[axis] = numpy.newaxis
-    return x - x.mean(axis=axis)[idx]
+    return x - x.mean(axis=axis)[tuple(idx)]
 
 
 
@@ -109,34 +110,5 @@ def compute_proxy_metastability_metric(params):
         the metric. Only used when the start point is larger than the time-series length
     """
 
-    time_series = params['time_series']
-    start_point = params['start_point']
-    segment = params['segment']
-    shape = time_series.data.shape
-    tpts = shape[0]
-
-    if start_point != 0.0:
-        start_tpt = start_point / time_series.sample_period
-        log.debug("Will discard: %s time points" % start_tpt)
-    else:
-        start_tpt = 0
-
-    if start_tpt > tpts:
-        log.warning("The time-series is shorter than the starting point")
-        log.debug("Will divide the time-series into %d segments." % segment)
-        # Lazy strategy
-        start_tpt = int((segment - 1) * (tpts // segment))
-
-    start_tpt = int(start_tpt)
-    time_series_diffs = remove_mean(time_series.data[start_tpt:, :], axis=2)
-    v_data = abs(time_series_diffs).mean(axis=2)
-
-    # handle state-variables & modes
-    cat_tpts = v_data.shape[0] * shape[1] * shape[3]
-    v_data = v_data.reshape((cat_tpts,), order="F")
-    # std across time-points
-    metastability = v_data.std(axis=0)
-    synchrony = 1. / v_data.mean(axis=0)
-
-    return {"Metastability": metastability,
-            "Synchrony": synchrony}
+    return compute_time_series_metrics(params['time_series'], [PROXY_METASTABILITY], params['start_point'],
+                                       params['segment'])
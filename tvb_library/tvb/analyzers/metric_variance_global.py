@@ -36,6 +36,7 @@ Filler analyzer: Takes a TimeSeries object and returns a Float.
 
 """
 
+from tvb.analyzers.metric_accumulators import compute_time_series_metrics, GLOBAL_VARIANCE
 from tvb.basic.logger.builder import get_logger
 
 """
@@ -74,27 +75,6 @@ def compute_variance_global_metric(params):
         the metric. Only used when the start point is larger than the time-series length
     """
 
-    time_series = params['time_series']
-    start_point = params['start_point']
-    segment = params['segment']
-
-    shape = time_series.data.shape
-    tpts = shape[0]
-
-    if start_point != 0.0:
-        start_tpt = start_point / time_series.sample_period
-        log.debug("Will discard: %s time points" % start_tpt)
-    else:
-        start_tpt = 0
-
-    if start_tpt > tpts:
-        log.warning("The time-series is shorter than the starting point")
-        log.debug("Will divide the time-series into %d segments." % segment)
-        # Lazy strategy
-        start_tpt = int((segment - 1) * (tpts // segment))
-
-    start_tpt = int(start_tpt)
-    zero_mean_data = (time_series.data[start_tpt:, :] - time_series.data[start_tpt:, :].mean(axis=0))
-    global_variance = zero_mean_data.var()
-
-    return global_variance
+    metrics = compute_time_series_metrics(params['time_series'], [GLOBAL_VARIANCE], params['start_point'],
+                                          params['segment'])
+    return metrics[GLOBAL_VARIANCE]
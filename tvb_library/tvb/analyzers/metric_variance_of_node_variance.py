@@ -36,6 +36,7 @@ Filler analyzer: Takes a TimeSeries object and returns a Float.
 
 """
 
+from tvb.analyzers.metric_accumulators import compute_time_series_metrics, VARIANCE_OF_NODE_VARIANCE
 from tvb.basic.logger.builder import get_logger
 
 """
@@ -74,34 +75,6 @@ def compute_variance_of_node_variance_metric(params):
         the metric. Only used when the start point is larger than the time-series length
     """
 
-    time_series = params['time_series']
-    start_point = params['start_point']
-    segment = params['segment']
-
-    shape = time_series.data.shape
-    tpts = shape[0]
-
-    if start_point != 0.0:
-        start_tpt = start_point / time_series.sample_period
-        log.debug("Will discard: %s time points" % start_tpt)
-    else:
-        start_tpt = 0
-
-    if start_tpt > tpts:
-        log.warning("The time-series is shorter than the starting point")
-        log.debug("Will divide the time-series into %d segments." % segment)
-        # Lazy strategy
-        start_tpt = int((segment - 1) * (tpts // segment))
-
-    start_tpt = int(start_tpt)
-    zero_mean_data = (time_series.data[start_tpt:, :] - time_series.data[start_tpt:, :].mean(axis=0))
-    # reshape by concatenating the time-series of each var and modes for each node.
-    zero_mean_data = zero_mean_data.transpose((0, 1, 3, 2))
-    cat_tpts = zero_mean_data.shape[0] * shape[1] * shape[3]
-    zero_mean_data = zero_mean_data.reshape((cat_tpts, shape[2]), order="F")
-    # Variance over time-points, state-variables, and modes for each node.
-    node_variance = zero_mean_data.var(axis=0)
-    # Variance of that variance over nodes
-    result = node_variance.var()
-
-    return result
+    metrics = compute_time_series_metrics(params['time_series'], [VARIANCE_OF_NODE_VARIANCE],
+                                          params['start_point'], params['segment'])
+    return metrics[VARIANCE_OF_NODE_VARIANCE]
@@ -37,20 +37,14 @@ Compute cross coherence between all nodes in a time series.
 """
 
 import numpy
-import matplotlib.mlab as mlab
-from matplotlib.pylab import detrend_linear
 import tvb.datatypes.spectral as spectral
+from tvb.analyzers.cross_spectrum import cross_spectrum, segment_starts, coherency
 from tvb.basic.logger.builder import get_logger
 from tvb.basic.neotraits.api import narray_describe
 
 log = get_logger(__name__)
 
 
-# TODO: Should do this properly, ie not with mlab, returning both coherence and
-#      the complex coherence spectra, then supporting magnitude squared
-#      coherence, etc in a similar fashion to the FourierSpectrum datatype...
-
-
 def _hamming(M, sym=True):
     """
     The M-point Hamming window.
@@ -71,50 +65,66 @@ def _hamming(M, sym=True):
 
 
 def coherence_mlab(data, sample_rate, nfft=256):
-    _, nsvar, nnode, nmode = data.shape
+    """
+    Coherence of all the node pairs as `matplotlib.mlab.cohere` computes it: linearly detrended,
+    non overlapping and not windowed blocks of `nfft` points, for frequencies from 0 to sample_rate / 2.
+    """
+    nt, nsvar, nnode, nmode = data.shape
+    starts = segment_starts(nt, nfft, nfft)
+    freq = numpy.arange(nfft // 2 + 1) * sample_rate / nfft
     # (frequency, nodes, nodes, state-variables, modes)
-    coh_shape = nfft/2 + 1, nnode, nnode, nsvar, nmode
-    coh = numpy.zeros(coh_shape)
+    coh = numpy.zeros((len(freq), nnode, nnode, nsvar, nmode))
     for mode in range(nmode):
         for var in range(nsvar):
-            data = data[:, var, :, mode].copy()
-            data -= data.mean(axis=0)[numpy.newaxis, :]
-            for n1 in range(nnode):
-                for n2 in range(nnode):
-                    cxy, freq = mlab.cohere(data[:, n1], data[:, n2],
-                                            NFFT=nfft,
-                                            Fs=sample_rate,
-                                            detrend=detrend_linear,
-                                            window=mlab.window_none)
-                    coh[:, n1, n2, var, mode] = cxy
+            csd, _ = cross_spectrum(lambda start, stop: data[start:stop, var, :, mode], starts, nfft,
+                                    n_freq=len(freq), detrend=True)
+            coh[..., var, mode] = numpy.abs(coherency(csd)) ** 2
     return coh, freq
 
 
-def _coherence(data, sample_rate, nfft=256, imag=False):
-    "Vectorized coherence calculation by windowed FFT"
-    nt, ns, nn, nm = data.shape
-    nwin = nt // nfft
+def coherence_frequencies(nfft, sample_rate):
+    """
+    The (positive) frequencies of the coherence computed by `windowed_coherence`.
+    """
+    fs = numpy.fft.fftfreq(nfft, 1e3 / sample_rate)
+    return fs[fs > 0.0]
+
+
+def windowed_coherence(read_data, n_time, nfft=256, imag=False):
+    """
+    Magnitude squared coherence of all the node pairs, from the cross spectrum of Hamming windowed,
+    non overlapping blocks of `nfft` points (the leftover data is ignored).
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    :param n_time: the number of time points of the time series
+    :param imag: use only the imaginary part of the cross spectrum
+    :returns: (frequency, node, node) array, for the frequencies given by `coherence_frequencies`
+    """
+    nwin = n_time // nfft
     if nwin < 1:
         raise ValueError(
             "Not enough time points ({0}) to compute an FFT, given a "
-            "window size of nfft={1}.".format(nt, nfft))
-    # ignore leftover data; need shape (nn, ... , nwin, nfft)
-    wins = data[:int(nwin * nfft)]\
-        .copy()\
-        .transpose((2, 1, 3, 0))\
-        .reshape((nn, ns, nm, nwin, nfft))
-    wins *= _hamming(nfft)
-    F = numpy.fft.fft(wins)
-    fs = numpy.fft.fftfreq(nfft, 1e3 / sample_rate)
-    # broadcasts to [node_i, node_j, ..., window, time]
-    G = F[:, numpy.newaxis] * F.conj()
+            "window size of nfft={1}.".format(n_time, nfft))
+    n_freq = (nfft - 1) // 2
+    csd, _ = cross_spectrum(read_data, segment_starts(nwin * nfft, nfft, nfft), nfft,
+                            window=_hamming(nfft), n_freq=n_freq + 1)
+    C = coherency(csd[1:])
     if imag:
-        G = G.imag
-    dG = numpy.array([G[i, i] for i in range(nn)])
-    C = (numpy.abs(G)**2 / (dG[:, numpy.newaxis] * dG)).mean(axis=-2)
-    mask = fs > 0.0
-    # C_ = numpy.abs(C.mean(axis=0).mean(axis=0))
-    return numpy.transpose(C[..., mask], (4, 0, 1, 2, 3)), fs[mask]
+        C = C.imag
+    return numpy.abs(C) ** 2
+
+
+def _coherence(data, sample_rate, nfft=256, imag=False):
+    "Coherence calculation by windowed FFT, for each state variable and mode"
+    nt, ns, nn, nm = data.shape
+    fs = coherence_frequencies(nfft, sample_rate)
+    # (frequency, nodes, nodes, state-variables, modes)
+    C = numpy.empty((len(fs), nn, nn, ns, nm))
+    for var in range(ns):
+        for mode in range(nm):
+            C[..., var, mode] = windowed_coherence(lambda start, stop: data[start:stop, var, :, mode], nt,
+                                                   nfft, imag)
+    return C, fs
 
 
 def calculate_cross_coherence(time_series, nfft):
@@ -142,7 +152,7 @@ def calculate_cross_coherence(time_series, nfft):
     spec = spectral.CoherenceSpectrum(
         source=time_series,
         nfft=nfft,
-        array_data=coh.astype(numpy.float),
+        array_data=coh,
         frequency=freq)
     return spec
 
@@ -38,7 +38,7 @@ return a ComplexCoherence datatype.
 
 import numpy
 import tvb.datatypes.spectral as spectral
-from scipy import signal as sp_signal
+from tvb.analyzers.cross_spectrum import cross_spectrum, segment_starts, coherency
 from tvb.basic.logger.builder import get_logger
 from tvb.basic.neotraits.info import narray_describe
 
@@ -46,12 +46,6 @@ SUPPORTED_WINDOWING_FUNCTIONS = ("hamming", "bartlett", "blackman", "hanning")
 
 log = get_logger(__name__)
 
-# NOTE: Work only with 2D TimeSeries -- otherwise a MemoryError will raise
-# My first attempts made use of itertools on the 4D TimeSeries but they were
-# fruitless.
-# Nested `for` loops seem a 'good' solution instead of creating enormous ndarrays
-# to compute the FFT and derived complex spectra at once
-
 
 """
 A module for calculating the FFT of a TimeSeries and returning
@@ -78,15 +72,17 @@ Output: (main arrays)
         
 By default the time series is segmented into 1 second `epoch` blocks and 0.5
 second 50% overlapping `segments` to which a Hanning function is applied. 
+
+The cross spectrum of all the channel pairs is computed by `tvb.analyzers.cross_spectrum`,
+which streams the segments and transforms each of them once.
     
 """
 
 
 def calculate_complex_cross_coherence(time_series, epoch_length, segment_length, segment_shift, window_function,
-                                      average_segments, subtract_epoch_average, zeropad, detrend_ts, max_freq,
-                                      npat):
+                                      average_segments, subtract_epoch_average, zeropad, detrend_ts, max_freq):
     """
-    # type: (TimeSeries, float, float, float, str, bool, bool, int, bool, float, float)  -> ComplexCoherenceSpectrum
+    # type: (TimeSeries, float, float, float, str, bool, bool, int, bool, float)  -> ComplexCoherenceSpectrum
     Calculate the FFT, Cross Coherence and Complex Coherence of time_series
     broken into (possibly) epochs and segments of length `epoch_length` and
     `segment_length` respectively, filtered by `window_function`.
@@ -122,148 +118,100 @@ def calculate_complex_cross_coherence(time_series, epoch_length, segment_length,
     mean across epochs before computing the complex coherence.
 
     zeropad : int
-    Adds `n` zeros at the end of each segment and at the end of window_function. It is not yet functional.
+    Adds `n` zeros at the end of each windowed segment before the FFT, sampling the spectra on a finer
+    frequency grid without improving the actual frequency resolution.
 
     detrend_ts : bool
     Flag. If `True` removes linear trend along the time dimension before applying FFT.
 
     max_freq : float
     Maximum frequency points (e.g. 32., 64., 128.) represented in the output. Default is segment_length / 2 + 1.
+    """
+    data = time_series.data
+    cs, coh, epoch_length, segment_length = complex_cross_coherence(
+        lambda start, stop: average_state_variables_and_modes(data[start:stop]), data.shape[0],
+        time_series.sample_period, epoch_length, segment_length, segment_shift, window_function,
+        average_segments, subtract_epoch_average, zeropad, detrend_ts, max_freq)
+
+    spectra = spectral.ComplexCoherenceSpectrum(source=time_series,
+                                                array_data=coh,
+                                                cross_spectrum=cs,
+                                                epoch_length=epoch_length,
+                                                segment_length=segment_length,
+                                                windowing_function=window_function)
+    return spectra
+
 
-    npat : float
-    This attribute appears to be related to an input projection matrix... Which is not yet implemented.
+def average_state_variables_and_modes(data):
     """
-    # self.time_series.trait["data"].log_debug(owner=cls_attr_name)
-    tpts = time_series.data.shape[0]
-    time_series_length = tpts * time_series.sample_period
+    Reduce a slice of a 4D TimeSeries to (time, nodes), as the complex coherence uses it. 2D data is unchanged.
+    """
+    if data.ndim > 2:
+        data = data.mean(axis=-1).mean(axis=1)
+    return data
 
-    if len(time_series.data.shape) > 2:
-        time_series_data = numpy.squeeze((time_series.data.mean(axis=-1)).mean(axis=1))
 
-    # Divide time-series into epochs, no overlapping
-    if epoch_length > 0.0:
+def complex_cross_coherence(read_data, n_time, sample_period, epoch_length, segment_length, segment_shift,
+                            window_function, average_segments, subtract_epoch_average, zeropad, detrend_ts,
+                            max_freq):
+    """
+    Compute the cross spectrum and the complex coherence of a time series, read in blocks of time points
+    by `read_data`, a callable returning the (time, channel) data between a start and a stop time index.
+    The other parameters are those of `calculate_complex_cross_coherence`.
+
+    :returns: the cross spectrum and the complex coherence, with the shape given by
+        `complex_coherence_result_shape`, and the epoch and segment lengths actually used
+    """
+    time_series_length = n_time * sample_period
+
+    # Divide time-series into epochs, no overlapping; a single epoch if the time series is shorter than one
+    if 0.0 < epoch_length <= time_series_length:
         nepochs = int(numpy.floor(time_series_length / epoch_length))
-        epoch_tpts = int(epoch_length / time_series.sample_period)
+        epoch_tpts = int(epoch_length / sample_period)
         time_series_length = epoch_length
-        tpts = epoch_tpts
     else:
         epoch_length = time_series_length
-        nepochs = int(numpy.ceil(time_series_length / epoch_length))
+        nepochs = 1
+        epoch_tpts = n_time
 
     # Segment time-series, overlapping if necessary
     nseg = int(numpy.floor(time_series_length / segment_length))
     if nseg > 1:
-        seg_tpts = int(segment_length / time_series.sample_period)
-        seg_shift_tpts = int(segment_shift / time_series.sample_period)
-        nseg = int(numpy.floor((tpts - seg_tpts) / seg_shift_tpts) + 1)
+        seg_tpts = int(segment_length / sample_period)
+        seg_shift_tpts = int(segment_shift / sample_period)
     else:
         segment_length = time_series_length
-        seg_tpts = time_series_data.shape[0]
+        seg_tpts = seg_shift_tpts = epoch_tpts
+    starts = segment_starts(nepochs * epoch_tpts, seg_tpts, seg_shift_tpts, epoch_tpts)
 
     # Frequency
     nfreq = int(numpy.min([max_freq, numpy.floor((seg_tpts + zeropad) / 2.0) + 1]))
 
-    resulted_shape, av_result_shape = complex_coherence_result_shape(time_series.data.shape, max_freq, epoch_length,
-                                                                     segment_length, segment_shift,
-                                                                     time_series.sample_period, zeropad,
-                                                                     average_segments)
-    cs = numpy.zeros(resulted_shape, dtype=numpy.complex128)
-    av = numpy.matrix(numpy.zeros(av_result_shape, dtype=numpy.complex128))
-    coh = numpy.zeros(resulted_shape, dtype=numpy.complex128)
-
     # Apply windowing function
+    win = None
     if window_function is not None:
         if window_function not in SUPPORTED_WINDOWING_FUNCTIONS:
             log.error("Windowing function is: %s" % window_function)
             log.error("Must be in: %s" % str(SUPPORTED_WINDOWING_FUNCTIONS))
+        win = getattr(numpy, window_function)(seg_tpts)
 
-        window_func = eval("".join(("numpy.", window_function)))
-        win = window_func(seg_tpts)
-        window_mask = (numpy.kron(numpy.ones((time_series_data.shape[1], 1)), win)).T
-
-    nave = 0
-
-    for j in numpy.arange(nepochs):
-        data = time_series_data[j * epoch_tpts:(j + 1) * epoch_tpts, :]
-
-        for i in numpy.arange(nseg):  # average over all segments;
-            ts = data[i * seg_shift_tpts: i * seg_shift_tpts + seg_tpts, :]
-
-            if detrend_ts:
-                ts = sp_signal.detrend(ts, axis=0)
-
-            datalocfft = numpy.fft.fft(ts * window_mask, axis=0)
-            datalocfft = numpy.matrix(datalocfft)
-
-            for f in numpy.arange(nfreq):  # for all frequencies
-                if npat == 1:
-                    if not average_segments:
-                        cs[:, :, f, i] += numpy.conjugate(datalocfft[f, :].conj().T * datalocfft[f, :])
-                        av[:, f, i] += numpy.conjugate(datalocfft[f, :].conj().T)
-                    else:
-                        cs[:, :, f] += numpy.conjugate(datalocfft[f, :].conj().T * datalocfft[f, :])
-                        av[:, f] += numpy.conjugate(datalocfft[f, :].conj().T)
-                else:
-                    if not average_segments:
-                        cs[:, :, f, j, i] = numpy.conjugate(datalocfft[f, :].conj().T * datalocfft[f, :])
-                        av[:, f, j, i] = numpy.conjugate(datalocfft[f, :].conj().T)
-                    else:
-                        cs[:, :, f, j] += numpy.conjugate(datalocfft[f, :].conj().T * datalocfft[f, :])
-                        av[:, f, j] += numpy.conjugate(datalocfft[f, :].conj().T)
-            del datalocfft
-
-        nave += 1.0
-
-    # End of FORs
-    if not average_segments:
-        cs = cs / nave
-        av = av / nave
-    else:
-        nave = nave * nseg
-        cs = cs / nave
-        av = av / nave
+    cs, av = cross_spectrum(read_data, starts, seg_tpts, window=win, nfft=seg_tpts + zeropad, n_freq=nfreq,
+                            detrend=detrend_ts, per_segment=not average_segments)
 
     # Subtract average
-    for f in numpy.arange(nfreq):
-        if subtract_epoch_average:
-            if npat == 1:
-                if not average_segments:
-                    for i in numpy.arange(nseg):
-                        cs[:, :, f, i] = cs[:, :, f, i] - av[:, f, i] * av[:, f, i].conj().T
-                else:
-                    cs[:, :, f] = cs[:, :, f] - av[:, f] * av[:, f].conj().T
-            else:
-                if not average_segments:
-                    for i in numpy.arange(nseg):
-                        for j in numpy.arange(nepochs):
-                            cs[:, :, f, j, i] = cs[:, :, f, j, i] - av[:, f, j, i] * av[:, f, j, i].conj().T
-
-                else:
-                    for j in numpy.arange(nepochs):
-                        cs[:, :, f, j] = cs[:, :, f, j] - av[:, f, j] * av[:, f, j].conj().T
+    if subtract_epoch_average:
+        cs -= av[..., :, numpy.newaxis] * av.conj()[..., numpy.newaxis, :]
 
     # Compute Complex Coherence
-    ndim = len(cs.shape)
-    if ndim == 3:
-        for i in numpy.arange(cs.shape[2]):
-            temp = numpy.matrix(cs[:, :, i])
-            coh[:, :, i] = cs[:, :, i] / numpy.sqrt(temp.diagonal().conj().T * temp.diagonal())
-
-    elif ndim == 4:
-        for i in numpy.arange(cs.shape[2]):
-            for j in numpy.arange(cs.shape[3]):
-                temp = numpy.matrix(numpy.squeeze(cs[:, :, i, j]))
-                coh[:, :, i, j] = temp / numpy.sqrt(temp.diagonal().conj().T * temp.diagonal().T)
+    coh = coherency(cs)
 
+    # (segments,) frequencies, channels, channels -> channels, channels, frequencies (, segments)
+    axes = (1, 2, 0) if average_segments else (2, 3, 1, 0)
+    cs = cs.transpose(axes)
+    coh = coh.transpose(axes)
     log.debug("result")
     log.debug(narray_describe(cs))
-    spectra = spectral.ComplexCoherenceSpectrum(source=time_series,
-                                                array_data=coh,
-                                                cross_spectrum=cs,
-                                                epoch_length=epoch_length,
-                                                segment_length=segment_length,
-                                                windowing_function=window_function)
-    return spectra
+    return cs, coh, epoch_length, segment_length
 
 
 def complex_coherence_result_shape(input_shape, max_freq, epoch_length, segment_length, segment_shift, sample_period,
@@ -37,13 +37,26 @@ a PrincipalComponents datatype.
 """
 
 import numpy
+import scipy.linalg
 import tvb.datatypes.mode_decompositions as mode_decompositions
 from tvb.basic.logger.builder import get_logger
-from tvb.basic.neotraits.api import HasTraits, Attr, narray_describe
+from tvb.basic.neotraits.api import HasTraits, Attr, TVBEnum, narray_describe
+
+# Upper bound, in bytes, of the chunk of time points read at once by the streamed methods
+CHUNK_MEMORY = 64 * 2 ** 20
+# Extra random vectors, and power iterations, of the randomized method
+N_OVERSAMPLES = 10
+N_POWER_ITERATIONS = 2
 
 log = get_logger(__name__)
 
 
+class PCAMethods(TVBEnum):
+    SVD = "svd"
+    COVARIANCE = "covariance"
+    RANDOMIZED = "randomized"
+
+
 def _compute_weights_and_fractions(data):
     """
     The code for this function has been taken and adapted from Matplotlib 2.1.0
@@ -67,6 +80,140 @@ def _compute_weights_and_fractions(data):
 
     return fracs, Wt
 
+
+def chunk_size(n_node, chunk_memory=CHUNK_MEMORY):
+    """
+    The number of time points read at once by the streamed methods, for `n_node` signals.
+    """
+    # the chunk and its centered copy
+    return max(int(chunk_memory // (2 * 8 * n_node)), 1)
+
+
+def streamed_moments(read_data, n_time, n_node, covariance=True, chunk_memory=CHUNK_MEMORY):
+    """
+    The mean and the (biased) covariance matrix of the signals, accumulated over chunks of time
+    points, or only their variances when `covariance` is False.
+
+    The chunks are merged with the pairwise update of Chan et al., which doesn't lose the
+    precision a single pass over raw sums of squares would.
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    """
+    step = chunk_size(n_node, chunk_memory)
+    mean = numpy.zeros(n_node)
+    comoment = numpy.zeros((n_node, n_node) if covariance else n_node)
+    count = 0
+    for start in range(0, n_time, step):
+        chunk = numpy.asarray(read_data(start, min(start + step, n_time)), dtype=numpy.float64)
+        n_chunk = chunk.shape[0]
+        chunk_mean = chunk.mean(axis=0)
+        centered = chunk - chunk_mean
+        delta = chunk_mean - mean
+        weight = count * n_chunk / (count + n_chunk)
+        if covariance:
+            comoment += centered.T @ centered + weight * numpy.outer(delta, delta)
+        else:
+            comoment += (centered ** 2).sum(axis=0) + weight * delta ** 2
+        mean += delta * n_chunk / (count + n_chunk)
+        count += n_chunk
+    return mean, comoment / count
+
+
+def _leading_eigenpairs(matrix, n_components):
+    """
+    The `n_components` largest eigenvalues of a symmetric matrix, in decreasing order, with the
+    eigenvectors as rows.
+    """
+    n = matrix.shape[0]
+    values, vectors = scipy.linalg.eigh(matrix, subset_by_index=[n - n_components, n - 1])
+    return numpy.clip(values[::-1], 0.0, None), vectors[:, ::-1].T
+
+
+def _randomized_eigenpairs(read_data, n_time, n_node, mean, scale, n_components, random_state=None,
+                           chunk_memory=CHUNK_MEMORY):
+    """
+    Approximate the `n_components` leading eigenpairs of the covariance matrix of
+    (data - mean) / scale without forming it: a random basis is multiplied by the covariance
+    matrix, one pass over the chunks of the data each time, and the eigenpairs are taken
+    from the projection of the matrix on the resulting subspace (Halko et al., 2011).
+    """
+    n_basis = min(n_node, n_components + N_OVERSAMPLES)
+    step = chunk_size(n_node + n_basis, chunk_memory)
+
+    def covariance_product(basis):
+        product = numpy.zeros_like(basis)
+        for start in range(0, n_time, step):
+            chunk = (numpy.asarray(read_data(start, min(start + step, n_time))) - mean) / scale
+            product += chunk.T @ (chunk @ basis)
+        return product / n_time
+
+    if not isinstance(random_state, numpy.random.RandomState):
+        random_state = numpy.random.RandomState(random_state)
+    basis = random_state.normal(size=(n_node, n_basis))
+    for _ in range(N_POWER_ITERATIONS + 1):
+        basis, _ = numpy.linalg.qr(covariance_product(basis))
+    projected = basis.T @ covariance_product(basis)
+    values, vectors = numpy.linalg.eigh((projected + projected.T) / 2)
+    order = numpy.argsort(values)[::-1][:n_components]
+    return numpy.clip(values[order], 0.0, None), (basis @ vectors[:, order]).T
+
+
+def principal_axes(read_data, n_time, n_node, n_components=None, method=PCAMethods.COVARIANCE,
+                   standardize=True, random_state=None, chunk_memory=CHUNK_MEMORY):
+    """
+    The leading principal axes of a time series read in chunks of time points, time points being
+    the observations and nodes the variables.
+
+    `PCAMethods.COVARIANCE` accumulates the covariance matrix of the nodes and takes its
+    eigenvectors, which is exact and needs two node by node matrices in memory.
+    `PCAMethods.RANDOMIZED` only keeps a few vectors per component, and reads the data a few
+    times more.
+
+    :param read_data: callable returning the (time, node) data between a start and a stop time index
+    :param standardize: whether the signals are scaled to unit variance (correlation instead of covariance)
+    :param random_state: seed or numpy.random.RandomState of the random basis of `PCAMethods.RANDOMIZED`
+    :return: the mean and the scale of each node, the variances along the axes, and the axes as rows
+    """
+    n_components = n_components or n_node
+    if not 0 < n_components <= n_node:
+        raise ValueError("The number of components (%d) should be between 1 and the number of nodes (%d)."
+                         % (n_components, n_node))
+
+    if method == PCAMethods.RANDOMIZED:
+        mean, variance = streamed_moments(read_data, n_time, n_node, False, chunk_memory)
+        scale = numpy.sqrt(variance) if standardize else numpy.ones(n_node)
+        values, axes = _randomized_eigenpairs(read_data, n_time, n_node, mean, scale, n_components,
+                                              random_state, chunk_memory)
+    elif method == PCAMethods.COVARIANCE:
+        mean, covariance = streamed_moments(read_data, n_time, n_node, True, chunk_memory)
+        scale = numpy.sqrt(numpy.diag(covariance)) if standardize else numpy.ones(n_node)
+        covariance /= numpy.outer(scale, scale)
+        values, axes = _leading_eigenpairs(covariance, n_components)
+    else:
+        raise ValueError("Unsupported streamed PCA method %s." % method)
+    return mean, scale, values, axes
+
+
+def streamed_pca_memory_size(n_node, n_components=None, method=PCAMethods.COVARIANCE, chunk_memory=CHUNK_MEMORY):
+    """
+    Upper bound of the memory in bytes required by `principal_axes`.
+    """
+    n_components = n_components or n_node
+    if method == PCAMethods.RANDOMIZED:
+        matrices_size = 4 * n_node * min(n_node, n_components + N_OVERSAMPLES)
+    else:
+        # the covariance matrix, and the workspace and eigenvectors of the eigen-solver
+        matrices_size = 2 * n_node ** 2 + n_node * n_components
+    return matrices_size * 8 + chunk_memory
+
+
+def project_components(weights, data):
+    """
+    The component time series of `data`, shaped (time, state-variables, nodes, modes), for the
+    component `weights`, shaped (components, nodes, state-variables, modes).
+    """
+    return numpy.einsum('cnvm,tvnm->tvcm', weights, data)
+
 """
 Return principal component weights and the fraction of the variance that 
 they explain. 
@@ -79,33 +226,39 @@ NOTE: The TimeSeries must be longer(more time-points) than the number of
 """
 
 
-# # TODO: Maybe should support first N components or neccessary components to
-# #      explain X% of the variance. NOTE: For default surface the weights
-# #      matrix has a size ~ 2GB * modes * vars...
-def compute_pca(time_series):
+def compute_pca(time_series, n_components=None, method=PCAMethods.SVD):
     """
-    # type: (TimeSeries)  -> PrincipalComponents
+    # type: (TimeSeries, int, PCAMethods)  -> PrincipalComponents
     Compute the temporal covariance between nodes in the time_series.
 
     Parameters
     __________
     time_series : TimeSeries
     The timeseries to which the PCA is to be applied.
+
+    n_components : int
+    Number of principal components to keep, all of them by default.
+
+    method : PCAMethods
+    SVD of the whole data, or one of the streamed methods of `principal_axes`.
+    NOTE: For default surface the weights matrix has a size ~ 2GB * modes * vars,
+    unless only the first components are kept.
     """
 
     ts_shape = time_series.data.shape
+    n_components = n_components or ts_shape[2]
 
     # Need more measurements than variables
-    if ts_shape[0] < ts_shape[2]:
+    if method == PCAMethods.SVD and ts_shape[0] < ts_shape[2]:
         msg = "PCA requires a longer timeseries (tpts > number of nodes)."
         log.error(msg)
         raise Exception(msg)
 
-    # (nodes, nodes, state-variables, modes)
-    weights_shape = (ts_shape[2], ts_shape[2], ts_shape[1], ts_shape[3])
+    # (components, nodes, state-variables, modes)
+    weights_shape = (n_components, ts_shape[2], ts_shape[1], ts_shape[3])
     log.info("weights shape will be: %s" % str(weights_shape))
 
-    fractions_shape = (ts_shape[2], ts_shape[1], ts_shape[3])
+    fractions_shape = (n_components, ts_shape[1], ts_shape[3])
     log.info("fractions shape will be: %s" % str(fractions_shape))
 
     weights = numpy.zeros(weights_shape)
@@ -116,9 +269,14 @@ def compute_pca(time_series):
         for var in range(ts_shape[1]):
             data = time_series.data[:, var, :, mode]
 
-            fracts, w = _compute_weights_and_fractions(data)
-            fractions[:, var, mode] = fracts
-            weights[:, :, var, mode] = w
+            if method == PCAMethods.SVD:
+                fracts, w = _compute_weights_and_fractions(data)
+            else:
+                _, _, variances, w = principal_axes(lambda start, stop: data[start:stop], ts_shape[0],
+                                                    ts_shape[2], n_components, method)
+                fracts = variances / ts_shape[2]
+            fractions[:, var, mode] = fracts[:n_components]
+            weights[:, :, var, mode] = w[:n_components]
 
     log.debug("fractions")
     log.debug(narray_describe(fractions))
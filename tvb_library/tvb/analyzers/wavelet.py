@@ -40,7 +40,7 @@ WaveletSpectrum datatype.
 """
 
 import numpy
-import scipy.signal as signal
+import scipy.fft
 import tvb.datatypes.spectral as spectral
 from tvb.basic.logger.builder import get_logger
 from tvb.basic.neotraits.api import HasTraits, Attr, Range, Float, narray_describe
@@ -48,6 +48,9 @@ from tvb.simulator.backend.ref import ReferenceBackend
 
 SUPPORTED_WAVELET_FUNCTIONS = ("morlet",)
 
+# Upper bound, in bytes, of the coefficients and temporary arrays of one chunk of the time series
+CHUNK_MEMORY = 256 * 2 ** 20
+
 log = get_logger(__name__)
 
 """
@@ -56,6 +59,10 @@ and returning a WaveletSpectrum object. The sampling period and frequency
 range of the result can be specified. The mother wavelet can also be
 specified... (So far, only Morlet.)
 
+The bank of wavelets is built once, and all the signals are convolved with all
+of them by FFT, in overlapping chunks of time points, so that the time series
+and the coefficients don't have to be in memory at once.
+
 References:
     .. [TBetal_1996] C. Tallon-Baudry et al, *Stimulus Specificity of
         Phase-Locked and Non-Phase-Locked 40 Hz Visual Responses in Human.*,
@@ -66,35 +73,13 @@ References:
 """
 
 
-def compute_continuous_wavelet_transform(time_series, frequencies, sample_period, q_ratio, normalisation, mother):
+def wavelet_frequencies(frequencies):
     """
-    # type: (TimeSeries, Range, float, float, str, str)  -> WaveletCoefficients
-    Calculate the continuous wavelet transform of time_series.
-
-    Parameters
-    __________
+    The frequencies of the transform, for the requested `frequencies` Range, falling back to
+    the default range when it is invalid.
 
-    time_series : TimeSeries
-    The timeseries to which the wavelet is to be applied.
-
-    frequencies : Range
-    The frequency resolution and range returned. Requested frequencies
-    are converted internally into appropriate scales.
-
-    sample_period : float
-    The sampling period of the computed wavelet spectrum.
-
-    q_ratio : float
-    NFC. Must be greater than 5. Ratios of the center frequencies to bandwidths.
-
-    normalisation : str
-    The type of normalisation for the resulting wavet spectrum. Default is 'energy', options are: 'energy'; 'gabor'.
-
-    mother : str
-    The mother wavelet function used in the transform.
+    :returns: the Range actually used, and its frequencies
     """
-    ts_shape = time_series.data.shape
-
     if frequencies.step == 0:
         log.warning("Frequency step can't be 0! Trying default step, 2e-3.")
         frequencies.step = 0.002
@@ -113,17 +98,30 @@ def compute_continuous_wavelet_transform(time_series, frequencies, sample_period
 
     log.debug("freqs")
     log.debug(narray_describe(freqs))
+    return frequencies, freqs
+
+
+def temporal_step(sample_period, input_sample_period):
+    """
+    The number of input time points per coefficient, for the requested result `sample_period`.
+    """
+    return max((1, ReferenceBackend.iround(sample_period / input_sample_period)))
+
+
+def morlet_kernels(freqs, sample_rate, q_ratio, normalisation):
+    """
+    The bank of Morlet wavelets for the frequencies `freqs`, sampled at `sample_rate`.
 
-    sample_rate = time_series.sample_rate
+    Each wavelet spans 4 standard deviations on each side of its center. They are zero padded to
+    the (odd) length of the widest one, keeping their centers aligned, so that they can all be used
+    for one 'same' mode convolution.
 
+    :returns: (n_freqs, n_points) complex array
+    """
     # Duke: code below is as given by Andreas Spiegler, I've just wrapped
     # some of the original argument names
     nf = len(freqs)
-    temporal_step = max((1, ReferenceBackend.iround(sample_period / time_series.sample_period)))
-    nt = int(numpy.ceil(ts_shape[0] / temporal_step))
-
-    if not isinstance(q_ratio, numpy.ndarray):
-        new_q_ratio = q_ratio * numpy.ones((1, nf))
+    new_q_ratio = q_ratio * numpy.ones((1, nf))
 
     if numpy.nanmin(new_q_ratio) < 5:
         msg = "q_ratio must be not lower than 5 !"
@@ -144,34 +142,154 @@ def compute_continuous_wavelet_transform(time_series, frequencies, sample_period
         Amp = 1.0 / numpy.sqrt(sample_rate * numpy.sqrt(numpy.pi) * sigma_t)
     elif normalisation == 'gabor':
         Amp = numpy.sqrt(2.0 / numpy.pi) / sample_rate / sigma_t
+    else:
+        msg = "Unknown normalisation %s !" % normalisation
+        log.error(msg)
+        raise Exception(msg)
 
-    coef_shape = (nf, nt, ts_shape[1], ts_shape[2], ts_shape[3])
-
-    coef = numpy.zeros(coef_shape, dtype=numpy.complex128)
-    log.debug("coef")
-    log.debug(narray_describe(coef))
-
-    scales = numpy.arange(0, nf, 1)
-    for i in scales:
+    wavelets = []
+    for i in range(nf):
         f0 = freqs[i]
         SDt = sigma_t[(0, i)]
         A = Amp[(0, i)]
         x = numpy.arange(0, 4.0 * SDt * sample_rate, 1) / sample_rate
         wvlt = A * numpy.exp(-x ** 2 / (2.0 * SDt ** 2)) * numpy.exp(2j * numpy.pi * f0 * x)
-        wvlt = numpy.hstack((numpy.conjugate(wvlt[-1:0:-1]), wvlt))
-        # util.self.log_debug_array(self.log, wvlt, "wvlt")
-
-        for var in range(ts_shape[1]):
-            for node in range(ts_shape[2]):
-                for mode in range(ts_shape[3]):
-                    data = time_series.data[:, var, node, mode]
-                    wt = signal.convolve(data, wvlt, 'same')
-                    # util.self.log_debug_array(self.log, wt, "wt")
-                    res = wt[0::temporal_step]
-                    # NOTE: this is a horrible horrible quick hack (alas, a solution) to avoid broadcasting errors
-                    # when using dt and sample periods which are not powers of 2.
-                    coef[i, :, var, node, mode] = res if len(res) == nt else res[:coef.shape[1]]
+        wavelets.append(numpy.hstack((numpy.conjugate(wvlt[-1:0:-1]), wvlt)))
+
+    n_points = max(len(wvlt) for wvlt in wavelets)
+    kernels = numpy.zeros((nf, n_points), dtype=numpy.complex128)
+    for kernel, wvlt in zip(kernels, wavelets):
+        offset = (n_points - len(wvlt)) // 2
+        kernel[offset:offset + len(wvlt)] = wvlt
+    return kernels
+
+
+def morlet_kernels_shape(freqs, sample_rate, q_ratio):
+    """
+    The shape of the bank of wavelets returned by `morlet_kernels`, without building it.
+    """
+    sigma_t = numpy.nanmax(q_ratio * numpy.ones(len(freqs)) / (2.0 * numpy.pi * numpy.asarray(freqs)))
+    return len(freqs), 2 * int(numpy.ceil(4.0 * sigma_t * sample_rate)) - 1
+
+
+def chunk_size(n_time, n_channel, kernels_shape, step=1, dtype=numpy.complex128, chunk_memory=CHUNK_MEMORY):
+    """
+    The number of time points of the chunks of the time series, and the number of channels (signals)
+    convolved at once, used by `wavelet_transform_chunks`.
+    """
+    n_kernels, n_points = kernels_shape[0], min(kernels_shape[1], 2 * n_time - 1)
+    itemsize = numpy.dtype(dtype).itemsize
+    # half of the memory for the coefficients of a chunk, a multiple of step time points
+    n_out = max((chunk_memory // 2) // (n_kernels * n_channel * itemsize), 1)
+    # the other half for the spectra of one channel: the data, and the products with all kernels
+    n_fft = max((chunk_memory // 2) // ((2 * n_kernels + 1) * itemsize), 1)
+    n_out = max(min(n_out, (n_fft - n_points + 1) // step, int(numpy.ceil(n_time / step))), 1)
+    n_fft = scipy.fft.next_fast_len(n_out * step + n_points - 1)
+    n_block = int(min(max((chunk_memory // 2) // (n_fft * (2 * n_kernels + 1) * itemsize), 1), n_channel))
+    return n_out * step, n_block
+
+
+def wavelet_memory_size(n_time, n_channel, kernels_shape, step=1, dtype=numpy.complex128, chunk_memory=CHUNK_MEMORY):
+    """
+    Upper bound of the memory in bytes required by `wavelet_transform_chunks`.
+    """
+    n_kernels, n_points = kernels_shape[0], min(kernels_shape[1], 2 * n_time - 1)
+    itemsize = numpy.dtype(dtype).itemsize
+    n_chunk, n_block = chunk_size(n_time, n_channel, kernels_shape, step, dtype, chunk_memory)
+    n_fft = scipy.fft.next_fast_len(n_chunk + n_points - 1)
+    data_size = (n_chunk + n_points - 1) * n_channel * itemsize // 2
+    spectra_size = n_fft * n_block * (2 * n_kernels + 1) * itemsize
+    coefficients_size = n_kernels * (n_chunk // step) * n_channel * itemsize
+    return data_size + spectra_size + coefficients_size + n_kernels * n_fft * itemsize
+
+
+def wavelet_transform_chunks(read_data, n_time, kernels, step=1, dtype=numpy.complex128, chunk_memory=CHUNK_MEMORY):
+    """
+    Convolve all the signals of a time series with all the kernels, in 'same' mode, as
+    `scipy.signal.convolve(signal, kernel, 'same')` would, keeping one time point every `step`.
+
+    The time series is read in chunks of time points, extended on both sides by the half length of the
+    kernels, and each chunk is convolved by FFT for a block of signals at a time.
+
+    :param read_data: callable returning the data between a start and a stop time index, time being the first axis
+    :param n_time: the number of time points of the time series
+    :param kernels: (n_kernels, n_points) array, of odd length, as returned by `morlet_kernels`
+    :param step: the number of time points per coefficient
+    :param dtype: the complex type of the computation and of the coefficients; complex64 halves the memory
+    :param chunk_memory: upper bound, in bytes, of the coefficients and temporary arrays of one chunk
+    :returns: a generator of (n_kernels, n_coefficients, ...) arrays, the coefficients of consecutive chunks
+    """
+    dtype = numpy.dtype(dtype)
+    real_dtype = numpy.finfo(dtype).dtype
+    # kernel points further than n_time - 1 from the center never overlap the time series
+    half = min((kernels.shape[1] - 1) // 2, n_time - 1)
+    center = (kernels.shape[1] - 1) // 2
+    kernels = kernels[:, center - half:center + half + 1]
+    n_kernels, n_points = kernels.shape
+    channel_shape = numpy.shape(read_data(0, 1))[1:]
+    n_channel = int(numpy.prod(channel_shape))
+    n_chunk, n_block = chunk_size(n_time, n_channel, kernels.shape, step, dtype, chunk_memory)
+    n_fft = scipy.fft.next_fast_len(n_chunk + n_points - 1)
+    spectra = scipy.fft.fft(kernels.astype(dtype), n=n_fft, axis=1)[:, :, numpy.newaxis]
+    log.debug("Wavelet transform of %d signals in chunks of %d time points, %d signals at once"
+              % (n_channel, n_chunk, n_block))
+
+    for start in range(0, n_time, n_chunk):
+        stop = min(start + n_chunk, n_time)
+        # the chunk, extended with the data on both sides, or with zeros at the ends of the time series
+        extended = numpy.zeros((stop - start + 2 * half, n_channel), dtype=real_dtype)
+        first, last = max(start - half, 0), min(stop + half, n_time)
+        data = numpy.asarray(read_data(first, last))
+        extended[first - start + half:last - start + half] = data.reshape((last - first, n_channel))
+
+        # the 'same' convolution at start + t is at 2 * half + t in the convolution of the extended chunk
+        coefficients = numpy.empty((n_kernels, len(range(start, stop, step)), n_channel), dtype=dtype)
+        for block in range(0, n_channel, n_block):
+            channels = slice(block, block + n_block)
+            data_spectra = scipy.fft.fft(extended[:, channels], n=n_fft, axis=0)
+            convolved = scipy.fft.ifft(spectra * data_spectra, axis=1, overwrite_x=True)
+            coefficients[:, :, channels] = convolved[:, 2 * half:2 * half + stop - start:step]
+        yield coefficients.reshape(coefficients.shape[:2] + channel_shape)
+
+
+def compute_continuous_wavelet_transform(time_series, frequencies, sample_period, q_ratio, normalisation, mother,
+                                         dtype=numpy.complex128):
+    """
+    # type: (TimeSeries, Range, float, float, str, str, numpy.dtype)  -> WaveletCoefficients
+    Calculate the continuous wavelet transform of time_series.
+
+    Parameters
+    __________
+
+    time_series : TimeSeries
+    The timeseries to which the wavelet is to be applied.
+
+    frequencies : Range
+    The frequency resolution and range returned. Requested frequencies
+    are converted internally into appropriate scales.
+
+    sample_period : float
+    The sampling period of the computed wavelet spectrum.
+
+    q_ratio : float
+    NFC. Must be greater than 5. Ratios of the center frequencies to bandwidths.
+
+    normalisation : str
+    The type of normalisation for the resulting wavet spectrum. Default is 'energy', options are: 'energy'; 'gabor'.
+
+    mother : str
+    The mother wavelet function used in the transform.
+
+    dtype : numpy.dtype
+    The complex type used for the computation, complex128 or complex64.
+    """
+    data = time_series.data
+    frequencies, freqs = wavelet_frequencies(frequencies)
+    kernels = morlet_kernels(freqs, time_series.sample_rate, q_ratio, normalisation)
+    step = temporal_step(sample_period, time_series.sample_period)
 
+    coef = numpy.concatenate(list(wavelet_transform_chunks(lambda start, stop: data[start:stop],
+                                                           data.shape[0], kernels, step, dtype)), axis=1)
     log.debug("coef")
     log.debug(narray_describe(coef))
 
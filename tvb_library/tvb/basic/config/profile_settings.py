@@ -96,6 +96,11 @@ class BaseSettingsProfile(object):
         # Max number of threads in the pool of ops running in parallel. TO be correlated with CPU cores
         self.MAX_THREADS_NUMBER = self.manager.get_attribute(stored.KEY_MAX_THREAD_NR, 4, int)
         self.OPERATIONS_BACKGROUND_JOB_INTERVAL = self.manager.get_attribute(stored.KEY_OP_BACKGROUND_INTERVAL, 60, int)
+        # Run ops in long-lived worker processes, instead of starting a new interpreter for each op
+        self.OPERATION_WORKERS = self.manager.get_attribute(stored.KEY_OPERATION_WORKERS, True, eval)
+        # A worker process is replaced after this number of ops, or when using more memory (in MB)
+        self.MAX_OPERATIONS_PER_WORKER = self.manager.get_attribute(stored.KEY_MAX_OPS_PER_WORKER, 20, int)
+        self.MAX_WORKER_MEMORY = self.manager.get_attribute(stored.KEY_MAX_WORKER_MEMORY, 2048, int)
         # The maximum disk space that can be used by one single user, in KB.
         self.MAX_DISK_SPACE = self.manager.get_attribute(stored.KEY_MAX_DISK_SPACE_USR, 5 * 1024 * 1024, int)
 
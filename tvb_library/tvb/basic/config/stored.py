@@ -70,6 +70,9 @@ KEY_CRYPT_DATADIR = 'CRYPT_DATADIR'
 KEY_HPC_COMPUTE_SITE = 'HPC_COMPUTE_SITE'
 KEY_MAX_THREAD_NR = 'MAXIMUM_NR_OF_THREADS'
 KEY_OP_BACKGROUND_INTERVAL = 'OP_BACKGROUND_JOB_INTERVAL'
+KEY_OPERATION_WORKERS = 'RUN_OPERATIONS_IN_WORKERS'
+KEY_MAX_OPS_PER_WORKER = 'MAXIMUM_NR_OF_OPS_PER_WORKER'
+KEY_MAX_WORKER_MEMORY = 'MAXIMUM_WORKER_MEMORY'
 KEY_MAX_RANGE_NR = 'MAXIMUM_NR_OF_OPS_IN_RANGE'
 KEY_MAX_NR_SURFACE_VERTEX = 'MAXIMUM_NR_OF_VERTICES_ON_SURFACE'
 KEY_LAST_CHECKED_FILE_VERSION = 'LAST_CHECKED_FILE_VERSION'
@@ -88,7 +88,7 @@ class PrincipalComponents(HasTraits):
         """Compnent time-series."""
         # TODO: Generalise -- it currently assumes 4D TimeSeriesSimulator...
         ts_shape = self.source.data.shape
-        component_ts = numpy.zeros(ts_shape)
+        component_ts = numpy.zeros((ts_shape[0], ts_shape[1], self.weights.shape[0], ts_shape[3]))
         for var in range(ts_shape[1]):
             for mode in range(ts_shape[3]):
                 w = self.weights[:, :, var, mode]
@@ -103,7 +103,7 @@ class PrincipalComponents(HasTraits):
         """normalised_Compnent time-series."""
         # TODO: Generalise -- it currently assumes 4D TimeSeriesSimulator...
         ts_shape = self.source.data.shape
-        component_ts = numpy.zeros(ts_shape)
+        component_ts = numpy.zeros((ts_shape[0], ts_shape[1], self.weights.shape[0], ts_shape[3]))
         for var in range(ts_shape[1]):
             for mode in range(ts_shape[3]):
                 w = self.weights[:, :, var, mode]
@@ -182,11 +182,11 @@ class IndependentComponents(HasTraits):
         Compute the linear mixing matrix A, so X = A * S ,
         where X is the observed data and S contain the independent components
             """
-        ts_shape = self.source.data.shape
-        mixing_matrix_shape = (ts_shape[2], self.n_components, ts_shape[1], ts_shape[3])
+        n_comp, n_node, n_svar, n_mode = self.prewhitening_matrix.shape
+        mixing_matrix_shape = (n_node, n_comp, n_svar, n_mode)
         mixing_matrix = numpy.zeros(mixing_matrix_shape)
-        for var in range(ts_shape[1]):
-            for mode in range(ts_shape[3]):
+        for var in range(n_svar):
+            for mode in range(n_mode):
                 w = self.unmixing_matrix[:, :, var, mode]
                 k = self.prewhitening_matrix[:, :, var, mode]
                 temp = numpy.matrix(numpy.dot(w, k))
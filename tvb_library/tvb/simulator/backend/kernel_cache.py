@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+A persistent, content-addressed cache of the source generated by the
+backends, such that kernels are rendered, formatted and, with Numba's
+`cache=True`, compiled once per installation rather than once per process.
+
+Entries are Python modules named after a hash of the template, the rendered
+source, the backend and the versions of TVB and its code generation
+dependencies, stored under the TVB storage folder. Entries are written
+atomically, so that concurrent operations generating the same kernel at worst
+both write the same file, and the least recently used entries are evicted
+once the cache grows beyond its maximum number of entries.
+
+"""
+
+import os
+import sys
+import glob
+import hashlib
+import tempfile
+import importlib.util
+
+import numpy as np
+
+from tvb.basic.config.settings import VersionSettings
+from tvb.basic.logger.builder import get_logger
+from tvb.basic.profile import TvbProfile
+
+
+LOG = get_logger(__name__)
+
+def _versions():
+    "Versions of the libraries which affect generated or compiled kernels."
+    versions = ['tvb=' + VersionSettings.BASE_VERSION, 'numpy=' + np.__version__,
+                'python=' + sys.version.split()[0]]
+    for modname in ('numba', 'mako', 'autopep8'):
+        try:
+            versions.append(modname + '=' + importlib.import_module(modname).__version__)
+        except (ImportError, AttributeError):
+            versions.append(modname + '=none')
+    return versions
+
+
+class KernelCache:
+    "Cache of generated kernel modules under a folder, with LRU eviction."
+
+    prefix = 'tvb_kernel_'
+
+    def __init__(self, folder=None, max_entries=512):
+        if folder is None:
+            folder = os.path.join(TvbProfile.current.TVB_STORAGE, 'kernels')
+        self.folder = folder
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+
+    def key(self, backend, template_source, source):
+        "Hash of the template, rendered source, backend and library versions."
+        digest = hashlib.sha256()
+        for part in [type(backend).__qualname__, template_source, source] + _versions():
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.folder, self.prefix + key + '.py')
+
+    def get(self, key, name):
+        "Retrieve one or more functions from a cached kernel module, or None if not cached."
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            module = self._import(key, path)
+            self._touch(key)
+        except FileNotFoundError:
+            # evicted concurrently
+            self.misses += 1
+            return None
+        self.hits += 1
+        fns = [getattr(module, n) for n in name.split(',')]
+        return fns[0] if len(fns) == 1 else fns
+
+    def put(self, key, source):
+        "Store kernel source atomically, evicting least recently used entries."
+        os.makedirs(self.folder, exist_ok=True)
+        if os.path.exists(self._path(key)):
+            # written by a concurrent operation, and rewriting would invalidate its compiled code
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.folder)
+        with os.fdopen(fd, 'w') as fh:
+            fh.write(source)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def _touch(self, key):
+        # the module itself is left untouched, as Numba invalidates its cache on source mtime
+        stamp = os.path.join(self.folder, self.prefix + key + '.used')
+        with open(stamp, 'a'):
+            os.utime(stamp)
+
+    def _import(self, key, path):
+        modname = self.prefix + key
+        if modname in sys.modules:
+            return sys.modules[modname]
+        spec = importlib.util.spec_from_file_location(modname, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[modname] = module
+        return module
+
+    def entries(self):
+        "Paths of cached kernel modules, from least to most recently used."
+        paths = []
+        for path in glob.glob(os.path.join(self.folder, self.prefix + '*.py')):
+            stamp = path[:-len('.py')] + '.used'
+            try:
+                used = os.path.getmtime(stamp) if os.path.exists(stamp) else os.path.getmtime(path)
+                paths.append((used, path))
+            except FileNotFoundError:
+                pass
+        return [path for _, path in sorted(paths)]
+
+    def evict(self):
+        "Remove the least recently used entries beyond the maximum number of entries."
+        paths = self.entries()
+        for path in paths[:max(0, len(paths) - self.max_entries)]:
+            stem = os.path.basename(path)[:-len('.py')]
+            # Numba's cache=True files are stored next to the module
+            compiled = glob.glob(os.path.join(self.folder, '__pycache__', stem + '.*'))
+            for fname in glob.glob(os.path.join(self.folder, stem + '.*')) + compiled:
+                try:
+                    os.remove(fname)
+                except FileNotFoundError:
+                    pass
+            LOG.debug('evicted kernel %s', stem)
+
+    def clear(self):
+        "Remove all entries."
+        max_entries, self.max_entries = self.max_entries, 0
+        try:
+            self.evict()
+        finally:
+            self.max_entries = max_entries
@@ -31,13 +31,192 @@
 """
 A Numba backend based on the NumPy backend.
 
+The backend fuses the steps of the simulator loop (coupling, derivatives,
+integration and history update) into a single compiled loop, rendered from
+the `nb-sim.py.mako` template, which advances the simulation by a chunk of
+steps per call, after which monitor samples are computed for the whole
+chunk at once::
+
+    sim = simulator.Simulator(...).configure()
+    (t, y), = NbBackend().run_sim(sim, simulation_length=1e3)
+
+Running a simulator through this backend is opt-in. It is model-agnostic,
+supporting any model which declares `state_variable_dfuns` and any coupling
+with `pre_expr` and `post_expr`, with the Euler, Heun or Runge-Kutta
+integrators and any number of Raw, SubSample, TemporalAverage and
+GlobalAverage monitors, cf. `NbBackend.check_compatibility`.
+
 ... moduleauthor:: Marmaduke Woodman <marmaduke.woodman@univ-amu.fr>
 
 """
 
+import math
+import numpy as np
 
 from .np import NpBackend
+from tvb.simulator import coupling, integrators, monitors, noise
 
 
 class NbBackend(NpBackend):
-    pass
+
+    supported_integrators = (
+        integrators.EulerDeterministic, integrators.EulerStochastic,
+        integrators.HeunDeterministic, integrators.HeunStochastic,
+        integrators.RungeKutta4thOrderDeterministic)
+
+    supported_monitors = (monitors.Raw, monitors.SubSample, monitors.TemporalAverage,
+                          monitors.GlobalAverage)
+
+    def check_compatibility(self, sim):
+        "Raise NotImplementedError if the configured simulator can't be run by this backend."
+        def check_choices(val, choices):
+            if not isinstance(val, choices):
+                raise NotImplementedError("Unsupported simulator component. Given: {}\nExpected one of: {}".format(type(val), choices))
+        # models
+        if getattr(sim.model, 'state_variable_dfuns', None) is None:
+            raise NotImplementedError("Model %s does not provide state_variable_dfuns." % type(sim.model).__name__)
+        if sim.model.nintvar != sim.model.nvar:
+            raise NotImplementedError("Models with non-integrated state variables not supported.")
+        if sim.model.number_of_modes != 1:
+            raise NotImplementedError("Models with more than one mode not supported.")
+        # coupling
+        check_choices(sim.coupling, coupling.Coupling)
+        if not hasattr(sim.coupling, 'pre_expr'):
+            raise NotImplementedError("Coupling %s does not provide pre_expr and post_expr." % type(sim.coupling).__name__)
+        for par in sim.coupling.parameter_names:
+            if getattr(sim.coupling, par).size != 1:
+                raise NotImplementedError("Coupling parameter %s must be scalar." % par)
+        # integrators
+        check_choices(sim.integrator, self.supported_integrators)
+        if isinstance(sim.integrator, integrators.IntegratorStochastic):
+            check_choices(sim.integrator.noise, noise.Additive)
+            if sim.integrator.noise.ntau > 0.0:
+                raise NotImplementedError("Coloured noise not supported.")
+            if sim.integrator.noise.nsig.size not in (1, sim.model.nvar):
+                raise NotImplementedError("Noise nsig must be scalar or per state variable.")
+        # monitors
+        for monitor in sim.monitors:
+            check_choices(monitor, self.supported_monitors)
+            if sim.current_step % monitor.istep != 0:
+                raise NotImplementedError("Simulator must be at a multiple of the monitor sampling period.")
+        # surface
+        if sim.surface is not None:
+            raise NotImplementedError("Surface simulation not supported.")
+        if sim.stimulus is not None:
+            raise NotImplementedError("Stimulus not supported.")
+
+    def build_loop(self, sim, print_source=False):
+        "Build the compiled loop advancing the simulator's state buffer by a number of steps."
+        template = '<%include file="nb-sim.py.mako"/>'
+        content = dict(sim=sim, np=np, debug_nojit=False, nb_cache=True)
+        return self.build_py_func(template, content, name='loop', print_source=print_source,
+                                  use_cache=True)
+
+    def _chunk_steps(self, sim, chunksize):
+        "Round the chunk size up to a multiple of all monitor periods."
+        istep = 1
+        for monitor in sim.monitors:
+            istep = istep * monitor.istep // math.gcd(istep, monitor.istep)
+        return max(1, int(math.ceil(chunksize / istep))) * istep
+
+    def _time_average(self, ts, istep):
+        "Average non-overlapping windows of istep samples along the last axis."
+        T = ts.shape[-1]
+        return np.mean(ts.reshape(ts.shape[:-1] + (T // istep, istep)), -1) # length of ts better be multiple of istep
+
+    def _monitor_chunk(self, monitor, steps, observed):
+        """
+        Sample a monitor on a chunk of observed states of shape (nvoi, nnode, nstep),
+        where the chunk starts after a sampling step of the monitor.
+        """
+        if isinstance(monitor, monitors.Raw):
+            return steps * monitor.dt, observed.transpose((2, 0, 1))[..., np.newaxis]
+        sample_steps = steps[monitor.istep - 1::monitor.istep]
+        if isinstance(monitor, monitors.TemporalAverage):
+            time = (sample_steps - monitor.istep / 2.0) * monitor.dt
+            data = self._time_average(observed[monitor.voi], monitor.istep)
+        elif isinstance(monitor, monitors.SubSample):
+            time = sample_steps * monitor.dt
+            data = observed[monitor.voi][..., monitor.istep - 1::monitor.istep]
+        elif isinstance(monitor, monitors.GlobalAverage):
+            time = sample_steps * monitor.dt
+            data = observed[monitor.voi][..., monitor.istep - 1::monitor.istep].mean(axis=1, keepdims=True)
+        else:
+            raise NotImplementedError("Unsupported monitor %s." % type(monitor).__name__)
+        return time, data.transpose((2, 0, 1))[..., np.newaxis]
+
+    def iter_sim(self, sim, nstep=None, simulation_length=None, chunksize=1000):
+        """
+        Return an iterator which advances the simulator by chunks of steps, generating
+        for each chunk a list of (time, data) pairs, one per monitor, in the layout of
+        the simulator's own output, with the samples of the chunk stacked along the first
+        axis. On completion, the simulator's current state, step and history are updated,
+        so that the simulation can be continued by the backend or by the simulator itself.
+
+        :param nstep: Number of integration steps, which takes precedence over simulation_length.
+        :param simulation_length: Length of the simulation to perform in ms.
+        :param chunksize: Number of steps per call of the compiled loop, rounded up to a multiple
+            of the monitors' sampling periods.
+        """
+        self.check_compatibility(sim)
+        if nstep is None:
+            if simulation_length is None:
+                simulation_length = sim.simulation_length
+            nstep = int(math.ceil(simulation_length / sim.integrator.dt))
+        for monitor in sim.monitors:
+            if nstep % monitor.istep != 0:
+                raise ValueError("Number of steps must be a multiple of the monitor sampling period.")
+        chunksize = self._chunk_steps(sim, min(chunksize, nstep))
+        loop = self.build_loop(sim)
+
+        # shapes
+        horizon = sim.connectivity.horizon
+        nnode = sim.connectivity.number_of_regions
+        nsvar = sim.model.nvar
+        cvar = sim.model.cvar
+        stochastic = isinstance(sim.integrator, integrators.IntegratorStochastic)
+        any_delays = sim.connectivity.idelays.any()
+        # arrays
+        parmat = sim.model.spatial_parameter_matrix.T.astype(np.float32)
+        if parmat.size == 0:
+            parmat = np.zeros((nnode, 0), np.float32)
+        weights = sim.connectivity.weights.astype(np.float32)
+        args = [weights, parmat]
+        if stochastic:
+            args.append(sim.integrator.noise.nsig.reshape((-1, )).astype(np.float32))
+        if any_delays:
+            args.append(sim.connectivity.idelays.astype(np.uint32))
+        # state buffer, with the history in its first horizon time slots, from oldest to current
+        state = np.zeros((nsvar, nnode, horizon + chunksize), np.float32)
+        ring = (sim.current_step + 1 + np.r_[:horizon]) % horizon
+        state[cvar, :, :horizon] = np.transpose(sim.history.buffer[ring, :, :, 0], (1, 2, 0))
+        state[:, :, horizon - 1] = sim.current_state[..., 0]
+
+        step = sim.current_step
+        while step < sim.current_step + nstep:
+            n = min(chunksize, sim.current_step + nstep - step)
+            if stochastic:
+                # noise is drawn in the simulator's order and read by the loop from future slots
+                dWt = sim.integrator.noise.random_stream.normal(size=(n, nsvar, nnode, 1))
+                state[:, :, horizon:horizon + n] = np.transpose(dWt[..., 0], (1, 2, 0))
+            loop(horizon, n, state, *args)
+            steps = np.r_[step + 1:step + n + 1]
+            observed = sim.model.observe(state[:, :, horizon:horizon + n].astype('d'))
+            yield [self._monitor_chunk(monitor, steps, observed) for monitor in sim.monitors]
+            state[:, :, :horizon] = state[:, :, n:n + horizon].copy()
+            step += n
+
+        # sync simulator with final state
+        sim.current_step = step
+        sim.current_state = state[:, :, horizon - 1, np.newaxis].astype('d')
+        ring = (step + 1 + np.r_[:horizon]) % horizon
+        sim.history.buffer[ring, :, :, 0] = np.transpose(state[cvar, :, :horizon], (2, 0, 1))
+
+    def run_sim(self, sim, nstep=None, simulation_length=None, chunksize=1000):
+        "Run the simulator with the compiled loop, collecting output data as Simulator.run does."
+        ts, xs = [[] for _ in sim.monitors], [[] for _ in sim.monitors]
+        for chunk in self.iter_sim(sim, nstep=nstep, simulation_length=simulation_length, chunksize=chunksize):
+            for tl, xl, (t, x) in zip(ts, xs, chunk):
+                tl.append(t)
+                xl.append(x)
+        return [(np.concatenate(tl), np.concatenate(xl)) for tl, xl in zip(ts, xs)]
@@ -36,49 +36,13 @@ code.
 
 """
 
-import os
-import importlib
 import numpy as np
-import autopep8
 
-from .templates import MakoUtilMix
+from .nb import NbBackend
 from tvb.simulator.lab import *
 
 
-class NbMPRBackend(MakoUtilMix):
-
-    def build_py_func(self, template_source, content, name='kernel', print_source=False,
-            modname=None):
-        "Build and retrieve one or more Python functions from template."
-        source = self.render_template(template_source, content)
-        source = autopep8.fix_code(source)
-        if print_source:
-            print(self.insert_line_numbers(source))
-        if modname is not None:
-            return self.eval_module(source, name, modname)
-        else:
-            return self.eval_source(source, name)
-
-    def eval_source(self, source, name):
-        globals_ = {}
-        try:
-            exec(source, globals_)
-        except Exception as exc:
-            if not print_source:
-                print(self._insert_line_numbers(source))
-            raise exc
-        fns = [globals_[n] for n in name.split(',')]
-        return fns[0] if len(fns)==1 else fns
-
-    def eval_module(self, source, name, modname):
-        here = os.path.abspath(os.path.dirname(__file__))
-        genp = os.path.join(here, 'templates', 'generated')
-        with open(f'{genp}/{modname}.py', 'w') as fd:
-            fd.write(source)
-        fullmodname = f'tvb.simulator.backend.templates.generated.{modname}'
-        mod = importlib.import_module(fullmodname)
-        fns = [getattr(mod,n) for n in name.split(',')]
-        return fns[0] if len(fns)==1 else fns
+class NbMPRBackend(NbBackend):
 
     def check_compatibility(self, sim): 
         def check_choices(val, choices):
@@ -161,10 +125,6 @@ class NbMPRBackend(MakoUtilMix):
         )
         return [svar_buf[:,horizon:] for svar_buf in svar_bufs]
 
-    def _time_average(self, ts, istep):
-        N, T = ts.shape
-        return np.mean(ts.reshape(N,T//istep,istep),-1) # length of ts better be multiple of istep 
-
     def _run_sim_tavg_chunked(self, sim, nstep, chunksize, compatibility_mode=False):
         template = '<%include file="nb-montbrio.py.mako"/>'
         content = dict(sim=sim, compatibility_mode=compatibility_mode) 
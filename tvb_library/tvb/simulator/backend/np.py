@@ -44,18 +44,42 @@ import autopep8
 import tempfile
 
 from .templates import MakoUtilMix
+from .kernel_cache import KernelCache
 
 
 class NpBackend(MakoUtilMix):
 
-    def __init__(self):
+    def __init__(self, kernel_cache=None):
         self.cgdir = tempfile.TemporaryDirectory()
         sys.path.append(self.cgdir.name)
+        self._kernel_cache = kernel_cache
+
+    @property
+    def kernel_cache(self):
+        "Persistent cache of generated kernels, by default under the TVB storage folder."
+        if self._kernel_cache is None:
+            self._kernel_cache = KernelCache()
+        return self._kernel_cache
 
     def build_py_func(self, template_source, content, name='kernel', print_source=False,
-            modname=None, fname=None):
-        "Build and retrieve one or more Python functions from template."
+            modname=None, fname=None, use_cache=False):
+        """
+        Build and retrieve one or more Python functions from template.
+
+        With use_cache, the formatted source is stored in and loaded from the kernel cache,
+        keyed on the rendered source, such that formatting and, for templates rendering
+        Numba functions with cache=True, compilation, happen once per distinct kernel.
+        """
         source = self.render_template(template_source, content)
+        if use_cache and modname is None and fname is None:
+            if print_source:
+                print(self.insert_line_numbers(source))
+            key = self.kernel_cache.key(self, template_source, source)
+            fns = self.kernel_cache.get(key, name)
+            if fns is None:
+                self.kernel_cache.put(key, autopep8.fix_code(source))
+                fns = self.kernel_cache.get(key, name)
+            return fns
         source = autopep8.fix_code(source)
         if print_source:
             print(self.insert_line_numbers(source))
@@ -80,12 +104,12 @@ class NpBackend(MakoUtilMix):
         return fns[0] if len(fns)==1 else fns
 
     def eval_module(self, source, name, modname):
-        here = os.path.abspath(os.path.dirname(__file__))
-        genp = os.path.join(here, 'templates', 'generated')
-        with open(f'{genp}/{modname}.py', 'w') as fd:
+        # written to this backend's own code generation folder, on the path, rather than
+        # into the package, which may be read-only or shared by concurrent operations
+        with open(os.path.join(self.cgdir.name, f'{modname}.py'), 'w') as fd:
             fd.write(source)
-        fullmodname = f'tvb.simulator.backend.templates.generated.{modname}'
-        mod = importlib.import_module(fullmodname)
+        importlib.invalidate_caches()
+        mod = importlib.import_module(modname)
         fns = [getattr(mod,n) for n in name.split(',')]
         return fns[0] if len(fns)==1 else fns
 
@@ -57,7 +57,7 @@ __device__ void coupling(
 % for cvar, cterm in zip(sim.model.cvar, sim.model.coupling_terms):
 		x_i = state[${cvar}*n_node + id];
 		x_j = state[${cvar}*n_node +  j];
-		cX[${loop.index}*n_node + id] += wij * ${sim.coupling.pre_expr};
+		cX[${loop.index}*n_node + id] += wij * (${sim.coupling.pre_expr});
 % endfor
 	}
 
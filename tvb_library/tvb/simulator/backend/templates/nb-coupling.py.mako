@@ -32,7 +32,7 @@ import math
 import numpy as np
 import numba as nb
 
-sin, cos, exp = math.sin, math.cos, math.exp
+sin, cos, exp, tanh = math.sin, math.cos, math.exp, math.tanh
 
 @nb.jit
 def coupling(cX, weights, state, di):
@@ -60,7 +60,7 @@ def coupling(cX, weights, state, di):
 % for cvar, cterm in zip(sim.model.cvar, sim.model.coupling_terms):
             x_i = state[${cvar}, 0, i]
 	    x_j = state[${cvar}, di[i, j], j]
-            cX[${loop.index}, i] += wij * ${sim.coupling.pre_expr}
+            cX[${loop.index}, i] += wij * (${sim.coupling.pre_expr})
 % endfor
 
 % for cterm in sim.model.coupling_terms:
@@ -31,7 +31,7 @@
 import math
 import numpy as np
 import numba as nb
-sin, cos, exp = math.sin, math.cos, math.exp
+sin, cos, exp, tanh = math.sin, math.cos, math.exp, math.tanh
 
 <%
     svars = ', '.join(sim.model.state_variables)
@@ -45,6 +45,7 @@ def cx_${cterm}(t, i, weights, cvar
 % for par in sim.coupling.parameter_names:
     ${par} = nb.float32(${getattr(sim.coupling, par)[0]})
 % endfor
+    n_cvar = nb.float32(${len(sim.model.cvar)})
     gx = nb.float32(0.0)
     for j in range(weights.shape[0]):
         wij = nb.float32(weights[i, j])
@@ -53,6 +54,6 @@ def cx_${cterm}(t, i, weights, cvar
         x_i = cvar[i, t]
         dij = ${'di[i, j]' if any_delays else 'nb.uint32(0)'}
         x_j = cvar[j, t - dij]
-        gx += wij * ${sim.coupling.pre_expr}
+        gx += wij * (${sim.coupling.pre_expr})
     return ${sim.coupling.post_expr}
 % endfor
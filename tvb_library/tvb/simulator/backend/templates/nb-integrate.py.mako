@@ -49,8 +49,31 @@ import numba as nb
     any_delays = sim.connectivity.idelays.any()
     svars = ', '.join(sim.model.state_variables)
     cvars = ', '.join(sim.model.coupling_terms)
+    nb_cache = 'cache=True' if context.get('nb_cache', False) else ''
+
+    # bounds as configured on the integrator for the model, cf. Integrator.configure_boundaries
+    import numpy
+    bounds = {}
+    if sim.integrator.state_variable_boundaries is not None:
+        for isvar, (lo, hi) in zip(sim.integrator.bounded_state_variable_indices,
+                                   sim.integrator.state_variable_boundaries):
+            lo = lo if lo > numpy.finfo('d').min else None
+            hi = hi if hi < numpy.finfo('d').max else None
+            bounds[sim.model.state_variables[isvar]] = lo, hi
 %>
 
+## apply state variable boundaries, if any, to each new state, as Integrator.integration_bound_and_clamp
+<%def name='bound_svars(prefix)'>
+% for svar, (lo, hi) in bounds.items():
+% if lo is not None:
+        ${prefix}${svar} = ${prefix}${svar} if ${prefix}${svar} >= ${lo} else ${lo}
+% endif
+% if hi is not None:
+        ${prefix}${svar} = ${prefix}${svar} if ${prefix}${svar} <= ${hi} else ${hi}
+% endif
+% endfor
+</%def>
+
 ## TODO multiplicative noise
 % if stochastic:
 ${'' if debug_nojit else '@nb.njit(inline="always")'}
@@ -67,7 +90,7 @@ def noise(t, i, isvar, nsig, state):
 # no noise function rendered for integrator ${type(sim.integrator)}
 % endif
 
-${'' if debug_nojit else '@nb.njit'}
+${'' if debug_nojit else f'@nb.njit({nb_cache})'}
 def integrate(t, state, weights, parmat
     ${', nsig' if stochastic else ''}
     ${', idelays' if any_delays else ''}
@@ -102,12 +125,14 @@ def integrate(t, state, weights, parmat
 % for svar in sim.model.state_variables:
         n${svar} = ${svar} + dt * d0${svar}
 % endfor
+${bound_svars('n')}
 % endif
 
 % if isinstance(sim.integrator, EulerStochastic):
 % for svar in sim.model.state_variables:
         n${svar} = ${svar} + dt * d0${svar} + z${svar}
 % endfor
+${bound_svars('n')}
 % endif
 
 ## Heun
@@ -118,24 +143,28 @@ def integrate(t, state, weights, parmat
 % for svar in sim.model.state_variables:
         i1${svar} = ${svar} + dt * d0${svar}
 % endfor
+${bound_svars('i1')}
 % for svar in sim.model.state_variables:
         d1${svar} = dx_${svar}(${i1svars}, ${cvars}, parmat[i])
 % endfor
 % for svar in sim.model.state_variables:
         n${svar} = ${svar} + dt / 2 * (d0${svar} + d1${svar})
 % endfor
+${bound_svars('n')}
 % endif
 
 % if isinstance(sim.integrator, HeunStochastic):
 % for svar in sim.model.state_variables:
         i1${svar} = ${svar} + dt * d0${svar} + z${svar}
 % endfor
+${bound_svars('i1')}
 % for svar in sim.model.state_variables:
         d1${svar} = dx_${svar}(${i1svars}, ${cvars}, parmat[i])
 % endfor
 % for svar in sim.model.state_variables:
         n${svar} = ${svar} + dt / 2 * (d0${svar} + d1${svar}) + z${svar}
 % endfor
+${bound_svars('n')}
 % endif
 
 ## Others
@@ -160,24 +189,28 @@ def integrate(t, state, weights, parmat
 % for svar in sim.model.state_variables:
         i1${svar} = ${svar} + dt / 2 * d0${svar}
 % endfor
+${bound_svars('i1')}
 % for svar in sim.model.state_variables:
         d1${svar} = dx_${svar}(${i1svars}, ${cvars}, parmat[i])
 % endfor
 % for svar in sim.model.state_variables:
         i2${svar} = ${svar} + dt / 2 * d1${svar}
 % endfor
+${bound_svars('i2')}
 % for svar in sim.model.state_variables:
         d2${svar} = dx_${svar}(${i2svars}, ${cvars}, parmat[i])
 % endfor
 % for svar in sim.model.state_variables:
         i3${svar} = ${svar} + dt * d2${svar}
 % endfor
+${bound_svars('i3')}
 % for svar in sim.model.state_variables:
         d3${svar} = dx_${svar}(${i3svars}, ${cvars}, parmat[i])
 % endfor
 % for svar in sim.model.state_variables:
         n${svar} = ${svar} + dt / 6 * (d0${svar} + 2*(d1${svar} + d2${svar}) + d3${svar})
 % endfor
+${bound_svars('n')}
 % endif
 
 ## Update buffer
@@ -57,7 +57,7 @@ def cx(t, i, N, weights, ${','.join(cvars)}, idelays):
     for j in range(N):
 % for cterm, cvar in zip(sim.model.coupling_terms, cvars):
         x_j = ${cvar}[j, t - idelays[i,j]]
-        ${cterm} +=  weights[i, j]* ${sim.coupling.pre_expr}
+        ${cterm} +=  weights[i, j] * (${sim.coupling.pre_expr})
 % endfor
 % for cterm, cvar in zip(sim.model.coupling_terms, cvars):
     gx = ${cterm}
@@ -39,9 +39,11 @@ import numba as nb
     from tvb.simulator.integrators import IntegratorStochastic
     stochastic = isinstance(sim.integrator, IntegratorStochastic)
     any_delays = sim.connectivity.idelays.any()
+    # compiled code is cached by Numba next to the module, when rendered to a file
+    nb_cache = ', cache=True' if context.get('nb_cache', False) else ''
 %>
 
-${'' if debug_nojit else '@nb.njit(inline="always")'}
+${'' if debug_nojit else f'@nb.njit(inline="always"{nb_cache})'}
 def loop(horizon, nstep, state, weights, parmat
            ${', nsig' if stochastic else ''}
            ${', idelays' if any_delays else ''}
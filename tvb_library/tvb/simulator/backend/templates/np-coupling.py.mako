@@ -30,7 +30,7 @@
 
 import numpy as np
 
-sin, cos, exp = np.sin, np.cos, np.exp
+sin, cos, exp, tanh = np.sin, np.cos, np.exp, np.tanh
 
 def coupling(cX, weights, state
 % if sim.connectivity.idelays.any():
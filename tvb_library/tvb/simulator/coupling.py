@@ -139,16 +139,11 @@ class SparseCoupling(Coupling):
     A coupling implementation which takes advantage of a sparse weights structure to reduce the
     number of coupling terms evaluated.
 
-    """
+    `pre` is evaluated on the afferent, non-zero-weight connections only, with `x_i` and `x_j` of
+    shape (n_cvar, n_nnzw, n_mode), and the weighted terms are summed per efferent node, so that no
+    (n_node, n_node) array is involved.
 
-    def _lri(self, nnz_row_el_idx):
-        "Flat array of indices afferent, non-zero-weight connections."
-        if not hasattr(self, '_cached_lri'):
-            rows = numpy.r_[-1, nnz_row_el_idx]
-            self._cached_lri, = numpy.argwhere(numpy.diff(rows)).T
-            self._cached_nzr = numpy.unique(nnz_row_el_idx)
-            self.log.debug('lri.size %d nzr.size %d', self._cached_lri.size, self._cached_nzr.size)
-        return self._cached_lri, self._cached_nzr
+    """
 
     def __call__(self, step, history):
         h = history # type: SparseHistory
@@ -157,17 +152,21 @@ class SparseCoupling(Coupling):
         assert x_j.shape == (h.n_cvar, h.n_nnzw, h.n_mode)
         #                              ^ from (columns)
 
-        sum = numpy.zeros_like(x_i)
-        x_i = x_i[:, h.nnz_row_el_idx]
-        assert x_i.shape == (h.n_cvar, h.n_nnzw, h.n_mode)
-        #                              ^ to (rows)
-
-        pre = self.pre(x_i, x_j)
-        assert pre.shape == (h.n_cvar, h.n_nnzw, h.n_mode)
-
+        if type(self).pre is Coupling.pre:
+            # the efferent state isn't needed
+            pre = x_j
+        else:
+            x_i = x_i[:, h.nnz_row_el_idx]
+            assert x_i.shape == (h.n_cvar, h.n_nnzw, h.n_mode)
+            #                              ^ to (rows)
+            pre = self.pre(x_i, x_j)
+        assert pre.shape[1:] == (h.n_nnzw, h.n_mode)
+
+        # pre may return fewer rows than n_cvar, e.g. SigmoidalJansenRit combines two cvars in one
+        sum = numpy.zeros((pre.shape[0], h.n_node, h.n_mode), dtype=pre.dtype)
         weights_col = h.nnz_weights.reshape((h.n_nnzw, 1))
-        lri, nzr = self._lri(h.nnz_row_el_idx)
-        sum[:, nzr] = numpy.add.reduceat(weights_col * pre, lri, axis=1)
+        if h.n_nnzw > 0:
+            sum[:, h.nnz_row_idx] = numpy.add.reduceat(weights_col * pre, h.nnz_row_start, axis=1)
         return self.post(sum)
 
 
@@ -221,6 +220,10 @@ class Scaling(SparseCoupling):
             "the ratio between different values."
     )
 
+    parameter_names = 'a'.split()
+    pre_expr = 'x_j'
+    post_expr = 'a * gx'
+
     def post(self, gx):
         return self.a * gx
 
@@ -264,6 +267,10 @@ class HyperbolicTangent(SparseCoupling):
         domain=Range(lo=0.01, hi=1000.0, step=10.0),
         doc="Standard deviation of the coupling")
 
+    parameter_names = 'a b midpoint sigma'.split()
+    pre_expr = 'a * (1 + tanh((b * x_j - midpoint) / sigma))'
+    post_expr = 'gx'
+
     def pre(self, x_i, x_j):
         return self.a * (1 +  numpy.tanh((self.b * x_j - self.midpoint) / self.sigma))
 
@@ -271,7 +278,7 @@ class HyperbolicTangent(SparseCoupling):
         return simple_gen_astr(self, 'a b midpoint sigma')
 
 
-class Sigmoidal(Coupling):
+class Sigmoidal(SparseCoupling):
     r"""
     Provides a sigmoidal coupling function of the form
 
@@ -326,7 +333,7 @@ class Sigmoidal(Coupling):
         return self.cmin + ((self.cmax - self.cmin) / (1.0 + numpy.exp(-self.a *((gx - self.midpoint) / self.sigma))))
 
 
-class SigmoidalJansenRit(Coupling):
+class SigmoidalJansenRit(SparseCoupling):
     r"""
     Provides a sigmoidal coupling function as described in the 
     Jansen and Rit model, of the following form
@@ -372,8 +379,8 @@ class SigmoidalJansenRit(Coupling):
         return simple_gen_astr(self, 'cmin cmax midpoint a r')
 
     def pre(self, x_i, x_j):
-        pre = self.cmax / (1.0 + numpy.exp(self.r * (self.midpoint - (x_j[:, 0] - x_j[:, 1]))))
-        return pre[:, numpy.newaxis]
+        pre = self.cmax / (1.0 + numpy.exp(self.r * (self.midpoint - (x_j[0] - x_j[1]))))
+        return pre[numpy.newaxis]
 
     def post(self, gx):
         return self.a * gx
@@ -479,6 +486,10 @@ class Difference(SparseCoupling):
         domain=Range(lo=0.0, hi=10., step=0.1),
         doc="Rescales the connection strength.",)
 
+    parameter_names = 'a'.split()
+    pre_expr = 'x_j - x_i'
+    post_expr = 'a * gx'
+
     def __str__(self):
         return simple_gen_astr(self, 'a')
 
@@ -503,6 +514,11 @@ class Kuramoto(SparseCoupling):
         domain=Range(lo=0.0, hi=1.0, step=0.01),
         doc="Rescales the connection strength.",)
 
+    parameter_names = 'a'.split()
+    pre_expr = 'sin(x_j - x_i)'
+    # as post, which normalizes by gx.shape[0], the number of coupling variables
+    post_expr = 'a / n_cvar * gx'
+
     def __str__(self):
         return simple_gen_astr(self, 'a')
 
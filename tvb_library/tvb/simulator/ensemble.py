@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Ensemble simulations integrate several instances of one simulator configuration,
+differing in model or coupling parameters and noise seeds, in a single vectorized
+pass, so that the per step Python overhead of the simulator loop is paid once for
+all instances instead of once per instance, as e.g. in a parameter sweep.
+
+The instances are carried as extra nodes of the state (node major), i.e. the state
+has shape ``(n_svar, n_node * n_instances, n_mode)``, which is a free reshape of
+``(n_svar, n_node, n_instances, n_mode)``. Models, integrators and noise therefore
+work unchanged on the wider state, while the history and coupling see the
+instances folded into the mode axis, keeping a single copy of the connectome.
+
+Monitor outputs carry a leading instance axis, i.e. each sample has shape
+``(n_instances, n_voi, n_node, n_mode)``.
+
+"""
+
+import numpy
+
+from tvb.basic.neotraits.api import Attr, Int, NArray
+from tvb.simulator import monitors
+from .simulator import Simulator
+
+
+class EnsembleRandomState(numpy.random.RandomState):
+    """
+    A random stream drawing normal variates for each ensemble instance from its own
+    seeded stream, such that instance ``i`` of an ensemble sees the same noise as a
+    single simulation seeded with ``seeds[i]``.
+
+    """
+
+    def __init__(self, seeds):
+        super(EnsembleRandomState, self).__init__(seeds[0])
+        self.streams = [numpy.random.RandomState(seed) for seed in seeds]
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        n_inst = len(self.streams)
+        if size is None or len(size) < 2 or size[1] % n_inst:
+            return super(EnsembleRandomState, self).normal(loc, scale, size)
+        n_svar, n_node = size[0], size[1] // n_inst
+        inst_size = (n_svar, n_node) + tuple(size[2:])
+        draws = [stream.normal(loc, scale, inst_size) for stream in self.streams]
+        return numpy.stack(draws, axis=2).reshape(size)
+
+
+class EnsembleSimulator(Simulator):
+    """
+    A Simulator integrating ``n_instances`` copies of its configuration at once.
+
+    Instances may differ by model parameters, coupling parameters and noise seeds,
+    e.g. to sweep the global coupling strength::
+
+        sim = EnsembleSimulator(connectivity=conn, n_instances=16,
+                                coupling_parameters={'a': numpy.linspace(0, 0.1, 16)})
+        (t, y), = sim.configure().run()  # y.shape == (n_t, 16, n_voi, n_node, n_mode)
+
+    """
+
+    n_instances = Int(
+        label="Number of instances",
+        default=1,
+        doc="""Number of instances of the configured simulation to integrate
+        in one pass.""")
+
+    model_parameters = Attr(
+        field_type=dict,
+        label="Model parameters per instance",
+        default=None,
+        required=False,
+        doc="""Maps model parameter names to arrays of shape (n_instances, ),
+        or (n_instances, n_node) for spatialized parameters, giving the value
+        used by each instance.""")
+
+    coupling_parameters = Attr(
+        field_type=dict,
+        label="Coupling parameters per instance",
+        default=None,
+        required=False,
+        doc="""Maps coupling parameter names to arrays of shape (n_instances, )
+        giving the value used by each instance.""")
+
+    noise_seeds = NArray(
+        dtype=int,
+        label="Noise seeds per instance",
+        required=False,
+        doc="""Seeds of the integration noise for each instance. If not provided,
+        all instances draw from the integrator noise's random stream.""")
+
+    supported_monitors = (monitors.Raw, monitors.SubSample, monitors.TemporalAverage)
+
+    @property
+    def good_history_shape(self):
+        """Returns expected history shape, with instances as extra nodes."""
+        n_time, n_svar, n_node, n_mode = super(EnsembleSimulator, self).good_history_shape
+        return n_time, n_svar, n_node * self.n_instances, n_mode
+
+    def _set_number_of_nodes(self):
+        super(EnsembleSimulator, self)._set_number_of_nodes()
+        self.number_of_nodes *= self.n_instances
+        self.log.info('Ensemble of %d instances, %d total nodes', self.n_instances, self.number_of_nodes)
+
+    def check_compatibility(self):
+        "Raise NotImplementedError for components which cannot be run as an ensemble."
+        if self.surface is not None:
+            raise NotImplementedError("Surface simulations are not supported in ensemble mode.")
+        for monitor in self.monitors:
+            # AfferentCoupling monitors derive from Raw and TemporalAverage
+            if not isinstance(monitor, self.supported_monitors):
+                raise NotImplementedError("Unsupported monitor %s in ensemble mode, expected one of %s."
+                                          % (type(monitor).__name__, self.supported_monitors))
+
+    def configure(self, full_configure=True):
+        if full_configure:
+            self.preconfigure()
+        self.check_compatibility()
+        self._configure_ensemble_parameters()
+        if self.noise_seeds is not None and hasattr(self.integrator, 'noise'):
+            if self.noise_seeds.size != self.n_instances:
+                raise ValueError("Expected %d noise seeds, got %d." % (self.n_instances, self.noise_seeds.size))
+            self.integrator.noise.random_stream = EnsembleRandomState(self.noise_seeds)
+        return super(EnsembleSimulator, self).configure(full_configure=False)
+
+    def _expand_model_parameter(self, name, values):
+        "Expand per instance values to the node major layout of the ensemble state."
+        n_reg, n_inst = self.connectivity.number_of_regions, self.n_instances
+        values = numpy.asarray(values, dtype=float)
+        if values.shape == (n_inst, ):
+            return numpy.tile(values, n_reg)
+        if values.shape == (n_inst, n_reg):
+            return values.T.ravel()
+        raise ValueError("Model parameter %s must have shape (%d, ) or (%d, %d), got %s."
+                         % (name, n_inst, n_inst, n_reg, values.shape))
+
+    def _configure_ensemble_parameters(self):
+        "Spread model and coupling parameters over the instances."
+        n_reg, n_inst = self.connectivity.number_of_regions, self.n_instances
+        model_parameters = self.model_parameters or {}
+        for name in type(self.model).declarative_attrs:
+            value = getattr(self.model, name)
+            if name in model_parameters or not isinstance(value, numpy.ndarray):
+                continue
+            if value.size == n_reg != 1:
+                setattr(self.model, name, numpy.repeat(value.reshape((-1, )), n_inst))
+        for name, values in model_parameters.items():
+            setattr(self.model, name, self._expand_model_parameter(name, values))
+        # history & coupling see instances folded into the (trailing) mode axis
+        for name, values in (self.coupling_parameters or {}).items():
+            values = numpy.asarray(values, dtype=float)
+            if values.shape != (n_inst, ):
+                raise ValueError("Coupling parameter %s must have shape (%d, ), got %s." % (name, n_inst, values.shape))
+            setattr(self.coupling, name, numpy.repeat(values, self.model.number_of_modes))
+
+    def _split_instances(self, data):
+        "Reshape data from (n_var, n_node * n_instances, n_mode) to (n_instances, n_var, n_node, n_mode)."
+        n_var, _, n_mode = data.shape
+        data = data.reshape((n_var, -1, self.n_instances, n_mode))
+        return data.transpose((2, 0, 1, 3))
+
+    def _loop_compute_node_coupling(self, step):
+        coupling = self.coupling(step, self.history)  # (n_cvar, n_node, n_instances * n_mode)
+        return coupling.reshape((coupling.shape[0], self.number_of_nodes, -1))
+
+    def _loop_update_stimulus(self, step, stimulus):
+        if self.stimulus is not None:
+            stim_step = step - (self.current_step + 1)
+            region_stimulus = self.stimulus(stim_step).reshape((-1, ))
+            stimulus[self.model.stvar, :, :] = numpy.repeat(region_stimulus, self.n_instances).reshape((1, -1, 1))
+
+    def _loop_update_history(self, step, state):
+        n_svar = state.shape[0]
+        self.history.update(step, state.reshape((n_svar, self.connectivity.number_of_regions, -1)))
+
+    def _loop_monitor_output(self, step, state, node_coupling):
+        output = super(EnsembleSimulator, self)._loop_monitor_output(step, state, node_coupling)
+        if output is not None:
+            output = [None if sample is None else [sample[0], self._split_instances(sample[1])]
+                      for sample in output]
+        return output
@@ -155,9 +155,15 @@ class BaseHistory(StaticAttr):
             region_history /= numpy.bincount(sim.surface.region_mapping).reshape((-1, 1))
             history = region_history
 
+        # ensemble simulations carry their instances as extra nodes (node major),
+        # which the history folds into the mode axis, cf. tvb.simulator.ensemble
+        n_reg = sim.connectivity.number_of_regions
+        nt, ns, nn, nm = history.shape
+        history = history.reshape((nt, ns, n_reg, nn // n_reg * nm))
+
         # init history instance
         inst = cls(sim.connectivity.weights, sim.connectivity.idelays,
-                   sim.model.cvar, sim.model.number_of_modes)
+                   sim.model.cvar, history.shape[-1])
         inst.initialize(history)
         return inst
 
@@ -209,37 +215,46 @@ class DenseHistory(BaseHistory):
 
 
 class SparseHistory(DenseHistory):
-    "History implementation which stores data only for non-zero weights."
+    """
+    History implementation which stores data only for non-zero weights.
+
+    Connections are kept in compressed sparse row order, i.e. sorted by efferent node, so that
+    the delayed state is gathered per (row, column, delay) triple and couplings can sum it per row
+    without any (n_node, n_node) array. The dense `delayed_state` & `es_weights`, only needed by
+    couplings which are not sparse, are built on first use.
+    """
 
     n_nnzw = Dim()
     n_nnzr = Dim()
     time_stride = Dim()
-    nnz_mask = NDArray(('n_node', 'n_node'), numpy.bool_)
     const_indices = NDArray(('n_cvar', n_nnzw, 'n_mode'), 'i')
     nnz_idelays = NDArray((n_nnzw,), 'i')
     nnz_row_el_idx = NDArray((n_nnzw, ), 'i')
     nnz_col_el_idx = NDArray((n_nnzw, ), 'i')
     nnz_weights = NDArray((n_nnzw, ), 'f')
     nnz_row_idx = NDArray((n_nnzr, ), 'i')
+    nnz_row_start = NDArray((n_nnzr, ), 'i')
+
+    _sparse_arrays = 'nnz_idelays nnz_row_el_idx nnz_col_el_idx nnz_weights nnz_row_idx nnz_row_start'.split()
+    _gather_arrays = ['const_indices']
+    _dense_weights = None
+    _dense_delayed_state = None
 
     def __init__(self, weights, delays, cvars, n_mode):
-        super(SparseHistory, self).__init__(weights, delays, cvars, n_mode)
+        self.n_time, self.n_cvar, self.n_node, self.n_mode = delays.max() + 1, len(cvars), delays.shape[0], n_mode
+        self.cvars = cvars
         self.time_stride = self.n_cvar * self.n_node * self.n_mode
-        self.nnz_mask = weights_nonzero = weights != 0.0 # type: numpy.ndarray
-        self.n_nnzw = nnz = weights_nonzero.sum()
-        self.nnz_weights = weights[self.nnz_mask]
-        self.nnz_row_el_idx, self.nnz_col_el_idx = numpy.argwhere(self.nnz_mask).T
-        nnz_row_idx = numpy.unique(self.nnz_row_el_idx)
+        # row major order of nonzero is the CSR order
+        rows, cols = numpy.nonzero(weights)
+        self.n_nnzw = rows.size
+        self.nnz_row_el_idx, self.nnz_col_el_idx = rows, cols
+        self.nnz_weights = weights[rows, cols]
+        self.nnz_idelays = delays[rows, cols].astype('i')
+        nnz_row_idx, nnz_row_start = numpy.unique(rows, return_index=True)
         self.n_nnzr = len(nnz_row_idx)
         self.nnz_row_idx = nnz_row_idx
-        self.nnz_idelays = delays[weights_nonzero].astype('i')
-        # build const indices
-        n, m = self.n_node, self.n_mode
-        icvars_ = numpy.r_[:len(cvars)].reshape((-1, 1, 1)) * n * m
-        nodes_ = numpy.tile(numpy.r_[:n], (n, 1))[self.nnz_mask, numpy.newaxis] * m
-        modes_ = numpy.r_[:m]
-        self.const_indices = icvars_ + nodes_ + modes_
-        self.delayed_state[:] = 0.0
+        self.nnz_row_start = nnz_row_start
+        self._configure_gather()
 
         LOG.info('history has n_time=%d n_cvar=%d n_node=%d n_nmode=%d, requires %.2f MB',
                  self.n_time, self.n_cvar, self.n_node, self.n_mode, self.nbytes*2**-20)
@@ -247,9 +262,44 @@ class SparseHistory(DenseHistory):
         LOG.info('sparse history has n_nnzw=%d, i.e. %.2f %% sparse', self.n_nnzw,
                  self.n_nnzw * 100.0 / self.n_node**2)
 
+    def _configure_gather(self):
+        "Build the indices used to gather the delayed state."
+        n, m = self.n_node, self.n_mode
+        icvars_ = numpy.r_[:self.n_cvar].reshape((-1, 1, 1)) * n * m
+        nodes_ = self.nnz_col_el_idx.reshape((-1, 1)) * m
+        modes_ = numpy.r_[:m]
+        self.const_indices = icvars_ + nodes_ + modes_
+
+    def _densify(self, nnz_values):
+        dense = numpy.zeros((self.n_node, self.n_node), nnz_values.dtype)
+        dense[self.nnz_row_el_idx, self.nnz_col_el_idx] = nnz_values
+        return dense
+
+    @property
+    def weights(self):
+        return self._densify(self.nnz_weights)
+
+    @property
+    def delays(self):
+        return self._densify(self.nnz_idelays)
+
+    @property
+    def es_weights(self):
+        if self._dense_weights is None:
+            self._dense_weights = self.weights[:, numpy.newaxis, :, numpy.newaxis]
+        return self._dense_weights
+
+    @property
+    def delayed_state(self):
+        if self._dense_delayed_state is None:
+            LOG.debug('coupling requires dense delayed state of shape %r',
+                      (self.n_node, self.n_cvar, self.n_node, self.n_mode))
+            self._dense_delayed_state = numpy.zeros((self.n_node, self.n_cvar, self.n_node, self.n_mode), 'f')
+        return self._dense_delayed_state
+
     def query(self, step, out=None):
         current, delayed = self.query_sparse(step)
-        self.delayed_state.transpose((1, 0, 2, 3))[:, self.nnz_mask] = delayed
+        self.delayed_state[self.nnz_row_el_idx, :, self.nnz_col_el_idx] = delayed.transpose((1, 0, 2))
         return current, self.delayed_state
 
     def query_sparse(self, step):
@@ -261,12 +311,61 @@ class SparseHistory(DenseHistory):
 
     @property
     def nbytes(self):
-        arrays = 'nnz_mask const_indices nnz_idelays nnz_row_el_idx nnz_col_el_idx nnz_weights nnz_row_idx'.split()
+        arrays = self._sparse_arrays + self._gather_arrays
         nbytes = sum([getattr(self, ary).nbytes for ary in arrays])
-        nbytes += DenseHistory.nbytes.fget(self)
+        nbytes += self.buffer.nbytes + self.cvars.nbytes
+        for dense in (self._dense_weights, self._dense_delayed_state):
+            if dense is not None:
+                nbytes += dense.nbytes
         return nbytes
 
 
+class DelayBucketHistory(SparseHistory):
+    """
+    Sparse history which groups the connections by integer delay.
+
+    For each unique delay, the state at that delay is a contiguous slab of the buffer, so a
+    query reads one slab per unique delay and gathers the connections from the stacked slabs with
+    constant indices, instead of computing a time index for each connection at each step.
+    This pays off when the number of unique delays times the number of nodes is small compared
+    to the number of connections, cf. `choose_history_class`.
+    """
+
+    n_udel = Dim()
+    unique_idelays = NDArray((n_udel, ), 'i')
+    slab_indices = NDArray(('n_nnzw', ), 'i')
+
+    _gather_arrays = ['unique_idelays', 'slab_indices']
+
+    def _configure_gather(self):
+        unique_idelays, nnz_udel_idx = numpy.unique(self.nnz_idelays, return_inverse=True)
+        self.n_udel = len(unique_idelays)
+        self.unique_idelays = unique_idelays
+        self.slab_indices = nnz_udel_idx * self.n_node + self.nnz_col_el_idx
+        LOG.debug('delay bucketed history has n_udel=%d', self.n_udel)
+
+    def query_sparse(self, step):
+        time_indices = (step - 1 - self.unique_idelays + self.n_time) % self.n_time
+        slabs = self.buffer[time_indices] # (n_udel, n_cvar, n_node, n_mode)
+        slabs = slabs.transpose((1, 0, 2, 3)).reshape((self.n_cvar, self.n_udel * self.n_node, self.n_mode))
+        delayed_state = slabs.take(self.slab_indices, axis=1)
+        current_state = self.buffer[(step - 1) % self.n_time]
+        return current_state, delayed_state
+
+
+# number of slab elements read per connection below which DelayBucketHistory is used
+DELAY_BUCKET_MAX_SLAB_RATIO = 8
+
+
+def choose_history_class(weights, delays):
+    "Choose the sparse history implementation with the cheaper delayed state gather for a connectivity."
+    nnz_delays = delays[weights != 0]
+    n_udel = numpy.unique(nnz_delays).size
+    if n_udel * weights.shape[0] <= DELAY_BUCKET_MAX_SLAB_RATIO * nnz_delays.size:
+        return DelayBucketHistory
+    return SparseHistory
+
+
 # implement in order  NumPy, Numba & OpenCL versions
 
 # simulator.history becomes impl instance
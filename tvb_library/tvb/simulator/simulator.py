@@ -51,7 +51,7 @@ from tvb.simulator.models.base import Model
 
 from .backend import ReferenceBackend
 from .common import psutil
-from .history import SparseHistory
+from .history import SparseHistory, choose_history_class
 
 
 # TODO with refactor, this becomes more of a builder, since iterator will account for
@@ -372,7 +372,8 @@ class Simulator(HasTraits):
 
     def _configure_history(self, initial_conditions=None):
         "Initialize history instance; cf. from_simulator for more information."
-        self.history = SparseHistory.from_simulator(self, initial_conditions)
+        history_class = choose_history_class(self.connectivity.weights, self.connectivity.idelays)
+        self.history = history_class.from_simulator(self, initial_conditions)
 
     def _configure_integrator_noise(self):
         """
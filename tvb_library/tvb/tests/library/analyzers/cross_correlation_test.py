@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the FFT based all-pairs cross-correlation.
+"""
+
+import numpy
+import pytest
+from scipy.signal import correlate
+
+from tvb.analyzers.cross_correlation import cross_correlation, cross_correlation_blocks, cross_correlation_lags, \
+    cross_correlation_node_blocks
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+class TestCrossCorrelation(BaseTestCase):
+
+    def test_lags(self):
+        assert list(cross_correlation_lags(6)) == [-3, -2, -1, 0, 1, 2]
+        assert list(cross_correlation_lags(7)) == [-3, -2, -1, 0, 1, 2, 3]
+        assert list(cross_correlation_lags(100, max_lag=2)) == [-2, -1, 0, 1, 2]
+
+    @pytest.mark.parametrize('n_time', [16, 33])
+    def test_matches_correlate(self, n_time):
+        data = numpy.random.RandomState(42).randn(n_time, 2, 5, 2) + 3.0
+        demeaned = data - data.mean(axis=0)
+        result = cross_correlation(data)
+        assert result.shape == (n_time, 5, 5, 2, 2)
+        for var in range(2):
+            for mode in range(2):
+                for n1 in range(5):
+                    for n2 in range(5):
+                        expected = correlate(demeaned[:, var, n1, mode], demeaned[:, var, n2, mode], mode="same")
+                        assert numpy.allclose(result[:, n1, n2, var, mode], expected)
+
+    def test_max_lag_and_blocks(self):
+        data = numpy.random.RandomState(42).randn(50, 1, 7, 1)
+        full = cross_correlation(data)
+        blocks = list(cross_correlation_blocks(data, max_lag=4, block_memory=1))
+        assert len(blocks) == 7
+        assert all(block.shape == (9, 1, 7, 1, 1) for block in blocks)
+        window = numpy.abs(cross_correlation_lags(50)) <= 4
+        assert numpy.allclose(numpy.concatenate(blocks, axis=1), full[window])
+
+    def test_node_blocks_read(self):
+        data = numpy.random.RandomState(42).randn(50, 2, 7, 1)
+        reads = []
+
+        def read_nodes(start, stop):
+            reads.append((start, stop))
+            return data[:, :, start:stop]
+
+        blocks = list(cross_correlation_node_blocks(read_nodes, data.shape, block_memory=1))
+        assert reads == [(node, node + 1) for node in range(7)]
+        assert numpy.allclose(numpy.concatenate(blocks, axis=1), cross_correlation(data))
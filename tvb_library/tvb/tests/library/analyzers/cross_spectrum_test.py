@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the cross spectrum engine, and the coherence analyzers based on it.
+"""
+
+import numpy
+import pytest
+from matplotlib import mlab
+from scipy.signal import detrend
+
+from tvb.analyzers.cross_spectrum import cross_spectrum, segment_starts, coherency
+from tvb.analyzers.node_coherence import coherence_mlab, _coherence
+from tvb.analyzers.node_complex_coherence import calculate_complex_cross_coherence
+from tvb.datatypes.time_series import TimeSeries
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+class TestCrossSpectrum(BaseTestCase):
+
+    def test_segment_starts(self):
+        assert segment_starts(10, 4, 2).tolist() == [[0, 2, 4, 6]]
+        assert segment_starts(21, 4, 2, epoch_tpts=10).tolist() == [[0, 2, 4, 6], [10, 12, 14, 16]]
+
+    @pytest.mark.parametrize('per_segment', [False, True])
+    def test_matches_segment_loop(self, per_segment):
+        data = numpy.random.RandomState(42).randn(100, 4)
+        starts = segment_starts(100, 16, 8, epoch_tpts=50)
+        window = numpy.hanning(16)
+        reads = []
+
+        def read_data(start, stop):
+            reads.append((start, stop))
+            return data[start:stop]
+
+        csd, mean = cross_spectrum(read_data, starts, 16, window=window, nfft=20, n_freq=9, detrend=True,
+                                   per_segment=per_segment, block_memory=1)
+        assert len(reads) == starts.size + 1
+
+        expected = numpy.zeros((starts.shape[1], 9, 4, 4), dtype=complex)
+        expected_mean = numpy.zeros((starts.shape[1], 9, 4), dtype=complex)
+        for epoch_starts in starts:
+            for seg, start in enumerate(epoch_starts):
+                spectrum = numpy.fft.fft(detrend(data[start:start + 16], axis=0) * window[:, numpy.newaxis],
+                                         n=20, axis=0)[:9]
+                expected[seg] += numpy.einsum('fi,fj->fij', spectrum, spectrum.conj()) / starts.shape[0]
+                expected_mean[seg] += spectrum / starts.shape[0]
+        if not per_segment:
+            expected, expected_mean = expected.mean(axis=0), expected_mean.mean(axis=0)
+        assert numpy.allclose(csd, expected)
+        assert numpy.allclose(mean, expected_mean)
+
+    def test_coherency(self):
+        data = numpy.random.RandomState(42).randn(512, 3)
+        data[:, 1] = 2.0 * data[:, 0]
+        csd, _ = cross_spectrum(lambda start, stop: data[start:stop], segment_starts(512, 64, 32), 64)
+        coh = coherency(csd)
+        assert numpy.allclose(numpy.abs(coh[:, 0, 1]), 1.0)
+        assert numpy.allclose(numpy.diagonal(coh, axis1=1, axis2=2), 1.0)
+        assert numpy.all(numpy.abs(coh[:, 0, 2]) < 1.0)
+
+
+class TestCoherence(BaseTestCase):
+
+    def test_coherence_mlab(self):
+        data = numpy.random.RandomState(42).randn(1000, 1, 3, 2)
+        data[:, :, 1] += data[:, :, 0]
+        coh, freq = coherence_mlab(data, 256.0, nfft=64)
+        assert coh.shape == (33, 3, 3, 1, 2)
+        for mode in range(2):
+            for n1 in range(3):
+                for n2 in range(3):
+                    cxy, expected_freq = mlab.cohere(data[:, 0, n1, mode], data[:, 0, n2, mode], NFFT=64, Fs=256.0,
+                                                     detrend=mlab.detrend_linear, window=mlab.window_none)
+                    assert numpy.allclose(freq, expected_freq)
+                    # the linearly detrended segments have no power at 0 Hz
+                    assert numpy.allclose(coh[1:, n1, n2, 0, mode], cxy[1:])
+
+    def test_coherence(self):
+        data = numpy.random.RandomState(42).randn(2048, 2, 3, 1)
+        data[:, :, 1] += data[:, :, 0]
+        coh, freq = _coherence(data, 1000.0, nfft=256)
+        assert coh.shape == (127, 3, 3, 2, 1)
+        assert freq.shape == (127,)
+        assert numpy.allclose(numpy.diagonal(coh, axis1=1, axis2=2), 1.0)
+        # coupled nodes are more coherent than independent ones
+        assert coh[:, 0, 1].mean() > 0.3 > coh[:, 0, 2].mean()
+        with pytest.raises(ValueError):
+            _coherence(data[:100], 1000.0, nfft=256)
+
+    def test_complex_coherence(self):
+        data = numpy.random.RandomState(42).randn(4000, 1, 3, 1)
+        data[:, :, 1] = data[:, :, 0]
+        time_series = TimeSeries(data=data, sample_period=1.0)
+        result = calculate_complex_cross_coherence(time_series, 1000.0, 500.0, 250.0, "hanning", True, True,
+                                                   0, False, 1024.0)
+        assert result.array_data.shape == (3, 3, 251)
+        assert result.cross_spectrum.shape == (3, 3, 251)
+        assert numpy.allclose(result.array_data[0, 1], 1.0)
+        assert numpy.all(numpy.abs(result.array_data[0, 2]) < 1.0)
+
+        result = calculate_complex_cross_coherence(time_series, 1000.0, 500.0, 250.0, "hanning", False, False,
+                                                   0, False, 1024.0)
+        assert result.array_data.shape == (3, 3, 251, 3)
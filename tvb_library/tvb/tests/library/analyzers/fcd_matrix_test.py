@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the streamed FCD computation.
+"""
+
+import numpy
+import pytest
+
+from tvb.analyzers.fcd_matrix import compute_fcd, sliding_windows, windowed_fc
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+def _reference_fcd(data, sw, sp):
+    """FCD computed window by window and pair by pair, with numpy.corrcoef."""
+    starts, stops = sliding_windows(data.shape[0], sw, sp)
+    fc = [numpy.corrcoef(data[start:stop].T)[numpy.triu_indices(data.shape[1], 1)]
+          for start, stop in zip(starts, stops)]
+    fcd = numpy.zeros((len(fc), len(fc)))
+    for i in range(len(fc)):
+        for j in range(i, len(fc)):
+            fcd[i, j] = fcd[j, i] = numpy.corrcoef(fc[i], fc[j])[0, 1]
+    return fcd
+
+
+class TestFcdMatrix(BaseTestCase):
+
+    def test_sliding_windows(self):
+        starts, stops = sliding_windows(100, 20.0, 7.5)
+        assert len(starts) == 10
+        assert list(starts[:4]) == [0, 7, 15, 22]
+        assert list(stops - starts) == [21, 21, 21, 21, 21, 21, 21, 21, 21, 21]
+
+    @pytest.mark.parametrize('sw, sp, chunk_size', [(60.0, 7.3, 64), (100, 1, 37), (200.0, 20.0, 4096)])
+    def test_matches_corrcoef(self, sw, sp, chunk_size):
+        data = numpy.random.RandomState(42).randn(600, 12).cumsum(axis=0) + 100.0
+        read_data = lambda start, stop: data[start:stop]
+        expected = _reference_fcd(data, sw, sp)
+        assert numpy.allclose(compute_fcd(read_data, 600, sw, sp, chunk_size), expected, atol=1e-10)
+        fcd32 = compute_fcd(read_data, 600, sw, sp, chunk_size, dtype=numpy.float32)
+        assert fcd32.dtype == numpy.float32
+        assert numpy.allclose(fcd32, expected, atol=1e-5)
+
+    def test_windowed_fc_reads_chunks(self):
+        data = numpy.random.RandomState(42).randn(300, 4)
+        reads = []
+
+        def read_data(start, stop):
+            reads.append((start, stop))
+            return data[start:stop]
+
+        fc = windowed_fc(read_data, 300, 50, 10, chunk_size=100)
+        assert fc.shape == (25, 6)
+        assert reads == [(0, 100), (100, 200), (200, 300)]
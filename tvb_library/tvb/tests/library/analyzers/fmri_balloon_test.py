@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the compiled and chunked integration of the Balloon model.
+"""
+
+import numpy
+import pytest
+
+from tvb.analyzers.fmri_balloon import BalloonModel, BoldModels, NeuralInputTransformations
+from tvb.datatypes.time_series import TimeSeriesRegion
+from tvb.simulator.integrators import HeunDeterministic
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+class PythonHeunDeterministic(HeunDeterministic):
+    """ The same scheme, which is not replaced by the compiled one. """
+
+
+class TestBalloonModel(BaseTestCase):
+    n_time = 3000
+
+    def setup_method(self):
+        self.data = numpy.abs(numpy.random.RandomState(42).randn(self.n_time, 2, 4, 2))
+
+    def read_data(self, start, stop):
+        return self.data[start:stop]
+
+    @pytest.mark.parametrize('transformation', list(NeuralInputTransformations))
+    @pytest.mark.parametrize('bold_model', list(BoldModels))
+    def test_compiled_matches_scheme(self, transformation, bold_model):
+        params = dict(neural_input_transformation=transformation, bold_model=bold_model, normalize_neural_input=True)
+        compiled = BalloonModel(**params)
+        python = BalloonModel(integrator=PythonHeunDeterministic(), **params)
+        expected = numpy.concatenate(list(python.bold_signal_chunks(self.read_data, self.n_time, 1e-3)))
+        result = numpy.concatenate(list(compiled.bold_signal_chunks(self.read_data, self.n_time, 1e-3)))
+        assert result.shape == expected.shape == (expected.shape[0], 1, 4, 2)
+        assert numpy.allclose(result, expected, rtol=1e-10, atol=0)
+        assert numpy.ptp(result) > 0
+
+    def test_chunks_and_downsampling(self):
+        model = BalloonModel()
+        full = numpy.concatenate(list(model.bold_signal_chunks(self.read_data, self.n_time, 1e-3)))
+        chunks = list(model.bold_signal_chunks(self.read_data, self.n_time, 1e-3, stride=7,
+                                               chunk_memory=4 * 8 * 8 * 250))
+        assert len(chunks) > 1
+        assert numpy.allclose(numpy.concatenate(chunks), full[::7])
+
+    def test_evaluate(self):
+        time_series = TimeSeriesRegion(data=self.data, time=numpy.arange(self.n_time) * 1.0, sample_period=1.0)
+        bold = BalloonModel(time_series=time_series).evaluate()
+        assert bold.data.shape == (self.n_time, 1, 4, 2)
+        assert bold.sample_period == 1e-3
+        # the initial conditions are at rest
+        assert numpy.all(bold.data[0] == 0)
+
+    @pytest.mark.parametrize('bold_model, expected', [
+        # the output of previous versions, which computed the linear model whichever was selected
+        (BoldModels.LINEAR, [[0.07562942486309292, 0.07433762999925697, 0.0741801235014874, 0.0824304106338892],
+                             [2.9498141349834923, 2.898032292958734, 2.887576584957356, 2.90585397814981]]),
+        (BoldModels.NONLINEAR, [[0.07271970770196243, 0.07165032479373515, 0.0713717616216363, 0.07936728590173403],
+                                [2.8438727570918485, 2.7938357633522064, 2.784653355865611, 2.802497643311463]])])
+    def test_bold_models_output(self, bold_model, expected):
+        time_series = TimeSeriesRegion(data=self.data, time=numpy.arange(self.n_time) * 1.0, sample_period=1.0)
+        bold = BalloonModel(time_series=time_series, bold_model=bold_model).evaluate()
+        numpy.testing.assert_allclose(bold.data[[1000, 2999], 0, :, 0], expected, rtol=1e-9)
+
+    def test_default_bold_model_is_linear(self):
+        assert BalloonModel().bold_model == BoldModels.LINEAR
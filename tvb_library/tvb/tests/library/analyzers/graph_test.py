@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the NumPy implementation of the Brain Connectivity Toolbox measures.
+"""
+
+import networkx
+import numpy
+import pytest
+
+from tvb.analyzers import graph
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+def _random_connectivity(n=20, density=0.25, seed=42):
+    rs = numpy.random.RandomState(seed)
+    W = rs.rand(n, n) * (rs.rand(n, n) < density)
+    numpy.fill_diagonal(W, 0)
+    return W
+
+
+class TestGraph(BaseTestCase):
+
+    def test_degrees_and_strengths(self):
+        W = _random_connectivity()
+        id_, od, deg = graph.degrees_dir(W)
+        assert numpy.array_equal(id_, (W > 0).sum(axis=0))
+        assert numpy.array_equal(od, (W > 0).sum(axis=1))
+        assert numpy.array_equal(deg, id_ + od)
+        is_, os_, strength = graph.strengths_dir(W)
+        assert numpy.allclose(strength, W.sum(axis=0) + W.sum(axis=1))
+        kden, N, K = graph.density_dir(W)
+        assert N == 20 and K == numpy.count_nonzero(W) and kden == K / 380.0
+
+    def test_clustering_matches_loop(self):
+        W = _random_connectivity()
+        B = ((W + W.T) > 0).astype(float)
+        expected = numpy.zeros(len(B))
+        for u in range(len(B)):
+            V = numpy.nonzero(B[u])[0]
+            if len(V) >= 2:
+                expected[u] = B[numpy.ix_(V, V)].sum() / (len(V) ** 2 - len(V))
+        assert numpy.allclose(graph.clustering_coef_bu(B), expected)
+        expected = networkx.clustering(networkx.from_numpy_array(B))
+        assert numpy.allclose(graph.clustering_coef_bu(B), [expected[i] for i in range(len(B))])
+
+    @pytest.mark.parametrize('weighted', [True, False])
+    def test_betweenness_matches_networkx(self, weighted):
+        W = _random_connectivity()
+        W[:3, :] = 0
+        if not weighted:
+            W = (W > 0).astype(float)
+        G = networkx.from_numpy_array(W, create_using=networkx.DiGraph)
+        weight = 'weight' if weighted else None
+        EBC, BC = graph.edge_betweenness_wei(W) if weighted else graph.edge_betweenness_bin(W)
+        expected_bc = networkx.betweenness_centrality(G, normalized=False, weight=weight)
+        expected_ebc = networkx.edge_betweenness_centrality(G, normalized=False, weight=weight)
+        assert numpy.allclose(BC, [expected_bc[i] for i in range(len(W))])
+        assert numpy.allclose([EBC[edge] for edge in expected_ebc], list(expected_ebc.values()))
+        if weighted:
+            assert numpy.allclose(graph.betweenness_wei(W), BC)
+        else:
+            assert numpy.allclose(graph.betweenness_bin(W), BC)
+
+    def test_distances(self):
+        W = _random_connectivity()
+        W[:, 0] = 0
+        G = networkx.from_numpy_array(W, create_using=networkx.DiGraph)
+        D, B = graph.distance_wei(W)
+        lengths = dict(networkx.all_pairs_dijkstra_path_length(G))
+        for i in range(len(W)):
+            for j in range(len(W)):
+                assert D[i, j] == pytest.approx(lengths[i].get(j, numpy.inf))
+        assert numpy.all(numpy.isinf(graph.distance_bin(W)[1:, 0]))
+        R, D_bin = graph.breadthdist(W)
+        assert numpy.array_equal(R, numpy.isfinite(D_bin))
+        assert numpy.array_equal(D_bin, graph.reachdist(W)[1])
+
+    def test_modularity(self):
+        W = _random_connectivity(30)
+        W = W + W.T
+        Ci, Q = graph.modularity_und(W)
+        communities = [set(numpy.nonzero(Ci == c)[0]) for c in numpy.unique(Ci)]
+        G = networkx.from_numpy_array(W)
+        assert Q == pytest.approx(networkx.algorithms.community.modularity(G, communities))
+        assert Q > 0.1
+        P = graph.participation_coef(W, Ci)
+        assert numpy.all((P >= 0) & (P <= 1))
+
+    def test_bct_measures_share_intermediate_results(self):
+        W = _random_connectivity()
+        (Ci, Q), P, (EBC, BC) = graph.bct_measures(W, ['modularity_dir', 'participation_coef', 'edge_betweenness_wei'])
+        assert numpy.allclose(P, graph.participation_coef(W, Ci))
+        assert numpy.allclose(BC, graph.betweenness_wei(W))
+        measures = graph.GraphMeasures(W)
+        assert graph.betweenness_wei(measures) is graph.edge_betweenness_wei(measures)[1]
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the sample entropy.
+"""
+
+import numpy
+import pytest
+
+from tvb.analyzers.info import coarse_grain, sample_entropy, sampen
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+def brute_force_counts(y, m, r):
+    """
+    The m and m + 1 template match counts, comparing all the pairs of templates.
+    """
+    counts = []
+    for length in (m, m + 1):
+        templates = numpy.array([y[i:i + length] for i in range(y.size - length + 1)])
+        distances = numpy.abs(templates[:, numpy.newaxis] - templates[numpy.newaxis]).max(axis=2)
+        counts.append(numpy.triu(distances < r, k=1).sum())
+    return counts
+
+
+class TestSampleEntropy(BaseTestCase):
+
+    @pytest.mark.parametrize('m, r', [(2, 0.3), (1, 0.5), (3, 0.8)])
+    def test_match_counts(self, m, r):
+        y = numpy.random.RandomState(42).randn(400)
+        e, p, c2, c1 = sampen(y, m=m, r=r, info=True)
+        assert [c1, c2] == brute_force_counts(y, m, r)
+        assert numpy.isclose(e, -numpy.log(c2 / c1))
+
+    def test_all_nodes_and_scales(self):
+        data = numpy.random.RandomState(42).randn(600, 4)
+        taus = numpy.r_[1:4]
+        entropy, _, c2, c1 = sample_entropy(data, taus=taus, qse=True, info=True)
+        assert entropy.shape == (3, 4)
+        for i, tau in enumerate(taus):
+            for node in range(4):
+                y = data[:, node]
+                r = 0.15 * y.std()
+                assert [c1[i, node], c2[i, node]] == brute_force_counts(coarse_grain(y, tau), 2, r)
+                assert numpy.isclose(entropy[i, node], sampen(y, taus=tau, qse=True))
+
+    def test_shapes(self):
+        data = numpy.random.RandomState(42).randn(300, 2, 3)
+        assert sample_entropy(data).shape == (2, 3)
+        assert sample_entropy(data, taus=[1, 2]).shape == (2, 2, 3)
+        assert numpy.ndim(sampen(data[:, 0, 0])) == 0
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the global TimeSeries metrics computed from chunks of time points.
+"""
+
+import numpy
+import pytest
+
+from tvb.analyzers.metric_accumulators import METRICS, Moments, compute_metrics, start_time_point
+from tvb.analyzers.metric_kuramoto_index import compute_kuramoto_index_metric
+from tvb.analyzers.metric_proxy_metastability import compute_proxy_metastability_metric
+from tvb.analyzers.metric_variance_global import compute_variance_global_metric
+from tvb.analyzers.metric_variance_of_node_variance import compute_variance_of_node_variance_metric
+from tvb.datatypes.time_series import TimeSeries
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+def in_memory_metrics(data, start_tpt):
+    """
+    The metrics computed directly from the whole time series.
+    """
+    phases = numpy.arctan2(data[:, 1, :, 0], data[:, 0, :, 0])
+    kuramoto = numpy.abs(numpy.exp(1j * phases).mean(axis=1)).mean()
+    data = data[start_tpt:]
+    zero_mean_data = data - data.mean(axis=0)
+    node_variance = zero_mean_data.transpose((0, 1, 3, 2)).reshape((-1, data.shape[2])).var(axis=0)
+    v_data = numpy.abs(data - data.mean(axis=2, keepdims=True)).mean(axis=2)
+    return {"GlobalVariance": zero_mean_data.var(),
+            "KuramotoIndex": kuramoto,
+            "Metastability": v_data.std(),
+            "Synchrony": 1. / v_data.mean(),
+            "VarianceNodeVariance": node_variance.var()}
+
+
+class TestMetricAccumulators(BaseTestCase):
+
+    def test_moments(self):
+        data = numpy.random.RandomState(42).randn(1000, 3) + 1e6
+        moments = Moments((3,))
+        for start in range(0, 1000, 70):
+            moments.update(data[start:start + 70])
+        assert numpy.allclose(moments.mean, data.mean(axis=0), rtol=1e-14)
+        assert numpy.allclose(moments.variance, data.var(axis=0), rtol=1e-8)
+
+    def test_start_time_point(self):
+        assert start_time_point(1000, 0.5, 100.0, 4) == 200
+        assert start_time_point(1000, 0.5, 0.0, 4) == 0
+        # shorter than the start point, so only the last quarter is used
+        assert start_time_point(1000, 1.0, 2000.0, 4) == 750
+
+    @pytest.mark.parametrize('chunk_memory', [1, 2000, 10 ** 8])
+    def test_chunked_metrics(self, chunk_memory):
+        data = numpy.random.RandomState(42).randn(500, 2, 6, 3) + numpy.arange(6)[:, numpy.newaxis]
+        results = compute_metrics(lambda start, stop: data[start:stop], data.shape, 0.5, METRICS,
+                                  start_point=30.0, chunk_memory=chunk_memory)
+        expected = in_memory_metrics(data, 60)
+        assert results.keys() == expected.keys()
+        for name, value in expected.items():
+            assert numpy.isclose(results[name], value, rtol=1e-10)
+
+    def test_selected_metrics(self):
+        data = numpy.random.RandomState(42).randn(200, 1, 4, 1)
+        reads = []
+
+        def read_data(start, stop):
+            reads.append(start)
+            return data[start:stop]
+
+        results = compute_metrics(read_data, data.shape, 1.0, ["GlobalVariance"], start_point=50.0)
+        assert list(results) == ["GlobalVariance"]
+        assert reads == [50]
+        with pytest.raises(ValueError):
+            compute_metrics(read_data, data.shape, 1.0, ["KuramotoIndex"])
+        with pytest.raises(ValueError):
+            compute_metrics(read_data, data.shape, 1.0, ["Unknown"])
+
+    def test_metric_functions(self):
+        data = numpy.random.RandomState(42).randn(400, 2, 5, 1)
+        params = {'time_series': TimeSeries(data=data, sample_period=1.0), 'start_point': 100.0, 'segment': 4}
+        expected = in_memory_metrics(data, 100)
+        assert numpy.isclose(compute_variance_global_metric(params), expected["GlobalVariance"])
+        assert numpy.isclose(compute_variance_of_node_variance_metric(params), expected["VarianceNodeVariance"])
+        proxy = compute_proxy_metastability_metric(params)
+        assert numpy.isclose(proxy["Metastability"], expected["Metastability"])
+        assert numpy.isclose(proxy["Synchrony"], expected["Synchrony"])
+        # the Kuramoto index uses all the time points
+        assert numpy.isclose(compute_kuramoto_index_metric(params), in_memory_metrics(data, 0)["KuramotoIndex"])
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the streamed PCA and ICA.
+"""
+
+import numpy
+import pytest
+
+from tvb.analyzers.ica import compute_ica_decomposition, streamed_fastica
+from tvb.analyzers.ica_algorithm import fastica, _cube, _exp, _logcosh
+from tvb.analyzers.pca import PCAMethods, compute_pca, principal_axes, streamed_moments
+from tvb.datatypes.time_series import TimeSeries
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+class TestModeDecompositions(BaseTestCase):
+    n_time, n_node = 2000, 12
+    # small chunks, so that several of them are needed
+    chunk_memory = 16 * 8 * n_node * 150
+
+    def setup_method(self):
+        rng = numpy.random.RandomState(42)
+        # a few non gaussian sources, of decreasing amplitudes, mixed into all nodes
+        self.sources = rng.uniform(-1.0, 1.0, (self.n_time, 4)) * [4.0, 3.0, 2.0, 1.0]
+        self.data = 5.0 + self.sources @ rng.randn(4, self.n_node) + 0.05 * rng.randn(self.n_time, self.n_node)
+
+    def read_data(self, start, stop):
+        return self.data[start:stop]
+
+    def test_streamed_moments(self):
+        mean, covariance = streamed_moments(self.read_data, self.n_time, self.n_node,
+                                            chunk_memory=self.chunk_memory)
+        assert numpy.allclose(mean, self.data.mean(axis=0))
+        assert numpy.allclose(covariance, numpy.cov(self.data.T, bias=True))
+        _, variance = streamed_moments(self.read_data, self.n_time, self.n_node, False, self.chunk_memory)
+        assert numpy.allclose(variance, self.data.var(axis=0))
+
+    @pytest.mark.parametrize('method', [PCAMethods.COVARIANCE, PCAMethods.RANDOMIZED])
+    def test_pca_matches_svd(self, method):
+        time_series = TimeSeries(data=self.data[:, numpy.newaxis, :, numpy.newaxis])
+        expected = compute_pca(time_series)
+        result = compute_pca(time_series, 3, method)
+        assert result.weights.shape == (3, self.n_node, 1, 1)
+        assert numpy.allclose(result.fractions, expected.fractions[:3])
+        # the same axes, up to their sign
+        overlap = numpy.sum(result.weights[..., 0, 0] * expected.weights[:3, :, 0, 0], axis=1)
+        assert numpy.allclose(numpy.abs(overlap), 1.0)
+
+    def test_principal_axes_standardize(self):
+        mean, scale, variances, axes = principal_axes(self.read_data, self.n_time, self.n_node, 2,
+                                                      standardize=False, chunk_memory=self.chunk_memory)
+        assert numpy.allclose(scale, 1.0)
+        centered = self.data - mean
+        assert numpy.allclose(variances, numpy.var(centered @ axes.T, axis=0))
+
+    @pytest.mark.parametrize('method', [PCAMethods.COVARIANCE, PCAMethods.RANDOMIZED])
+    def test_ica_matches_fastica(self, method):
+        K, W, sources = streamed_fastica(self.read_data, self.n_time, self.n_node, 4, method, random_state=0,
+                                         chunk_memory=self.chunk_memory)
+        expected_K, _, _ = fastica(self.data.copy(), 4, random_state=0)
+        assert K.shape == (4, self.n_node) and W.shape == (4, 4)
+        # the same whitening, up to the sign of the axes
+        assert numpy.allclose(numpy.abs(numpy.sum(K * expected_K, axis=1)), numpy.sum(expected_K ** 2, axis=1))
+        # the mixed sources are recovered, up to their order and sign
+        correlation = numpy.corrcoef(sources.T, self.sources.T)[:4, 4:]
+        assert numpy.all(numpy.abs(correlation).max(axis=1) > 0.99)
+
+    def test_compute_ica_decomposition(self):
+        time_series = TimeSeries(data=self.data[:, numpy.newaxis, :, numpy.newaxis])
+        result = compute_ica_decomposition(time_series, 4, PCAMethods.COVARIANCE)
+        assert result.prewhitening_matrix.shape == (4, self.n_node, 1, 1)
+        assert result.component_time_series.shape == (self.n_time, 4, 1, 1)
+        result.compute_mixing_matrix()
+        assert result.mixing_matrix.shape == (self.n_node, 4, 1, 1)
+
+
+class TestFastICA(BaseTestCase):
+
+    @pytest.mark.parametrize('shape', [(5, 9000), (3000,)])
+    def test_nonlinearities(self, shape):
+        x = numpy.random.RandomState(42).randn(*shape)
+        expected = {_logcosh: (numpy.tanh(1.5 * x), 1.5 * (1 - numpy.tanh(1.5 * x) ** 2)),
+                    _exp: (x * numpy.exp(-x ** 2 / 2), (1 - x ** 2) * numpy.exp(-x ** 2 / 2)),
+                    _cube: (x ** 3, 3 * x ** 2)}
+        for g, (gx, g_x) in expected.items():
+            result_gx, result_g_x = g(x.copy(), {'alpha': 1.5})
+            assert numpy.allclose(result_gx, gx)
+            assert numpy.allclose(result_g_x, g_x.reshape((-1, x.shape[-1])).mean(axis=-1))
+
+    @pytest.mark.parametrize('algorithm', ['parallel', 'deflation'])
+    @pytest.mark.parametrize('fun', ['logcosh', 'exp', 'cube'])
+    def test_unmixing(self, algorithm, fun):
+        rng = numpy.random.RandomState(42)
+        sources = rng.laplace(size=(3000, 4))
+        K, W, estimated = fastica(sources @ rng.randn(4, 6), 4, algorithm, fun=fun, random_state=0)
+        assert K.shape == (4, 6) and W.shape == (4, 4) and estimated.shape == (3000, 4)
+        correlation = numpy.corrcoef(estimated.T, sources.T)[:4, 4:]
+        assert numpy.all(numpy.abs(correlation).max(axis=1) > 0.99)
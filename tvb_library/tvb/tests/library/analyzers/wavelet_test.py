@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the chunked FFT wavelet transform.
+"""
+
+import numpy
+import pytest
+from scipy import signal
+
+from tvb.analyzers.wavelet import compute_continuous_wavelet_transform, morlet_kernels, morlet_kernels_shape, \
+    wavelet_transform_chunks
+from tvb.basic.neotraits.api import Range
+from tvb.datatypes.time_series import TimeSeries
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+class TestWavelet(BaseTestCase):
+    freqs = numpy.arange(0.008, 0.06, 0.002)
+
+    def test_kernels(self):
+        kernels = morlet_kernels(self.freqs, 1.0, 5.0, 'energy')
+        assert kernels.shape == morlet_kernels_shape(self.freqs, 1.0, 5.0)
+        # centered: the narrowest wavelet is zero padded on both sides
+        center = kernels.shape[1] // 2
+        assert numpy.allclose(kernels[:, center + 1:], kernels[:, center - 1::-1].conj())
+        assert kernels[-1, 0] == 0
+
+    @pytest.mark.parametrize('n_time, step', [(700, 1), (300, 3), (1000, 8)])
+    def test_matches_convolution(self, n_time, step):
+        data = numpy.random.RandomState(42).randn(n_time, 2, 3, 1)
+        kernels = morlet_kernels(self.freqs, 1.0, 5.0, 'gabor')
+        # small chunks, so that several of them are needed
+        chunks = list(wavelet_transform_chunks(lambda start, stop: data[start:stop], n_time, kernels, step,
+                                               chunk_memory=2 ** 18))
+        assert len(chunks) > 1
+        result = numpy.concatenate(chunks, axis=1)
+        assert result.shape == (len(self.freqs), len(range(0, n_time, step)), 2, 3, 1)
+        for i, kernel in enumerate(kernels):
+            expected = signal.convolve(data[:, 1, 2, 0], kernel[kernel != 0], 'same')[::step]
+            assert numpy.allclose(result[i, :, 1, 2, 0], expected)
+
+    def test_single_precision(self):
+        data = numpy.random.RandomState(42).randn(500, 1, 4, 1)
+        kernels = morlet_kernels(self.freqs, 1.0, 5.0, 'energy')
+        double, = wavelet_transform_chunks(lambda start, stop: data[start:stop], 500, kernels)
+        single, = wavelet_transform_chunks(lambda start, stop: data[start:stop], 500, kernels,
+                                           dtype=numpy.complex64)
+        assert single.dtype == numpy.complex64
+        assert numpy.allclose(single, double, atol=1e-5 * numpy.abs(double).max())
+
+    def test_compute_continuous_wavelet_transform(self):
+        data = numpy.random.RandomState(42).randn(400, 1, 2, 1)
+        time_series = TimeSeries(data=data, sample_period=1.0, sample_period_unit="s")
+        result = compute_continuous_wavelet_transform(time_series, Range(lo=0.008, hi=0.06, step=0.002), 4.0,
+                                                      5.0, 'energy', 'morlet')
+        assert result.array_data.shape == (26, 100, 1, 2, 1)
+        with pytest.raises(Exception):
+            compute_continuous_wavelet_transform(time_series, Range(lo=0.008, hi=0.06, step=0.002), 4.0,
+                                                 4.0, 'energy', 'morlet')
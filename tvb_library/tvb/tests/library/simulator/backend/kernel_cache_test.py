@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Tests for the persistent kernel cache of the code generating backends.
+
+"""
+
+import os
+import time
+import tempfile
+import unittest
+
+from tvb.simulator.backend.kernel_cache import KernelCache
+from tvb.simulator.backend.np import NpBackend
+
+
+class TestKernelCache(unittest.TestCase):
+
+    template = '''
+def kernel(x):
+    return x + ${a}
+'''
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = KernelCache(self.tmpdir.name, max_entries=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_build_hit(self):
+        backend = NpBackend(kernel_cache=self.cache)
+        kernel = backend.build_py_func(self.template, dict(a=1), use_cache=True)
+        self.assertEqual(kernel(1), 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        # a new process would start from the stored module
+        cache = KernelCache(self.tmpdir.name)
+        kernel = NpBackend(kernel_cache=cache).build_py_func(self.template, dict(a=1), use_cache=True)
+        self.assertEqual(kernel(1), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        # different content is a different kernel
+        kernel = backend.build_py_func(self.template, dict(a=2), use_cache=True)
+        self.assertEqual(kernel(1), 3)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_lru_eviction(self):
+        backend = NpBackend(kernel_cache=self.cache)
+        keys = []
+        for a in range(3):
+            key = self.cache.key(backend, self.template, str(a))
+            self.cache.put(key, self.template.replace('${a}', str(a)))
+            keys.append(key)
+            time.sleep(0.01)
+            if a == 1:
+                # use the first entry, so the second one is least recently used
+                self.assertIsNotNone(self.cache.get(keys[0], 'kernel'))
+                time.sleep(0.01)
+        names = [os.path.basename(path) for path in self.cache.entries()]
+        self.assertEqual(names, [KernelCache.prefix + key + '.py' for key in (keys[0], keys[2])])
+        self.assertIsNone(self.cache.get(keys[1], 'kernel'))
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
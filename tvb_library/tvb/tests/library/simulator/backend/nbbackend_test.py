@@ -35,10 +35,12 @@ Tests for the Numba backend.
 
 """
 
+import copy
 import unittest
 import numpy as np
 
-from tvb.simulator.coupling import Sigmoidal, Linear
+from tvb.simulator.coupling import (Sigmoidal, Linear, Scaling, HyperbolicTangent,
+    Difference, Kuramoto)
 from tvb.simulator.noise import Additive, Multiplicative
 from tvb.datatypes.connectivity import Connectivity
 from tvb.simulator.models.infinite_theta import MontbrioPazoRoxin
@@ -47,6 +49,9 @@ from tvb.simulator.integrators import (EulerDeterministic, EulerStochastic,
     RungeKutta4thOrderDeterministic, Identity, IdentityStochastic,
     VODEStochastic)
 from tvb.simulator.backend.nb import NbBackend
+from tvb.simulator.models.linear import Linear as LinearModel
+from tvb.simulator.monitors import Raw, SubSample, TemporalAverage, GlobalAverage, Bold
+from tvb.simulator.simulator import Simulator
 
 from .backendtestbase import (BaseTestCoupling, BaseTestDfun,
     BaseTestIntegrate, BaseTestSim)
@@ -288,3 +293,69 @@ class TestNbSim(BaseTestSim):
 
     def test_drk4(self): self._test_integrator(RungeKutta4thOrderDeterministic,
                                                delays=True)
+
+
+class TestNbRunSim(BaseTestSim):
+    "Tests of the compiled loop against the simulator's own loop."
+
+    def _create_sims(self, integrator, delays=False, model=None, cfun=None, monitors=None):
+        sims = []
+        if model is None:
+            model = MontbrioPazoRoxin(eta=MontbrioPazoRoxin().eta * (1 + np.random.randn(76) * 0.1))
+        for _ in range(2):
+            conn = Connectivity.from_file()
+            conn.speed = np.r_[3.0 if delays else np.inf]
+            sim = Simulator(connectivity=conn, model=copy.deepcopy(model),
+                            coupling=copy.deepcopy(cfun or Linear()),
+                            integrator=copy.deepcopy(integrator),
+                            monitors=copy.deepcopy(monitors or [Raw(), TemporalAverage(period=0.1)]),
+                            simulation_length=2.0)
+            sim.configure()
+            if isinstance(sim.integrator, IntegratorStochastic):
+                sim.integrator.noise.reset_random_stream()
+            sims.append(sim)
+        sims[1].history.buffer[:] = sims[0].history.buffer
+        sims[1].current_state[:] = sims[0].current_state
+        return sims
+
+    def _test_run_sim(self, integrator, delays=False, **kwargs):
+        sim, nbsim = self._create_sims(integrator, delays=delays, **kwargs)
+        expected = sim.run()
+        actual = NbBackend().run_sim(nbsim, chunksize=64)
+        for (t, y), (nbt, nby) in zip(expected, actual):
+            np.testing.assert_allclose(nbt, t)
+            self.assertEqual(nby.shape, y.shape)
+            np.testing.assert_allclose(nby, y, 1e-3, 1e-4)
+        self.assertEqual(nbsim.current_step, sim.current_step)
+        np.testing.assert_allclose(nbsim.current_state, sim.current_state, 1e-3, 1e-4)
+        np.testing.assert_allclose(nbsim.history.buffer, sim.history.buffer, 1e-3, 1e-4)
+
+    def _integrator(self, Integrator):
+        if issubclass(Integrator, IntegratorStochastic):
+            return Integrator(dt=0.01, noise=Additive(nsig=np.r_[0.01]))
+        return Integrator(dt=0.01)
+
+    def test_heun(self): self._test_run_sim(self._integrator(HeunDeterministic))
+    def test_dheuns(self): self._test_run_sim(self._integrator(HeunStochastic), delays=True)
+    def test_deulers(self): self._test_run_sim(self._integrator(EulerStochastic), delays=True)
+    def test_drk4(self): self._test_run_sim(self._integrator(RungeKutta4thOrderDeterministic), delays=True)
+
+    def test_couplings(self):
+        for cfun in (Scaling(), HyperbolicTangent(a=np.r_[0.01]), Difference(a=np.r_[0.01]),
+                     Kuramoto(a=np.r_[0.1]), Sigmoidal(cmin=np.r_[0.0], cmax=np.r_[0.01])):
+            self._test_run_sim(self._integrator(HeunDeterministic), delays=True, cfun=cfun)
+
+    def test_monitors(self):
+        monitors = [SubSample(period=0.05), GlobalAverage(period=0.1), TemporalAverage(period=0.2),
+                    TemporalAverage(period=0.04, variables_of_interest=np.r_[1])]
+        self._test_run_sim(self._integrator(HeunStochastic), delays=True, monitors=monitors)
+
+    def test_linear_model(self):
+        self._test_run_sim(self._integrator(EulerDeterministic), delays=True,
+                           model=LinearModel(gamma=np.r_[-1.0]), cfun=Difference())
+
+    def test_unsupported(self):
+        sim, _ = self._create_sims(self._integrator(HeunDeterministic))
+        sim.monitors = [Bold()]
+        with self.assertRaises(NotImplementedError):
+            NbBackend().check_compatibility(sim)
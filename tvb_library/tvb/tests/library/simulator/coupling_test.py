@@ -142,6 +142,20 @@ class TestCoupling(BaseTestCase):
         assert k.a == 0.56
         self._apply_coupling_2sv(k)
 
+    def test_sigmoidal_jr_coupling_output(self):
+        weights = numpy.array([[0.0, 1.0, 0.5], [2.0, 0.0, 0.0], [0.0, 0.25, 0.0]])
+        state = numpy.array([[[7.0], [5.0], [9.0]], [[1.0], [2.0], [0.5]]])
+        history = SparseHistory(weights, numpy.zeros(weights.shape, dtype=int), numpy.r_[0, 1], 1)
+        history.update(0, state)
+        k = coupling.SigmoidalJansenRit()
+        k.configure()
+        result = k(0, history)
+        # the two coupling variables are combined in a single coupling term
+        assert result.shape == (1, 3, 1)
+        sigm = k.cmax / (1.0 + numpy.exp(k.r * (k.midpoint - (state[0, :, 0] - state[1, :, 0]))))
+        expected = k.a * weights.dot(sigm)
+        assert numpy.allclose(result[0, :, 0], expected)
+
 
 class TestCouplingShape(BaseTestCase):
     @pytest.mark.slow
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Benchmarks of the sparse coupling path for connectomes of increasing size.
+
+"""
+
+import numpy
+import pytest
+
+from tvb.simulator import coupling
+from tvb.simulator.history import SparseHistory, DelayBucketHistory
+
+DENSITY = 0.03
+MAX_DELAY = 50
+
+
+def make_history(n_node, n_cvar=1, history_class=SparseHistory):
+    rng = numpy.random.RandomState(42)
+    weights = (rng.rand(n_node, n_node) < DENSITY) * rng.rand(n_node, n_node).astype('f')
+    delays = rng.randint(0, MAX_DELAY, (n_node, n_node)).astype(numpy.int16)
+    history = history_class(weights, delays, numpy.r_[:n_cvar], 1)
+    history.initialize(rng.randn(MAX_DELAY, n_cvar, n_node, 1))
+    return history
+
+
+@pytest.mark.parametrize('n_node', [76, 998, 5000])
+@pytest.mark.parametrize('cfun_class', [coupling.Linear, coupling.Sigmoidal, coupling.Difference])
+def test_sparse_coupling(benchmark, n_node, cfun_class):
+    history = make_history(n_node)
+    cfun = cfun_class()
+    cfun.configure()
+    benchmark(lambda: cfun(MAX_DELAY, history))
+    benchmark.extra_info['history_mbytes'] = history.nbytes * 2 ** -20
+    # no (n_node, n_node) array is involved, memory scales with the number of connections
+    assert history.nbytes - history.buffer.nbytes < 32 * history.n_nnzw + 16 * n_node + 64
+    assert history._dense_delayed_state is None
+
+
+@pytest.mark.parametrize('n_node', [76, 998])
+def test_dense_coupling(benchmark, n_node):
+    history = make_history(n_node, n_cvar=2)
+    cfun = coupling.PreSigmoidal()
+    cfun.configure()
+    benchmark(lambda: cfun(MAX_DELAY, history))
+    benchmark.extra_info['history_mbytes'] = history.nbytes * 2 ** -20
+
+
+@pytest.mark.parametrize('n_node', [76, 998, 5000])
+@pytest.mark.parametrize('history_class', [SparseHistory, DelayBucketHistory])
+def test_history_query(benchmark, n_node, history_class):
+    history = make_history(n_node, history_class=history_class)
+    benchmark(lambda: history.query_sparse(MAX_DELAY))
+    benchmark.extra_info['history_mbytes'] = history.nbytes * 2 ** -20
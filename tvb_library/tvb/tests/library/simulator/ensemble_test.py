@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Scientific Package. This package holds all simulators, and
+# analysers necessary to run brain-simulations. You can use it stand alone or
+# in conjunction with TheVirtualBrain-Framework Package. See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Test ensemble simulations against individual simulations.
+
+.. moduleauthor:: Marmaduke Woodman <marmaduke.woodman@univ-amu.fr>
+
+"""
+
+import numpy
+import pytest
+from tvb.datatypes.connectivity import Connectivity
+from tvb.simulator import coupling, integrators, models, monitors, noise
+from tvb.simulator.ensemble import EnsembleSimulator
+from tvb.simulator.simulator import Simulator
+from tvb.tests.library.base_testcase import BaseTestCase
+
+
+class TestEnsembleSimulator(BaseTestCase):
+    n_instances = 3
+
+    def _build(self, cls, **kwargs):
+        conn = Connectivity.from_file()
+        conn.speed = numpy.r_[3.0]
+        return cls(connectivity=conn,
+                   coupling=coupling.Linear(),
+                   model=models.Generic2dOscillator(),
+                   integrator=integrators.HeunStochastic(dt=0.1, noise=noise.Additive(nsig=numpy.r_[0.001])),
+                   monitors=[monitors.TemporalAverage(period=1.0), monitors.Raw()],
+                   simulation_length=20.0, **kwargs)
+
+    def _single_runs(self, ic, configure_instance):
+        outputs = []
+        for i in range(self.n_instances):
+            sim = self._build(Simulator, initial_conditions=ic)
+            configure_instance(i, sim)
+            sim.integrator.noise.reset_random_stream()
+            outputs.append(sim.configure().run())
+        return outputs
+
+    def _check_match(self, ens_output, single_outputs):
+        for i, single_output in enumerate(single_outputs):
+            for (ens_t, ens_y), (t, y) in zip(ens_output, single_output):
+                numpy.testing.assert_allclose(ens_t, t)
+                assert ens_y.shape == (t.size, self.n_instances) + y.shape[1:]
+                numpy.testing.assert_allclose(ens_y[:, i], y)
+
+    def test_coupling_parameters_and_seeds(self):
+        ic = numpy.random.rand(*self._build(Simulator).configure().good_history_shape)
+        a = numpy.linspace(0.0, 0.02, self.n_instances)
+        seeds = numpy.r_[:self.n_instances] + 10
+        ens = self._build(EnsembleSimulator, n_instances=self.n_instances,
+                          initial_conditions=numpy.repeat(ic, self.n_instances, 2),
+                          coupling_parameters={'a': a}, noise_seeds=seeds)
+
+        def configure_instance(i, sim):
+            sim.coupling.a = a[i:i + 1]
+            sim.integrator.noise.noise_seed = seeds[i]
+
+        self._check_match(ens.configure().run(), self._single_runs(ic, configure_instance))
+
+    def test_model_parameters(self):
+        ic = numpy.random.rand(*self._build(Simulator).configure().good_history_shape)
+        I = numpy.linspace(0.0, 1.0, self.n_instances)
+        ens = self._build(EnsembleSimulator, n_instances=self.n_instances,
+                          initial_conditions=numpy.repeat(ic, self.n_instances, 2),
+                          model_parameters={'I': I}, noise_seeds=numpy.repeat(42, self.n_instances))
+
+        def configure_instance(i, sim):
+            sim.model.I = I[i:i + 1]
+
+        self._check_match(ens.configure().run(), self._single_runs(ic, configure_instance))
+
+    def test_unsupported_monitor(self):
+        ens = self._build(EnsembleSimulator, n_instances=self.n_instances)
+        ens.monitors = [monitors.GlobalAverage()]
+        with pytest.raises(NotImplementedError):
+            ens.configure()
@@ -39,6 +39,7 @@ import numpy
 from tvb.basic.neotraits.api import List
 from tvb.datatypes.connectivity import Connectivity
 from tvb.simulator.coupling import SparseCoupling
+from tvb.simulator.history import SparseHistory, DelayBucketHistory, choose_history_class
 from tvb.simulator.integrators import Identity
 from tvb.simulator.models.base import Model
 from tvb.simulator.monitors import Raw
@@ -114,3 +115,34 @@ class TestsExactPropagation(BaseTestCase):
                            [38., 13., 10., 1.],
                            [48., 17., 11., 1.]])
         assert numpy.allclose(xs, xs_)
+
+    def test_propagation_history_class(self):
+        self.build_simulator(n=4)
+        assert isinstance(self.sim.history, DelayBucketHistory)
+
+
+class TestDelayBucketHistory(BaseTestCase):
+
+    def test_query_matches_sparse(self):
+        rng = numpy.random.RandomState(42)
+        n_node, n_time = 20, 7
+        weights = (rng.rand(n_node, n_node) < 0.3) * rng.rand(n_node, n_node)
+        delays = rng.randint(0, n_time, (n_node, n_node))
+        cvars = numpy.r_[0, 2]
+        sparse = SparseHistory(weights, delays, cvars, 3)
+        bucketed = DelayBucketHistory(weights, delays, cvars, 3)
+        init = rng.randn(n_time, 3, n_node, 3)
+        sparse.initialize(init)
+        bucketed.initialize(init)
+        assert bucketed.n_udel == numpy.unique(delays[weights != 0]).size
+        for step in range(n_time, 3 * n_time):
+            state = rng.randn(3, n_node, 3)
+            sparse.update(step, state)
+            bucketed.update(step, state)
+            for expected, actual in zip(sparse.query_sparse(step), bucketed.query_sparse(step)):
+                assert numpy.allclose(expected, actual)
+
+    def test_choose_history_class(self):
+        weights = numpy.ones((10, 10))
+        assert choose_history_class(weights, numpy.zeros((10, 10), 'i')) is DelayBucketHistory
+        assert choose_history_class(weights, numpy.r_[:100].reshape((10, 10))) is SparseHistory
@@ -47,6 +47,7 @@ from tvb.basic.profile import TvbProfile
 from tvb.storage.h5.decorators import synchronized
 from tvb.storage.h5.encryption.encryption_handler import EncryptionHandler
 from tvb.storage.h5.file.files_helper import FilesHelper
+from tvb.storage.h5.file.handle_pool import read_handle_pool
 from tvb.storage.kube.kube_notifier import KubeNotifier
 
 LOGGER = get_logger(__name__)
@@ -170,6 +171,7 @@ class DataEncryptionHandler(metaclass=DataEncryptionHandlerMeta):
                 and folder in self.marked_for_delete:
             self.marked_for_delete.remove(folder)
             LOGGER.info("Remove folder {}".format(folder))
+            read_handle_pool.invalidate_folder(folder)
             shutil.rmtree(folder)
 
     def is_in_usage(self, folder):
@@ -194,6 +196,7 @@ class DataEncryptionHandler(metaclass=DataEncryptionHandlerMeta):
             crypto_pass = self._project_key(project_name)
             crypto = Crypto(crypto_pass)
             syncro = Syncrypto(crypto, encrypted_folder, folder)
+            read_handle_pool.invalidate_folder(folder)
             syncro.sync_folder()
             trash_path = os.path.join(encrypted_folder, "_syncrypto", "trash")
             if os.path.exists(trash_path):
@@ -234,6 +237,7 @@ class DataEncryptionHandler(metaclass=DataEncryptionHandlerMeta):
                 LOGGER.info("Project {} still in use. Marked for deletion.".format(project_folder))
                 continue
             LOGGER.info("Remove project: {}".format(project_folder))
+            read_handle_pool.invalidate_folder(project_folder)
             shutil.rmtree(project_folder)
 
     def push_folder_to_sync(self, folder):
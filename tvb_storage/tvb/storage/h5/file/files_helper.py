@@ -41,6 +41,7 @@ from tvb.basic.logger.builder import get_logger
 from tvb.basic.profile import TvbProfile
 from tvb.storage.h5.decorators import synchronized
 from tvb.storage.h5.file.exceptions import FileStructureException
+from tvb.storage.h5.file.handle_pool import read_handle_pool
 from tvb.storage.h5.file.xml_metadata_handlers import XMLWriter, XMLReader
 
 LOCK_CREATE_FOLDER = Lock()
@@ -110,6 +111,7 @@ class FilesHelper(object):
 
             if os.path.exists(new_full_name):
                 raise IOError("Path exists %s " % new_full_name)
+            read_handle_pool.invalidate_folder(path)
             os.rename(path, new_full_name)
             return path, new_full_name
         except Exception:
@@ -169,6 +171,7 @@ class FilesHelper(object):
         try:
             folder = self.get_project_folder(new_project_name, str(new_op_id))
             full_new_file = os.path.join(folder, os.path.split(full_path)[1])
+            read_handle_pool.invalidate(full_path)
             os.rename(full_path, full_new_file)
         except Exception:
             self.logger.exception("Could not move file")
@@ -262,8 +265,10 @@ class FilesHelper(object):
             try:
                 if os.path.exists(file_):
                     if os.path.isfile(file_):
+                        read_handle_pool.invalidate(file_)
                         os.remove(file_)
                     if os.path.isdir(file_):
+                        read_handle_pool.invalidate_folder(file_)
                         shutil.rmtree(file_)
             except Exception:
                 logger = get_logger(__name__)
@@ -278,6 +283,7 @@ class FilesHelper(object):
         :param ignore_errors: When False throw FileStructureException if folder_path is invalid.
         """
         if os.path.isdir(folder_path):
+            read_handle_pool.invalidate_folder(folder_path)
             shutil.rmtree(folder_path, ignore_errors)
             return
         if not ignore_errors:
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+
+"""
+Process-wide pool of read-only HDF5 file handles, kept open between reads.
+
+Viewers page through big arrays with many small reads. Opening the file for each of them means parsing
+the HDF5 superblock and metadata over and over, so read-only handles are kept open here, keyed by path and
+validated against the modification stamp of the file. Whoever changes a file on disk (a writer, the
+encryption sync, file removal) invalidates the handles for it.
+"""
+
+import os
+import threading
+import time
+import h5py as hdf5
+
+from tvb.basic.logger.builder import get_logger
+
+LOG = get_logger(__name__)
+
+# Maximum number of files kept open by the pool
+MAX_OPEN_FILES = 64
+# Seconds after which a handle not used anymore is closed
+IDLE_TIMEOUT = 60
+
+
+class _PooledHandle(object):
+
+    def __init__(self, path, stamp, h5_file):
+        self.path = path
+        self.stamp = stamp
+        self.file = h5_file
+        self.users = 0
+        self.last_used = time.monotonic()
+        self.stale = False
+
+    def close(self):
+        try:
+            if self.file.id.valid:
+                self.file.close()
+        except Exception as excep:
+            LOG.exception(excep)
+
+
+class H5ReadHandlePool(object):
+    """
+    LRU pool of h5py files opened in 'r' mode.
+
+    A handle is reused only while the modification time and size of its file are unchanged.
+    Handles still in use when they get evicted or invalidated are closed at release.
+    """
+
+    def __init__(self, max_open=MAX_OPEN_FILES, idle_timeout=IDLE_TIMEOUT):
+        """
+        :param max_open: the maximum number of files kept open, 0 disables keeping files open
+        :param idle_timeout: seconds after which an unused handle is closed
+        """
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self._handles = {}
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+
+    def __len__(self):
+        return len(self._handles)
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _open(path):
+        try:
+            # without file locking, so that a kept open handle doesn't block writers in other processes
+            return hdf5.File(path, 'r', libver='latest', locking=False)
+        except (TypeError, ValueError):
+            # locking is not supported by older h5py / HDF5 versions
+            return hdf5.File(path, 'r', libver='latest')
+
+    def acquire(self, path):
+        """
+        Get an open handle for reading the given file. It has to be given back with `release`.
+        :raises OSError: when the file can not be opened
+        """
+        path = os.path.abspath(path)
+        stamp = self._stamp(path)
+        with self._lock:
+            self._check_process()
+            handle = self._handles.pop(path, None)
+            if handle is not None and (handle.stale or handle.stamp != stamp or not handle.file.id.valid):
+                self._discard(handle)
+                handle = None
+            if handle is None:
+                self.misses += 1
+                LOG.debug("Opening file: %s in mode: r" % path)
+                handle = _PooledHandle(path, stamp, self._open(path))
+            else:
+                self.hits += 1
+            # re-inserted, so that the dict is kept in least recently used order
+            self._handles[path] = handle
+            handle.users += 1
+            handle.last_used = time.monotonic()
+            self._shrink()
+            return handle
+
+    def release(self, handle):
+        """
+        Give back a handle obtained with `acquire`.
+        """
+        with self._lock:
+            handle.users -= 1
+            handle.last_used = time.monotonic()
+            if handle.users == 0 and (handle.stale or self._handles.get(handle.path) is not handle):
+                handle.close()
+            self._shrink()
+
+    def invalidate(self, path):
+        """
+        Drop the handle of a file which is about to be changed, moved or removed.
+        """
+        with self._lock:
+            handle = self._handles.pop(os.path.abspath(path), None)
+            if handle is not None:
+                self._discard(handle)
+
+    def invalidate_folder(self, folder):
+        """
+        Drop the handles of all the files under a folder.
+        """
+        folder = os.path.join(os.path.abspath(folder), '')
+        with self._lock:
+            for path in [path for path in self._handles if path.startswith(folder)]:
+                self._discard(self._handles.pop(path))
+
+    def close_idle(self):
+        """
+        Close the handles unused for longer than the idle timeout.
+        """
+        with self._lock:
+            limit = time.monotonic() - self.idle_timeout
+            for handle in list(self._handles.values()):
+                if handle.users == 0 and handle.last_used <= limit:
+                    self._discard(self._handles.pop(handle.path))
+
+    def clear(self):
+        """
+        Close all the handles not in use and forget about the others.
+        """
+        with self._lock:
+            for handle in list(self._handles.values()):
+                self._discard(handle)
+            self._handles = {}
+
+    def _discard(self, handle):
+        handle.stale = True
+        if handle.users == 0:
+            handle.close()
+
+    def _shrink(self):
+        self.close_idle()
+        excess = len(self._handles) - self.max_open
+        for handle in list(self._handles.values()):
+            if excess <= 0:
+                break
+            if handle.users == 0:
+                self._discard(self._handles.pop(handle.path))
+                excess -= 1
+
+    def _check_process(self):
+        # HDF5 handles are not usable from a forked child, so these are dropped without closing them
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._handles = {}
+
+
+read_handle_pool = H5ReadHandlePool()
@@ -35,9 +35,9 @@ Persistence of data in HDF5 format.
 .. moduleauthor:: Calin Pavel <calin.pavel@codemart.ro>
 """
 
-import copy
 import os
 import threading
+from contextlib import contextmanager
 from datetime import datetime
 import h5py as hdf5
 import numpy as numpy
@@ -49,6 +49,7 @@ from tvb.storage.h5.encryption.data_encryption_handler import encryption_handler
 from tvb.storage.h5.file.exceptions import MissingDataSetException, IncompatibleFileManagerException, \
     FileStructureException, MissingDataFileException
 from tvb.storage.h5.file.files_helper import FilesHelper
+from tvb.storage.h5.file.handle_pool import read_handle_pool
 
 # Create logger for this module
 LOG = get_logger(__name__)
@@ -82,8 +83,10 @@ class HDF5StorageManager(object):
 
         self.__storage_full_name = storage_full_name
         self.__buffer_array = None
+        self.__buffer_stats = {'flushes': 0, 'bytes_written': 0}
         self.data_buffers = {}
         self.data_encryption_handler = encryption_handler
+        self.__kept_open = 0
 
     def is_valid_tvb_file(self):
         """
@@ -95,13 +98,14 @@ class HDF5StorageManager(object):
         except RuntimeError:
             return False
 
-    def store_data(self, data_list, dataset_name='', where=ROOT_NODE_PATH):
+    def store_data(self, data_list, dataset_name='', where=ROOT_NODE_PATH, storage_policy=None):
         """
         This method stores provided data list into a data set in the H5 file.
 
         :param dataset_name: Name of the data set where to store data
         :param data_list: Data to be stored
         :param where: represents the path where to store our dataset (e.g. /data/info)
+        :param storage_policy: optional StoragePolicy for chunking and compressing a new data set
         """
         data_to_store = self._check_data(data_list)
 
@@ -112,7 +116,10 @@ class HDF5StorageManager(object):
 
             full_dataset_name = where + dataset_name
             if full_dataset_name not in hdf5_file:
-                hdf5_file.create_dataset(full_dataset_name, data=data_to_store)
+                kwargs = {}
+                if storage_policy is not None and isinstance(data_to_store, numpy.ndarray) and data_to_store.size > 0:
+                    kwargs = storage_policy.dataset_kwargs(data_to_store.shape, data_to_store.dtype, 0, growable=False)
+                hdf5_file.create_dataset(full_dataset_name, data=data_to_store, **kwargs)
 
             elif hdf5_file[full_dataset_name].shape == data_to_store.shape:
                 hdf5_file[full_dataset_name][...] = data_to_store[...]
@@ -127,7 +134,8 @@ class HDF5StorageManager(object):
             self.data_encryption_handler.push_folder_to_sync(FilesHelper.get_project_folder_from_h5(
                 self.__storage_full_name))
 
-    def append_data(self, data_list, dataset_name='', grow_dimension=-1, close_file=True, where=ROOT_NODE_PATH):
+    def append_data(self, data_list, dataset_name='', grow_dimension=-1, close_file=True, where=ROOT_NODE_PATH,
+                    buffer_size=None, storage_policy=None):
         """
         This method appends data to an existing data set. If the data set does not exists, create it first.
 
@@ -137,6 +145,10 @@ class HDF5StorageManager(object):
         :param close_file: Specify if the file should be closed automatically after write operation. If not,
             you have to close file by calling method close_file()
         :param where: represents the path where to store our dataset (e.g. /data/info)
+        :param buffer_size: size in bytes of the data buffered for this data set before being written,
+            BUFFER_SIZE by default. Only taken into account by the first append after the file is opened.
+        :param storage_policy: optional StoragePolicy for chunking and compressing the data set when it is created,
+            otherwise h5py chooses the chunk shape.
 
         """
         data_to_store = self._check_data(data_list)
@@ -149,16 +161,22 @@ class HDF5StorageManager(object):
                 dataset = hdf5_file[datapath]
                 self.data_buffers[datapath] = HDF5StorageManager.H5pyStorageBuffer(dataset,
                                                                                    buffered_data=data_to_store,
-                                                                                   grow_dimension=grow_dimension)
+                                                                                   grow_dimension=grow_dimension,
+                                                                                   buffer_size=buffer_size)
             else:
                 data_shape_list = list(data_to_store.shape)
                 data_shape_list[grow_dimension] = None
                 data_shape = tuple(data_shape_list)
+                kwargs = {}
+                if storage_policy is not None:
+                    kwargs = storage_policy.dataset_kwargs(data_to_store.shape, data_to_store.dtype, grow_dimension)
                 dataset = hdf5_file.create_dataset(where + dataset_name, data=data_to_store, shape=data_to_store.shape,
-                                                   dtype=data_to_store.dtype, maxshape=data_shape)
+                                                   dtype=data_to_store.dtype, maxshape=data_shape, **kwargs)
                 self.data_buffers[datapath] = HDF5StorageManager.H5pyStorageBuffer(dataset,
                                                                                    buffered_data=None,
-                                                                                   grow_dimension=grow_dimension)
+                                                                                   grow_dimension=grow_dimension,
+                                                                                   buffer_size=buffer_size)
+                self.data_buffers[datapath].bytes_written += data_to_store.nbytes
         else:
             if not data_buffer.buffer_data(data_to_store):
                 data_buffer.flush_buffered_data()
@@ -167,6 +185,17 @@ class HDF5StorageManager(object):
         self.data_encryption_handler.push_folder_to_sync(
             FilesHelper.get_project_folder_from_h5(self.__storage_full_name))
 
+    def get_buffer_stats(self):
+        """
+        :returns: a dictionary with the number of buffer flushes and the number of bytes written
+            by append operations through this storage manager.
+        """
+        stats = dict(self.__buffer_stats)
+        for h5py_buffer in self.data_buffers.values():
+            stats['flushes'] += h5py_buffer.flush_count
+            stats['bytes_written'] += h5py_buffer.bytes_written
+        return stats
+
     def remove_data(self, dataset_name='', where=ROOT_NODE_PATH):
         """
         Deleting a data set from H5 file.
@@ -204,29 +233,37 @@ class HDF5StorageManager(object):
         LOG.debug("Reading data from data set: %s" % dataset_name)
 
         data_path = where + dataset_name
+        if close_file and self.__is_closed():
+            with self.__pooled_h5_file() as hdf5_file:
+                return self.__read_data(hdf5_file, data_path, data_slice, ignore_errors)
         try:
             # Open file to read data
             hdf5_file = self._open_h5_file('r')
-            if data_path in hdf5_file:
-                data_array = hdf5_file[data_path]
-                # Now read data
-                if data_slice is None:
-                    result = data_array[()]
-                    if isinstance(result, hdf5.Empty):
-                        return numpy.empty([])
-                    return result
-                else:
-                    return data_array[data_slice]
-            else:
-                if not ignore_errors:
-                    LOG.error("Trying to read data from a missing data set: %s" % dataset_name)
-                    raise MissingDataSetException("Could not locate dataset: %s" % dataset_name)
-                else:
-                    return None
+            self.__flush_buffer(data_path)
+            return self.__read_data(hdf5_file, data_path, data_slice, ignore_errors)
         finally:
             if close_file:
                 self.close_file()
 
+    @staticmethod
+    def __read_data(hdf5_file, data_path, data_slice, ignore_errors):
+        if data_path in hdf5_file:
+            data_array = hdf5_file[data_path]
+            # Now read data
+            if data_slice is None:
+                result = data_array[()]
+                if isinstance(result, hdf5.Empty):
+                    return numpy.empty([])
+                return result
+            else:
+                return data_array[data_slice]
+        else:
+            if not ignore_errors:
+                LOG.error("Trying to read data from a missing data set: %s" % data_path)
+                raise MissingDataSetException("Could not locate dataset: %s" % data_path)
+            else:
+                return None
+
     def get_data_shape(self, dataset_name='', where=ROOT_NODE_PATH):
         """
         This method reads data-size from the given data set
@@ -238,8 +275,12 @@ class HDF5StorageManager(object):
         """
         LOG.debug("Reading data from data set: %s" % dataset_name)
         try:
+            if self.__is_closed():
+                with self.__pooled_h5_file() as hdf5_file:
+                    return hdf5_file[where + dataset_name].shape
             # Open file to read data
             hdf5_file = self._open_h5_file('r')
+            self.__flush_buffer(where + dataset_name)
             data_array = hdf5_file[where + dataset_name]
             return data_array.shape
         except KeyError:
@@ -357,19 +398,12 @@ class HDF5StorageManager(object):
         LOG.debug("Retrieving metadata for dataset: %s" % dataset_name)
         meta_key = ""
         try:
+            if self.__is_closed():
+                with self.__pooled_h5_file() as hdf5_file:
+                    return self.__read_metadata(hdf5_file[where + dataset_name])
             # Open file to read data
             hdf5_file = self._open_h5_file('r')
-            node = hdf5_file[where + dataset_name]
-            # Now retrieve metadata values
-            all_meta_data = {}
-
-            for meta_key in node.attrs:
-                new_key = meta_key
-                if meta_key.startswith(self.TVB_ATTRIBUTE_PREFIX):
-                    new_key = meta_key[len(self.TVB_ATTRIBUTE_PREFIX):]
-                value = node.attrs[meta_key]
-                all_meta_data[new_key] = self._deserialize_value(value)
-            return all_meta_data
+            return self.__read_metadata(hdf5_file[where + dataset_name])
 
         except KeyError:
             msg = "Trying to read data from a missing data set: %s" % (where + dataset_name)
@@ -387,6 +421,16 @@ class HDF5StorageManager(object):
         finally:
             self.close_file()
 
+    def __read_metadata(self, node):
+        all_meta_data = {}
+        for meta_key in node.attrs:
+            new_key = meta_key
+            if meta_key.startswith(self.TVB_ATTRIBUTE_PREFIX):
+                new_key = meta_key[len(self.TVB_ATTRIBUTE_PREFIX):]
+            value = node.attrs[meta_key]
+            all_meta_data[new_key] = self._deserialize_value(value)
+        return all_meta_data
+
     def get_file_data_version(self, data_version, dataset_name='', where=ROOT_NODE_PATH):
         """
         Checks the data version for the current file.
@@ -444,13 +488,31 @@ class HDF5StorageManager(object):
             raise Exception("Some lock was deleted without being released beforehand.")
         lock.release()
 
+    @contextmanager
+    def kept_open(self):
+        """
+        Keep the file open for writing during a sequence of reads and writes, instead of opening and closing it
+        for each of them. The file is closed when the outermost such block ends.
+        """
+        self._open_h5_file()
+        self.__kept_open += 1
+        try:
+            yield self
+        finally:
+            self.__kept_open -= 1
+            self.close_file()
+
     def close_file(self):
         """
+        The file stays open while inside a `kept_open` block.
+
         The synchronization of open/close doesn't seem to be needed anymore for h5py in
         contrast to PyTables for concurrent reads. However since it shouldn't add that
         much overhead in most situation we'll leave it like this for now since in case
         of concurrent writes(metadata) this provides extra safety.
         """
+        if self.__kept_open:
+            return
         try:
             self.__aquire_lock()
             self.__close_file()
@@ -483,6 +545,8 @@ class HDF5StorageManager(object):
             try:
                 for h5py_buffer in self.data_buffers.values():
                     h5py_buffer.flush_buffered_data()
+                    self.__buffer_stats['flushes'] += h5py_buffer.flush_count
+                    self.__buffer_stats['bytes_written'] += h5py_buffer.bytes_written
                 self.data_buffers = {}
                 hdf5_file.close()
             except Exception as excep:
@@ -494,6 +558,38 @@ class HDF5StorageManager(object):
                 self.__hfd5_file = None
 
     # -------------- Private methods  --------------
+    def __is_closed(self):
+        """
+        True when this manager has neither the file open, nor data buffered for it.
+        Reads can then go through a pooled read-only handle.
+        """
+        return not self.data_buffers and (self.__hfd5_file is None or not self.__hfd5_file.id.valid)
+
+    @contextmanager
+    def __pooled_h5_file(self):
+        """
+        Get a read-only handle for the file, kept open between reads by the read handle pool.
+        """
+        if self.__storage_full_name is None:
+            raise FileStructureException("Invalid storage file. Please provide a valid path.")
+        try:
+            handle = read_handle_pool.acquire(self.__storage_full_name)
+        except (IOError, OSError) as err:
+            LOG.exception("Could not open storage file.")
+            raise FileStructureException("Could not open storage file. %s" % err)
+        try:
+            yield handle.file
+        finally:
+            read_handle_pool.release(handle)
+
+    def __flush_buffer(self, data_path):
+        """
+        Write data still buffered by appends to the given data set, so that it can be read.
+        """
+        data_buffer = self.data_buffers.get(data_path, None)
+        if data_buffer is not None:
+            data_buffer.flush_buffered_data()
+
     def __open_h5_file(self, mode='a'):
         """
         Open file for reading, writing or append.
@@ -509,6 +605,9 @@ class HDF5StorageManager(object):
             # Check if file is still open from previous writes.
             if self.__hfd5_file is None or not self.__hfd5_file.id.valid:
                 file_exists = os.path.exists(self.__storage_full_name)
+                if mode != 'r':
+                    # kept open read-only handles would prevent opening it for writing
+                    read_handle_pool.invalidate(self.__storage_full_name)
 
                 # bug in some versions of hdf5 on windows prevent creating file with mode='a'
                 if not file_exists and mode == 'a':
@@ -550,16 +649,48 @@ class HDF5StorageManager(object):
         """
         Helper class in order to buffer data for append operations, to limit the number of actual
         HDD I/O operations.
+
+        Appended data is copied in place into a preallocated block, whose length along the grow
+        dimension holds buffer_size bytes, rounded down to whole chunks of the dataset when larger
+        than one chunk, so that each flush is a single resize and slice write of whole chunks.
         """
 
-        def __init__(self, h5py_dataset, buffered_data=None, grow_dimension=-1):
-            self.buffered_data = buffered_data
-            self.buffer_size = BUFFER_SIZE
+        def __init__(self, h5py_dataset, buffered_data=None, grow_dimension=-1, buffer_size=None):
+            self.buffer_size = buffer_size or BUFFER_SIZE
             if h5py_dataset is None:
                 raise MissingDataSetException("A H5pyStorageBuffer instance must have a h5py dataset for which the"
                                               "buffering is done. Please supply one to the 'h5py_dataset' parameter.")
             self.h5py_dataset = h5py_dataset
-            self.grow_dimension = grow_dimension
+            self.grow_dimension = grow_dimension % len(h5py_dataset.shape)
+            self.flush_count = 0
+            self.bytes_written = 0
+            self.__block = None
+            self.__length = 0
+            if buffered_data is not None:
+                self.buffer_data(buffered_data)
+
+        @property
+        def buffered_data(self):
+            """The data buffered so far, or None."""
+            if self.__length == 0:
+                return None
+            return self.__block[self.__address(0, self.__length)]
+
+        def __address(self, start, stop):
+            address = [slice(None, None, None) for _ in self.h5py_dataset.shape]
+            address[self.grow_dimension] = slice(start, stop, None)
+            return tuple(address)
+
+        def __allocate(self, data_list):
+            sample_shape = list(data_list.shape)
+            sample_shape[self.grow_dimension] = 1
+            sample_nbytes = max(1, int(numpy.prod(sample_shape)) * data_list.dtype.itemsize)
+            capacity = max(1, self.buffer_size // sample_nbytes)
+            chunks = self.h5py_dataset.chunks
+            if chunks is not None and capacity > chunks[self.grow_dimension]:
+                capacity -= capacity % chunks[self.grow_dimension]
+            sample_shape[self.grow_dimension] = capacity
+            self.__block = numpy.empty(tuple(sample_shape), dtype=data_list.dtype)
 
         def buffer_data(self, data_list):
             """
@@ -567,47 +698,36 @@ class HDF5StorageManager(object):
             :returns: True if buffer is still fine, \
                       False if a flush is necessary since the buffer is full
             """
-            if self.buffered_data is None:
-                self.buffered_data = data_list
-            else:
-                self.buffered_data = self.__custom_numpy_append(self.buffered_data, data_list)
-            if self.buffered_data.nbytes > self.buffer_size:
-                return False
-            else:
-                return True
-
-        def __custom_numpy_append(self, array1, array2):
-            array_1_shape = numpy.array(array1.shape)
-            array_2_shape = numpy.array(array2.shape)
-            result_shape = copy.deepcopy(array_1_shape)
-            result_shape[self.grow_dimension] += array_2_shape[self.grow_dimension]
-            result_array = numpy.empty(shape=tuple(result_shape), dtype=array1.dtype)
-            full_slice = slice(None, None, None)
-            full_index = [full_slice for _ in array_1_shape]
-            full_index[self.grow_dimension] = slice(0, array_1_shape[self.grow_dimension], None)
-            result_array[tuple(full_index)] = array1
-            full_index[self.grow_dimension] = slice(array_1_shape[self.grow_dimension],
-                                                    result_shape[self.grow_dimension], None)
-            result_array[tuple(full_index)] = array2
-            return result_array
+            if self.__block is None:
+                self.__allocate(data_list)
+            capacity = self.__block.shape[self.grow_dimension]
+            length = data_list.shape[self.grow_dimension]
+            if self.__length + length > capacity:
+                self.flush_buffered_data()
+                if length > capacity:
+                    # larger than the whole buffer, so write through
+                    self.__write(data_list)
+                    return True
+            self.__block[self.__address(self.__length, self.__length + length)] = data_list
+            self.__length += length
+            return self.__length < capacity
+
+        def __write(self, data):
+            current_shape = self.h5py_dataset.shape
+            new_shape = list(current_shape)
+            new_shape[self.grow_dimension] += data.shape[self.grow_dimension]
+            # For example if the 3nd dimension of a 4D datashape (74, 1, 100, 1)
+            # we want to get the slice (:, :, 100:200, :) in order to add 100 new entries
+            self.h5py_dataset.resize(tuple(new_shape))
+            self.h5py_dataset[self.__address(current_shape[self.grow_dimension], new_shape[self.grow_dimension])] = data
+            self.flush_count += 1
+            self.bytes_written += data.nbytes
 
         def flush_buffered_data(self):
             """
             Append the data buffered so far to the input dataset using :param grow_dimension: as the dimension that
             will be expanded.
             """
-            if self.buffered_data is not None:
-                current_shape = self.h5py_dataset.shape
-                new_shape = list(current_shape)
-                new_shape[self.grow_dimension] += self.buffered_data.shape[self.grow_dimension]
-                # Create the required slice to which the new data will be added.
-                # For example if the 3nd dimension of a 4D datashape (74, 1, 100, 1)
-                # we want to get the slice (:, :, 100:200, :) in order to add 100 new entries
-                full_slice = slice(None, None, None)
-                slice_to_add = slice(current_shape[self.grow_dimension], new_shape[self.grow_dimension], None)
-                append2address = [full_slice for _ in new_shape]
-                append2address[self.grow_dimension] = slice_to_add
-                # Do the data reshape and copy the new data
-                self.h5py_dataset.resize(tuple(new_shape))
-                self.h5py_dataset[tuple(append2address)] = self.buffered_data
-                self.buffered_data = None
+            if self.__length > 0:
+                self.__write(self.buffered_data)
+                self.__length = 0
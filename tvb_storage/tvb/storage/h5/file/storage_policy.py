@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2022, Baycrest Centre for Geriatric Care ("Baycrest") and others
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with this
+# program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Chunking and compression policies for growable HDF5 data sets.
+
+h5py picks chunk shapes without knowing how data will be read back, so
+time series written sample by sample end up in chunks which cut across
+both time pages and channels. A StoragePolicy instead shapes chunks for the
+expected access pattern: whole samples over a run of time steps for viewers
+paging through time, or a long run of time steps of a single channel for
+analyzers working channel by channel.
+"""
+
+import numpy
+
+from tvb.basic.logger.builder import get_logger
+
+LOG = get_logger(__name__)
+
+# Size of a chunk, below the 1 MB default chunk cache of each data set
+CHUNK_BYTES = 256 * 1024
+
+
+class StoragePolicy(object):
+    """
+    Describes how a growable data set is chunked and compressed in file.
+    """
+    TIME_PAGED = 'time_paged'
+    CHANNEL_SLICED = 'channel_sliced'
+
+    GZIP = 'gzip'
+    LZF = 'lzf'
+    LZ4 = 'lz4'
+
+    def __init__(self, access=TIME_PAGED, compression=None, compression_level=None, shuffle=False,
+                 chunk_bytes=CHUNK_BYTES):
+        """
+        :param access: expected access pattern, TIME_PAGED or CHANNEL_SLICED
+        :param compression: None, or one of GZIP, LZF or LZ4. LZ4 requires the hdf5plugin package,
+            without which GZIP is used instead.
+        :param compression_level: optional level of the GZIP compression
+        :param shuffle: apply the byte shuffle filter before compression
+        :param chunk_bytes: approximate size in bytes of one chunk
+        """
+        if access not in (self.TIME_PAGED, self.CHANNEL_SLICED):
+            raise ValueError("Unknown access pattern %s" % access)
+        if compression not in (None, self.GZIP, self.LZF, self.LZ4):
+            raise ValueError("Unknown compression %s" % compression)
+        self.access = access
+        self.compression = compression
+        self.compression_level = compression_level
+        self.shuffle = shuffle
+        self.chunk_bytes = chunk_bytes
+
+    def chunk_shape(self, shape, dtype, grow_dimension=-1, growable=True):
+        """
+        Chunk shape for a data set of the given shape, growing along grow_dimension, or
+        indexed mainly along it when not growable.
+
+        Time paged chunks span every dimension but the grow one, while channel sliced chunks
+        have a single element along each of them, except for the modes of 4D time series.
+        In both cases the chunk extends along the grow dimension up to chunk_bytes.
+        """
+        ndim = len(shape)
+        grow_dimension = grow_dimension % ndim
+        chunk = [max(1, int(n)) for n in shape]
+        if self.access == self.CHANNEL_SLICED:
+            for i in range(ndim):
+                if i != grow_dimension and not (ndim == 4 and i == 3):
+                    chunk[i] = 1
+        chunk[grow_dimension] = 1
+        sample_bytes = int(numpy.prod(chunk)) * numpy.dtype(dtype).itemsize
+        chunk[grow_dimension] = max(1, self.chunk_bytes // max(1, sample_bytes))
+        if not growable:
+            chunk[grow_dimension] = min(chunk[grow_dimension], max(1, int(shape[grow_dimension])))
+        return tuple(chunk)
+
+    def dataset_kwargs(self, shape, dtype, grow_dimension=-1, growable=True):
+        """
+        Keyword arguments to h5py's create_dataset applying this policy.
+        """
+        kwargs = dict(chunks=self.chunk_shape(shape, dtype, grow_dimension, growable))
+        if self.shuffle:
+            kwargs['shuffle'] = True
+        compression = self.compression
+        if compression == self.LZ4:
+            try:
+                import hdf5plugin
+                kwargs.update(hdf5plugin.LZ4())
+                compression = None
+            except ImportError:
+                LOG.warning("hdf5plugin is not installed, using gzip instead of lz4 compression.")
+                compression = self.GZIP
+        if compression is not None:
+            kwargs['compression'] = compression
+            if compression == self.GZIP and self.compression_level is not None:
+                kwargs['compression_opts'] = self.compression_level
+        return kwargs
+
+    def __repr__(self):
+        return "StoragePolicy(access=%s, compression=%s, shuffle=%s)" % (self.access, self.compression, self.shuffle)
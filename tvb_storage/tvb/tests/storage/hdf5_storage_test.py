@@ -41,6 +41,7 @@ import pytest
 from tvb.basic.profile import TvbProfile
 from tvb.storage.h5.file.exceptions import MissingDataSetException, IncompatibleFileManagerException, \
     FileStructureException
+from tvb.storage.h5.file.handle_pool import H5ReadHandlePool, read_handle_pool
 from tvb.storage.h5.file.hdf5_storage_manager import HDF5StorageManager
 from tvb.storage.storage_interface import StorageInterface
 
@@ -185,6 +186,26 @@ class TestHDF5Storage(object):
         read_data = self.storage.get_data(DATASET_NAME_1, None, StorageInterface.ROOT_NODE_PATH, False, True)
         self._assert_arrays_are_equal(self.test_2D_array, read_data)
 
+    def test_append_buffered(self):
+        """
+        Test appends buffered in place, with flushes of whole buffers and write-through of large data
+        """
+        data = numpy.random.random((10, 1000))
+        buffer_size = data[:, :100].nbytes
+        self.storage.append_data(data[:, :1], DATASET_NAME_1, 1, False, StorageInterface.ROOT_NODE_PATH,
+                                 buffer_size=buffer_size)
+        for index in range(1, 500):
+            self.storage.append_data(data[:, index:index + 1], DATASET_NAME_1, 1, False,
+                                     StorageInterface.ROOT_NODE_PATH)
+        stats = self.storage.get_buffer_stats()
+        assert stats['flushes'] <= 5
+        self.storage.append_data(data[:, 500:], DATASET_NAME_1, 1, False, StorageInterface.ROOT_NODE_PATH)
+        self.storage.close_file()
+
+        assert self.storage.get_buffer_stats()['bytes_written'] == data.nbytes
+        read_data = self.storage.get_data(DATASET_NAME_1, None, StorageInterface.ROOT_NODE_PATH, False, True)
+        self._assert_arrays_are_equal(data, read_data)
+
     def test_append_data_on_path(self):
         """
         Test data store using append method on a given path
@@ -459,3 +480,72 @@ class TestHDF5Storage(object):
         read_data = self.storage.get_metadata('', StorageInterface.ROOT_NODE_PATH)
         self._assert_arrays_are_equal(TvbProfile.current.version.DATA_VERSION,
                                       read_data[TvbProfile.current.version.DATA_VERSION_ATTRIBUTE])
+
+    def test_reads_keep_file_open(self):
+        """
+        Test that consecutive reads reuse a pooled handle, and writes are seen by the following reads.
+        """
+        self.storage.store_data(self.test_2D_array, DATASET_NAME_1, StorageInterface.ROOT_NODE_PATH)
+        self.storage.get_data(DATASET_NAME_1, where=StorageInterface.ROOT_NODE_PATH)
+        hits = read_handle_pool.hits
+        for i in range(3):
+            read_data = self.storage.get_data(DATASET_NAME_1, (slice(i, i + 1),), StorageInterface.ROOT_NODE_PATH)
+            self._assert_arrays_are_equal(self.test_2D_array[i:i + 1], read_data)
+        assert read_handle_pool.hits == hits + 3
+
+        # writing has to close the pooled handle, otherwise the file could not be opened for append
+        self.storage.append_data(self.test_2D_array, DATASET_NAME_2, where=StorageInterface.ROOT_NODE_PATH)
+        self.storage.append_data(self.test_2D_array, DATASET_NAME_2, where=StorageInterface.ROOT_NODE_PATH)
+        assert (10, 20) == self.storage.get_data_shape(DATASET_NAME_2, StorageInterface.ROOT_NODE_PATH)
+        self.storage.set_metadata(META_DICT, DATASET_NAME_1, where=StorageInterface.ROOT_NODE_PATH)
+        assert META_VALUE == self.storage.get_metadata(DATASET_NAME_1, StorageInterface.ROOT_NODE_PATH)[META_KEY]
+
+    def test_kept_open(self):
+        """
+        Test that the file is opened once for a block of writes, and closed when the outermost block ends.
+        """
+        with self.storage.kept_open():
+            self.storage.store_data(self.test_2D_array, DATASET_NAME_1, StorageInterface.ROOT_NODE_PATH)
+            h5_file = self.storage._open_h5_file()
+            with self.storage.kept_open():
+                self.storage.set_metadata(META_DICT, DATASET_NAME_1, where=StorageInterface.ROOT_NODE_PATH)
+            self.storage.store_data(self.test_3D_array, DATASET_NAME_2, StorageInterface.ROOT_NODE_PATH)
+            assert h5_file.id.valid
+            assert h5_file is self.storage._open_h5_file()
+            read_data = self.storage.get_data(DATASET_NAME_1, where=StorageInterface.ROOT_NODE_PATH)
+            self._assert_arrays_are_equal(self.test_2D_array, read_data)
+        assert not h5_file.id.valid
+
+        read_data = self.storage.get_data(DATASET_NAME_2, where=StorageInterface.ROOT_NODE_PATH)
+        self._assert_arrays_are_equal(self.test_3D_array, read_data)
+        assert META_VALUE == self.storage.get_metadata(DATASET_NAME_1, StorageInterface.ROOT_NODE_PATH)[META_KEY]
+
+    def test_read_handle_pool_limits(self):
+        """
+        Test the number of open files is bounded, and unused handles are closed after the idle timeout.
+        """
+        pool = H5ReadHandlePool(max_open=2, idle_timeout=3600)
+        paths = []
+        for i in range(3):
+            storage = HDF5StorageManager(os.path.join(self.storage_folder, "pooled_%d.h5" % i))
+            storage.store_data(self.test_2D_array, DATASET_NAME_1, StorageInterface.ROOT_NODE_PATH)
+            paths.append(os.path.join(self.storage_folder, "pooled_%d.h5" % i))
+
+        handles = [pool.acquire(path) for path in paths]
+        assert 3 == len(pool)
+        for handle in handles:
+            pool.release(handle)
+        assert 2 == len(pool)
+        assert not handles[0].file.id.valid
+
+        handle = pool.acquire(paths[2])
+        assert handle is handles[2]
+        pool.release(handle)
+        pool.invalidate_folder(self.storage_folder)
+        assert 0 == len(pool)
+        assert not handle.file.id.valid
+
+        pool.idle_timeout = 0
+        pool.release(pool.acquire(paths[0]))
+        pool.close_idle()
+        assert 0 == len(pool)